@@ -1,15 +1,24 @@
 import polars as pl
 
+import ar_type
+
 
 def extract_ns(df: pl.LazyFrame) -> pl.LazyFrame:
     return df.with_columns(
         # NSデータ
-        pl.col("no").str.extract(r"([NS])").cast(pl.Categorical).alias("ns"),
+        pl.col("no").str.extract(r"([NS])").cast(ar_type.NS).alias("ns"),
         # 通し番号からNSを削除
         pl.col("no").str.replace(r"[NS]", ""),
     )
 
 
+def cast_ns(df: pl.LazyFrame) -> pl.LazyFrame:
+    return df.with_columns(
+        # NSデータを文字列から列挙型へ
+        pl.col("ns").cast(ar_type.NS)
+    )
+
+
 def convert_no(df: pl.LazyFrame) -> pl.LazyFrame:
     return df.with_columns(
         # 通し番号を文字列から整数へ
@@ -36,7 +45,7 @@ def extract_coords_qm(
         # 経緯度のはてなマークの存在
         pl.col(coords)
         .str.extract(r"(\?)")
-        .cast(pl.Categorical)
+        .cast(ar_type.QUESTION)
         .name.suffix("_question"),
         # 経緯度からはてなマーク削除
         pl.col(coords).str.replace(r"\?", ""),
@@ -81,7 +90,7 @@ def extract_coords_sign(
         )
         .str.extract(r"([p-])")
         .str.replace(r"(p)", "+")
-        .cast(pl.Categorical)
+        .cast(ar_type.SIGN)
         .name.suffix("_sign"),
         # 経緯度の左右の数値から符号を削除
         pl.col(
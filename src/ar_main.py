@@ -10,6 +10,7 @@ import ar_new
 import ar_notebook
 import ar_old
 import ar_type
+import parquet_layout
 
 
 def calc_obs_date(df: pl.LazyFrame, year: int, month: int) -> pl.LazyFrame:
@@ -31,6 +32,7 @@ def calc_obs_date(df: pl.LazyFrame, year: int, month: int) -> pl.LazyFrame:
 def calc_no(df: pl.LazyFrame, schema_type: ar_type.SchemaType) -> pl.LazyFrame:
     match schema_type:
         case ar_type.SchemaType.NOTEBOOK_1:
+            df = ar_common.cast_ns(df)
             df = ar_common.convert_no(df)
         case ar_type.SchemaType.NOTEBOOK_3:
             df = ar_common.extract_ns(df)
@@ -59,12 +61,12 @@ def calc_coords(
                     ("over", pl.Boolean),
                     ("lon_left", pl.UInt16),
                     ("lon_right", pl.UInt16),
-                    ("lat_left_sign", pl.Categorical),
-                    ("lat_right_sign", pl.Categorical),
-                    ("lon_left_sign", pl.Categorical),
-                    ("lon_right_sign", pl.Categorical),
-                    ("lat_question", pl.Categorical),
-                    ("lon_question", pl.Categorical),
+                    ("lat_left_sign", ar_type.SIGN),
+                    ("lat_right_sign", ar_type.SIGN),
+                    ("lon_left_sign", ar_type.SIGN),
+                    ("lon_right_sign", ar_type.SIGN),
+                    ("lat_question", ar_type.QUESTION),
+                    ("lon_question", ar_type.QUESTION),
                 ],
             )
         case ar_type.SchemaType.NOTEBOOK_3:
@@ -77,10 +79,10 @@ def calc_coords(
                     ("over", pl.Boolean),
                     ("lon_left", pl.UInt16),
                     ("lon_right", pl.UInt16),
-                    ("lon_left_sign", pl.Categorical),
-                    ("lon_right_sign", pl.Categorical),
-                    ("lat_question", pl.Categorical),
-                    ("lon_question", pl.Categorical),
+                    ("lon_left_sign", ar_type.SIGN),
+                    ("lon_right_sign", ar_type.SIGN),
+                    ("lat_question", ar_type.QUESTION),
+                    ("lon_question", ar_type.QUESTION),
                 ],
             )
         case ar_type.SchemaType.OLD | ar_type.SchemaType.NEW:
@@ -151,20 +153,21 @@ def main() -> None:
         )
     )
 
-    with pl.StringCache():
-        # 中間結果を計算し保存
-        for schema_type, df in df_by_schema.items():
-            file_name = output_path / f"{schema_type.name.lower()}.parquet"
-            df.collect().write_parquet(file_name)
-        df_merged.collect().write_parquet(output_path / "merged.parquet")
-        # プロファイルとともに計算
-        df_all, profile = df_sorted.profile()
+    # 中間結果を計算し保存
+    for schema_type, df in df_by_schema.items():
+        file_name = output_path / f"{schema_type.name.lower()}.parquet"
+        df.collect().write_parquet(file_name)
+    df_merged.collect().write_parquet(output_path / "merged.parquet")
+    # プロファイルとともに計算
+    df_all, profile = df_sorted.profile()
 
     # 結果を表示し、保存
     pprint(df_all.schema)
     print(df_all)
     print(profile)
-    df_all.write_parquet(output_path / "all.parquet")
+    parquet_layout.write_parquet(
+        df_all, output_path / "all.parquet", ["ns", "no"]
+    )
     profile.write_csv(output_path / "profile.csv")
 
 
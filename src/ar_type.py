@@ -3,6 +3,13 @@ from enum import Enum, auto
 
 import polars as pl
 
+# 北半球と南半球
+NS = pl.Enum(["N", "S"])
+# 経緯度の数値の符号
+SIGN = pl.Enum(["+", "-"])
+# 経緯度が不確かであることを示すはてなマーク
+QUESTION = pl.Enum(["?"])
+
 
 class SchemaType(Enum):
     NOTEBOOK_1 = auto()
@@ -30,12 +37,14 @@ def detect_schema_type(year: int, month: int) -> SchemaType | None:
     return None
 
 
-def detect_dtypes(schema_type: SchemaType) -> dict[str, type[pl.DataType]]:
+def detect_dtypes(
+    schema_type: SchemaType,
+) -> dict[str, pl.DataType | type[pl.DataType]]:
     match schema_type:
         case SchemaType.NOTEBOOK_1:
-            return {"no": pl.UInt32, "ns": pl.Categorical, "lat": pl.Utf8}
+            return {"no": pl.UInt32, "ns": pl.Utf8, "lat": pl.Utf8}
         case SchemaType.NOTEBOOK_2 | SchemaType.NOTEBOOK_3:
-            return {"no": pl.Utf8, "ns": pl.Categorical, "lat": pl.Utf8}
+            return {"no": pl.Utf8, "ns": pl.Utf8, "lat": pl.Utf8}
         case SchemaType.OLD:
             return {
                 "no": pl.Utf8,
@@ -0,0 +1,213 @@
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+import butterfly_common
+import seiryo_butterfly
+import seiryo_butterfly_image
+from seiryo_butterfly import ButterflyInfo, DateDelta
+
+if TYPE_CHECKING:
+    from datetime import date
+
+# 作成する蝶形図の名前と間隔
+CADENCES = {
+    "daily": DateDelta(days=1),
+    "weekly": DateDelta(days=7),
+    "carrington": DateDelta(rotations=1),
+    "monthly": DateDelta(months=1),
+    "yearly": DateDelta(years=1),
+}
+
+# 緯度の範囲
+LAT_MIN = -50
+LAT_MAX = 50
+
+
+def prepare_seiryo(df: pl.LazyFrame) -> pl.LazyFrame:
+    """黒点群データを観測日ごとの緯度の範囲へ変換する
+
+    Args:
+        df (pl.LazyFrame): 黒点群データ
+
+    Returns:
+        pl.LazyFrame: 初観測日、最終観測日、緯度の範囲
+    """
+    return df.select(
+        pl.col("date").alias("first"),
+        pl.col("date").alias("last"),
+        "lat_min",
+        "lat_max",
+    ).drop_nulls()
+
+
+def prepare_fujimori(df: pl.LazyFrame) -> pl.LazyFrame:
+    """活動領域のデータを観測期間ごとの緯度の範囲へ変換する
+
+    Args:
+        df (pl.LazyFrame): 活動領域のデータ
+
+    Returns:
+        pl.LazyFrame: 初観測日、最終観測日、緯度の範囲
+    """
+    return (
+        df.pipe(butterfly_common.cast_lat_sign)
+        .pipe(butterfly_common.drop_lat_null)
+        .pipe(butterfly_common.reverse_south)
+        .pipe(butterfly_common.reverse_minus)
+        .pipe(butterfly_common.fix_order)
+        .pipe(butterfly_common.complement_last)
+        .select("first", "last", "lat_min", "lat_max")
+        .drop_nulls()
+    )
+
+
+def create_info(
+    df: pl.DataFrame,
+    delta: DateDelta,
+    lat_min: int = LAT_MIN,
+    lat_max: int = LAT_MAX,
+) -> ButterflyInfo:
+    """データの期間全体を覆う蝶形図の情報を作成する
+
+    Args:
+        df (pl.DataFrame): 初観測日と最終観測日を持つデータ
+        delta (DateDelta): 日付の間隔
+        lat_min (int, optional): 緯度の最小値. Defaults to LAT_MIN.
+        lat_max (int, optional): 緯度の最大値. Defaults to LAT_MAX.
+
+    Returns:
+        ButterflyInfo: 蝶形図の情報
+    """
+    date_range: dict[str, date] = df.select(
+        pl.min("first").alias("start"), pl.max("last").alias("end")
+    ).to_dicts()[0]
+    return ButterflyInfo(
+        lat_min,
+        lat_max,
+        seiryo_butterfly.align_date(date_range["start"], delta),
+        seiryo_butterfly.align_date(date_range["end"], delta),
+        delta,
+    )
+
+
+def calc_bins(
+    df: pl.LazyFrame, info: ButterflyInfo, weight: str | None = None
+) -> pl.LazyFrame:
+    """観測期間に含まれる全ての列へ緯度の範囲を展開する
+
+    Args:
+        df (pl.LazyFrame): 初観測日、最終観測日、緯度の範囲
+        info (ButterflyInfo): 蝶形図の情報
+        weight (str | None, optional): 重みの列名、Noneの場合は全て1.
+            Defaults to None.
+
+    Returns:
+        pl.LazyFrame: 列のインデックス、緯度の範囲、重み
+    """
+    n_bins = seiryo_butterfly.create_date_bins(info).collect().height
+    return (
+        df.filter(pl.col("last") >= info.date_start)
+        # 範囲の開始日より前から続く観測期間は開始日から数える
+        .with_columns(pl.col("first").clip(lower_bound=info.date_start))
+        .pipe(seiryo_butterfly.with_bin_index, info=info, col="first")
+        .pipe(seiryo_butterfly.with_bin_index, info=info, col="last")
+        .select(
+            pl.int_ranges(
+                "first_index",
+                # 範囲の終了後まで続く観測期間は最後の列までとする
+                pl.col("last_index").fill_null(n_bins - 1) + 1,
+            ).alias("index"),
+            pl.col("lat_min").alias("min"),
+            pl.col("lat_max").alias("max"),
+            (
+                pl.col(weight).cast(pl.Float64)
+                if weight is not None
+                else pl.lit(1.0)
+            ).alias("weight"),
+        )
+        # 範囲の終了後に始まる観測期間を除く
+        .drop_nulls("index")
+        .explode("index")
+    )
+
+
+def build_images(
+    df: pl.DataFrame,
+    cadences: dict[str, DateDelta],
+    lat_min: int = LAT_MIN,
+    lat_max: int = LAT_MAX,
+) -> dict[str, tuple[npt.NDArray[np.uint8], ButterflyInfo]]:
+    """一度読み込んだデータから全ての間隔の蝶形図を作成する
+
+    Args:
+        df (pl.DataFrame): 初観測日、最終観測日、緯度の範囲
+        cadences (dict[str, DateDelta]): 蝶形図の名前と間隔
+        lat_min (int, optional): 緯度の最小値. Defaults to LAT_MIN.
+        lat_max (int, optional): 緯度の最大値. Defaults to LAT_MAX.
+
+    Returns:
+        dict[str, tuple[npt.NDArray[np.uint8], ButterflyInfo]]:
+            名前ごとの蝶形図の画像データと情報
+    """
+    infos = {
+        name: create_info(df, delta, lat_min, lat_max)
+        for name, delta in cadences.items()
+    }
+    dfl = pl.collect_all(
+        [calc_bins(df.lazy(), info) for info in infos.values()]
+    )
+    return {
+        name: (
+            (
+                seiryo_butterfly_image.create_density_image(df_bins, info) > 0
+            ).astype(np.uint8),
+            info,
+        )
+        for (name, info), df_bins in zip(infos.items(), dfl, strict=True)
+    }
+
+
+def save_images(
+    images: dict[str, tuple[npt.NDArray[np.uint8], ButterflyInfo]],
+    output_path: Path,
+    prefix: str,
+) -> None:
+    """蝶形図の画像データと情報を名前ごとに保存する
+
+    Args:
+        images (dict[str, tuple[npt.NDArray[np.uint8], ButterflyInfo]]):
+            名前ごとの蝶形図の画像データと情報
+        output_path (Path): 出力先のフォルダのパス
+        prefix (str): ファイル名の接頭辞
+    """
+    for name, (img, info) in images.items():
+        with (output_path / f"{prefix}_{name}.npz").open("wb") as f_img:
+            np.savez_compressed(f_img, img=img)
+        with (output_path / f"{prefix}_{name}.json").open("w") as f_info:
+            f_info.write(info.to_json())
+
+
+def main() -> None:
+    output_path = Path("out/butterfly/cadence")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    for prefix, path, prepare in [
+        ("seiryo", Path("out/seiryo/all.parquet"), prepare_seiryo),
+        ("fujimori", Path("out/ar/all.parquet"), prepare_fujimori),
+    ]:
+        start = time.perf_counter()
+        df = pl.scan_parquet(path).pipe(prepare).collect()
+        images = build_images(df, CADENCES)
+        save_images(images, output_path, prefix)
+        print(f"{prefix}: {time.perf_counter() - start:.3f}s")
+        for name, (img, info) in images.items():
+            print(f"    {name}: {img.shape} {info.date_start}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+import butterfly_cadence
+import seiryo_butterfly
+from seiryo_butterfly import ButterflyInfo, DateDelta
+
+# 作成する緯度の移動の名前と間隔
+CADENCES = {"daily": DateDelta(days=1), "monthly": DateDelta(months=1)}
+
+# 緯度の分布の分位点
+QUANTILES = [0.1, 0.5, 0.9]
+
+# 当てはめる多項式の次数
+DEGREES = [1, 2]
+
+# 1年の日数
+DAYS_PER_YEAR = 365.25
+
+# 極小の前後で新旧の周期の黒点群が重なる年数
+OVERLAP_YEARS = 2
+
+# 重なる期間に新旧の周期を分ける緯度
+SPLIT_LATITUDE = 15
+
+
+def prepare_seiryo(df: pl.LazyFrame) -> pl.LazyFrame:
+    """黒点群データを観測日ごとの緯度の範囲と黒点数へ変換する
+
+    Args:
+        df (pl.LazyFrame): 黒点群データ
+
+    Returns:
+        pl.LazyFrame: 初観測日、最終観測日、緯度の範囲、黒点数の重み
+    """
+    return df.select(
+        pl.col("date").alias("first"),
+        pl.col("date").alias("last"),
+        "lat_min",
+        "lat_max",
+        pl.col("num").alias("weight"),
+    ).drop_nulls()
+
+
+def prepare_fujimori(df: pl.LazyFrame) -> pl.LazyFrame:
+    """活動領域のデータを観測期間ごとの緯度の範囲へ変換する
+
+    黒点数が無いため、重みは全て1とする
+
+    Args:
+        df (pl.LazyFrame): 活動領域のデータ
+
+    Returns:
+        pl.LazyFrame: 初観測日、最終観測日、緯度の範囲、重み
+    """
+    return butterfly_cadence.prepare_fujimori(df).with_columns(
+        pl.lit(1).alias("weight")
+    )
+
+
+def assign_cycles(df: pl.LazyFrame, minima: pl.Series) -> pl.LazyFrame:
+    """黒点群を日付と緯度から活動周期へ割り当てる
+
+    基本は直前の極小から始まる周期とする。
+    極小の前後OVERLAP_YEARS年は新旧の周期の黒点群が重なるため、
+    極小の前の高緯度の黒点群は次の周期、
+    極小の後の低緯度の黒点群は前の周期とする。
+    最初の極小より前の周期の黒点群は周期が不明なため除く
+
+    Args:
+        df (pl.LazyFrame): 日付と緯度の絶対値を持つデータ
+        minima (pl.Series): 活動周期の極小の日付
+
+    Returns:
+        pl.LazyFrame: 周期の開始日を追加したデータ
+    """
+    df_minima = (
+        pl.LazyFrame({"start": minima.sort()})
+        .cast({"start": pl.Date})
+        .with_columns(
+            pl.col("start").shift(1).alias("prev"),
+            pl.col("start").shift(-1).alias("next"),
+        )
+    )
+    overlap = OVERLAP_YEARS * DAYS_PER_YEAR
+    high = pl.col("lat") >= SPLIT_LATITUDE
+    return (
+        df.sort("date", maintain_order=True)
+        .join_asof(
+            df_minima, left_on="date", right_on="start", strategy="backward"
+        )
+        .with_columns(
+            pl.when(
+                (pl.col("next") - pl.col("date")).dt.total_days() < overlap,
+                high,
+            )
+            .then(pl.col("next"))
+            .when(
+                (pl.col("date") - pl.col("start")).dt.total_days() < overlap,
+                ~high,
+            )
+            .then(pl.col("prev"))
+            .otherwise(pl.col("start"))
+            .alias("start")
+        )
+        .drop("prev", "next")
+        .drop_nulls("start")
+    )
+
+
+def weighted_quantile(q: float) -> pl.Expr:
+    """重み付きの緯度の分位点を算出する
+
+    緯度の順に重みを累積し、累積の割合が初めて分位以上となる緯度とする
+
+    Args:
+        q (float): 分位
+
+    Returns:
+        pl.Expr: 分位点
+    """
+    ratio = pl.col("weight").sort_by("lat").cum_sum() / pl.col("weight").sum()
+    return pl.col("lat").sort().filter(ratio >= q).first()
+
+
+def calc_drift(
+    df: pl.LazyFrame, info: ButterflyInfo, minima: pl.Series
+) -> pl.LazyFrame:
+    """期間、周期、半球ごとの黒点群の緯度の分布を算出する
+
+    緯度の範囲の中央を黒点群の緯度とし、南半球は絶対値とする。
+    赤道上の黒点群は半球が決まらないため除く。
+    分位点は平均と同じく重みを付ける
+
+    Args:
+        df (pl.LazyFrame): 初観測日、最終観測日、緯度の範囲、重み
+        info (ButterflyInfo): 蝶形図の情報
+        minima (pl.Series): 活動周期の極小の日付
+
+    Returns:
+        pl.LazyFrame: 期間の初めの日付、周期の開始日、開始からの年数、
+            半球、重み付き平均緯度、緯度の分位点、黒点群数、重みの合計
+    """
+    lat = (pl.col("min") + pl.col("max")) / 2
+    return (
+        butterfly_cadence.calc_bins(df, info, weight="weight")
+        .select(
+            pl.col("index").cast(pl.UInt32),
+            pl.when(lat > 0)
+            .then(pl.lit("north"))
+            .when(lat < 0)
+            .then(pl.lit("south"))
+            .alias("hemisphere"),
+            lat.abs().alias("lat"),
+            "weight",
+        )
+        .drop_nulls("hemisphere")
+        .join(seiryo_butterfly.create_date_bins(info), on="index", how="left")
+        .pipe(assign_cycles, minima)
+        .group_by("date", "start", "hemisphere")
+        .agg(
+            (
+                (pl.col("lat") * pl.col("weight")).sum()
+                / pl.col("weight").sum()
+            ).alias("lat_mean"),
+            *(
+                weighted_quantile(q).alias(f"lat_q{round(q * 100):02}")
+                for q in QUANTILES
+            ),
+            pl.len().cast(pl.UInt32).alias("count"),
+            pl.col("weight").sum(),
+        )
+        .with_columns(
+            (
+                (pl.col("date") - pl.col("start")).dt.total_days()
+                / DAYS_PER_YEAR
+            ).alias("t")
+        )
+        .select("date", "start", "t", pl.all().exclude("date", "start", "t"))
+        .sort("date", "start", "hemisphere")
+    )
+
+
+def fit_drift(df: pl.DataFrame, degree: int) -> pl.DataFrame:
+    """周期と半球ごとの緯度の移動を多項式でまとめて当てはめる
+
+    重みの合計を重みとした重み付き最小二乗法とし、
+    全ての組の正規方程式を一度に解く
+
+    Args:
+        df (pl.DataFrame): 周期の開始日、開始からの年数、半球、
+            重み付き平均緯度、重みの合計
+        degree (int): 多項式の次数
+
+    Returns:
+        pl.DataFrame: 周期の開始日、半球、次数、
+            定数項から次数の順の係数、期間の数
+    """
+    t = pl.col("t")
+    w = pl.col("weight")
+    df_moments = (
+        df.group_by("start", "hemisphere")
+        .agg(
+            *((w * t**k).sum().alias(f"m{k}") for k in range(2 * degree + 1)),
+            *(
+                (w * t**k * pl.col("lat_mean")).sum().alias(f"v{k}")
+                for k in range(degree + 1)
+            ),
+            pl.len().cast(pl.UInt32).alias("n"),
+        )
+        .sort("start", "hemisphere")
+    )
+    moments = df_moments.select(
+        f"m{k}" for k in range(2 * degree + 1)
+    ).to_numpy()
+    values = df_moments.select(f"v{k}" for k in range(degree + 1)).to_numpy()
+
+    # 正規方程式の行列はモーメントを並べたハンケル行列となる
+    index = np.add.outer(np.arange(degree + 1), np.arange(degree + 1))
+    coef = (np.linalg.pinv(moments[:, index]) @ values[..., None])[..., 0]
+    coef[df_moments["n"].to_numpy() <= degree] = np.nan
+
+    return df_moments.select(
+        "start",
+        "hemisphere",
+        pl.lit(degree, pl.UInt8).alias("degree"),
+        *(
+            pl.Series(f"c{k}", coef[:, k]).fill_nan(None)
+            for k in range(degree + 1)
+        ),
+        "n",
+    )
+
+
+def fit_all(df: pl.DataFrame, degrees: list[int] = DEGREES) -> pl.DataFrame:
+    """全ての次数の当てはめ結果を一つのデータへまとめる
+
+    Args:
+        df (pl.DataFrame): 周期を割り当てた緯度の分布
+        degrees (list[int], optional): 多項式の次数. Defaults to DEGREES.
+
+    Returns:
+        pl.DataFrame: 次数ごとの当てはめ結果
+    """
+    return pl.concat(
+        [fit_drift(df, degree) for degree in degrees], how="diagonal"
+    ).select(
+        "start",
+        "hemisphere",
+        "degree",
+        *(f"c{k}" for k in range(max(degrees) + 1)),
+        "n",
+    )
+
+
+def main() -> None:
+    path_extrema = Path("out/sn/smoothed/extrema_tapered.parquet")
+    output_path = Path("out/butterfly/drift")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    minima = (
+        pl.read_parquet(path_extrema)
+        .filter(
+            pl.col("kind") == "min", pl.col("series").str.ends_with("_total")
+        )["date"]
+        .unique()
+    )
+    print(f"minima: {minima.sort().to_list()}")
+
+    for prefix, path, prepare in [
+        ("seiryo", Path("out/seiryo/all.parquet"), prepare_seiryo),
+        ("fujimori", Path("out/ar/all.parquet"), prepare_fujimori),
+    ]:
+        df = pl.scan_parquet(path).pipe(prepare).collect()
+        for name, delta in CADENCES.items():
+            start = time.perf_counter()
+            info = butterfly_cadence.create_info(df, delta)
+            df_drift = calc_drift(df.lazy(), info, minima).collect()
+            df_fit = fit_all(df_drift)
+            print(
+                f"{prefix} {name}: {df_drift.height} rows "
+                f"in {time.perf_counter() - start:.3f}s"
+            )
+            print(df_fit)
+            df_drift.write_parquet(output_path / f"{prefix}_{name}.parquet")
+            df_fit.write_parquet(output_path / f"{prefix}_{name}_fit.parquet")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,124 +1,156 @@
+import json
 from pathlib import Path
 
 import polars as pl
 
+from check_common import Rule, enabled_rules, find_violations, print_violations
+from check_config import CheckAr
 
-def filter_df(lf: pl.LazyFrame, expr: pl.Expr) -> pl.DataFrame | None:
-    df = lf.filter(expr).sort("no", "ns").collect()
-    return df if df.height != 0 else None
+
+def null_values(cols: list[str]) -> pl.Expr:
+    """
+    欠損値が混入している行で真となる式
+    """
+    return pl.any_horizontal(pl.col(cols).is_null())
 
 
-def find_null_values_notebook(lf: pl.LazyFrame) -> pl.DataFrame | None:
+def observation_reversals() -> pl.Expr:
     """
-    欠損値が混入していないか確認する関数
-    混入していたもののみ返す
-    手帳形式用
+    初観測日時と最終観測日時の関係が逆転している行で真となる式
     """
-    return filter_df(
-        lf.select("ns", "no", "lat_left", "lat_right", "first"),
-        pl.any_horizontal(pl.all().is_null()),
-    )
+    return pl.col("first") > pl.col("last")
 
 
-def find_null_values_report(lf: pl.LazyFrame) -> pl.DataFrame | None:
+def invalid_obs_range(interval: int) -> pl.Expr:
     """
-    欠損値が混入していないか確認する関数
-    混入していたもののみ返す
-    レポート形式用
+    初観測日時と最終観測日時の差が離れすぎている行で真となる式
     """
-    return filter_df(
-        lf.select(
-            "ns",
-            "no",
-            "lat_left",
-            "lat_right",
-            "lon_left",
-            "lon_right",
-            "first",
-            "last",
-            "over",
-        ),
-        pl.any_horizontal(pl.all().is_null()),
-    )
+    return (pl.col("last") - pl.col("first")).dt.total_days() > interval
 
 
-def find_observation_reversals(lf: pl.LazyFrame) -> pl.DataFrame | None:
+def invalid_lat_range(threshold: int) -> pl.Expr:
     """
-    初観測日時と最終観測日時の関係が逆転していないか確認する関数
-    逆転しているもののみ返す
+    緯度の範囲が閾値までに収まっていない行で真となる式
     """
-    return filter_df(
-        lf.select("ns", "no", "first", "last"),
-        pl.col("first") > pl.col("last"),
-    )
+    return ~pl.col("lat_left").is_between(0, threshold) | ~pl.col(
+        "lat_right"
+    ).is_between(0, threshold)
 
 
-def find_invalid_obs_range(
-    lf: pl.LazyFrame, interval: int
-) -> pl.DataFrame | None:
+def invalid_lon_range(min_threshold: int, max_threshold: int) -> pl.Expr:
     """
-    初観測日時と最終観測日時の差が離れすぎていないか確認する関数
-    離れすぎているものを返す
+    経度の範囲が閾値までに収まっていない行で真となる式
     """
-    return filter_df(
-        lf.select("ns", "no", "first", "last"),
-        (pl.col("last") - pl.col("first")).dt.total_days() > interval,
-    )
+    return ~pl.col("lon_left").is_between(
+        min_threshold, max_threshold
+    ) | ~pl.col("lon_right").is_between(min_threshold, max_threshold)
 
 
-def find_invalid_lat_range(
-    lf: pl.LazyFrame, threthold: int
-) -> pl.DataFrame | None:
+def create_rules_notebook() -> list[Rule]:
+    """
+    手帳形式のデータの検査の規則を作成する
+    """
+    cols = ["ns", "no", "lat_left", "lat_right", "first"]
+    return [
+        Rule(
+            name="null_notebook",
+            message="type notebook null check failed",
+            expr=null_values(cols),
+            columns=tuple(cols),
+        )
+    ]
+
+
+def create_rules_report(config: CheckAr) -> list[Rule]:
     """
-    緯度の範囲が閾値までに収まってるか確認する関数
-    収まっていないもののみ返す
+    レポート形式のデータの検査の規則を作成する
     """
-    return filter_df(
-        lf.select("ns", "no", "lat_left", "lat_right", "first"),
-        ~pl.col("lat_left").is_between(0, threthold)
-        | ~pl.col("lat_right").is_between(0, threthold),
-    )
+    cols = [
+        "ns",
+        "no",
+        "lat_left",
+        "lat_right",
+        "lon_left",
+        "lon_right",
+        "first",
+        "last",
+        "over",
+    ]
+    return [
+        Rule(
+            name="null_report",
+            message="type report null check failed",
+            expr=null_values(cols),
+            columns=tuple(cols),
+        ),
+        Rule(
+            name="obs_range",
+            message="obs range check failed",
+            expr=invalid_obs_range(config.obs_interval),
+            columns=("ns", "no", "first", "last"),
+        ),
+        Rule(
+            name="lon_range",
+            message="lon range check failed",
+            expr=invalid_lon_range(
+                config.lon_min_threshold, config.lon_max_threshold
+            ),
+            columns=("ns", "no", "lon_left", "lon_right", "first"),
+        ),
+    ]
 
 
-def find_invalid_lon_range(lf: pl.LazyFrame) -> pl.DataFrame | None:
+def create_rules_all(config: CheckAr) -> list[Rule]:
     """
-    経度の範囲が0~360に収まっているか確認する関数
-    収まっていないもののみ返す
+    全てのデータの検査の規則を作成する
     """
-    return filter_df(
-        lf.select("ns", "no", "lon_left", "lon_right", "first"),
-        ~pl.col("lon_left").is_between(0, 360)
-        | ~pl.col("lon_right").is_between(0, 360),
-    )
+    return [
+        Rule(
+            name="obs_reversals",
+            message="obs revers check failed",
+            expr=observation_reversals(),
+            columns=("ns", "no", "first", "last"),
+        ),
+        Rule(
+            name="lat_range",
+            message="lat range check failed",
+            expr=invalid_lat_range(config.lat_threshold),
+            columns=("ns", "no", "lat_left", "lat_right", "first"),
+        ),
+    ]
 
 
 def main() -> None:
     df_notebook = pl.scan_parquet(Path("out/ar/notebook_*.parquet"))
     df_report = pl.scan_parquet(Path("out/ar/merged.parquet"))
     df_all = pl.scan_parquet(Path("out/ar/all.parquet"))
+    config_path = Path("config/check/ar.json")
+
+    with config_path.open("r") as file:
+        config = CheckAr(**json.load(file))
+    rules_notebook = enabled_rules(create_rules_notebook(), config.disabled)
+    rules_report = enabled_rules(create_rules_report(config), config.disabled)
+    rules_all = enabled_rules(create_rules_all(config), config.disabled)
 
-    with pl.Config() as cfg, pl.StringCache():
+    with pl.Config() as cfg:
         cfg.set_tbl_cols(-1)
         cfg.set_tbl_rows(-1)
 
-        if (checked := find_null_values_notebook(df_notebook)) is not None:
-            print("type notebook null check failed")
-            print(checked)
-        if (checked := find_null_values_report(df_report)) is not None:
-            print("type report null check failed")
-            print(checked)
-        if (checked := find_observation_reversals(df_all)) is not None:
-            print("obs revers check failed")
-            print(checked)
-        if (checked := find_invalid_obs_range(df_report, 25)) is not None:
-            print("obs range check failed")
-            print(checked)
-        if (checked := find_invalid_lat_range(df_all, 50)) is not None:
-            print("lat range check failed")
-            print(checked)
-        if (checked := find_invalid_lon_range(df_report)) is not None:
-            print("lon range check failed")
-            print(checked)
+        # 各データを一度ずつ走査し、並列に検査する
+        dfl = pl.collect_all(
+            [
+                find_violations(df, rules).sort("no", "ns")
+                for df, rules in [
+                    (df_notebook, rules_notebook),
+                    (df_report, rules_report),
+                    (df_all, rules_all),
+                ]
+            ]
+        )
+        for df, rules in zip(
+            dfl, [rules_notebook, rules_report, rules_all], strict=True
+        ):
+            print_violations(df, rules)
 
 
 if __name__ == "__main__":
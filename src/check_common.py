@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+
+import polars as pl
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Rule:
+    """データの検査の規則
+
+    Attributes:
+        name (str): 規則の名前
+        message (str): 違反が見つかった場合に表示するメッセージ
+        expr (pl.Expr): 違反している行で真となる式
+        columns (tuple[str, ...]): 違反の表示に用いる列
+    """
+
+    name: str
+    message: str
+    expr: pl.Expr
+    columns: tuple[str, ...]
+
+
+def enabled_rules(rules: list[Rule], disabled: list[str]) -> list[Rule]:
+    """無効にされていない規則のみを返す
+
+    Args:
+        rules (list[Rule]): 規則
+        disabled (list[str]): 無効にする規則の名前
+
+    Returns:
+        list[Rule]: 有効な規則
+    """
+    return [rule for rule in rules if rule.name not in disabled]
+
+
+def find_violations(lf: pl.LazyFrame, rules: list[Rule]) -> pl.LazyFrame:
+    """全ての規則を一度の走査で検査し、違反した行を規則の名前と共に返す
+
+    一つの行が複数の規則に違反した場合は規則ごとに行を分ける
+
+    Args:
+        lf (pl.LazyFrame): 検査するデータ
+        rules (list[Rule]): 規則
+
+    Returns:
+        pl.LazyFrame: 違反した規則の名前の列を追加したデータ
+    """
+    rule_type = pl.Enum([rule.name for rule in rules])
+    if not rules:
+        return lf.clear().with_columns(pl.lit(None, rule_type).alias("rule"))
+    return (
+        lf.with_columns(
+            pl.concat_list(
+                pl.when(rule.expr).then(pl.lit(rule.name)) for rule in rules
+            )
+            .list.drop_nulls()
+            .alias("rule")
+        )
+        .filter(pl.col("rule").list.len() > 0)
+        .explode("rule")
+        .with_columns(pl.col("rule").cast(rule_type))
+    )
+
+
+def print_violations(df: pl.DataFrame, rules: list[Rule]) -> None:
+    """規則ごとに違反した行を表示する
+
+    Args:
+        df (pl.DataFrame): 違反した規則の名前の列を持つデータ
+        rules (list[Rule]): 規則
+    """
+    for rule in rules:
+        violations = df.filter(pl.col("rule") == rule.name)
+        if violations.height != 0:
+            print(rule.message)
+            print(violations.select(rule.columns))
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+
+class CheckAr(BaseModel):
+    disabled: list[str]
+    obs_interval: int
+    lat_threshold: int
+    lon_min_threshold: int
+    lon_max_threshold: int
+
+
+class CheckSn(BaseModel):
+    disabled: list[str]
+    lat: float
+    lon: float
+
+
+class CheckSeiryo(BaseModel):
+    disabled: list[str]
+    lat_threshold: int
+    lon_min_threshold: int
+    lon_max_threshold: int
+    lat_interval: int
+    lon_interval: int
@@ -1,62 +1,50 @@
+import json
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import polars as pl
 from suntime import Sun
 
+from check_common import Rule, enabled_rules, find_violations, print_violations
+from check_config import CheckSn
 
-def filter_df(lf: pl.LazyFrame, expr: pl.Expr) -> pl.DataFrame | None:
-    df = lf.filter(expr).collect()
-    return df if df.height != 0 else None
 
-
-def find_null_values(lf: pl.LazyFrame) -> pl.DataFrame | None:
+def null_values() -> pl.Expr:
     """
     nullチェック
-    混入しているものを返す
+    一部の値のみが欠損している行で真となる式
     """
-    return filter_df(
-        lf,
-        pl.any_horizontal(pl.col("time", "ng", "nf", "sg", "sf").is_null())
-        & ~pl.all_horizontal(pl.col("time", "ng", "nf", "sg", "sf").is_null())
-        | pl.col("date").is_null(),
+    cols = pl.col("time", "ng", "nf", "sg", "sf")
+    return (
+        pl.any_horizontal(cols.is_null()) & ~pl.all_horizontal(cols.is_null())
+        | pl.col("date").is_null()
     )
 
 
-def find_gf_reversals(lf: pl.LazyFrame) -> pl.DataFrame | None:
+def gf_reversals() -> pl.Expr:
     """
-    g(黒点群数)とf(黒点数)の関係が逆転していないかを確認する関数
-    逆転しているものを返す
+    g(黒点群数)とf(黒点数)の関係が逆転している行で真となる式
     """
-    return filter_df(
-        lf, (pl.col("ng") > pl.col("nf")) | (pl.col("sg") > pl.col("sf"))
-    )
+    return (pl.col("ng") > pl.col("nf")) | (pl.col("sg") > pl.col("sf"))
 
 
-def check_by_total(
-    lf: pl.LazyFrame, index: pl.LazyFrame
-) -> pl.DataFrame | None:
+def check_by_total(lf: pl.LazyFrame, index: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    月ごとの合計値が集計表と一致しているか確認する
+    一致していない月を返す
+    """
     return (
-        df
-        if (
-            df := lf.select(
-                pl.col("date").dt.year().alias("year"),
-                pl.col("date").dt.month().alias("month"),
-                (pl.col("nf") + pl.col("ng") * 10).alias("nt"),
-                (pl.col("sf") + pl.col("sg") * 10).alias("st"),
-            )
-            .group_by("year", "month")
-            .agg(pl.col("nt").sum(), pl.col("st").sum())
-            # .cast({"month": pl.UInt32})
-            .join(index, on=["year", "month"], how="outer")
-            .filter(
-                (pl.col("nt") != pl.col("n")) | (pl.col("st") != pl.col("s"))
-            )
-            .sort("year", "month")
-            .collect()
-        ).height
-        != 0
-        else None
+        lf.select(
+            pl.col("date").dt.year().alias("year"),
+            pl.col("date").dt.month().alias("month"),
+            (pl.col("nf") + pl.col("ng") * 10).alias("nt"),
+            (pl.col("sf") + pl.col("sg") * 10).alias("st"),
+        )
+        .group_by("year", "month")
+        .agg(pl.col("nt").sum(), pl.col("st").sum())
+        .join(index, on=["year", "month"], how="full", coalesce=True)
+        .filter((pl.col("nt") != pl.col("n")) | (pl.col("st") != pl.col("s")))
+        .sort("year", "month")
     )
 
 
@@ -67,43 +55,69 @@ def is_sun_rised(sun: Sun, dt: datetime) -> bool:
     return sr <= dt <= ss
 
 
-def check_sun_rised(
-    lf: pl.LazyFrame, lat: int = 35, lon: int = 135
-) -> pl.DataFrame | None:
+def sun_not_rised(lat: float, lon: float) -> pl.Expr:
+    """
+    観測時刻が日の出から日の入りまでの間に無い行で真となる式
+    """
     sun = Sun(lat, lon)
 
     def _is_sun_rised(x: datetime) -> bool:
         return is_sun_rised(sun, x)
 
-    return filter_df(
-        lf,
-        ~pl.col("date")
-        .dt.combine(pl.col("time"))
-        .dt.replace_time_zone("Asia/Tokyo")
-        .map_elements(_is_sun_rised, return_dtype=pl.Boolean),
-    )
+    return ~pl.col("date").dt.combine(pl.col("time")).dt.replace_time_zone(
+        "Asia/Tokyo"
+    ).map_elements(_is_sun_rised, return_dtype=pl.Boolean)
+
+
+def create_rules(config: CheckSn) -> list[Rule]:
+    """
+    黒点数データの検査の規則を作成する
+    """
+    columns = ("date", "time", "ng", "nf", "sg", "sf")
+    return [
+        Rule(
+            name="null",
+            message="null check failed",
+            expr=null_values(),
+            columns=columns,
+        ),
+        Rule(
+            name="gf_reversals",
+            message="gf reversals check failed",
+            expr=gf_reversals(),
+            columns=columns,
+        ),
+        Rule(
+            name="sunrise",
+            message="sunrise/sunset check failed",
+            expr=sun_not_rised(config.lat, config.lon),
+            columns=columns,
+        ),
+    ]
 
 
 def main() -> None:
     file = pl.scan_parquet(Path("out/sn/all.parquet"))
     index = pl.scan_parquet(Path("out/sn/index.parquet"))
+    config_path = Path("config/check/sn.json")
+
+    with config_path.open("r") as file_config:
+        config = CheckSn(**json.load(file_config))
+    rules = enabled_rules(create_rules(config), config.disabled)
+
+    # 規則の検査と合計値の検査を並列に実行する
+    df_violations, df_total = pl.collect_all(
+        [find_violations(file, rules), check_by_total(file, index)]
+    )
 
     with pl.Config() as cfg:
         cfg.set_tbl_cols(-1)
         cfg.set_tbl_rows(-1)
 
-        if (checked := find_null_values(file)) is not None:
-            print("null check failed")
-            print(checked)
-        if (checked := find_gf_reversals(file)) is not None:
-            print("gf reversals check failed")
-            print(checked)
-        if (checked := check_by_total(file, index)) is not None:
+        print_violations(df_violations, rules)
+        if df_total.height != 0:
             print("total check failed")
-            print(checked)
-        if (checked := check_sun_rised(file)) is not None:
-            print("sunrise/sunset check failed")
-            print(checked)
+            print(df_total)
 
 
 if __name__ == "__main__":
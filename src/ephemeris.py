@@ -0,0 +1,244 @@
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+# 1970-01-01 0時(UT)のユリウス日
+JD_UNIX_EPOCH = 2440587.5
+
+# J2000.0のユリウス日
+JD_J2000 = 2451545.0
+
+# 太陽の赤道の黄道に対する傾斜角の度数
+SOLAR_INCLINATION = 7.25
+
+# カリントン経度の原点のユリウス日
+JD_CARRINGTON = 2398220.0
+
+# カリントン自転の恒星自転周期の日数
+CARRINGTON_PERIOD = 25.38
+
+# カリントン自転1の開始のユリウス日
+JD_CARRINGTON_ROTATION = 2398140.227
+
+# カリントン自転の平均の会合周期の日数
+CARRINGTON_SYNODIC_PERIOD = 27.2752316
+
+
+def calc_julian_day(
+    dates: npt.NDArray[np.datetime64],
+) -> npt.NDArray[np.float64]:
+    """日付の配列をユリウス日へ変換する
+
+    Args:
+        dates (npt.NDArray[np.datetime64]): 日付の配列
+
+    Returns:
+        npt.NDArray[np.float64]: ユリウス日の配列
+    """
+    dates = dates.astype("datetime64[D]")
+    days = dates.astype(np.int64).astype(np.float64)
+    # 日付の欠損値は非数とする
+    days[np.isnat(dates)] = np.nan
+    return days + JD_UNIX_EPOCH
+
+
+def calc_solar_longitude(
+    jd: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """太陽の視黄経と黄道傾斜角を算出する
+
+    Args:
+        jd (npt.NDArray[np.float64]): ユリウス日の配列
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+            視黄経[deg]と黄道傾斜角[deg]
+    """
+    t = (jd - JD_J2000) / 36525
+    # 平均黄経と平均近点角
+    mean_lon = 280.46646 + 36000.76983 * t + 0.0003032 * t**2
+    mean_anomaly = np.deg2rad(357.52911 + 35999.05029 * t - 0.0001537 * t**2)
+    # 中心差
+    center = (
+        (1.914602 - 0.004817 * t - 0.000014 * t**2) * np.sin(mean_anomaly)
+        + (0.019993 - 0.000101 * t) * np.sin(2 * mean_anomaly)
+        + 0.000289 * np.sin(3 * mean_anomaly)
+    )
+    # 章動と光行差を補正した視黄経
+    omega = np.deg2rad(125.04 - 1934.136 * t)
+    lon = mean_lon + center - 0.00569 - 0.00478 * np.sin(omega)
+    # 黄道傾斜角
+    obliquity = (
+        23.439291 - 0.0130042 * t - 0.00000016 * t**2 + 0.00256 * np.cos(omega)
+    )
+    return np.mod(lon, 360), obliquity
+
+
+def calc_node(jd: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """太陽の赤道の昇交点黄経を算出する
+
+    Args:
+        jd (npt.NDArray[np.float64]): ユリウス日の配列
+
+    Returns:
+        npt.NDArray[np.float64]: 昇交点黄経[rad]
+    """
+    return np.deg2rad(73.6667 + 1.3958333 * (jd - 2396758) / 36525)
+
+
+def calc_b0p(
+    dates: npt.NDArray[np.datetime64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """日付の配列から太陽の自転軸の傾きB0と位置角Pを算出する
+
+    Args:
+        dates (npt.NDArray[np.datetime64]): 日付の配列
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+            B0[deg]とP[deg]
+    """
+    jd = calc_julian_day(dates)
+    lon, obliquity = calc_solar_longitude(jd)
+    node = calc_node(jd)
+    lon = np.deg2rad(lon)
+    inclination = np.deg2rad(SOLAR_INCLINATION)
+
+    x = np.arctan(-np.cos(lon) * np.tan(np.deg2rad(obliquity)))
+    y = np.arctan(-np.cos(lon - node) * np.tan(inclination))
+    b0 = np.arcsin(np.sin(lon - node) * np.sin(inclination))
+    return np.rad2deg(b0), np.rad2deg(x + y)
+
+
+def calc_l0(dates: npt.NDArray[np.datetime64]) -> npt.NDArray[np.float64]:
+    """日付の配列から太陽の中央子午線のカリントン経度L0を算出する
+
+    Args:
+        dates (npt.NDArray[np.datetime64]): 日付の配列
+
+    Returns:
+        npt.NDArray[np.float64]: L0[deg]
+    """
+    jd = calc_julian_day(dates)
+    lon, _ = calc_solar_longitude(jd)
+    node = calc_node(jd)
+    lon = np.deg2rad(lon)
+    inclination = np.deg2rad(SOLAR_INCLINATION)
+
+    # 原点からの自転角
+    theta = (jd - JD_CARRINGTON) * 360 / CARRINGTON_PERIOD
+    eta = np.arctan2(
+        -np.sin(lon - node) * np.cos(inclination), -np.cos(lon - node)
+    )
+    return np.mod(np.rad2deg(eta) - theta, 360)
+
+
+def calc_carrington_rotation(
+    dates: npt.NDArray[np.datetime64],
+) -> npt.NDArray[np.float64]:
+    """日付の配列から小数のカリントン自転番号を算出する
+
+    整数部は自転番号、小数部はL0が360度から減少した割合とする
+
+    Args:
+        dates (npt.NDArray[np.datetime64]): 日付の配列
+
+    Returns:
+        npt.NDArray[np.float64]: 小数のカリントン自転番号
+    """
+    jd = calc_julian_day(dates)
+    # 平均の会合周期による概算値を、L0と整合するよう補正する
+    approx = (jd - JD_CARRINGTON_ROTATION) / CARRINGTON_SYNODIC_PERIOD
+    frac = 1 - calc_l0(dates) / 360
+    return np.round(approx - frac) + frac
+
+
+def load_b0p_table(path: Path) -> pl.LazyFrame:
+    """月日ごとのB0とPの表を読み込む
+
+    Args:
+        path (Path): 表のファイルのパス
+
+    Returns:
+        pl.LazyFrame: B0とPの表
+    """
+    return pl.scan_csv(
+        path,
+        schema={
+            "month": pl.Int8,
+            "day": pl.Int8,
+            "b0": pl.Float64,
+            "p": pl.Float64,
+        },
+    )
+
+
+def join_b0p_table(
+    df: pl.LazyFrame, table: pl.LazyFrame, col: str = "date"
+) -> pl.LazyFrame:
+    """表から各行の日付に対応するB0とPを付与する
+
+    Args:
+        df (pl.LazyFrame): 日付を含むデータ
+        table (pl.LazyFrame): B0とPの表
+        col (str, optional): 日付の列名. Defaults to "date".
+
+    Returns:
+        pl.LazyFrame: B0とPを付与したデータ
+    """
+    return (
+        df.with_columns(
+            pl.col(col).dt.month().cast(pl.Int8).alias("month"),
+            pl.col(col).dt.day().cast(pl.Int8).alias("day"),
+        )
+        .join(table, on=["month", "day"], how="left", coalesce=True)
+        .drop("month", "day")
+    )
+
+
+def with_b0p(df: pl.LazyFrame, col: str = "date") -> pl.LazyFrame:
+    """計算式から各行の日付に対応するB0とPを付与する
+
+    Args:
+        df (pl.LazyFrame): 日付を含むデータ
+        col (str, optional): 日付の列名. Defaults to "date".
+
+    Returns:
+        pl.LazyFrame: B0とPを付与したデータ
+    """
+    return df.with_columns(
+        pl.col(col)
+        .map_batches(
+            lambda s: (
+                pl.DataFrame(
+                    dict(zip(["b0", "p"], calc_b0p(s.to_numpy()), strict=True))
+                )
+                .fill_nan(None)
+                .to_struct()
+            ),
+            return_dtype=pl.Struct({"b0": pl.Float64, "p": pl.Float64}),
+        )
+        .alias("b0p")
+    ).unnest("b0p")
+
+
+def with_l0(df: pl.LazyFrame, col: str = "date") -> pl.LazyFrame:
+    """計算式から各行の日付に対応するL0を付与する
+
+    Args:
+        df (pl.LazyFrame): 日付を含むデータ
+        col (str, optional): 日付の列名. Defaults to "date".
+
+    Returns:
+        pl.LazyFrame: L0を付与したデータ
+    """
+    return df.with_columns(
+        pl.col(col)
+        .map_batches(
+            lambda s: pl.Series(calc_l0(s.to_numpy())).fill_nan(None),
+            return_dtype=pl.Float64,
+        )
+        .alias("l0")
+    )
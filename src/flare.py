@@ -0,0 +1,253 @@
+from pathlib import Path
+from re import search
+
+import polars as pl
+
+import silso
+
+# 半球の種類
+HEMISPHERE = pl.Enum(["north", "south", "total"])
+
+# キャッシュの列の型
+SCHEMA: dict[str, pl.DataType | type[pl.DataType]] = {
+    "date": pl.Date,
+    "hemisphere": HEMISPHERE,
+    "daily": pl.Float64,
+    "monthly": pl.Float64,
+    "source": pl.Utf8,
+    "hash": pl.Utf8,
+}
+
+
+def detect_hemisphere(path: Path) -> str:
+    """ファイル名から半球の種類を判定する
+
+    Args:
+        path (Path): ファイルのパス
+
+    Raises:
+        ValueError: 半球の種類が判定できない場合に送出
+
+    Returns:
+        str: 半球の種類
+    """
+    if match := search(r"(north|south|total)", path.stem):
+        return match.group()
+    msg = f"cannot detect hemisphere from {path.name}"
+    raise ValueError(msg)
+
+
+def split_values(df: pl.LazyFrame) -> pl.LazyFrame:
+    """行を値のリストへ分割する
+
+    タブ区切りの場合は空の値を保持し、空白区切りの場合は連続する空白で区切る
+
+    Args:
+        df (pl.LazyFrame): 各行を要素とするデータ
+
+    Returns:
+        pl.LazyFrame: 先頭の値とそれ以降の値のリスト
+    """
+    return (
+        df.with_columns(
+            pl.when(pl.col("line").str.contains("\t"))
+            .then(pl.col("line").str.strip_chars(" ").str.split("\t"))
+            .otherwise(pl.col("line").str.extract_all(r"\S+"))
+        )
+        .select(
+            pl.col("line").list.first().str.strip_chars().alias("head"),
+            pl.col("line").list.slice(1).alias("values"),
+        )
+        .with_columns(
+            # 先頭から順に月の番号を割り当てる
+            pl.int_ranges(1, pl.col("values").list.len() + 1).alias("month")
+        )
+        .explode("values", "month")
+        .with_columns(
+            pl.col("values").str.strip_chars().cast(pl.Float64, strict=False)
+        )
+    )
+
+
+def parse_flare_file(path: Path) -> pl.LazyFrame:
+    """フレア指数のファイルを日ごとの縦持ちのデータへ変換する
+
+    Args:
+        path (Path): ファイルのパス
+
+    Returns:
+        pl.LazyFrame: 日付、半球、日ごとと月ごとのフレア指数
+    """
+    lines = silso.scan_lines(path).drop_nulls()
+    year = (
+        lines.select(
+            pl.col("line")
+            .str.extract(r"^\s*(\d{4})\b")
+            .drop_nulls()
+            .first()
+            .cast(pl.Int32)
+            .alias("year")
+        )
+        # 数値の行に年を付与するための結合用の列
+        .with_columns(pl.lit(0).alias("key"))
+    )
+    daily = (
+        lines.filter(pl.col("line").str.contains(r"^\s*\d{1,2}\s"))
+        .pipe(split_values)
+        .select(
+            pl.col("head").cast(pl.Int8).alias("day"),
+            "month",
+            pl.col("values").alias("daily"),
+        )
+    )
+    monthly = (
+        lines.filter(pl.col("line").str.contains(r"^Mean\s"))
+        .pipe(split_values)
+        .select("month", pl.col("values").alias("monthly"))
+    )
+    return (
+        daily.join(monthly, on="month", how="full", coalesce=True)
+        # 日ごとの値が無い月は月初めの日付とする
+        .with_columns(pl.col("day").fill_null(1), pl.lit(0).alias("key"))
+        .join(year, on="key", how="left")
+        .select(
+            pl.date("year", "month", "day").alias("date"),
+            pl.lit(detect_hemisphere(path))
+            .cast(HEMISPHERE)
+            .alias("hemisphere"),
+            "daily",
+            "monthly",
+        )
+        # 存在しない日付と空白の値を除去
+        .drop_nulls("date")
+        .filter(
+            pl.col("daily").is_not_null() | pl.col("monthly").is_not_null()
+        )
+        .sort("date")
+    )
+
+
+def load_flare_files(paths: list[Path]) -> pl.DataFrame:
+    """複数のフレア指数のファイルを並列に読み込む
+
+    Args:
+        paths (list[Path]): ファイルのパス
+
+    Raises:
+        ValueError: 年が見つからないファイルがある場合に送出
+
+    Returns:
+        pl.DataFrame: 日付、半球、日ごとと月ごとのフレア指数、元のファイル名
+    """
+    dfl = pl.collect_all(
+        [
+            parse_flare_file(path).with_columns(
+                pl.lit(path.name).alias("source")
+            )
+            for path in paths
+        ]
+    )
+    for path, df in zip(paths, dfl, strict=True):
+        if df.height == 0:
+            msg = f"cannot find year in {path.name}"
+            raise ValueError(msg)
+    # ファイルが無い場合も列の型を揃える
+    df_empty = pl.DataFrame(
+        schema={k: v for k, v in SCHEMA.items() if k != "hash"}
+    )
+    return pl.concat([df_empty, *dfl])
+
+
+def load_flare_data_cached(path: Path, cache_file: Path) -> pl.DataFrame:
+    """フレア指数のファイルをキャッシュを用いて読み込む
+
+    キャッシュにはファイルごとのハッシュ値を保存し、
+    追加や変更されたファイルのみを読み込む
+
+    Args:
+        path (Path): フレア指数のファイルのフォルダのパス
+        cache_file (Path): キャッシュのファイルのパス
+
+    Returns:
+        pl.DataFrame: 日付、半球、日ごとと月ごとのフレア指数
+    """
+    files = sorted(path.glob("*.txt"))
+    hashes = pl.DataFrame(
+        {
+            "source": [file.name for file in files],
+            "hash": [silso.calc_hash(file) for file in files],
+        },
+        schema={"source": pl.Utf8, "hash": pl.Utf8},
+    )
+
+    # 変更のないファイルのキャッシュのみを残す
+    df_cached = (
+        pl.read_parquet(cache_file).join(
+            hashes, on=["source", "hash"], how="semi"
+        )
+        if cache_file.exists()
+        else pl.DataFrame(schema=SCHEMA)
+    )
+
+    # キャッシュに存在しないファイルのみを読み込む
+    sources_new = hashes.join(df_cached, on="source", how="anti")["source"]
+    df_new = load_flare_files([path / source for source in sources_new]).join(
+        hashes, on="source", how="left"
+    )
+
+    df = pl.concat([df_cached, df_new]).sort("hemisphere", "date")
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    df.write_parquet(cache_file)
+    return df.drop("source", "hash")
+
+
+def pivot_flare(df: pl.DataFrame, col: str) -> pl.DataFrame:
+    """縦持ちのフレア指数を半球ごとの列へ変換する
+
+    Args:
+        df (pl.DataFrame): 日付、半球、フレア指数
+        col (str): 変換するフレア指数の列名
+
+    Returns:
+        pl.DataFrame: 日付と半球ごとのフレア指数
+    """
+    df_pivot = df.drop_nulls(col).pivot("hemisphere", index="date", values=col)
+    return df_pivot.select(
+        "date",
+        *[
+            # 存在しない半球の列は空の値で埋める
+            pl.col(h)
+            if h in df_pivot.columns
+            else pl.lit(None, pl.Float64).alias(h)
+            for h in HEMISPHERE.categories
+        ],
+    ).sort("date")
+
+
+def pivot_daily(df: pl.DataFrame) -> pl.DataFrame:
+    """日ごとのフレア指数を半球ごとの列へ変換する
+
+    Args:
+        df (pl.DataFrame): 縦持ちのフレア指数
+
+    Returns:
+        pl.DataFrame: 日付と半球ごとの日ごとのフレア指数
+    """
+    return pivot_flare(df, "daily")
+
+
+def pivot_monthly(df: pl.DataFrame) -> pl.DataFrame:
+    """月ごとのフレア指数を半球ごとの列へ変換する
+
+    Args:
+        df (pl.DataFrame): 縦持ちのフレア指数
+
+    Returns:
+        pl.DataFrame: 月初めの日付と半球ごとの月ごとのフレア指数
+    """
+    return pivot_flare(
+        df.select(
+            pl.col("date").dt.truncate("1mo"), "hemisphere", "monthly"
+        ).unique(),
+        "monthly",
+    )
@@ -0,0 +1,407 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+from scipy import fft
+
+import flare
+import sn_common
+import sn_hemispheric
+import wolf_number
+
+# 半球の種類
+HEMISPHERES = ["north", "south", "total"]
+
+# フレア指数と比較する黒点数の系列
+SUNSPOTS = ["seiryo", "fujimori"]
+
+# 相関係数を算出する組の数の下限
+MIN_PAIRS = 10
+
+# 日ごとと月ごとの最大のずれ
+MAX_LAG_DAILY = 180
+MAX_LAG_MONTHLY = 24
+
+# 月ごとの移動窓の幅と移動量、窓の中で追跡する最大のずれ
+ROLLING_WINDOW = 48
+ROLLING_STEP = 1
+ROLLING_MAX_LAG = 12
+
+
+def join_series(
+    df_flare: pl.DataFrame, sunspots: dict[str, pl.DataFrame], interval: str
+) -> pl.DataFrame:
+    """フレア指数と黒点数の半球ごとの列を一つのデータへまとめる
+
+    フレア指数の期間のみを残す
+
+    Args:
+        df_flare (pl.DataFrame): 日付と半球ごとのフレア指数
+        sunspots (dict[str, pl.DataFrame]): 系列名ごとの日付と半球別の黒点数
+        interval (str): 日付の間隔
+
+    Returns:
+        pl.DataFrame: 連続した日付と、系列名と半球を列名とした値
+    """
+    df = df_flare.select(
+        "date", pl.col(HEMISPHERES).cast(pl.Float64).name.prefix("flare_")
+    )
+    for name, df_sunspot in sunspots.items():
+        df = df.join(
+            df_sunspot.select(
+                "date",
+                pl.col(HEMISPHERES).cast(pl.Float64).name.prefix(f"{name}_"),
+            ),
+            on="date",
+            how="left",
+            coalesce=True,
+        )
+    return sn_common.fill_dates(df, interval)
+
+
+def cross_sum(
+    a: npt.NDArray[np.complex128],
+    b: npt.NDArray[np.complex128],
+    n_fft: int,
+    max_lag: int,
+) -> npt.NDArray[np.float64]:
+    """フーリエ変換した二つの系列から、ずれごとの積の総和を算出する
+
+    ずれkの総和は a(t) b(t + k) の全ての時刻の和とする
+
+    Args:
+        a (npt.NDArray[np.complex128]): 系列aのフーリエ変換
+        b (npt.NDArray[np.complex128]): 系列bのフーリエ変換
+        n_fft (int): 変換の長さ
+        max_lag (int): 最大のずれ
+
+    Returns:
+        npt.NDArray[np.float64]: -max_lagからmax_lagまでのずれごとの総和
+    """
+    c = fft.irfft(np.conj(a) * b, n_fft, axis=-1)
+    # 負のずれは循環した末尾にある
+    return np.concatenate(
+        [c[..., n_fft - max_lag :], c[..., : max_lag + 1]], axis=-1
+    )
+
+
+def center(
+    x: npt.NDArray[np.float64], mask: npt.NDArray[np.bool_]
+) -> npt.NDArray[np.float64]:
+    """観測のある値から行ごとの平均を除き、欠損を0とする
+
+    Args:
+        x (npt.NDArray[np.float64]): 系列を行とした値
+        mask (npt.NDArray[np.bool_]): 観測の有無
+
+    Returns:
+        npt.NDArray[np.float64]: 平均を除いた値
+    """
+    x0 = np.where(mask, x, 0.0)
+    count = mask.sum(axis=-1, keepdims=True)
+    mean = x0.sum(axis=-1, keepdims=True) / np.maximum(count, 1)
+    return np.where(mask, x0 - mean, 0.0)
+
+
+def masked_xcorr(
+    x: npt.NDArray[np.float64],
+    y: npt.NDArray[np.float64],
+    max_lag: int,
+    min_pairs: int = MIN_PAIRS,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+    """欠損を除いたずれごとの相関係数を全ての組でまとめて算出する
+
+    ずれごとに両方の観測がある時刻のみで平均と分散を求め直す。
+    必要な総和は全てフーリエ変換による相互相関から求める
+
+    Args:
+        x (npt.NDArray[np.float64]): 組を行とし、欠損を非数とした系列x
+        y (npt.NDArray[np.float64]): 組を行とし、欠損を非数とした系列y
+        max_lag (int): 最大のずれ
+        min_pairs (int, optional): 観測の組の数の下限.
+            Defaults to MIN_PAIRS.
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+            ずれを列とした x(t) と y(t + k) の相関係数と観測の組の数
+    """
+    n_fft = fft.next_fast_len(x.shape[-1] + max_lag, real=True)
+    mx = ~np.isnan(x)
+    my = ~np.isnan(y)
+    # 桁落ちを防ぐため、系列ごとの平均を除いておく
+    x0 = center(x, mx)
+    y0 = center(y, my)
+
+    def transform(arr: npt.ArrayLike) -> npt.NDArray[np.complex128]:
+        return fft.rfft(arr, n_fft, axis=-1)
+
+    fmx, fx, fxx = (transform(v) for v in (mx.astype(np.float64), x0, x0**2))
+    fmy, fy, fyy = (transform(v) for v in (my.astype(np.float64), y0, y0**2))
+
+    n = np.rint(cross_sum(fmx, fmy, n_fft, max_lag))
+    sx = cross_sum(fx, fmy, n_fft, max_lag)
+    sy = cross_sum(fmx, fy, n_fft, max_lag)
+    sxx = cross_sum(fxx, fmy, n_fft, max_lag)
+    syy = cross_sum(fmx, fyy, n_fft, max_lag)
+    sxy = cross_sum(fx, fy, n_fft, max_lag)
+
+    cov = n * sxy - sx * sy
+    var = (n * sxx - sx**2) * (n * syy - sy**2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = np.where((n >= min_pairs) & (var > 0), cov / np.sqrt(var), np.nan)
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+
+def to_pairs(
+    df: pl.DataFrame,
+) -> tuple[pl.DataFrame, npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """黒点数とフレア指数の同じ半球の列を組として配列へ変換する
+
+    Args:
+        df (pl.DataFrame): 連続した日付と、系列名と半球を列名とした値
+
+    Returns:
+        tuple[
+            pl.DataFrame,
+            npt.NDArray[np.float64],
+            npt.NDArray[np.float64],
+        ]: 組ごとの系列名と半球、組を行とした黒点数とフレア指数
+    """
+    keys = pl.DataFrame(
+        [
+            (sunspot, hemisphere)
+            for sunspot in SUNSPOTS
+            for hemisphere in HEMISPHERES
+            if f"{sunspot}_{hemisphere}" in df.columns
+        ],
+        schema={"sunspot": pl.Utf8, "hemisphere": pl.Utf8},
+        orient="row",
+    )
+
+    def to_numpy(cols: list[str]) -> npt.NDArray[np.float64]:
+        # フレア指数の列は複数の系列の組で重複して使う
+        return np.stack(
+            [
+                df[col].cast(pl.Float64).fill_null(np.nan).to_numpy()
+                for col in cols
+            ]
+        ).reshape(len(cols), df.height)
+
+    x = to_numpy([f"{s}_{h}" for s, h in keys.iter_rows()])
+    y = to_numpy([f"flare_{h}" for _, h in keys.iter_rows()])
+    return keys, x, y
+
+
+def calc_cross_correlation(df: pl.DataFrame, max_lag: int) -> pl.DataFrame:
+    """全ての系列と半球のずれごとの相関係数を算出する
+
+    ずれが正の場合はフレア指数が黒点数より遅れることを表す
+
+    Args:
+        df (pl.DataFrame): 連続した日付と、系列名と半球を列名とした値
+        max_lag (int): 最大のずれ
+
+    Returns:
+        pl.DataFrame: 系列名、半球、ずれ、相関係数、観測の組の数
+    """
+    keys, x, y = to_pairs(df)
+    r, n = masked_xcorr(x, y, max_lag)
+    return (
+        keys.with_columns(
+            pl.Series(
+                "lag",
+                np.tile(np.arange(-max_lag, max_lag + 1), (keys.height, 1)),
+            ),
+            pl.Series("r", r),
+            pl.Series("n", n),
+        )
+        .explode("lag", "r", "n")
+        .with_columns(pl.col("r").fill_nan(None))
+    )
+
+
+def track_rolling_lag(
+    df: pl.DataFrame,
+    window: int = ROLLING_WINDOW,
+    step: int = ROLLING_STEP,
+    max_lag: int = ROLLING_MAX_LAG,
+) -> pl.DataFrame:
+    """移動窓ごとに相関係数が最大となるずれを追跡する
+
+    全ての組と窓を行として並べ、まとめて相関係数を算出する
+
+    Args:
+        df (pl.DataFrame): 連続した日付と、系列名と半球を列名とした値
+        window (int, optional): 窓の幅. Defaults to ROLLING_WINDOW.
+        step (int, optional): 窓の移動量. Defaults to ROLLING_STEP.
+        max_lag (int, optional): 最大のずれ. Defaults to ROLLING_MAX_LAG.
+
+    Returns:
+        pl.DataFrame: 窓の中央の日付、系列名、半球、
+            相関係数が最大のずれ、相関係数、観測の組の数
+    """
+    keys, x, y = to_pairs(df)
+    if df.height < window:
+        return pl.DataFrame(
+            schema={
+                "date": pl.Date,
+                **dict(keys.schema),
+                "lag": pl.Int64,
+                "r": pl.Float64,
+                "n": pl.Int64,
+            }
+        )
+    x_windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)
+    y_windows = np.lib.stride_tricks.sliding_window_view(y, window, axis=1)
+    x_windows = x_windows[:, ::step]
+    y_windows = y_windows[:, ::step]
+    n_pairs, n_windows = x_windows.shape[:2]
+
+    r, n = masked_xcorr(
+        x_windows.reshape(-1, window), y_windows.reshape(-1, window), max_lag
+    )
+    valid = ~np.isnan(r).all(axis=1)
+    best = np.argmax(np.where(np.isnan(r), -np.inf, r), axis=1)
+    index = np.arange(r.shape[0])
+    centers = df["date"].to_numpy()[np.arange(n_windows) * step + window // 2]
+
+    return (
+        pl.DataFrame(
+            {
+                "date": np.tile(centers, n_pairs),
+                "sunspot": np.repeat(keys["sunspot"].to_numpy(), n_windows),
+                "hemisphere": np.repeat(
+                    keys["hemisphere"].to_numpy(), n_windows
+                ),
+                "lag": best - max_lag,
+                "r": r[index, best],
+                "n": n[index, best],
+            }
+        )
+        .cast({"date": pl.Date})
+        .with_columns(pl.when(pl.Series(valid)).then(pl.col("lag", "r", "n")))
+    )
+
+
+def pivot_rolling(df: pl.DataFrame, sunspot: str) -> pl.DataFrame:
+    """移動窓のずれと相関係数を半球ごとの列へ変換する
+
+    黒点数とフレア指数の月ごとのデータと日付で結合できる形とする
+
+    Args:
+        df (pl.DataFrame): 移動窓ごとのずれと相関係数
+        sunspot (str): 系列名
+
+    Returns:
+        pl.DataFrame: 日付と、半球ごとのずれと相関係数
+    """
+    return (
+        df.filter(pl.col("sunspot") == sunspot)
+        .pivot("hemisphere", index="date", values=["lag", "r"])
+        .sort("date")
+    )
+
+
+def load_daily(
+    path_flare: Path, path_cache: Path, path_seiryo: Path, path_fujimori: Path
+) -> pl.DataFrame:
+    """日ごとのフレア指数と黒点数を読み込む
+
+    Args:
+        path_flare (Path): フレア指数のファイルのフォルダのパス
+        path_cache (Path): フレア指数のキャッシュのパス
+        path_seiryo (Path): 清陵の日ごとの黒点数のファイルのパス
+        path_fujimori (Path): 藤森の黒点数のファイルのパス
+
+    Returns:
+        pl.DataFrame: 連続した日付と、系列名と半球を列名とした値
+    """
+    return join_series(
+        flare.pivot_daily(
+            flare.load_flare_data_cached(path_flare, path_cache)
+        ),
+        {
+            "seiryo": pl.read_parquet(path_seiryo),
+            "fujimori": wolf_number.load_fujimori_daily(path_fujimori),
+        },
+        "1d",
+    )
+
+
+def load_monthly(
+    path_flare: Path, path_cache: Path, path_seiryo: Path, path_fujimori: Path
+) -> pl.DataFrame:
+    """月ごとのフレア指数と黒点数を読み込む
+
+    Args:
+        path_flare (Path): フレア指数のファイルのフォルダのパス
+        path_cache (Path): フレア指数のキャッシュのパス
+        path_seiryo (Path): 清陵の月ごとの黒点数のファイルのパス
+        path_fujimori (Path): 藤森の黒点数のファイルのパス
+
+    Returns:
+        pl.DataFrame: 連続した月の日付と、系列名と半球を列名とした値
+    """
+    return join_series(
+        flare.pivot_monthly(
+            flare.load_flare_data_cached(path_flare, path_cache)
+        ),
+        {
+            "seiryo": pl.read_parquet(path_seiryo),
+            "fujimori": sn_hemispheric.calc_sunspot_number(
+                pl.scan_parquet(path_fujimori)
+            ),
+        },
+        "1mo",
+    )
+
+
+def main() -> None:
+    path_flare = Path("data/flare")
+    path_cache = Path("out/flare/flare.parquet")
+    path_seiryo = Path("out/seiryo/sunspot")
+    path_fujimori = Path("out/sn/all.parquet")
+    output_path = Path("out/flare/correlation")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    df_daily = load_daily(
+        path_flare, path_cache, path_seiryo / "daily.parquet", path_fujimori
+    )
+    df_monthly = load_monthly(
+        path_flare, path_cache, path_seiryo / "monthly.parquet", path_fujimori
+    )
+
+    for name, df, max_lag in [
+        ("daily", df_daily, MAX_LAG_DAILY),
+        ("monthly", df_monthly, MAX_LAG_MONTHLY),
+    ]:
+        start = time.perf_counter()
+        df_xcorr = calc_cross_correlation(df, max_lag)
+        print(
+            f"{name}: {df.height} x {max_lag * 2 + 1} lags in "
+            f"{time.perf_counter() - start:.3f}s"
+        )
+        print(
+            df_xcorr.sort("r", descending=True, nulls_last=True)
+            .group_by("sunspot", "hemisphere", maintain_order=True)
+            .first()
+        )
+        df_xcorr.write_parquet(output_path / f"{name}.parquet")
+
+    start = time.perf_counter()
+    df_rolling = track_rolling_lag(df_monthly)
+    print(
+        f"rolling: {df_rolling.height} windows in "
+        f"{time.perf_counter() - start:.3f}s"
+    )
+    df_rolling.write_parquet(output_path / "rolling.parquet")
+    # 黒点数とフレア指数の図へ重ねるため、同じ場所へ保存する
+    pivot_rolling(df_rolling, "seiryo").write_parquet(
+        path_seiryo / "flare_lag.parquet"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+from dateutil.relativedelta import relativedelta
+
+# 行グループの行数、数万行までの表は一つの行グループとする
+ROW_GROUP_SIZE = 65536
+
+# ベンチマークで比較する、日付で行グループを分ける場合の期間
+ROW_GROUP_SPAN = "1y"
+
+# zstdの圧縮レベル
+COMPRESSION_LEVEL = 10
+
+# ベンチマークで読み込む期間の長さ
+WINDOWS = {
+    "month": relativedelta(months=1),
+    "year": relativedelta(years=1),
+    "cycle": relativedelta(years=11),
+}
+
+# ベンチマークで繰り返す回数
+N_REPEATS = 20
+
+
+def calc_row_group_sizes(
+    df: pl.DataFrame, sort_by: list[str], span: str | None = None
+) -> pl.Series:
+    """並べ替えたデータの行グループごとの行数を求める
+
+    既定では一定の行数ごとに行グループを分ける。
+    期間を指定した場合は、日付で並べたデータを期間ごとに分ける
+
+    Args:
+        df (pl.DataFrame): 並べ替えたデータ
+        sort_by (list[str]): 並べ替えた列名
+        span (str | None, optional): 行グループが含む期間. Defaults to None.
+
+    Returns:
+        pl.Series: 行グループごとの行数
+    """
+    if span is not None and sort_by[0] == "date":
+        return (
+            df["date"]
+            .dt.truncate(span)
+            .rle_id()
+            .value_counts(sort=False)["count"]
+        )
+    n_full, rest = divmod(df.height, ROW_GROUP_SIZE)
+    return pl.Series(
+        [ROW_GROUP_SIZE] * n_full + ([rest] if rest > 0 else []),
+        dtype=pl.UInt32,
+    )
+
+
+def split_row_groups(df: pl.DataFrame, sizes: pl.Series) -> pl.DataFrame:
+    """行グループごとのチャンクへデータを分ける
+
+    Args:
+        df (pl.DataFrame): データ
+        sizes (pl.Series): 行グループごとの行数
+
+    Returns:
+        pl.DataFrame: チャンクを分けたデータ
+    """
+    offsets = sizes.cum_sum() - sizes
+    return pl.concat(
+        [
+            df.slice(offset, size)
+            for offset, size in zip(offsets, sizes, strict=True)
+        ],
+        rechunk=False,
+    )
+
+
+def write_parquet(
+    df: pl.DataFrame, path: Path, sort_by: list[str], span: str | None = None
+) -> None:
+    """並び順と行グループを揃えてparquetファイルへ書き出す
+
+    行グループが小さいと容量と読み込み時間が増えるため、既定では行数で分ける。
+    期間を指定すると日付の範囲で行グループを読み飛ばせるようにするが、
+    polars 1.1は日付の統計量で読み飛ばさないため、既定では用いない。
+    sink_parquetはチャンクごとに行グループを書き出し、
+    write_parquetと異なり行グループが3つ以上でも時刻の列を保つため、
+    行グループごとのチャンクへ分けてから書き出す。
+    統計量は全て書き出し、zstdで圧縮する
+
+    Args:
+        df (pl.DataFrame): 書き出すデータ
+        path (Path): ファイルのパス
+        sort_by (list[str]): 並べ替える列名
+        span (str | None, optional): 日付で並べた場合に行グループが含む期間.
+            Defaults to None.
+    """
+    df_sorted = df.sort(sort_by, maintain_order=True)
+    if df_sorted.height > 0:
+        df_sorted = split_row_groups(
+            df_sorted, calc_row_group_sizes(df_sorted, sort_by, span)
+        )
+    df_sorted.lazy().sink_parquet(
+        path,
+        compression="zstd",
+        compression_level=COMPRESSION_LEVEL,
+        statistics="full",
+    )
+
+
+def calc_row_group_bounds(
+    df: pl.DataFrame, sizes: pl.Series, col: str = "date"
+) -> pl.DataFrame:
+    """行グループごとの列の範囲を求める
+
+    Args:
+        df (pl.DataFrame): 並べ替えたデータ
+        sizes (pl.Series): 行グループごとの行数
+        col (str, optional): 範囲を求める列名. Defaults to "date".
+
+    Returns:
+        pl.DataFrame: 行グループの番号、行数、列の最小値と最大値
+    """
+    row_group = np.repeat(np.arange(sizes.len(), dtype=np.uint32), sizes)
+    return (
+        df.select(col)
+        .with_columns(pl.Series("row_group", row_group))
+        .group_by("row_group", maintain_order=True)
+        .agg(
+            pl.len().alias("rows"),
+            pl.col(col).min().alias("min"),
+            pl.col(col).max().alias("max"),
+        )
+    )
+
+
+def filter_row_groups(
+    df_bounds: pl.DataFrame, start: date, end: date
+) -> pl.DataFrame:
+    """期間と範囲が重なり、読み込む必要がある行グループを選ぶ
+
+    Args:
+        df_bounds (pl.DataFrame): 行グループごとの日付の範囲
+        start (date): 期間の初めの日付
+        end (date): 期間の終わりの日付
+
+    Returns:
+        pl.DataFrame: 読み込む行グループ
+    """
+    return df_bounds.filter(pl.col("min") <= end, pl.col("max") >= start)
+
+
+def time_scan(path: Path, start: date, end: date) -> float:
+    """期間を指定したファイルの読み込みの平均時間を計測する
+
+    Args:
+        path (Path): ファイルのパス
+        start (date): 期間の初めの日付
+        end (date): 期間の終わりの日付
+
+    Returns:
+        float: 平均時間
+    """
+    begin = time.perf_counter()
+    for _ in range(N_REPEATS):
+        pl.scan_parquet(path).filter(
+            pl.col("date").is_between(start, end)
+        ).collect()
+    return (time.perf_counter() - begin) / N_REPEATS
+
+
+def main() -> None:
+    output_path = Path("out/parquet_layout")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    for path in [
+        Path("out/sn/all.parquet"),
+        Path("out/seiryo/all.parquet"),
+        Path("out/wolf/fujimori.parquet"),
+    ]:
+        if not path.exists():
+            print(f"{path}: not found, skipped")
+            continue
+
+        # 既定の書き出し、行数ごとと期間ごとの行グループの書き出しを比較する
+        df = pl.read_parquet(path)
+        df_sorted = df.sort("date", maintain_order=True)
+        df.write_parquet(output_path / f"{path.parent.name}_default.parquet")
+        layouts: dict[str, pl.DataFrame | None] = {"default": None}
+        for name, span in [("rows", None), ("span", ROW_GROUP_SPAN)]:
+            write_parquet(
+                df,
+                output_path / f"{path.parent.name}_{name}.parquet",
+                ["date"],
+                span,
+            )
+            layouts[name] = calc_row_group_bounds(
+                df_sorted, calc_row_group_sizes(df_sorted, ["date"], span)
+            )
+        sizes = [
+            (output_path / f"{path.parent.name}_{name}.parquet").stat().st_size
+            for name in layouts
+        ]
+        print(
+            f"{path}: {df.height} rows, "
+            f"{' / '.join(map(str, sizes))} bytes ({' / '.join(layouts)})"
+        )
+
+        last: date = df["date"].max()  # type: ignore[assignment]
+        for window, delta in WINDOWS.items():
+            start = last - delta
+            n_rows = df.filter(pl.col("date").is_between(start, last)).height
+            results = []
+            for name, df_bounds in layouts.items():
+                elapsed = time_scan(
+                    output_path / f"{path.parent.name}_{name}.parquet",
+                    start,
+                    last,
+                )
+                if df_bounds is None:
+                    results.append(f"{name} {elapsed * 1e3:.2f}ms")
+                    continue
+                df_read = filter_row_groups(df_bounds, start, last)
+                results.append(
+                    f"{name} {df_read.height}/{df_bounds.height} groups "
+                    f"{df_read['rows'].sum()} rows {elapsed * 1e3:.2f}ms"
+                )
+            print(f"  {window} ({n_rows} rows): {', '.join(results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ from pathlib import Path
 
 import polars as pl
 
+import parquet_layout
+
 
 def fill_date(df: pl.LazyFrame) -> pl.LazyFrame:
     return df.with_columns(pl.col("date").forward_fill())
@@ -73,11 +75,13 @@ def convert_coord(
             pl.concat_str("right_sign", "right").alias("right"),
         )
         .with_columns(
-            # 文字列から小数へ変換し、四捨五入
+            # 文字列から小数へ変換し、整数へ変換する場合のみ四捨五入
             pl.col("left", "right").cast(pl.Float64).round()
+            if dtype.is_integer()
+            else pl.col("left", "right").cast(pl.Float64)
         )
         .with_columns(
-            # 最大値と最小値を算出し、整数へ変換
+            # 最大値と最小値を算出し、指定の型へ変換
             pl.min_horizontal("left", "right").cast(dtype).alias(f"{col}_min"),
             pl.max_horizontal("left", "right").cast(dtype).alias(f"{col}_max"),
         )
@@ -91,26 +95,46 @@ def sort(df: pl.LazyFrame) -> pl.LazyFrame:
     ).sort("date", "no")
 
 
+def load_file(path: Path) -> pl.LazyFrame:
+    return pl.scan_csv(path, infer_schema_length=0).pipe(fill_date)
+
+
+def convert(
+    df: pl.LazyFrame,
+    *,
+    lat_dtype: type[pl.DataType] = pl.Int8,
+    lon_dtype: type[pl.DataType] = pl.Int16,
+) -> pl.LazyFrame:
+    return (
+        df.pipe(convert_number)
+        .pipe(convert_date)
+        .pipe(convert_coord, col="lat", dtype=lat_dtype)
+        .pipe(convert_coord, col="lon", dtype=lon_dtype)
+        .pipe(sort)
+    )
+
+
 def main() -> None:
     path_seiryo = Path("data/seiryo")
     output_path = Path("out/seiryo")
     output_path.mkdir(parents=True, exist_ok=True)
 
-    dfl: list[pl.LazyFrame] = []
-    for path in path_seiryo.glob("*.csv"):
-        df = pl.scan_csv(path, infer_schema_length=0).pipe(fill_date)
-        dfl.append(df)
-    df_all = (
+    dfl = [load_file(path) for path in path_seiryo.glob("*.csv")]
+    df_all = pl.concat(dfl).pipe(convert).collect()
+    print(df_all)
+    parquet_layout.write_parquet(
+        df_all, output_path / "all.parquet", ["date", "no"]
+    )
+
+    # 小数の緯度と経度を丸めずに保持したデータ
+    df_float = (
         pl.concat(dfl)
-        .pipe(convert_number)
-        .pipe(convert_date)
-        .pipe(convert_coord, col="lat", dtype=pl.Int8)
-        .pipe(convert_coord, col="lon", dtype=pl.Int16)
-        .pipe(sort)
+        .pipe(convert, lat_dtype=pl.Float64, lon_dtype=pl.Float64)
         .collect()
     )
-    print(df_all)
-    df_all.write_parquet(output_path / "all.parquet")
+    parquet_layout.write_parquet(
+        df_float, output_path / "all_float.parquet", ["date", "no"]
+    )
 
 
 if __name__ == "__main__":
@@ -1,19 +1,30 @@
 import json
 from dataclasses import asdict, dataclass, fields
-from datetime import date
+from datetime import date, timedelta
 from pathlib import Path
 from pprint import pprint
 
+import numpy as np
+import numpy.typing as npt
 import polars as pl
+from dateutil.relativedelta import relativedelta
+
+import ephemeris
+
+DAYS_PER_MONTH = 365.25 / 12
 
 
 @dataclass(frozen=True, slots=True, kw_only=True)
 class DateDelta:
-    """日付の間隔"""
+    """日付の間隔
+
+    rotationsはカリントン自転の数であり、他の間隔と組み合わせられない
+    """
 
     years: int = 0
     months: int = 0
     days: int = 0
+    rotations: int = 0
 
     def __post_init__(self: "DateDelta") -> None:
         """初期化後の入力値チェック
@@ -28,6 +39,11 @@ class DateDelta:
         if any(value < 0 for value in values):
             msg = "parameters cannot be negative"
             raise ValueError(msg)
+        if self.rotations != 0 and any(
+            value != 0 for value in [self.years, self.months, self.days]
+        ):
+            msg = "rotations cannot be combined with other parameters"
+            raise ValueError(msg)
 
     def to_dict(self: "DateDelta") -> dict[str, int]:
         """辞書へ変換
@@ -37,15 +53,37 @@ class DateDelta:
         """
         return asdict(self)
 
+    def scale(self: "DateDelta", factor: int) -> "DateDelta":
+        """間隔を整数倍する
+
+        Args:
+            factor (int): 倍率
+
+        Returns:
+            DateDelta: 整数倍した間隔
+        """
+        return DateDelta(
+            years=self.years * factor,
+            months=self.months * factor,
+            days=self.days * factor,
+            rotations=self.rotations * factor,
+        )
+
     def _format_time(self: "DateDelta", time: int, unit: str) -> str:
         return f"{time}{unit}" if time != 0 else ""
 
     def to_interval(self: "DateDelta") -> str:
         """Polarsが受け取る期間の文字列へ変換
 
+        Raises:
+            ValueError: カリントン自転の間隔の時に送出
+
         Returns:
             str: 変換後の文字列
         """
+        if self.rotations != 0:
+            msg = "rotations cannot be converted to interval"
+            raise ValueError(msg)
         years = self._format_time(self.years, "y")
         months = self._format_time(self.months, "mo")
         days = self._format_time(self.days, "d")
@@ -54,13 +92,16 @@ class DateDelta:
     def isoformat(self: "DateDelta") -> str:
         """ISO8601の形式へ変換
 
+        カリントン自転は独自の単位Rで表す
+
         Returns:
             str: 変換後の文字列
         """
         years = self._format_time(self.years, "Y")
         months = self._format_time(self.months, "M")
         days = self._format_time(self.days, "D")
-        return f"P{years}{months}{days}"
+        rotations = self._format_time(self.rotations, "R")
+        return f"P{years}{months}{days}{rotations}"
 
     @classmethod
     def fromisoformat(cls: type["DateDelta"], data: str) -> "DateDelta":
@@ -80,7 +121,12 @@ class DateDelta:
             d = int(d_s)
         else:
             d = 0
-        return cls(years=y, months=m, days=d)
+        if "R" in data:
+            r_s, data = data.split("R")
+            r = int(r_s)
+        else:
+            r = 0
+        return cls(years=y, months=m, days=d, rotations=r)
 
 
 @dataclass(frozen=True, slots=True)
@@ -225,6 +271,327 @@ def calc_lat(df: pl.LazyFrame, info: ButterflyInfo) -> pl.DataFrame:
     )
 
 
+def rotation_number(col: str) -> pl.Expr:
+    """日付の列からカリントン自転番号の整数部を算出する
+
+    Args:
+        col (str): 日付の列名
+
+    Returns:
+        pl.Expr: カリントン自転番号
+    """
+    return pl.col(col).map_batches(
+        lambda s: pl.Series(
+            np.floor(ephemeris.calc_carrington_rotation(s.to_numpy()))
+        ).cast(pl.Int64),
+        return_dtype=pl.Int64,
+    )
+
+
+def create_date_bins(info: ButterflyInfo) -> pl.LazyFrame:
+    """蝶形図の列の日付とインデックスを作成する
+
+    カリントン自転の間隔の場合は、各自転の最初の日付を列の日付とする
+
+    Args:
+        info (ButterflyInfo): 蝶形図の情報
+
+    Returns:
+        pl.LazyFrame: 期間の初めの日付と列のインデックス
+    """
+    if (rotations := info.date_interval.rotations) == 0:
+        return pl.LazyFrame(
+            {
+                "date": pl.date_range(
+                    info.date_start,
+                    info.date_end,
+                    info.date_interval.to_interval(),
+                    eager=True,
+                )
+            }
+        ).with_row_index("index")
+    return (
+        pl.LazyFrame(
+            {"date": pl.date_range(info.date_start, info.date_end, eager=True)}
+        )
+        .with_columns(rotation_number("date").alias("rotation"))
+        .select(
+            (
+                (pl.col("rotation") - pl.col("rotation").first()) // rotations
+            ).alias("index"),
+            "date",
+        )
+        .unique("index", keep="first", maintain_order=True)
+        .cast({"index": pl.UInt32})
+    )
+
+
+def align_date(day: date, delta: DateDelta) -> date:
+    """日付を含む期間の初めの日付を算出する
+
+    カリントン自転の場合は、自転番号が間隔の倍数となる自転から数える
+
+    Args:
+        day (date): 日付
+        delta (DateDelta): 日付の間隔
+
+    Returns:
+        date: 期間の初めの日付
+    """
+    if delta.rotations == 0:
+        return pl.Series([day]).dt.truncate(delta.to_interval()).item()
+    days = pl.date_range(
+        day - timedelta(days=28 * delta.rotations), day, eager=True
+    )
+    rotation = np.floor(ephemeris.calc_carrington_rotation(days.to_numpy()))
+    first = rotation[-1] - rotation[-1] % delta.rotations
+    return days[int(np.searchsorted(rotation, first))]
+
+
+def with_bin_index(
+    df: pl.LazyFrame, info: ButterflyInfo, col: str = "date"
+) -> pl.LazyFrame:
+    """日付の列を含む期間の列のインデックスを付与する
+
+    蝶形図の範囲外の日付のインデックスは空白とする
+
+    Args:
+        df (pl.LazyFrame): 日付を含むデータ
+        info (ButterflyInfo): 蝶形図の情報
+        col (str, optional): 日付の列名. Defaults to "date".
+
+    Returns:
+        pl.LazyFrame: 列名に_indexを付けた列を追加したデータ
+    """
+    alias = f"{col}_index"
+    bins = create_date_bins(info)
+    if (rotations := info.date_interval.rotations) == 0:
+        return df.join(
+            bins.rename({"date": "_bin", "index": alias}),
+            left_on=pl.col(col).dt.truncate(info.date_interval.to_interval()),
+            right_on="_bin",
+            how="left",
+        ).drop("_bin", strict=False)
+    first = int(
+        np.floor(
+            ephemeris.calc_carrington_rotation(
+                np.array([info.date_start], dtype="datetime64[D]")
+            )[0]
+        )
+    )
+    index = (rotation_number(col) - first) // rotations
+    n_bins = bins.collect().height
+    return df.with_columns(
+        pl.when(index.is_between(0, n_bins - 1))
+        .then(index)
+        .cast(pl.UInt32)
+        .alias(alias)
+    )
+
+
+def calc_row_slice(info: ButterflyInfo, lat_min: int, lat_max: int) -> slice:
+    """緯度の範囲に対応する蝶形図の行の範囲を算出する
+
+    蝶形図の範囲外の部分は除く
+
+    Args:
+        info (ButterflyInfo): 蝶形図の情報
+        lat_min (int): 緯度の最小値
+        lat_max (int): 緯度の最大値
+
+    Returns:
+        slice: 行の範囲
+    """
+    return slice(
+        2 * (info.lat_max - min(lat_max, info.lat_max)),
+        2 * (info.lat_max - max(lat_min, info.lat_min)) + 1,
+    )
+
+
+def calc_column_index(info: ButterflyInfo, day: date) -> int:
+    """日付を含む蝶形図の列のインデックスを算出する
+
+    列の日付を全て作成せずに算出し、範囲外の日付は負または列数以上の値となる
+
+    Args:
+        info (ButterflyInfo): 蝶形図の情報
+        day (date): 日付
+
+    Returns:
+        int: 列のインデックス
+    """
+    delta = info.date_interval
+    if delta.rotations != 0:
+        rotation = np.floor(
+            ephemeris.calc_carrington_rotation(
+                np.array([info.date_start, day], dtype="datetime64[D]")
+            )
+        )
+        return int(rotation[1] - rotation[0]) // delta.rotations
+
+    def bin_start(index: int) -> date:
+        return info.date_start + relativedelta(
+            years=delta.years * index,
+            months=delta.months * index,
+            days=delta.days * index,
+        )
+
+    # 平均の長さから見積もり、月の長さの違いによるずれを補正する
+    length = (delta.years * 12 + delta.months) * DAYS_PER_MONTH + delta.days
+    index = int((day - info.date_start).days // length)
+    while bin_start(index) > day:
+        index -= 1
+    while bin_start(index + 1) <= day:
+        index += 1
+    return index
+
+
+def calc_column_slice(info: ButterflyInfo, start: date, end: date) -> slice:
+    """日付の範囲に対応する蝶形図の列の範囲を算出する
+
+    開始日を含む列から終了日を含む列までとし、蝶形図の範囲外の部分は除く
+
+    Args:
+        info (ButterflyInfo): 蝶形図の情報
+        start (date): 開始日
+        end (date): 終了日
+
+    Returns:
+        slice: 列の範囲
+    """
+    n_bins = calc_column_index(info, info.date_end) + 1
+    left = calc_column_index(info, start)
+    right = calc_column_index(info, end) + 1
+    return slice(min(max(left, 0), n_bins), min(max(right, 0), n_bins))
+
+
+def with_date_index(df: pl.LazyFrame, info: ButterflyInfo) -> pl.LazyFrame:
+    """期間の初めの日付に対応する列のインデックスを付与する
+
+    蝶形図の範囲外の行は除去する
+
+    Args:
+        df (pl.LazyFrame): 期間の初めの日付を持つデータ
+        info (ButterflyInfo): 蝶形図の情報
+
+    Returns:
+        pl.LazyFrame: 列のインデックスを付与したデータ
+    """
+    return df.join(create_date_bins(info), on="date", how="inner")
+
+
+def agg_intervals(df: pl.LazyFrame, interval: str) -> pl.LazyFrame:
+    """緯度の範囲を期間ごとの縦持ちのデータへ変換する
+
+    リストの列へ集計せず、一つの範囲を一行とし期間の順に並べる
+
+    Args:
+        df (pl.LazyFrame): 黒点群データ
+        interval (str): 区切る期間
+
+    Returns:
+        pl.LazyFrame: 期間の初めの日付と緯度の範囲
+    """
+    return (
+        df.select(
+            pl.col("date").dt.truncate(interval),
+            pl.col("lat_min").alias("min"),
+            pl.col("lat_max").alias("max"),
+        )
+        .drop_nulls()
+        .sort("date", "min", "max")
+    )
+
+
+def calc_intervals(df: pl.LazyFrame, info: ButterflyInfo) -> pl.DataFrame:
+    """蝶形図の範囲内の緯度の範囲を縦持ちのデータとして算出する
+
+    Args:
+        df (pl.LazyFrame): 黒点群データ
+        info (ButterflyInfo): 蝶形図の情報
+
+    Returns:
+        pl.DataFrame: 期間の初めの日付と緯度の範囲
+    """
+    return (
+        df.pipe(agg_intervals, interval=info.date_interval.to_interval())
+        .join(create_date_bins(info).select("date"), on="date", how="semi")
+        .collect()
+    )
+
+
+def calc_offsets(
+    df: pl.DataFrame, info: ButterflyInfo
+) -> npt.NDArray[np.int64]:
+    """各列の最初の行の位置を算出する
+
+    i列目の行はoffsets[i]からoffsets[i + 1]の手前までとなる
+
+    Args:
+        df (pl.DataFrame): 期間の順に並んだ緯度の範囲
+        info (ButterflyInfo): 蝶形図の情報
+
+    Returns:
+        npt.NDArray[np.int64]: 列数より一つ多い行の位置
+    """
+    index = (
+        df.lazy()
+        .pipe(with_date_index, info=info)
+        .collect()["index"]
+        .to_numpy()
+    )
+    n_cols = create_date_bins(info).collect().height
+    counts = np.bincount(index, minlength=n_cols)
+    return np.concatenate([[0], np.cumsum(counts)])
+
+
+def slice_intervals(
+    df: pl.DataFrame, offsets: npt.NDArray[np.int64], start: int, end: int
+) -> pl.DataFrame:
+    """列のインデックスの範囲に含まれる行を切り出す
+
+    Args:
+        df (pl.DataFrame): 期間の順に並んだ緯度の範囲
+        offsets (npt.NDArray[np.int64]): 各列の最初の行の位置
+        start (int): 最初の列のインデックス
+        end (int): 最後の列の次のインデックス
+
+    Returns:
+        pl.DataFrame: 切り出したデータ
+    """
+    return df.slice(offsets[start], offsets[end] - offsets[start])
+
+
+def calc_density(
+    df: pl.LazyFrame, info: ButterflyInfo, weight: str | None = "num"
+) -> pl.DataFrame:
+    """黒点群ごとの緯度の範囲と重みを列のインデックスと共に算出する
+
+    Args:
+        df (pl.LazyFrame): 黒点群データ
+        info (ButterflyInfo): 蝶形図の情報
+        weight (str | None, optional): 重みの列名、Noneの場合は群の数.
+            Defaults to "num".
+
+    Returns:
+        pl.DataFrame: 列のインデックス、緯度の範囲、重み
+    """
+    return (
+        df.drop_nulls(["lat_min", "lat_max"])
+        .pipe(with_bin_index, info=info)
+        .drop_nulls("date_index")
+        .select(
+            pl.col("date_index").alias("index"),
+            pl.col("lat_min").alias("min"),
+            pl.col("lat_max").alias("max"),
+            (pl.col(weight) if weight is not None else pl.lit(1))
+            .cast(pl.Float64)
+            .alias("weight"),
+        )
+        .collect()
+    )
+
+
 def main() -> None:
     data_path = Path("out/seiryo/all.parquet")
     output_path = Path("out/seiryo/butterfly")
@@ -240,6 +607,10 @@ def main() -> None:
     df.write_parquet(output_path / "monthly.parquet")
     print(df)
 
+    df_intervals = calc_intervals(data_file, info)
+    df_intervals.write_parquet(output_path / "monthly_intervals.parquet")
+    print(df_intervals)
+
     with (output_path / "monthly.json").open("w") as f_info:
         f_info.write(info.to_json())
 
@@ -0,0 +1,234 @@
+import json
+import time
+from dataclasses import dataclass
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+import seiryo_butterfly
+import seiryo_butterfly_image
+import seiryo_butterfly_trim
+from seiryo_butterfly import ButterflyInfo
+
+
+@dataclass(frozen=True, slots=True)
+class PackedImage:
+    """緯度方向に1画素を1ビットへ詰めた二値の蝶形図"""
+
+    bits: npt.NDArray[np.uint8]
+    info: ButterflyInfo
+
+    @classmethod
+    def from_image(
+        cls: type["PackedImage"],
+        img: npt.NDArray[np.uint8],
+        info: ButterflyInfo,
+    ) -> "PackedImage":
+        """二値の画像を詰めて作成する
+
+        Args:
+            img (npt.NDArray[np.uint8]): 蝶形図の画像データ
+            info (ButterflyInfo): 蝶形図の情報
+
+        Returns:
+            PackedImage: 詰めた蝶形図
+        """
+        return cls(np.packbits(img != 0, axis=0), info)
+
+    @property
+    def n_rows(self: "PackedImage") -> int:
+        return 2 * (self.info.lat_max - self.info.lat_min) + 1
+
+    def to_image(self: "PackedImage") -> npt.NDArray[np.uint8]:
+        """一画素一バイトの画像へ戻す
+
+        Returns:
+            npt.NDArray[np.uint8]: 蝶形図の画像データ
+        """
+        return np.unpackbits(self.bits, axis=0, count=self.n_rows)
+
+    def count(self: "PackedImage") -> npt.NDArray[np.int64]:
+        """列ごとの画素数を数える
+
+        Returns:
+            npt.NDArray[np.int64]: 列ごとの値が1の画素数
+        """
+        return np.bitwise_count(self.bits).sum(axis=0, dtype=np.int64)
+
+    def _check_info(self: "PackedImage", other: "PackedImage") -> None:
+        if self.info != other.info:
+            msg = "Butterfly info must be equal"
+            raise ValueError(msg)
+
+    def __or__(self: "PackedImage", other: "PackedImage") -> "PackedImage":
+        self._check_info(other)
+        return PackedImage(self.bits | other.bits, self.info)
+
+    def __and__(self: "PackedImage", other: "PackedImage") -> "PackedImage":
+        self._check_info(other)
+        return PackedImage(self.bits & other.bits, self.info)
+
+    def __xor__(self: "PackedImage", other: "PackedImage") -> "PackedImage":
+        self._check_info(other)
+        return PackedImage(self.bits ^ other.bits, self.info)
+
+
+def intersect_info(info_list: list[ButterflyInfo]) -> ButterflyInfo:
+    """全ての蝶形図に共通する範囲の情報を作成する
+
+    Args:
+        info_list (list[ButterflyInfo]): 蝶形図の情報
+
+    Raises:
+        ValueError: 期間の間隔が異なるか、共通する範囲がない場合に送出
+
+    Returns:
+        ButterflyInfo: 共通する範囲の蝶形図の情報
+    """
+    if len({info.date_interval for info in info_list}) != 1:
+        msg = "Date interval must be equal"
+        raise ValueError(msg)
+    lat_min = max(info.lat_min for info in info_list)
+    lat_max = min(info.lat_max for info in info_list)
+    date_start = max(info.date_start for info in info_list)
+    date_end = min(info.date_end for info in info_list)
+    if lat_max < lat_min or date_end < date_start:
+        msg = "ranges do not overlap"
+        raise ValueError(msg)
+    return ButterflyInfo(
+        lat_min, lat_max, date_start, date_end, info_list[0].date_interval
+    )
+
+
+def calc_column_metrics(a: PackedImage, b: PackedImage) -> pl.DataFrame:
+    """二つの蝶形図の列ごとの一致度を算出する
+
+    Jaccard係数は和集合に対する共通部分の割合、
+    重複係数は画素数の少ない方に対する共通部分の割合とする
+
+    Args:
+        a (PackedImage): 蝶形図A
+        b (PackedImage): 蝶形図B
+
+    Returns:
+        pl.DataFrame: 列の日付、画素数、共通部分、和集合、排他的論理和、
+            Jaccard係数、重複係数
+    """
+    return (
+        seiryo_butterfly.create_date_bins(a.info)
+        .select("date")
+        .collect()
+        .with_columns(
+            pl.Series("count_a", a.count()),
+            pl.Series("count_b", b.count()),
+            pl.Series("intersection", (a & b).count()),
+            pl.Series("union", (a | b).count()),
+            pl.Series("xor", (a ^ b).count()),
+        )
+        .with_columns(
+            pl.when(pl.col("union") > 0)
+            .then(pl.col("intersection") / pl.col("union"))
+            .alias("jaccard"),
+            pl.when(pl.min_horizontal("count_a", "count_b") > 0)
+            .then(
+                pl.col("intersection")
+                / pl.min_horizontal("count_a", "count_b")
+            )
+            .alias("overlap"),
+        )
+    )
+
+
+def load_intervals_image(
+    data_path: Path, info_path: Path
+) -> tuple[npt.NDArray[np.uint8], ButterflyInfo]:
+    """縦持ちの緯度の範囲から蝶形図の画像を作成する
+
+    Args:
+        data_path (Path): 緯度の範囲のparquetファイルのパス
+        info_path (Path): 情報のjsonファイルのパス
+
+    Returns:
+        tuple[npt.NDArray[np.uint8], ButterflyInfo]: 画像データと情報
+    """
+    with info_path.open("r") as f_info:
+        info = ButterflyInfo.from_dict(json.load(f_info))
+    img = seiryo_butterfly_image.create_image_from_intervals(
+        pl.read_parquet(data_path), info
+    )
+    return img, info
+
+
+def load_npz_image(
+    img_path: Path, info_path: Path
+) -> tuple[npt.NDArray[np.uint8], ButterflyInfo]:
+    """保存済みの蝶形図の画像を読み込む
+
+    Args:
+        img_path (Path): 画像のnpzファイルのパス
+        info_path (Path): 情報のjsonファイルのパス
+
+    Returns:
+        tuple[npt.NDArray[np.uint8], ButterflyInfo]: 画像データと情報
+    """
+    with info_path.open("r") as f_info:
+        info = ButterflyInfo.from_dict(json.load(f_info))
+    with np.load(img_path) as f_img:
+        img = f_img["img"]
+    return img, info
+
+
+def main() -> None:
+    seiryo_path = Path("out/seiryo/butterfly")
+    cadence_path = Path("out/butterfly/cadence")
+    output_path = Path("out/seiryo/butterfly/compare")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    images = {
+        "seiryo": load_intervals_image(
+            seiryo_path / "monthly_intervals.parquet",
+            seiryo_path / "monthly.json",
+        ),
+        "fromtext": load_intervals_image(
+            seiryo_path / "fromtext_intervals.parquet",
+            seiryo_path / "fromtext.json",
+        ),
+        "fujimori": load_npz_image(
+            cadence_path / "fujimori_monthly.npz",
+            cadence_path / "fujimori_monthly.json",
+        ),
+    }
+
+    for (name_a, (img_a, info_a)), (name_b, (img_b, info_b)) in combinations(
+        images.items(), 2
+    ):
+        try:
+            info = intersect_info([info_a, info_b])
+        except ValueError as e:
+            print(f"{name_a} vs {name_b}: {e}")
+            continue
+        a = PackedImage.from_image(
+            seiryo_butterfly_trim.trim_image(img_a, info_a, info), info
+        )
+        b = PackedImage.from_image(
+            seiryo_butterfly_trim.trim_image(img_b, info_b, info), info
+        )
+
+        start = time.perf_counter()
+        df = calc_column_metrics(a, b)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{name_a} vs {name_b}: {info.date_start} - {info.date_end}, "
+            f"{a.bits.nbytes} bytes (unpacked {a.n_rows * df.height}), "
+            f"{elapsed * 1000:.2f}ms"
+        )
+        print(df.select(pl.col("jaccard", "overlap").mean()))
+        df.write_parquet(output_path / f"{name_a}_{name_b}.parquet")
+
+
+if __name__ == "__main__":
+    main()
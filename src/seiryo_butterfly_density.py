@@ -0,0 +1,80 @@
+import json
+import time
+from pathlib import Path
+from pprint import pprint
+
+import numpy as np
+import polars as pl
+
+import seiryo_butterfly
+import seiryo_butterfly_draw
+import seiryo_butterfly_image
+import seiryo_butterfly_plotly
+from seiryo_butterfly import ButterflyInfo, DateDelta
+from seiryo_butterfly_config import ButterflyDiagram
+
+
+def main() -> None:
+    data_path = Path("out/seiryo/all.parquet")
+    data_float_path = Path("out/seiryo/all_float.parquet")
+    config_path = Path("config/seiryo/butterfly_diagram/density.json")
+    output_path = Path("out/seiryo/butterfly")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    data_file = pl.scan_parquet(data_path)
+    start, end = seiryo_butterfly.calc_date_limit(data_file)
+
+    info = ButterflyInfo(-50, 50, start, end, DateDelta(days=1))
+    pprint(info)
+
+    time_start = time.perf_counter()
+    df = seiryo_butterfly.calc_density(data_file, info)
+    img = seiryo_butterfly_image.create_density_image(df, info)
+    print(f"{img.shape} in {time.perf_counter() - time_start:.3f}s")
+
+    with (output_path / "daily_density.npz").open("wb") as f_img:
+        np.savez_compressed(f_img, img=img)
+    with (output_path / "daily_density.json").open("w") as f_info:
+        f_info.write(info.to_json())
+
+    with config_path.open("r") as f_config:
+        config = ButterflyDiagram(**json.load(f_config))
+
+    # 保存は縮小時に合計できるよう線形とし、表示のみ対数とする
+    img_log = np.log1p(img)
+    fig = seiryo_butterfly_draw.draw_butterfly_diagram(img_log, info, config)
+    for f in ["png", "pdf"]:
+        fig.savefig(
+            output_path / f"daily_density.{f}",
+            format=f,
+            dpi=300,
+            bbox_inches="tight",
+            pad_inches=0.1,
+        )
+
+    fig_plotly = seiryo_butterfly_plotly.draw_butterfly_diagram_plotly(
+        img_log, info
+    )
+    fig_plotly.write_json(output_path / "daily_density_plotly.json")
+
+    # 小数の緯度を保持したデータから0.25度ごとの蝶形図を作成する
+    lat_step = 0.25
+    time_start = time.perf_counter()
+    df_float = seiryo_butterfly.calc_density(
+        pl.scan_parquet(data_float_path), info
+    )
+    img_fine = seiryo_butterfly_image.create_binned_image(
+        df_float, info, lat_step
+    )
+    print(f"{img_fine.shape} in {time.perf_counter() - time_start:.3f}s")
+
+    with (output_path / "daily_density_fine.npz").open("wb") as f_img:
+        np.savez_compressed(
+            f_img,
+            img=img_fine,
+            lat=seiryo_butterfly_image.create_lat_bins(info, lat_step),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import numpy.typing as npt
 import polars as pl
 from matplotlib.figure import Figure
 
+import seiryo_butterfly
 from seiryo_butterfly import ButterflyInfo
 from seiryo_butterfly_config import ButterflyDiagram
 
@@ -44,20 +45,23 @@ def create_lat_index(lat_min: int, lat_max: int) -> npt.NDArray[np.int8]:
 
 
 def draw_butterfly_diagram(
-    img: npt.NDArray[np.uint8], info: ButterflyInfo, config: ButterflyDiagram
+    img: npt.NDArray[np.uint8] | npt.NDArray[np.float32],
+    info: ButterflyInfo,
+    config: ButterflyDiagram,
 ) -> Figure:
     """蝶形図データを基に画像を作成する
 
     Args:
-        img (npt.NDArray[np.uint8]): 蝶形図のデータ
+        img (npt.NDArray[np.uint8] | npt.NDArray[np.float32]):
+            蝶形図のデータ
         info (ButterflyInfo): 蝶形図の情報
         config (ButterflyDiagram): グラフの設定
 
     Returns:
         Figure: 作成した蝶形図
     """
-    date_index = create_date_index(
-        info.date_start, info.date_end, info.date_interval.to_interval()
+    date_index = (
+        seiryo_butterfly.create_date_bins(info).collect()["date"].to_numpy()
     )
     lat_index = create_lat_index(info.lat_min, info.lat_max)
 
@@ -67,6 +67,10 @@ def main() -> None:
     df.write_parquet(output_path / "fromtext.parquet")
     print(df)
 
+    df_intervals = seiryo_butterfly.calc_intervals(lf, info)
+    df_intervals.write_parquet(output_path / "fromtext_intervals.parquet")
+    print(df_intervals)
+
     with (output_path / "fromtext.json").open("w") as f_info:
         f_info.write(info.to_json())
 
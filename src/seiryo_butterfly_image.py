@@ -6,6 +6,7 @@ import numpy as np
 import numpy.typing as npt
 import polars as pl
 
+import seiryo_butterfly
 from seiryo_butterfly import ButterflyInfo
 
 
@@ -77,6 +78,118 @@ def create_image(
     return np.hstack(lines)
 
 
+def create_lat_bins(
+    info: ButterflyInfo, lat_step: float
+) -> npt.NDArray[np.float64]:
+    """蝶形図の行ごとの緯度を作成する
+
+    北を上とするため、緯度の最大値から間隔ごとに減らして並べる
+
+    Args:
+        info (ButterflyInfo): 蝶形図の情報
+        lat_step (float): 行の緯度の間隔
+
+    Returns:
+        npt.NDArray[np.float64]: 行ごとの緯度
+    """
+    n_rows = round((info.lat_max - info.lat_min) / lat_step) + 1
+    return info.lat_max - np.arange(n_rows) * lat_step
+
+
+def create_binned_image(
+    df: pl.DataFrame,
+    info: ButterflyInfo,
+    lat_step: float,
+    *,
+    log: bool = False,
+) -> npt.NDArray[np.float32]:
+    """任意の緯度の間隔で重みを累積した蝶形図のデータを作成する
+
+    行の緯度が範囲に含まれる画素へ重みを加える。
+    範囲の両端に差分を置き、行方向の累積和で埋めるため、
+    使用するメモリは範囲の長さによらず画素数と黒点群の数に比例する
+
+    Args:
+        df (pl.DataFrame): 列のインデックス、緯度の範囲、重み
+        info (ButterflyInfo): 蝶形図の情報
+        lat_step (float): 行の緯度の間隔
+        log (bool, optional): 対数で表示する場合は真. Defaults to False.
+
+    Returns:
+        npt.NDArray[np.float32]: 蝶形図の画像データ
+    """
+    n_rows = create_lat_bins(info, lat_step).size
+    n_cols = seiryo_butterfly.create_date_bins(info).collect().height
+
+    arr_min = df["min"].to_numpy().astype(np.float64)
+    arr_max = df["max"].to_numpy().astype(np.float64)
+
+    # 範囲に含まれる行のインデックスを両端を含めて算出
+    # 浮動小数点の誤差で境界の行を落とさないよう、わずかに広げる
+    eps = 1e-9
+    index_min = np.ceil((info.lat_max - arr_max) / lat_step - eps)
+    index_max = np.floor((info.lat_max - arr_min) / lat_step + eps)
+    index_min = np.clip(index_min, 0, None).astype(np.int64)
+    index_max = np.clip(index_max, None, n_rows - 1).astype(np.int64)
+    index_inner = index_min <= index_max
+
+    # 範囲の始まりに重みを加え、終わりの次の行で打ち消す
+    cols = df["index"].to_numpy().astype(np.int64)[index_inner]
+    weights = df["weight"].to_numpy()[index_inner]
+    diff = np.bincount(
+        np.concatenate(
+            [
+                index_min[index_inner] * n_cols + cols,
+                (index_max[index_inner] + 1) * n_cols + cols,
+            ]
+        ),
+        np.concatenate([weights, -weights]),
+        minlength=(n_rows + 1) * n_cols,
+    ).reshape(n_rows + 1, n_cols)
+
+    img = np.cumsum(diff[:-1], axis=0).astype(np.float32)
+    return np.log1p(img) if log else img
+
+
+def create_density_image(
+    df: pl.DataFrame, info: ButterflyInfo, *, log: bool = False
+) -> npt.NDArray[np.float32]:
+    """黒点群ごとの重みを累積した蝶形図のデータを作成する
+
+    行は0.5度ごとの緯度であり、整数の緯度の間の行も範囲に含める
+
+    Args:
+        df (pl.DataFrame): 列のインデックス、緯度の範囲、重み
+        info (ButterflyInfo): 蝶形図の情報
+        log (bool, optional): 対数で表示する場合は真. Defaults to False.
+
+    Returns:
+        npt.NDArray[np.float32]: 蝶形図の画像データ
+    """
+    return create_binned_image(df, info, 0.5, log=log)
+
+
+def create_image_from_intervals(
+    df: pl.DataFrame, info: ButterflyInfo
+) -> npt.NDArray[np.uint8]:
+    """縦持ちの緯度の範囲から蝶形図のデータを作成する
+
+    Args:
+        df (pl.DataFrame): 期間の初めの日付と緯度の範囲
+        info (ButterflyInfo): 蝶形図の情報
+
+    Returns:
+        npt.NDArray[np.uint8]: 蝶形図の画像データ
+    """
+    df_index = (
+        df.lazy()
+        .pipe(seiryo_butterfly.with_date_index, info=info)
+        .select("index", "min", "max", pl.lit(1.0).alias("weight"))
+        .collect()
+    )
+    return (create_density_image(df_index, info) > 0).astype(np.uint8)
+
+
 def main() -> None:
     data_path = Path("out/seiryo/butterfly/monthly.parquet")
     info_path = Path("out/seiryo/butterfly/monthly.json")
@@ -30,12 +30,7 @@ def calc_lat_size(info: ButterflyInfo) -> int:
 
 
 def calc_date_size(info: ButterflyInfo) -> int:
-    return pl.date_range(
-        info.date_start,
-        info.date_end,
-        info.date_interval.to_interval(),
-        eager=True,
-    ).len()
+    return seiryo_butterfly.create_date_bins(info).collect().height
 
 
 def create_merged_image(
@@ -62,6 +57,64 @@ def create_merged_image(
     return img
 
 
+def paste_image(
+    canvas: npt.NDArray[np.uint16],
+    info: ButterflyInfo,
+    img: npt.NDArray[np.uint16],
+    img_info: ButterflyInfo,
+) -> None:
+    """画像を蝶形図の情報に基づく位置へ重ねる
+
+    重ねる先の範囲外の部分は切り捨てる
+
+    Args:
+        canvas (npt.NDArray[np.uint16]): 重ねる先の画像データ
+        info (ButterflyInfo): 重ねる先の蝶形図の情報
+        img (npt.NDArray[np.uint16]): 重ねる画像データ
+        img_info (ButterflyInfo): 重ねる画像の蝶形図の情報
+    """
+    rows = seiryo_butterfly.calc_row_slice(
+        info, img_info.lat_min, img_info.lat_max
+    )
+    columns = seiryo_butterfly.calc_column_slice(
+        info, img_info.date_start, img_info.date_end
+    )
+    if rows.start >= rows.stop or columns.start >= columns.stop:
+        return
+    row_offset = 2 * (info.lat_max - img_info.lat_max)
+    column_offset = seiryo_butterfly.calc_column_index(
+        info, img_info.date_start
+    )
+    canvas[rows, columns] |= img[
+        rows.start - row_offset : rows.stop - row_offset,
+        columns.start - column_offset : columns.stop - column_offset,
+    ]
+
+
+def create_merged_image_from_images(
+    images: list[tuple[npt.NDArray[np.uint8], ButterflyInfo]],
+    info: ButterflyInfo,
+) -> npt.NDArray[np.uint16]:
+    """描画済みの画像を、確保した画像の対応する位置へ重ねて統合する
+
+    Args:
+        images (list[tuple[npt.NDArray[np.uint8], ButterflyInfo]]):
+            画像データと蝶形図の情報
+        info (ButterflyInfo): 統合後の蝶形図の情報
+
+    Returns:
+        npt.NDArray[np.uint16]: 統合した画像データ
+    """
+    img: npt.NDArray[np.uint16] = np.zeros(
+        (calc_lat_size(info), calc_date_size(info)), dtype=np.uint16
+    )
+    for i, (img_src, img_info) in enumerate(images):
+        paste_image(
+            img, info, np.left_shift(img_src, i, dtype=np.uint16), img_info
+        )
+    return img
+
+
 def create_color_image(
     img: npt.NDArray[np.uint16], cmap: ColorMap
 ) -> npt.NDArray[np.uint8]:
@@ -72,10 +125,14 @@ def create_color_image(
 
 
 def main() -> None:
-    monthly_data_path = Path("out/seiryo/butterfly/trimmed_monthly.parquet")
-    monthly_info_path = monthly_data_path.with_suffix(".json")
-    fromtext_data_path = Path("out/seiryo/butterfly/trimmed_fromtext.parquet")
-    fromtext_info_path = fromtext_data_path.with_suffix(".json")
+    monthly_data_path = Path(
+        "out/seiryo/butterfly/trimmed_monthly_intervals.parquet"
+    )
+    monthly_info_path = Path("out/seiryo/butterfly/trimmed_monthly.json")
+    fromtext_data_path = Path(
+        "out/seiryo/butterfly/trimmed_fromtext_intervals.parquet"
+    )
+    fromtext_info_path = Path("out/seiryo/butterfly/trimmed_fromtext.json")
     cmap_path = Path("config/seiryo/color/merged.json")
     output_path = Path("out/seiryo/butterfly")
 
@@ -92,7 +149,23 @@ def main() -> None:
     info = merge_info([fromtext_info, monthly_info])
     pprint(info)
 
-    img = create_merged_image([fromtext_data, monthly_data], info)
+    img = create_merged_image_from_images(
+        [
+            (
+                seiryo_butterfly_image.create_image_from_intervals(
+                    fromtext_data, fromtext_info
+                ),
+                fromtext_info,
+            ),
+            (
+                seiryo_butterfly_image.create_image_from_intervals(
+                    monthly_data, monthly_info
+                ),
+                monthly_info,
+            ),
+        ],
+        info,
+    )
     print(img)
 
     with cmap_path.open("r") as f_cmap:
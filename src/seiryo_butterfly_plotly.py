@@ -1,4 +1,5 @@
 import json
+from datetime import date
 from pathlib import Path
 from pprint import pprint
 
@@ -6,15 +7,18 @@ import numpy as np
 import numpy.typing as npt
 import plotly.graph_objects as go
 
+import seiryo_butterfly
 import seiryo_butterfly_draw
+import seiryo_butterfly_pyramid
 from seiryo_butterfly import ButterflyInfo
+from seiryo_butterfly_pyramid import ButterflyLevel
 
 
 def draw_butterfly_diagram_plotly(
-    img: npt.NDArray[np.uint8], info: ButterflyInfo
+    img: npt.NDArray[np.uint8] | npt.NDArray[np.float32], info: ButterflyInfo
 ) -> go.Figure:
-    date_index = seiryo_butterfly_draw.create_date_index(
-        info.date_start, info.date_end, info.date_interval.to_interval()
+    date_index = (
+        seiryo_butterfly.create_date_bins(info).collect()["date"].to_numpy()
     )
     lat_index = seiryo_butterfly_draw.create_lat_index(
         info.lat_min, info.lat_max
@@ -30,7 +34,10 @@ def draw_butterfly_diagram_plotly(
         go.Figure()
         .add_trace(
             go.Heatmap(
-                z=img, showscale=False, colorscale=[[0, "white"], [1, "black"]]
+                z=img,
+                # 密度の場合のみ色の尺度を表示する
+                showscale=np.issubdtype(img.dtype, np.floating),
+                colorscale=[[0, "white"], [1, "black"]],
             )
         )
         .update_layout(
@@ -57,6 +64,169 @@ def draw_butterfly_diagram_plotly(
     )
 
 
+def draw_butterfly_pyramid_plotly(
+    levels: list[ButterflyLevel],
+    start: date | None = None,
+    end: date | None = None,
+    max_columns: int = seiryo_butterfly_pyramid.MAX_COLUMNS,
+) -> go.Figure:
+    """表示する範囲に合う段を選んで蝶形図を作成する
+
+    Args:
+        levels (list[ButterflyLevel]): 細かい順の段
+        start (date | None, optional): 表示する範囲の開始日、
+            Noneの場合は全体. Defaults to None.
+        end (date | None, optional): 表示する範囲の終了日、
+            Noneの場合は全体. Defaults to None.
+        max_columns (int, optional): 表示する列数の上限.
+            Defaults to MAX_COLUMNS.
+
+    Returns:
+        go.Figure: 作成した蝶形図
+    """
+    info = levels[0].info
+    lat_index = seiryo_butterfly_draw.create_lat_index(
+        info.lat_min, info.lat_max
+    )
+    ylabel = [(i, n) for i, n in enumerate(lat_index) if n % 10 == 0]
+    fig = (
+        go.Figure()
+        .add_trace(
+            go.Heatmap(
+                showscale=False, colorscale=[[0, "white"], [1, "black"]]
+            )
+        )
+        .update_layout(
+            {
+                "title": {"text": "butterfly diagram"},
+                "xaxis": {"title": {"text": "date"}, "type": "date"},
+                "yaxis": {
+                    "title": {"text": "latitude"},
+                    "autorange": "reversed",
+                    "tickmode": "array",
+                    "tickvals": [i[0] for i in ylabel],
+                    "ticktext": [i[1] for i in ylabel],
+                },
+            }
+        )
+    )
+    return update_butterfly_pyramid_plotly(
+        fig,
+        levels,
+        start if start is not None else info.date_start,
+        end if end is not None else info.date_end,
+        max_columns,
+    )
+
+
+def update_butterfly_pyramid_plotly(
+    fig: go.Figure,
+    levels: list[ButterflyLevel],
+    start: date,
+    end: date,
+    max_columns: int = seiryo_butterfly_pyramid.MAX_COLUMNS,
+) -> go.Figure:
+    """表示する範囲に合う段の画像へ差し替える
+
+    ズームの操作で範囲が変わるたびに呼び出すことで、
+    常に上限以下の列数の画像のみを描画する
+
+    Args:
+        fig (go.Figure): 蝶形図
+        levels (list[ButterflyLevel]): 細かい順の段
+        start (date): 表示する範囲の開始日
+        end (date): 表示する範囲の終了日
+        max_columns (int, optional): 表示する列数の上限.
+            Defaults to MAX_COLUMNS.
+
+    Returns:
+        go.Figure: 差し替えた蝶形図
+    """
+    level = seiryo_butterfly_pyramid.select_level(
+        levels, start, end, max_columns
+    )
+    img, date_index = seiryo_butterfly_pyramid.crop_level(level, start, end)
+    fig.update_traces(
+        z=img,
+        x=date_index,
+        # 密度の場合のみ色の尺度を表示する
+        showscale=np.issubdtype(img.dtype, np.floating),
+    )
+    return fig
+
+
+def parse_range_date(value: str | date) -> date:
+    """表示する範囲の端の値を日付へ変換する
+
+    Plotlyの日付の軸の範囲は時刻を含む文字列で返されるため、日付の部分のみを使う
+
+    Args:
+        value (str | date): 範囲の端の値
+
+    Returns:
+        date: 日付
+    """
+    return date.fromisoformat(str(value)[:10])
+
+
+def connect_butterfly_pyramid_plotly(
+    fig: go.Figure,
+    levels: list[ButterflyLevel],
+    max_columns: int = seiryo_butterfly_pyramid.MAX_COLUMNS,
+) -> None:
+    """横軸の範囲が変わるたびに、範囲に合う段へ差し替えるよう登録する
+
+    範囲が解除された場合は全体を表示する
+
+    Args:
+        fig (go.Figure): 蝶形図
+        levels (list[ButterflyLevel]): 細かい順の段
+        max_columns (int, optional): 表示する列数の上限.
+            Defaults to MAX_COLUMNS.
+    """
+    info = levels[0].info
+
+    def on_range_change(
+        _layout: go.Layout, x_range: tuple[str, str] | None
+    ) -> None:
+        if x_range is None:
+            start, end = info.date_start, info.date_end
+        else:
+            start, end = map(parse_range_date, x_range)
+        with fig.batch_update():
+            update_butterfly_pyramid_plotly(
+                fig, levels, start, end, max_columns
+            )
+
+    fig.layout.on_change(on_range_change, "xaxis.range")
+
+
+def create_butterfly_pyramid_widget(
+    img_path: Path,
+    info_path: Path,
+    max_columns: int = seiryo_butterfly_pyramid.MAX_COLUMNS,
+) -> go.FigureWidget:
+    """保存した段を読み込み、ズームに合わせて段を切り替える蝶形図を作成する
+
+    Jupyterで表示して用いる
+
+    Args:
+        img_path (Path): 段ごとの画像のnpzファイルのパス
+        info_path (Path): 段ごとの情報のjsonファイルのパス
+        max_columns (int, optional): 表示する列数の上限.
+            Defaults to MAX_COLUMNS.
+
+    Returns:
+        go.FigureWidget: 作成した蝶形図
+    """
+    levels = seiryo_butterfly_pyramid.load_pyramid(img_path, info_path)
+    fig = go.FigureWidget(
+        draw_butterfly_pyramid_plotly(levels, max_columns=max_columns)
+    )
+    connect_butterfly_pyramid_plotly(fig, levels, max_columns)
+    return fig
+
+
 def main() -> None:
     data_path = Path("out/seiryo/butterfly/monthly.npz")
     info_path = Path("out/seiryo/butterfly/monthly.json")
@@ -0,0 +1,217 @@
+import json
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+import seiryo_butterfly
+from seiryo_butterfly import ButterflyInfo
+
+# 最も粗い段の列数の上限
+MAX_COLUMNS = 2000
+
+
+@dataclass(frozen=True, slots=True)
+class ButterflyLevel:
+    """蝶形図の解像度ごとの段"""
+
+    img: npt.NDArray[np.uint8] | npt.NDArray[np.float32]
+    info: ButterflyInfo
+
+
+def pool_image(
+    img: npt.NDArray[np.uint8] | npt.NDArray[np.float32],
+    factor: int,
+    *,
+    density: bool = False,
+) -> npt.NDArray[np.uint8] | npt.NDArray[np.float32]:
+    """隣り合う列をまとめて画像を縮小する
+
+    二値の画像は最大値、密度の画像は合計値でまとめる
+
+    Args:
+        img (npt.NDArray[np.uint8] | npt.NDArray[np.float32]): 蝶形図のデータ
+        factor (int): まとめる列の数
+        density (bool, optional): 密度の画像の場合は真. Defaults to False.
+
+    Returns:
+        npt.NDArray[np.uint8] | npt.NDArray[np.float32]: 縮小した画像
+    """
+    n_rows, n_cols = img.shape
+    # 端数の列を0で埋めて割り切れるようにする
+    pad = -n_cols % factor
+    blocks = np.pad(img, ((0, 0), (0, pad))).reshape(n_rows, -1, factor)
+    return blocks.sum(axis=2, dtype=img.dtype) if density else blocks.max(2)
+
+
+def create_pyramid(
+    img: npt.NDArray[np.uint8] | npt.NDArray[np.float32],
+    info: ButterflyInfo,
+    *,
+    density: bool = False,
+    max_columns: int = MAX_COLUMNS,
+) -> list[ButterflyLevel]:
+    """列数が上限以下となるまで半分ずつ縮小した段を作成する
+
+    Args:
+        img (npt.NDArray[np.uint8] | npt.NDArray[np.float32]): 蝶形図のデータ
+        info (ButterflyInfo): 蝶形図の情報
+        density (bool, optional): 密度の画像の場合は真. Defaults to False.
+        max_columns (int, optional): 最も粗い段の列数の上限.
+            Defaults to MAX_COLUMNS.
+
+    Returns:
+        list[ButterflyLevel]: 細かい順の段
+    """
+    levels = [ButterflyLevel(img, info)]
+    factor = 1
+    while levels[-1].img.shape[1] > max_columns:
+        factor *= 2
+        levels.append(
+            ButterflyLevel(
+                pool_image(levels[-1].img, 2, density=density),
+                ButterflyInfo(
+                    info.lat_min,
+                    info.lat_max,
+                    info.date_start,
+                    info.date_end,
+                    info.date_interval.scale(factor),
+                ),
+            )
+        )
+    return levels
+
+
+def save_pyramid(
+    levels: list[ButterflyLevel], img_path: Path, info_path: Path
+) -> None:
+    """段ごとの画像と情報を保存する
+
+    Args:
+        levels (list[ButterflyLevel]): 細かい順の段
+        img_path (Path): 画像のnpzファイルのパス
+        info_path (Path): 情報のjsonファイルのパス
+    """
+    with img_path.open("wb") as f_img:
+        np.savez_compressed(
+            f_img,
+            **{f"level_{i}": level.img for i, level in enumerate(levels)},
+        )
+    with info_path.open("w") as f_info:
+        json.dump(
+            [json.loads(level.info.to_json()) for level in levels],
+            f_info,
+            indent=2,
+        )
+
+
+def load_pyramid(img_path: Path, info_path: Path) -> list[ButterflyLevel]:
+    """保存した段ごとの画像と情報を読み込む
+
+    Args:
+        img_path (Path): 画像のnpzファイルのパス
+        info_path (Path): 情報のjsonファイルのパス
+
+    Returns:
+        list[ButterflyLevel]: 細かい順の段
+    """
+    with info_path.open("r") as f_info:
+        infos = [ButterflyInfo.from_dict(data) for data in json.load(f_info)]
+    with np.load(img_path) as f_img:
+        return [
+            ButterflyLevel(f_img[f"level_{i}"], info)
+            for i, info in enumerate(infos)
+        ]
+
+
+def create_level_date_index(
+    level: ButterflyLevel,
+) -> npt.NDArray[np.datetime64]:
+    """段の列の日付のインデックスを作成する
+
+    Args:
+        level (ButterflyLevel): 段
+
+    Returns:
+        npt.NDArray[np.datetime64]: 日付のインデックス
+    """
+    return (
+        seiryo_butterfly.create_date_bins(level.info)
+        .collect()["date"]
+        .to_numpy()
+    )
+
+
+def select_level(
+    levels: list[ButterflyLevel],
+    start: date,
+    end: date,
+    max_columns: int = MAX_COLUMNS,
+) -> ButterflyLevel:
+    """表示する範囲の列数が上限以下となる最も細かい段を選ぶ
+
+    Args:
+        levels (list[ButterflyLevel]): 細かい順の段
+        start (date): 表示する範囲の開始日
+        end (date): 表示する範囲の終了日
+        max_columns (int, optional): 表示する列数の上限.
+            Defaults to MAX_COLUMNS.
+
+    Returns:
+        ButterflyLevel: 選んだ段
+    """
+    for level in levels:
+        columns = seiryo_butterfly.calc_column_slice(level.info, start, end)
+        if columns.stop - columns.start <= max_columns:
+            return level
+    return levels[-1]
+
+
+def crop_level(
+    level: ButterflyLevel, start: date, end: date
+) -> tuple[
+    npt.NDArray[np.uint8] | npt.NDArray[np.float32], npt.NDArray[np.datetime64]
+]:
+    """段の画像から表示する範囲の列を切り出す
+
+    Args:
+        level (ButterflyLevel): 段
+        start (date): 表示する範囲の開始日
+        end (date): 表示する範囲の終了日
+
+    Returns:
+        tuple[
+            npt.NDArray[np.uint8] | npt.NDArray[np.float32],
+            npt.NDArray[np.datetime64],
+        ]: 切り出した画像と列の日付
+    """
+    date_index = create_level_date_index(level)
+    columns = seiryo_butterfly.calc_column_slice(level.info, start, end)
+    return level.img[:, columns], date_index[columns]
+
+
+def main() -> None:
+    img_path = Path("out/seiryo/butterfly/daily_density.npz")
+    info_path = Path("out/seiryo/butterfly/daily_density.json")
+    output_path = Path("out/seiryo/butterfly")
+
+    with info_path.open("r") as f_info:
+        info = ButterflyInfo.from_dict(json.load(f_info))
+    with np.load(img_path) as f_img:
+        img = f_img["img"]
+
+    levels = create_pyramid(img, info, density=True)
+    for level in levels:
+        print(level.info.date_interval.isoformat(), level.img.shape)
+
+    save_pyramid(
+        levels,
+        output_path / "daily_density_pyramid.npz",
+        output_path / "daily_density_pyramid.json",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,12 @@ from datetime import date
 from pathlib import Path
 from pprint import pprint
 
+import numpy as np
+import numpy.typing as npt
 import polars as pl
 from dateutil.relativedelta import relativedelta
 
+import seiryo_butterfly
 from seiryo_butterfly import ButterflyInfo, fill_lat
 
 
@@ -39,11 +42,84 @@ def trim_data(df: pl.DataFrame, info: ButterflyInfo) -> pl.DataFrame:
     )
 
 
+def trim_intervals(
+    df: pl.DataFrame, info: ButterflyInfo, trimmed_info: ButterflyInfo
+) -> pl.DataFrame:
+    """縦持ちの緯度の範囲を、列の位置から求めた行の範囲で切り出す
+
+    空白の期間は行を持たないため、埋める処理は不要となる
+
+    Args:
+        df (pl.DataFrame): 期間の順に並んだ緯度の範囲
+        info (ButterflyInfo): 元の蝶形図の情報
+        trimmed_info (ButterflyInfo): 切り出した後の蝶形図の情報
+
+    Returns:
+        pl.DataFrame: 切り出したデータ
+    """
+    offsets = seiryo_butterfly.calc_offsets(df, info)
+    date_bins = (
+        seiryo_butterfly.create_date_bins(info).collect()["date"].to_numpy()
+    )
+    start = int(
+        np.searchsorted(date_bins, np.datetime64(trimmed_info.date_start))
+    )
+    end = int(
+        np.searchsorted(
+            date_bins, np.datetime64(trimmed_info.date_end), side="right"
+        )
+    )
+    return seiryo_butterfly.slice_intervals(df, offsets, start, end)
+
+
+def trim_image(
+    img: npt.NDArray[np.uint8],
+    info: ButterflyInfo,
+    trimmed_info: ButterflyInfo,
+) -> npt.NDArray[np.uint8]:
+    """描画済みの蝶形図の画像を再計算せずに切り出す
+
+    元の画像の一部を参照するビューを返すため、データは複製しない
+
+    Args:
+        img (npt.NDArray[np.uint8]): 蝶形図の画像データ
+        info (ButterflyInfo): 元の蝶形図の情報
+        trimmed_info (ButterflyInfo): 切り出した後の蝶形図の情報
+
+    Raises:
+        ValueError: 期間の間隔が異なるか、範囲が元の画像を超える場合に送出
+
+    Returns:
+        npt.NDArray[np.uint8]: 切り出した画像データ
+    """
+    if info.date_interval != trimmed_info.date_interval:
+        msg = "Date interval must be equal"
+        raise ValueError(msg)
+    if (
+        trimmed_info.lat_min < info.lat_min
+        or info.lat_max < trimmed_info.lat_max
+        or trimmed_info.date_start < info.date_start
+        or info.date_end < trimmed_info.date_end
+    ):
+        msg = "trimmed range must be inside the original range"
+        raise ValueError(msg)
+    rows = seiryo_butterfly.calc_row_slice(
+        info, trimmed_info.lat_min, trimmed_info.lat_max
+    )
+    columns = seiryo_butterfly.calc_column_slice(
+        info, trimmed_info.date_start, trimmed_info.date_end
+    )
+    return img[rows, columns]
+
+
 def main() -> None:
-    monthly_data_path = Path("out/seiryo/butterfly/monthly.parquet")
-    monthly_info_path = monthly_data_path.with_suffix(".json")
-    fromtext_data_path = Path("out/seiryo/butterfly/fromtext.parquet")
-    fromtext_info_path = fromtext_data_path.with_suffix(".json")
+    monthly_data_path = Path("out/seiryo/butterfly/monthly_intervals.parquet")
+    monthly_info_path = Path("out/seiryo/butterfly/monthly.json")
+    monthly_image_path = Path("out/seiryo/butterfly/monthly.npz")
+    fromtext_data_path = Path(
+        "out/seiryo/butterfly/fromtext_intervals.parquet"
+    )
+    fromtext_info_path = Path("out/seiryo/butterfly/fromtext.json")
     output_path = Path("out/seiryo/butterfly")
 
     monthly_data = pl.read_parquet(monthly_data_path)
@@ -58,12 +134,31 @@ def main() -> None:
 
     trimmed_monthly_info = trim_info(monthly_info, lat_min=-50, lat_max=50)
     pprint(trimmed_monthly_info)
-    trimmed_monthly_data = trim_data(monthly_data, trimmed_monthly_info)
+    trimmed_monthly_data = trim_intervals(
+        monthly_data, monthly_info, trimmed_monthly_info
+    )
     print(trimmed_monthly_data)
-    trimmed_monthly_data.write_parquet(output_path / "trimmed_monthly.parquet")
+    trimmed_monthly_data.write_parquet(
+        output_path / "trimmed_monthly_intervals.parquet"
+    )
     with (output_path / "trimmed_monthly.json").open("w") as f_trimmed_monthly:
         f_trimmed_monthly.write(trimmed_monthly_info.to_json())
 
+    # 描画済みの画像があれば、再描画せずに同じ範囲を切り出す
+    if monthly_image_path.exists():
+        with np.load(monthly_image_path) as f_monthly_image:
+            monthly_image = f_monthly_image["img"]
+        trimmed_monthly_image = trim_image(
+            monthly_image, monthly_info, trimmed_monthly_info
+        )
+        print(trimmed_monthly_image.shape)
+        with (output_path / "trimmed_monthly.npz").open(
+            "wb"
+        ) as f_trimmed_monthly_image:
+            np.savez_compressed(
+                f_trimmed_monthly_image, img=trimmed_monthly_image
+            )
+
     trimmed_fromtext_info = trim_info(
         fromtext_info,
         lat_min=-50,
@@ -71,10 +166,12 @@ def main() -> None:
         date_end=monthly_info.date_start - relativedelta(months=1),
     )
     pprint(trimmed_fromtext_info)
-    trimmed_fromtext_data = trim_data(fromtext_data, trimmed_fromtext_info)
+    trimmed_fromtext_data = trim_intervals(
+        fromtext_data, fromtext_info, trimmed_fromtext_info
+    )
     print(trimmed_fromtext_data)
     trimmed_fromtext_data.write_parquet(
-        output_path / "trimmed_fromtext.parquet"
+        output_path / "trimmed_fromtext_intervals.parquet"
     )
     with (output_path / "trimmed_fromtext.json").open(
         "w"
@@ -1,148 +1,133 @@
+import json
 from pathlib import Path
 
 import polars as pl
 
+from check_common import Rule, enabled_rules, find_violations, print_violations
+from check_config import CheckSeiryo
 
-def create_expected_group_numbers(no: int) -> pl.Series:
-    return pl.Series(range(1, no + 1), dtype=pl.UInt8)
 
+def invalid_group_number() -> pl.Expr:
+    """グループ番号が日ごとに1からの連番になっていない行で真となる式
 
-def find_invalid_group_number(df: pl.DataFrame) -> pl.DataFrame:
-    """不正なグループ番号を検索する
-
-    Args:
-        df (pl.DataFrame): 黒点群データ
+    番号が0の群のみの日は黒点が無い日として除く
 
     Returns:
-        pl.DataFrame: 不正値を含む行のみの新しいデータフレーム
+        pl.Expr: 不正なグループ番号を持つ日の行で真となる式
     """
-    return (
-        df.lazy()
-        .group_by("date")
-        .agg(
-            pl.col("no").alias("original"),
-            pl.col("no")
-            .count()
-            .map_elements(
-                create_expected_group_numbers, return_dtype=pl.List(pl.UInt8)
-            )
-            .alias("expected"),
-        )
-        .with_columns(pl.col("original", "expected").list.sort())
-        .filter(
-            (pl.col("original") != pl.col("expected"))
-            & (pl.col("original") != [0])
-        )
-        .collect()
+    no = pl.col("no").sort()
+    expected = pl.int_range(1, pl.len() + 1, dtype=pl.UInt8)
+    return (no.ne(expected).any() & ~(no.eq(0).all() & pl.len().eq(1))).over(
+        "date"
     )
 
 
-def find_invalid_lat_range(df: pl.DataFrame, threshold: int) -> pl.DataFrame:
-    """不正な範囲に存在する緯度を検索する
+def invalid_lat_range(threshold: int) -> pl.Expr:
+    """緯度が範囲外の行で真となる式
 
     Args:
-        df (pl.DataFrame): 黒点群データ
         threshold (int): 緯度の閾値
 
     Returns:
-        pl.DataFrame: 不正値を含む行のみの新しいデータフレーム
+        pl.Expr: 不正な緯度の行で真となる式
     """
-    return df.filter(
-        pl.any_horizontal(
-            ~pl.col("lat_min").abs().is_between(0, threshold),
-            ~pl.col("lat_max").abs().is_between(0, threshold),
-        )
+    return pl.any_horizontal(
+        ~pl.col("lat_min").abs().is_between(0, threshold),
+        ~pl.col("lat_max").abs().is_between(0, threshold),
     )
 
 
-def find_invalid_lon_range(
-    df: pl.DataFrame, min_threshold: int, max_threshold: int
-) -> pl.DataFrame:
-    """不正な範囲に存在する経度を検索する
+def invalid_lon_range(min_threshold: int, max_threshold: int) -> pl.Expr:
+    """経度が範囲外の行で真となる式
 
     Args:
-        df (pl.DataFrame): 黒点群データ
         min_threshold (int): 経度の閾値の最小
         max_threshold (int): 経度の閾値の最大
 
     Returns:
-        pl.DataFrame: 不正値を含む行のみの新しいデータフレーム
+        pl.Expr: 不正な経度の行で真となる式
     """
-    return df.filter(
-        pl.any_horizontal(
-            ~pl.col("lon_min").is_between(min_threshold, max_threshold),
-            ~pl.col("lon_max").is_between(min_threshold, max_threshold),
-        )
+    return pl.any_horizontal(
+        ~pl.col("lon_min").is_between(min_threshold, max_threshold),
+        ~pl.col("lon_max").is_between(min_threshold, max_threshold),
     )
 
 
-def find_invalid_lat_interval(df: pl.DataFrame, interval: int) -> pl.DataFrame:
-    """不正な間隔を持つ緯度を検索する
+def invalid_interval(col: str, interval: int) -> pl.Expr:
+    """範囲の間隔が最大値を超える行で真となる式
 
     Args:
-        df (pl.DataFrame): 黒点群データ
-        interval (int): 緯度の間隔の最大値
+        col (str): 緯度もしくは経度の列名の接頭辞
+        interval (int): 間隔の最大値
 
     Returns:
-        pl.DataFrame: 不正値を含む行のみの新しいデータフレーム
+        pl.Expr: 不正な間隔の行で真となる式
     """
-    return df.with_columns(
-        (pl.col("lat_max") - pl.col("lat_min")).alias("interval")
-    ).filter(pl.col("interval") > interval)
+    return (pl.col(f"{col}_max") - pl.col(f"{col}_min")) > interval
 
 
-def find_invalid_lon_interval(df: pl.DataFrame, interval: int) -> pl.DataFrame:
-    """不正な間隔を持つ経度を検索する
+def create_rules(config: CheckSeiryo) -> list[Rule]:
+    """黒点群データの検査の規則を作成する
 
     Args:
-        df (pl.DataFrame): 黒点群データ
-        interval (int): 経度の間隔の最大値
+        config (CheckSeiryo): 検査の設定
 
     Returns:
-        pl.DataFrame: 不正値を含む行のみの新しいデータフレーム
+        list[Rule]: 検査の規則
     """
-    return df.with_columns(
-        (pl.col("lon_max") - pl.col("lon_min")).alias("interval")
-    ).filter(pl.col("interval") > interval)
+    lat_columns = ("date", "no", "lat_min", "lat_max")
+    lon_columns = ("date", "no", "lon_min", "lon_max")
+    return [
+        Rule(
+            name="group_number",
+            message="Invalid group numbers found",
+            expr=invalid_group_number(),
+            columns=("date", "no"),
+        ),
+        Rule(
+            name="lat_range",
+            message="Invalid latitude range values found",
+            expr=invalid_lat_range(config.lat_threshold),
+            columns=lat_columns,
+        ),
+        Rule(
+            name="lon_range",
+            message="Invalid longitude range values found",
+            expr=invalid_lon_range(
+                config.lon_min_threshold, config.lon_max_threshold
+            ),
+            columns=lon_columns,
+        ),
+        Rule(
+            name="lat_interval",
+            message="Invalid latitude interval found",
+            expr=invalid_interval("lat", config.lat_interval),
+            columns=lat_columns,
+        ),
+        Rule(
+            name="lon_interval",
+            message="Invalid longitude interval found",
+            expr=invalid_interval("lon", config.lon_interval),
+            columns=lon_columns,
+        ),
+    ]
 
 
 def main() -> None:
-    df = pl.read_parquet(Path("out/seiryo/all.parquet"))
+    lf = pl.scan_parquet(Path("out/seiryo/all.parquet"))
+    config_path = Path("config/check/seiryo.json")
+
+    with config_path.open("r") as file:
+        config = CheckSeiryo(**json.load(file))
+    rules = enabled_rules(create_rules(config), config.disabled)
 
-    lat_threshold = 50
-    lon_min_threshold = -180
-    lon_max_threshold = 180
-    lat_interval = 15
-    lon_interval = 30
+    df = find_violations(lf, rules).sort("date", "no").collect()
 
     with pl.Config() as cfg:
         cfg.set_tbl_cols(-1)
         cfg.set_tbl_rows(-1)
 
-        ret = find_invalid_group_number(df)
-        if ret.height != 0:
-            print("Invalid group numbers found")
-            print(ret.sort("date"))
-
-        ret = find_invalid_lat_range(df, lat_threshold)
-        if ret.height != 0:
-            print("Invalid latitude range values found")
-            print(ret.drop("lon_min", "lon_max", "num").sort("date", "no"))
-
-        ret = find_invalid_lon_range(df, lon_min_threshold, lon_max_threshold)
-        if ret.height != 0:
-            print("Invalid longitude range values found")
-            print(ret.drop("lat_min", "lat_max", "num").sort("date", "no"))
-
-        ret = find_invalid_lat_interval(df, lat_interval)
-        if ret.height != 0:
-            print("Invalid latitude interval found")
-            print(ret.drop("lon_min", "lon_max", "num").sort("date", "no"))
-
-        ret = find_invalid_lon_interval(df, lon_interval)
-        if ret.height != 0:
-            print("Invalid longitude interval found")
-            print(ret.drop("lat_min", "lat_max", "num").sort("date", "no"))
+        print_violations(df, rules)
 
 
 if __name__ == "__main__":
@@ -298,28 +298,32 @@ def validate_file(file: Iterable[str]) -> list[dict]:
     return errors
 
 
+def print_errors(path: Path, errors: list[dict]) -> None:
+    """検出された不正な箇所を表示する
+
+    Args:
+        path (Path): CSVファイルのパス
+        errors (list[dict]): 不正と検出された箇所と種類
+    """
+    print(path)
+    for err in errors:
+        match err["type"]:
+            case "header":
+                print(f"        header         : {err['header']}")
+            case "row":
+                print(f"    {err['line']: <4}row over       : {err['over']}")
+            case "field":
+                print(f"    {err['line']: <4}field invalid  : {err['fields']}")
+    print()
+
+
 def main() -> None:
     path_seiryo = Path("data/seiryo")
 
     for path in path_seiryo.glob("*.csv"):
         with path.open("r") as f:
             if len(ret := validate_file(f)) != 0:
-                print(path)
-                for err in ret:
-                    match err["type"]:
-                        case "header":
-                            print(f"        header         : {err['header']}")
-                        case "row":
-                            print(
-                                f"    {err['line']: <4}row over       :"
-                                f" {err['over']}"
-                            )
-                        case "field":
-                            print(
-                                f"    {err['line']: <4}field invalid  :"
-                                f" {err['fields']}"
-                            )
-                print()
+                print_errors(path, ret)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+import time
+from pathlib import Path
+
+import polars as pl
+
+import butterfly_common
+import ephemeris
+
+# 緯度の許容誤差の度数
+LAT_TOLERANCE = 3.0
+
+# 経度の許容誤差の度数
+LON_TOLERANCE = 10.0
+
+
+def prepare_seiryo(df: pl.LazyFrame) -> pl.LazyFrame:
+    """黒点群データの経度を中央子午線からの距離からカリントン経度へ変換する
+
+    Args:
+        df (pl.LazyFrame): 黒点群データ
+
+    Returns:
+        pl.LazyFrame: 緯度の範囲と、カリントン経度の始点と幅を持つデータ
+    """
+    return (
+        df.filter(pl.col("no") != 0)
+        .drop_nulls(["lat_min", "lat_max", "lon_min", "lon_max"])
+        .pipe(ephemeris.with_l0)
+        .select(
+            "date",
+            "no",
+            pl.col("lat_min", "lat_max").cast(pl.Float64),
+            # 東が正であるため、東端が最も小さいカリントン経度となる
+            ((pl.col("l0") - pl.col("lon_max")) % 360).alias("lon_start"),
+            (pl.col("lon_max") - pl.col("lon_min"))
+            .cast(pl.Float64)
+            .alias("lon_width"),
+        )
+    )
+
+
+def convert_ar_coords(df: pl.LazyFrame) -> pl.LazyFrame:
+    """活動領域の緯度を符号付きへ、経度を始点と幅へ変換する
+
+    経度の左右の大小が反転しているものは、幅が半周未満となるよう入れ替える
+
+    Args:
+        df (pl.LazyFrame): 活動領域のデータ
+
+    Returns:
+        pl.LazyFrame: 観測期間、緯度の範囲、カリントン経度の始点と幅
+    """
+    lon = [
+        pl.when(pl.col(f"{col}_sign").eq("-"))
+        .then(-pl.col(col).cast(pl.Float64))
+        .otherwise(pl.col(col).cast(pl.Float64))
+        % 360
+        for col in ["lon_left", "lon_right"]
+    ]
+    width = (lon[1] - lon[0]) % 360
+    # 幅が半周を超えるものは左右が反転しているとみなす
+    reverse = width > 180  # noqa: PLR2004
+    return (
+        df.pipe(butterfly_common.cast_lat_sign)
+        .pipe(butterfly_common.drop_lat_null)
+        .pipe(butterfly_common.reverse_south)
+        .pipe(butterfly_common.reverse_minus)
+        .pipe(butterfly_common.fix_order)
+        .pipe(butterfly_common.complement_last)
+        .drop_nulls(["lon_left", "lon_right", "first"])
+        .select(
+            "first",
+            "last",
+            "ns",
+            pl.col("no").alias("ar_no"),
+            pl.col("lat_min").cast(pl.Float64).alias("ar_lat_min"),
+            pl.col("lat_max").cast(pl.Float64).alias("ar_lat_max"),
+            pl.when(reverse)
+            .then(lon[1])
+            .otherwise(lon[0])
+            .alias("ar_lon_start"),
+            pl.when(reverse)
+            .then(360 - width)
+            .otherwise(width)
+            .alias("ar_lon_width"),
+        )
+    )
+
+
+def prepare_ar(df: pl.LazyFrame) -> pl.LazyFrame:
+    """活動領域のデータを観測期間の日ごとの行へ展開する
+
+    Args:
+        df (pl.LazyFrame): 活動領域のデータ
+
+    Returns:
+        pl.LazyFrame: 日付ごとの緯度の範囲と経度の始点と幅を持つデータ
+    """
+    return (
+        df.pipe(convert_ar_coords)
+        .with_columns(pl.date_ranges("first", "last").alias("date"))
+        .drop("first", "last")
+        .explode("date")
+    )
+
+
+def calc_overlap(
+    start_a: pl.Expr, end_a: pl.Expr, start_b: pl.Expr, end_b: pl.Expr
+) -> pl.Expr:
+    """二つの区間の重なりの長さを算出する
+
+    Args:
+        start_a (pl.Expr): 区間Aの始点
+        end_a (pl.Expr): 区間Aの終点
+        start_b (pl.Expr): 区間Bの始点
+        end_b (pl.Expr): 区間Bの終点
+
+    Returns:
+        pl.Expr: 重なりの長さ
+    """
+    return (
+        pl.min_horizontal(end_a, end_b) - pl.max_horizontal(start_a, start_b)
+    ).clip(lower_bound=0)
+
+
+def calc_lat_score(tolerance: float) -> pl.Expr:
+    """許容誤差で広げた緯度の範囲の重なりの割合を算出する
+
+    Args:
+        tolerance (float): 緯度の許容誤差
+
+    Returns:
+        pl.Expr: 重なりの長さを和集合の長さで割った値
+    """
+    start_a = pl.col("lat_min") - tolerance
+    end_a = pl.col("lat_max") + tolerance
+    start_b = pl.col("ar_lat_min") - tolerance
+    end_b = pl.col("ar_lat_max") + tolerance
+    overlap = calc_overlap(start_a, end_a, start_b, end_b)
+    return overlap / ((end_a - start_a) + (end_b - start_b) - overlap)
+
+
+def calc_lon_score(tolerance: float) -> pl.Expr:
+    """許容誤差で広げた経度の円弧の重なりの割合を算出する
+
+    Args:
+        tolerance (float): 経度の許容誤差
+
+    Returns:
+        pl.Expr: 重なりの長さを和集合の長さで割った値
+    """
+    width_a = pl.col("lon_width") + 2 * tolerance
+    width_b = pl.col("ar_lon_width") + 2 * tolerance
+    # 円弧Aの始点を原点とした円弧Bの始点
+    start_b = (pl.col("ar_lon_start") - pl.col("lon_start")) % 360
+    # 0度を跨ぐ場合に備え、一周前の位置との重なりも加える
+    overlap = calc_overlap(
+        pl.lit(0.0), width_a, start_b, start_b + width_b
+    ) + calc_overlap(
+        pl.lit(0.0), width_a, start_b - 360, start_b - 360 + width_b
+    )
+    return overlap / (width_a + width_b - overlap)
+
+
+def crossmatch(
+    df_seiryo: pl.LazyFrame,
+    df_ar: pl.LazyFrame,
+    lat_tolerance: float = LAT_TOLERANCE,
+    lon_tolerance: float = LON_TOLERANCE,
+) -> pl.LazyFrame:
+    """黒点群と活動領域を日付、緯度、経度の重なりで対応付ける
+
+    日付の等結合で候補を絞り込み、緯度と経度の重なりで判定する
+
+    Args:
+        df_seiryo (pl.LazyFrame): 黒点群データ
+        df_ar (pl.LazyFrame): 活動領域のデータ
+        lat_tolerance (float, optional): 緯度の許容誤差.
+            Defaults to LAT_TOLERANCE.
+        lon_tolerance (float, optional): 経度の許容誤差.
+            Defaults to LON_TOLERANCE.
+
+    Returns:
+        pl.LazyFrame: 対応する黒点群と活動領域の組と重なりの割合
+    """
+    return (
+        prepare_seiryo(df_seiryo)
+        .join(prepare_ar(df_ar), on="date", how="inner")
+        .with_columns(
+            calc_lat_score(lat_tolerance).alias("lat_score"),
+            calc_lon_score(lon_tolerance).alias("lon_score"),
+        )
+        .filter((pl.col("lat_score") > 0) & (pl.col("lon_score") > 0))
+        .select(
+            "date",
+            "no",
+            "ns",
+            "ar_no",
+            "lat_score",
+            "lon_score",
+            (pl.col("lat_score") * pl.col("lon_score")).alias("score"),
+        )
+        .with_columns(
+            # 黒点群ごとに最も重なりの大きい活動領域
+            (
+                pl.col("score") == pl.col("score").max().over("date", "no")
+            ).alias("best")
+        )
+        .sort("date", "no", "score", descending=[False, False, True])
+    )
+
+
+def main() -> None:
+    path_seiryo = Path("out/seiryo/all.parquet")
+    path_ar = Path("out/ar/all.parquet")
+    output_path = Path("out/crossmatch")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    df = crossmatch(
+        pl.scan_parquet(path_seiryo), pl.scan_parquet(path_ar)
+    ).collect()
+    print(f"{df.height} matches in {time.perf_counter() - start:.3f}s")
+    print(df)
+    df.write_parquet(output_path / "seiryo_ar.parquet")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import polars as pl
 from dateutil.relativedelta import relativedelta
 from matplotlib.figure import Figure
 
+import parquet_layout
+import sn_bootstrap
 from seiryo_sunspot_number_config import (
     SunspotNumberHemispheric,
     SunspotNumberWholeDisk,
@@ -16,6 +18,10 @@ from seiryo_sunspot_number_config import (
 if TYPE_CHECKING:
     from datetime import date
 
+    from matplotlib.axes import Axes
+
+    from seiryo_config_common import Line
+
 
 def split(df: pl.LazyFrame) -> tuple[pl.LazyFrame, pl.LazyFrame]:
     df_spot = df.filter(~pl.col("no").eq(0))
@@ -72,6 +78,13 @@ def sort(df: pl.LazyFrame) -> pl.LazyFrame:
     return df.select(["date", "ng", "nf", "sg", "sf", "tg", "tf"]).sort("date")
 
 
+def calc_raw(df: pl.LazyFrame) -> pl.LazyFrame:
+    df_spot, df_nospot = split(df)
+    df_spot = df_spot.pipe(calc_lat).pipe(calc_sn)
+    df_nospot = df_nospot.select("date").pipe(fill_sn)
+    return pl.concat([df_spot, df_nospot]).pipe(sort)
+
+
 def agg_daily(df: pl.DataFrame) -> pl.DataFrame:
     return (
         df.lazy()
@@ -108,6 +121,33 @@ def agg_monthly(df: pl.DataFrame) -> pl.DataFrame:
     )
 
 
+def agg_monthly_with_errors(df: pl.DataFrame) -> pl.DataFrame:
+    # 日ごとの値の再標本化による誤差を月平均値へ付与
+    return agg_monthly(df).join(
+        sn_bootstrap.calc_monthly_errors(agg_daily(df)),
+        on="date",
+        how="left",
+        coalesce=True,
+    )
+
+
+def draw_errorbar(
+    ax: "Axes", df: pl.DataFrame, col: str, line: "Line"
+) -> None:
+    # 標準誤差の列がある場合のみ誤差棒を描画
+    if f"{col}_se" not in df.columns:
+        return
+    ax.errorbar(
+        df["date"],
+        df[col],
+        yerr=df[f"{col}_se"].fill_null(0),
+        fmt="none",
+        ecolor=line.color,
+        elinewidth=line.width / 2,
+        capsize=0,
+    )
+
+
 def draw_sunspot_number_whole_disk(
     df: pl.DataFrame, config: SunspotNumberWholeDisk
 ) -> Figure:
@@ -133,6 +173,7 @@ def draw_sunspot_number_whole_disk(
         marker=config.line.marker.marker,
         ms=config.line.marker.size,
     )
+    draw_errorbar(ax, df, "total", config.line)
 
     ax.set_title(
         config.title.text,
@@ -216,6 +257,8 @@ def draw_sunspot_number_hemispheric(
         marker=config.line_south.marker.marker,
         ms=config.line_south.marker.size,
     )
+    draw_errorbar(ax, df, "north", config.line_north)
+    draw_errorbar(ax, df, "south", config.line_south)
 
     ax.set_title(
         config.title.text,
@@ -281,20 +324,21 @@ def main() -> None:
     output_path = Path("out/seiryo/sunspot")
     output_path.mkdir(exist_ok=True)
 
-    df_spot, df_nospot = split(pl.scan_parquet(path_seiryo))
-    df_spot = df_spot.pipe(calc_lat).pipe(calc_sn)
-    df_nospot = df_nospot.select("date").pipe(fill_sn)
-    df_raw = pl.concat([df_spot, df_nospot]).pipe(sort).collect()
+    df_raw = calc_raw(pl.scan_parquet(path_seiryo)).collect()
     print(df_raw)
-    df_raw.write_parquet(output_path / "raw.parquet")
+    parquet_layout.write_parquet(df_raw, output_path / "raw.parquet", ["date"])
 
     df_daily = agg_daily(df_raw)
     print(df_daily)
-    df_daily.write_parquet(output_path / "daily.parquet")
+    parquet_layout.write_parquet(
+        df_daily, output_path / "daily.parquet", ["date"]
+    )
 
-    df_monthly = agg_monthly(df_raw)
+    df_monthly = agg_monthly_with_errors(df_raw)
     print(df_monthly)
-    df_monthly.write_parquet(output_path / "monthly.parquet")
+    parquet_layout.write_parquet(
+        df_monthly, output_path / "monthly.parquet", ["date"]
+    )
 
     with (config_path / "whole_disk.json").open("r") as file:
         config_whole_disk = SunspotNumberWholeDisk(**json.load(file))
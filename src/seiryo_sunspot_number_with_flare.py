@@ -1,7 +1,6 @@
 import json
-from datetime import date
 from pathlib import Path
-from re import compile
+from typing import TYPE_CHECKING
 
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
@@ -10,61 +9,15 @@ from dateutil.relativedelta import relativedelta
 from matplotlib.figure import Figure
 from scipy import optimize
 
+import flare
+import parquet_layout
 from seiryo_sunspot_number_with_flare_config import (
     SunspotNumberWithFlare,
     SunspotNumberWithFlareHemispheric,
 )
 
-
-def load_flare_file(path: Path) -> pl.DataFrame:
-    with path.open("r") as f:
-        lines = [line.strip() for line in f if line.strip()]
-    pat_year = compile(r"(\d{4})")
-    for line in lines:
-        if match := pat_year.match(line):
-            year = int(match.group())
-            break
-    else:
-        msg = "cannot find year"
-        raise ValueError(msg)
-    mean_line = [
-        line.replace("Mean", "").split()
-        for line in lines
-        if line.startswith("Mean")
-    ]
-    dates: list[date] = []
-    indexes: list[float] = []
-    for i, d in enumerate(mean_line[0]):
-        dates.append(date(year, i + 1, 1))
-        indexes.append(float(d))
-    return pl.DataFrame({"date": dates, "index": indexes})
-
-
-def load_flare_files(
-    files_north: list[Path], files_south: list[Path], files_total: list[Path]
-) -> pl.DataFrame:
-    df_north = pl.concat(
-        load_flare_file(file).lazy() for file in files_north
-    ).rename({"index": "north"})
-    df_south = pl.concat(
-        load_flare_file(file).lazy() for file in files_south
-    ).rename({"index": "south"})
-    df_total = pl.concat(
-        load_flare_file(file).lazy() for file in files_total
-    ).rename({"index": "total"})
-    return (
-        df_north.join(df_south, on="date", how="full", coalesce=True)
-        .join(df_total, on="date", how="full", coalesce=True)
-        .sort("date")
-        .collect()
-    )
-
-
-def load_flare_data(path: Path) -> pl.DataFrame:
-    files_north = list(path.glob("*north*.txt"))
-    files_south = list(path.glob("*south*.txt"))
-    files_total = list(path.glob("*total*.txt"))
-    return load_flare_files(files_north, files_south, files_total)
+if TYPE_CHECKING:
+    from datetime import date
 
 
 def join_data(df_seiryo: pl.DataFrame, df_flare: pl.DataFrame) -> pl.DataFrame:
@@ -469,18 +422,23 @@ def draw_sunspot_number_with_flare_hemispheric(  # noqa: PLR0915
 def main() -> None:
     path_seiryo = Path("out/seiryo/sunspot/monthly.parquet")
     path_flare = Path("data/flare")
+    path_cache = Path("out/flare/flare.parquet")
     config_path = Path("config/seiryo/sunspot_number")
     output_path = Path("out/seiryo/sunspot")
 
     df_seiryo = pl.read_parquet(path_seiryo)
     print(df_seiryo)
 
-    df_flare = load_flare_data(path_flare).sort("date")
+    df_flare = flare.pivot_monthly(
+        flare.load_flare_data_cached(path_flare, path_cache)
+    )
     print(df_flare)
 
     df_with_flare = join_data(df_seiryo, df_flare)
     print(df_with_flare)
-    df_with_flare.write_parquet(output_path / "with_flare.parquet")
+    parquet_layout.write_parquet(
+        df_with_flare, output_path / "with_flare.parquet", ["date"]
+    )
 
     factors = calc_factors(df_with_flare)
     print(f"{factors=}")
@@ -11,6 +11,8 @@ from matplotlib.figure import Figure
 from scipy import optimize
 from sklearn import metrics
 
+import parquet_layout
+import silso
 from seiryo_sunspot_number_with_silso_config import (
     SunspotNumberDiff,
     SunspotNumberRatio,
@@ -24,25 +26,6 @@ if TYPE_CHECKING:
     from datetime import date
 
 
-def load_silso_data(path: Path) -> pl.DataFrame:
-    with path.open() as f:
-        data = [i.split() for i in f.read().split("\n") if i]
-    return (
-        pl.LazyFrame(
-            {
-                "year": [int(i[0]) for i in data],
-                "month": [int(i[1]) for i in data],
-                "total": [float(i[3]) for i in data],
-            }
-        )
-        .with_columns(
-            pl.date(pl.col("year"), pl.col("month"), 1).alias("date")
-        )
-        .drop("year", "month")
-        .collect()
-    )
-
-
 def join_data(df_seiryo: pl.DataFrame, df_silso: pl.DataFrame) -> pl.DataFrame:
     return (
         df_seiryo.lazy()
@@ -670,18 +653,21 @@ def draw_ratio_diff_2(
 def main() -> None:
     path_seiryo = Path("out/seiryo/sunspot/monthly.parquet")
     path_silso = Path("data/SN_m_tot_V2.0.txt")
+    path_cache = Path("out/silso")
     config_path = Path("config/seiryo/sunspot_number")
     output_path = Path("out/seiryo/sunspot")
 
     df_seiryo = pl.read_parquet(path_seiryo)
     print(df_seiryo)
 
-    df_silso = load_silso_data(path_silso)
+    df_silso = silso.load_silso_data_cached(path_silso, path_cache)
     print(df_silso)
 
     df_seiryo_with_silso = join_data(df_seiryo, df_silso)
     print(df_seiryo_with_silso)
-    df_seiryo_with_silso.write_parquet(output_path / "with_silso.parquet")
+    parquet_layout.write_parquet(
+        df_seiryo_with_silso, output_path / "with_silso.parquet", ["date"]
+    )
 
     df_seiryo_with_silso_truncated = truncate_data(df_seiryo_with_silso)
 
@@ -698,7 +684,9 @@ def main() -> None:
         df_seiryo_with_silso_truncated, factor
     )
     print(df_ratio_and_diff)
-    df_ratio_and_diff.write_parquet(output_path / "ratio_diff.parquet")
+    parquet_layout.write_parquet(
+        df_ratio_and_diff, output_path / "ratio_diff.parquet", ["date"]
+    )
 
     with (config_path / "with_silso.json").open("r") as file:
         config_with_silso = SunspotNumberWithSilso(**json.load(file))
@@ -0,0 +1,161 @@
+from hashlib import sha256
+from pathlib import Path
+
+import polars as pl
+
+# 月別のファイルの一行の形式
+# 年 月 小数の年 黒点数 標準偏差 観測数 [暫定値の印]
+PATTERN_MONTHLY = (
+    r"^\s*(?<year>\d+)\s+(?<month>\d+)\s+(?<fr_year>\S+)"
+    r"\s+(?<total>\S+)\s+(?<std>\S+)\s+(?<obs>\S+)(?:\s+(?<marker>\S+))?\s*$"
+)
+
+# 日別のファイルの一行の形式
+# 年 月 日 小数の年 黒点数 標準偏差 観測数 [確定値の印]
+PATTERN_DAILY = (
+    r"^\s*(?<year>\d+)\s+(?<month>\d+)\s+(?<day>\d+)\s+(?<fr_year>\S+)"
+    r"\s+(?<total>\S+)\s+(?<std>\S+)\s+(?<obs>\S+)(?:\s+(?<marker>\S+))?\s*$"
+)
+
+
+def scan_lines(path: Path) -> pl.LazyFrame:
+    """ファイルを一行ずつ一つの列として読み込む
+
+    Args:
+        path (Path): ファイルのパス
+
+    Returns:
+        pl.LazyFrame: 各行を要素とするデータ
+    """
+    return pl.scan_csv(
+        path,
+        has_header=False,
+        separator="\x1f",
+        quote_char=None,
+        schema={"line": pl.Utf8},
+    )
+
+
+def parse_values(df: pl.LazyFrame, pattern: str) -> pl.LazyFrame:
+    """各行を列へ分解し、数値へ変換する
+
+    欠損値を表す負の値はnullへ変換する
+
+    Args:
+        df (pl.LazyFrame): 各行を要素とするデータ
+        pattern (str): 一行の形式
+
+    Returns:
+        pl.LazyFrame: 列へ分解したデータ
+    """
+    return (
+        df.select(pl.col("line").str.extract_groups(pattern))
+        .unnest("line")
+        .drop_nulls("year")
+        .with_columns(
+            pl.col("fr_year", "total", "std").cast(pl.Float64),
+            pl.col("obs").cast(pl.Int32),
+        )
+        .with_columns(
+            pl.when(pl.col(col).ge(0)).then(pl.col(col)).alias(col)
+            for col in ["total", "std", "obs"]
+        )
+    )
+
+
+def parse_monthly(df: pl.LazyFrame) -> pl.LazyFrame:
+    """月別の黒点数のファイルを解析する
+
+    Args:
+        df (pl.LazyFrame): 各行を要素とするデータ
+
+    Returns:
+        pl.LazyFrame: 月別の黒点数
+    """
+    return df.pipe(parse_values, pattern=PATTERN_MONTHLY).select(
+        pl.date("year", "month", 1).alias("date"),
+        "fr_year",
+        "total",
+        "std",
+        "obs",
+        # 確定値は1、暫定値は0もしくは印が付く
+        pl.col("marker")
+        .is_in(["0", "*"])
+        .fill_null(value=False)
+        .alias("provisional"),
+    )
+
+
+def parse_daily(df: pl.LazyFrame) -> pl.LazyFrame:
+    """日別の黒点数のファイルを解析する
+
+    Args:
+        df (pl.LazyFrame): 各行を要素とするデータ
+
+    Returns:
+        pl.LazyFrame: 日別の黒点数
+    """
+    return df.pipe(parse_values, pattern=PATTERN_DAILY).select(
+        pl.date("year", "month", "day").alias("date"),
+        "fr_year",
+        "total",
+        "std",
+        "obs",
+        # 確定値は1、暫定値は0もしくは印が付く
+        pl.col("marker")
+        .is_in(["0", "*"])
+        .fill_null(value=False)
+        .alias("provisional"),
+    )
+
+
+def load_silso_data(path: Path, *, daily: bool = False) -> pl.DataFrame:
+    """SILSOの黒点数のファイルを読み込む
+
+    Args:
+        path (Path): ファイルのパス
+        daily (bool, optional): 日別のファイルかどうか. Defaults to False.
+
+    Returns:
+        pl.DataFrame: 黒点数
+    """
+    parse = parse_daily if daily else parse_monthly
+    return scan_lines(path).pipe(parse).collect()
+
+
+def calc_hash(path: Path) -> str:
+    """ファイルの内容のハッシュ値を算出する
+
+    Args:
+        path (Path): ファイルのパス
+
+    Returns:
+        str: ハッシュ値
+    """
+    with path.open("rb") as f:
+        return sha256(f.read()).hexdigest()
+
+
+def load_silso_data_cached(
+    path: Path, cache_path: Path, *, daily: bool = False
+) -> pl.DataFrame:
+    """SILSOの黒点数のファイルをキャッシュを用いて読み込む
+
+    キャッシュは元のファイルのハッシュ値ごとにparquetとして保存する
+
+    Args:
+        path (Path): ファイルのパス
+        cache_path (Path): キャッシュを保存するフォルダのパス
+        daily (bool, optional): 日別のファイルかどうか. Defaults to False.
+
+    Returns:
+        pl.DataFrame: 黒点数
+    """
+    cache_file = cache_path / f"{path.stem}_{calc_hash(path)[:16]}.parquet"
+    if cache_file.exists():
+        return pl.read_parquet(cache_file)
+
+    df = load_silso_data(path, daily=daily)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    df.write_parquet(cache_file)
+    return df
@@ -0,0 +1,210 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+import parquet_layout
+import wolf_number
+
+# 半球の種類
+HEMISPHERES = ["north", "south", "total"]
+
+# 再標本化の回数と一度に計算する回数
+N_RESAMPLES = 2000
+CHUNK_SIZE = 64
+
+# 信頼区間の信頼係数
+CONFIDENCE = 0.95
+
+# 乱数のシード
+SEED = 0
+
+# 誤差を算出する観測数の下限
+MIN_COUNT = 2
+
+
+@dataclass(frozen=True, slots=True)
+class MonthBatch:
+    """長さを揃えて並べた月ごとの観測値"""
+
+    dates: pl.Series
+    values: npt.NDArray[np.float64]
+    counts: npt.NDArray[np.int64]
+
+    @property
+    def mask(self: "MonthBatch") -> npt.NDArray[np.bool_]:
+        return np.arange(self.values.shape[2]) < self.counts[:, None]
+
+
+def create_batch(df: pl.DataFrame, cols: list[str]) -> MonthBatch:
+    """観測値を月ごとに並べた配列へ変換する
+
+    Args:
+        df (pl.DataFrame): 日付と系列ごとの観測値
+        cols (list[str]): 系列の列名
+
+    Returns:
+        MonthBatch: 系列、月、月の中の順番の配列
+    """
+    df_index = (
+        df.drop_nulls(cols)
+        .with_columns(pl.col("date").dt.truncate("1mo"))
+        .sort("date")
+        .with_columns(
+            (pl.col("date").rank("dense") - 1).alias("row"),
+            pl.int_range(pl.len()).over("date").alias("col"),
+        )
+    )
+    dates = df_index["date"].unique(maintain_order=True)
+    rows = df_index["row"].to_numpy()
+    positions = df_index["col"].to_numpy()
+    counts = np.bincount(rows, minlength=dates.len())
+
+    values = np.zeros(
+        (len(cols), dates.len(), int(counts.max()) if counts.size > 0 else 0)
+    )
+    values[:, rows, positions] = (
+        df_index.select(pl.col(cols).cast(pl.Float64)).to_numpy().T
+    )
+    return MonthBatch(dates, values, counts)
+
+
+def bootstrap_means(
+    batch: MonthBatch,
+    n_resamples: int = N_RESAMPLES,
+    seed: int = SEED,
+    chunk_size: int = CHUNK_SIZE,
+) -> npt.NDArray[np.float64]:
+    """全ての系列と月の平均値をまとめて再標本化する
+
+    月ごとの観測数未満の乱数の添字を行列として作成し、
+    観測ごとの抽出回数へ数え直して観測値との行列積から平均値を求める
+
+    Args:
+        batch (MonthBatch): 月ごとの観測値
+        n_resamples (int, optional): 再標本化の回数.
+            Defaults to N_RESAMPLES.
+        seed (int, optional): 乱数のシード. Defaults to SEED.
+        chunk_size (int, optional): 一度に計算する回数.
+            Defaults to CHUNK_SIZE.
+
+    Returns:
+        npt.NDArray[np.float64]: 系列、月、再標本化の順の平均値
+    """
+    rng = np.random.default_rng(seed)
+    n_series, n_months, n_max = batch.values.shape
+    mask = batch.mask
+    inv_counts = 1 / np.maximum(batch.counts, 1)
+    # 月ごとに系列と観測の行列とする
+    values = batch.values.transpose(1, 0, 2)
+
+    means = np.empty((n_series, n_months, n_resamples))
+    for start in range(0, n_resamples, chunk_size):
+        size = min(chunk_size, n_resamples - start)
+        # 各月の観測数の範囲の添字を復元抽出する
+        index = (
+            rng.random((size, n_months, n_max)) * batch.counts[:, None]
+        ).astype(np.int64)
+        # 再標本化、月ごとの通し番号へ変換し、観測ごとの抽出回数を数える
+        offset = np.arange(size * n_months).reshape(size, n_months) * n_max
+        counts = np.bincount(
+            (index + offset[..., None])[:, mask].ravel(),
+            minlength=size * n_months * n_max,
+        ).reshape(size, n_months, n_max)
+        means[..., start : start + size] = (
+            values @ counts.transpose(1, 2, 0)
+        ).transpose(1, 0, 2) * inv_counts[:, None]
+    return means
+
+
+def jackknife_se(batch: MonthBatch) -> npt.NDArray[np.float64]:
+    """一つずつ除いた平均値からジャックナイフ標準誤差を算出する
+
+    Args:
+        batch (MonthBatch): 月ごとの観測値
+
+    Returns:
+        npt.NDArray[np.float64]: 系列、月の順の標準誤差
+    """
+    n = batch.counts.astype(np.float64)
+    mask = batch.mask
+    total = np.where(mask, batch.values, 0.0).sum(axis=2, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        loo = (total - batch.values) / (n[:, None] - 1)
+        loo_mean = np.where(mask, loo, 0.0).sum(axis=2) / n
+        ss = np.where(mask, (loo - loo_mean[..., None]) ** 2, 0.0).sum(axis=2)
+        return np.where(n >= MIN_COUNT, np.sqrt((n - 1) / n * ss), np.nan)
+
+
+def calc_monthly_errors(
+    df: pl.DataFrame,
+    cols: list[str] = HEMISPHERES,
+    n_resamples: int = N_RESAMPLES,
+    confidence: float = CONFIDENCE,
+    seed: int = SEED,
+) -> pl.DataFrame:
+    """月平均値の標準誤差と信頼区間を全ての系列と月でまとめて算出する
+
+    観測が一つの月は誤差を算出できないため空白とする
+
+    Args:
+        df (pl.DataFrame): 日付と系列ごとの観測値
+        cols (list[str], optional): 系列の列名. Defaults to HEMISPHERES.
+        n_resamples (int, optional): 再標本化の回数.
+            Defaults to N_RESAMPLES.
+        confidence (float, optional): 信頼係数. Defaults to CONFIDENCE.
+        seed (int, optional): 乱数のシード. Defaults to SEED.
+
+    Returns:
+        pl.DataFrame: 月初めの日付、観測数と、系列ごとのブートストラップと
+            ジャックナイフの標準誤差、パーセンタイル信頼区間
+    """
+    batch = create_batch(df, cols)
+    means = bootstrap_means(batch, n_resamples, seed)
+    alpha = (1 - confidence) / 2
+    se = means.std(axis=2, ddof=1)
+    lower, upper = np.quantile(means, [alpha, 1 - alpha], axis=2)
+    se_jack = jackknife_se(batch)
+    valid = batch.counts >= MIN_COUNT
+
+    return pl.DataFrame(
+        {"date": batch.dates, "n": pl.Series(batch.counts, dtype=pl.UInt32)}
+    ).with_columns(
+        pl.Series(name, np.where(valid, values, np.nan)).fill_nan(None)
+        for i, col in enumerate(cols)
+        for name, values in [
+            (f"{col}_se", se[i]),
+            (f"{col}_se_jack", se_jack[i]),
+            (f"{col}_ci_lower", lower[i]),
+            (f"{col}_ci_upper", upper[i]),
+        ]
+    )
+
+
+def main() -> None:
+    path_seiryo = Path("out/seiryo/sunspot/daily.parquet")
+    path_fujimori = Path("out/sn/all.parquet")
+    output_path = Path("out/sn/bootstrap")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    for name, df in [
+        ("seiryo", pl.read_parquet(path_seiryo)),
+        ("fujimori", wolf_number.load_fujimori(path_fujimori)),
+    ]:
+        start = time.perf_counter()
+        df_errors = calc_monthly_errors(df)
+        print(
+            f"{name}: {df_errors.height} months x {N_RESAMPLES} resamples "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        print(df_errors)
+        parquet_layout.write_parquet(
+            df_errors, output_path / f"{name}.parquet", ["date"]
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
+from typing import TYPE_CHECKING
+
 import polars as pl
 
+if TYPE_CHECKING:
+    from datetime import date
+
 
 def calc_date(df: pl.LazyFrame, year: int, month: int) -> pl.LazyFrame:
     return df.with_columns(
@@ -11,3 +16,24 @@ def calc_date(df: pl.LazyFrame, year: int, month: int) -> pl.LazyFrame:
 def sort(df: pl.LazyFrame) -> pl.LazyFrame:
     # 日付でソートする
     return df.sort("date")
+
+
+def fill_dates(df: pl.DataFrame, interval: str) -> pl.DataFrame:
+    """欠けた日付を空白で埋め、一定の間隔で連続したデータとする
+
+    Args:
+        df (pl.DataFrame): 日付と値を持つデータ
+        interval (str): 日付の間隔
+
+    Returns:
+        pl.DataFrame: 連続した日付のデータ
+    """
+    date_min: date = df.select(pl.min("date")).item()
+    date_max: date = df.select(pl.max("date")).item()
+    return (
+        pl.DataFrame(
+            {"date": pl.date_range(date_min, date_max, interval, eager=True)}
+        )
+        .join(df, on="date", how="left", coalesce=True)
+        .sort("date")
+    )
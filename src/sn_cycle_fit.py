@@ -0,0 +1,322 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+# Hathawayの形状関数の定数
+SHAPE_C = 0.71
+
+# パラメータの名前
+PARAMS = ["a", "b", "t0"]
+
+# 反復の上限
+MAX_ITER = 200
+
+# 収束とみなす残差平方和の相対的な減少量と、減衰係数の上限
+TOLERANCE = 1e-12
+LAM_MAX = 1e10
+
+# 立ち上がりの時間と開始の月の初期値の候補
+START_B = [24.0, 36.0, 48.0, 60.0]
+START_T0 = [-6.0, 0.0]
+
+# 指数関数が桁あふれしない指数の上限
+EXP_LIMIT = 700.0
+
+# 当てはめに用いる周期の最小の月数
+MIN_MONTHS = 36
+
+
+@dataclass(frozen=True, slots=True)
+class CycleBatch:
+    """長さを揃えて並べた活動周期ごとの月の値"""
+
+    keys: pl.DataFrame
+    t: npt.NDArray[np.float64]
+    y: npt.NDArray[np.float64]
+    mask: npt.NDArray[np.bool_]
+
+
+def segment_cycles(
+    df: pl.DataFrame, df_extrema: pl.DataFrame, min_months: int = MIN_MONTHS
+) -> pl.DataFrame:
+    """月ごとの値を極小から次の極小までの活動周期へ分割する
+
+    最初の極小より前の月は周期が不明なため除く
+    次の極小がない最後の周期は途中までのため、completeを偽とする
+    観測のある月が少ない周期は当てはめられないため除く
+
+    Args:
+        df (pl.DataFrame): 連続した月の日付と系列ごとの値
+        df_extrema (pl.DataFrame): 系列名、極大か極小か、日付、値
+        min_months (int, optional): 周期の最小の月数.
+            Defaults to MIN_MONTHS.
+
+    Returns:
+        pl.DataFrame: 系列名、周期の開始日、周期が完結しているか、
+            開始からの月数、値
+    """
+    df_minima = (
+        df_extrema.filter(pl.col("kind") == "min")
+        .select("series", pl.col("date").alias("start"))
+        .sort("start")
+        .with_columns(
+            pl.col("start")
+            .shift(-1)
+            .over("series")
+            .is_not_null()
+            .alias("complete")
+        )
+    )
+    return (
+        df.unpivot(index="date", variable_name="series")
+        .drop_nulls("value")
+        .sort("date")
+        .join_asof(
+            df_minima,
+            left_on="date",
+            right_on="start",
+            by="series",
+            strategy="backward",
+        )
+        .drop_nulls("start")
+        .filter(pl.len().over("series", "start") >= min_months)
+        .select(
+            "series",
+            "start",
+            "complete",
+            (
+                (pl.col("date").dt.year() - pl.col("start").dt.year()) * 12
+                + pl.col("date").dt.month().cast(pl.Int32)
+                - pl.col("start").dt.month().cast(pl.Int32)
+            ).alias("t"),
+            pl.col("value").cast(pl.Float64),
+        )
+        .sort("series", "start", "t")
+    )
+
+
+def create_batch(df: pl.DataFrame) -> CycleBatch:
+    """活動周期ごとの値を月数の位置へ並べた配列へ変換する
+
+    月数と値以外の列は周期ごとのキーとして残す
+
+    Args:
+        df (pl.DataFrame): 系列名、周期の開始日、開始からの月数、値
+
+    Returns:
+        CycleBatch: 周期を行、月数を列とした配列
+    """
+    keys = df.select(pl.exclude("t", "value")).unique(maintain_order=True)
+    df_index = df.join(
+        keys.with_row_index("row"), on=["series", "start"], how="left"
+    )
+    rows = df_index["row"].to_numpy()
+    cols = df_index["t"].to_numpy()
+
+    shape = (keys.height, int(cols.max()) + 1 if cols.size > 0 else 0)
+    y = np.zeros(shape)
+    mask = np.zeros(shape, dtype=np.bool_)
+    y[rows, cols] = df_index["value"].to_numpy()
+    mask[rows, cols] = True
+    t = np.broadcast_to(np.arange(shape[1], dtype=np.float64), shape)
+    return CycleBatch(keys, t, y, mask)
+
+
+def shape_function(
+    t: npt.NDArray[np.float64], params: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Hathawayの形状関数と、パラメータに対する偏微分を算出する
+
+    f(t) = a (t - t0)^3 / (exp((t - t0)^2 / b^2) - c)
+
+    Args:
+        t (npt.NDArray[np.float64]): 周期を行とした月数
+        params (npt.NDArray[np.float64]): 周期ごとのa、b、t0
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+            関数の値と、最後の軸をパラメータとしたヤコビ行列
+    """
+    a, b, t0 = (params[:, i, None] for i in range(3))
+    u = t - t0
+    e = np.exp(np.minimum(u**2 / b**2, EXP_LIMIT))
+    d = e - SHAPE_C
+    f = a * u**3 / d
+    df_da = u**3 / d
+    df_db = 2 * a * u**5 * e / (b**3 * d**2)
+    df_dt0 = -a * u**2 * (3 * d - 2 * u**2 * e / b**2) / d**2
+    return f, np.stack([df_da, df_db, df_dt0], axis=-1)
+
+
+def calc_residual(
+    batch: CycleBatch, params: npt.NDArray[np.float64]
+) -> tuple[
+    npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]
+]:
+    """観測のある月の残差、ヤコビ行列、残差平方和を算出する
+
+    Args:
+        batch (CycleBatch): 周期ごとの配列
+        params (npt.NDArray[np.float64]): 周期ごとのパラメータ
+
+    Returns:
+        tuple[
+            npt.NDArray[np.float64],
+            npt.NDArray[np.float64],
+            npt.NDArray[np.float64],
+        ]: 残差、ヤコビ行列、残差平方和
+    """
+    f, jac = shape_function(batch.t, params)
+    r = np.where(batch.mask, batch.y - f, 0.0)
+    jac = np.where(batch.mask[..., None], jac, 0.0)
+    ssr = (r**2).sum(axis=1)
+    return r, jac, np.where(np.isfinite(ssr), ssr, np.inf)
+
+
+def fit_batch(
+    batch: CycleBatch, b0: float, t00: float, max_iter: int = MAX_ITER
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """全ての周期をまとめてLevenberg-Marquardt法で当てはめる
+
+    aは線形であるため、初期値はbとt0を固定した最小二乗解とする
+
+    Args:
+        batch (CycleBatch): 周期ごとの配列
+        b0 (float): bの初期値
+        t00 (float): t0の初期値
+        max_iter (int, optional): 反復の上限. Defaults to MAX_ITER.
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+            周期ごとのパラメータと残差平方和
+    """
+    n = batch.y.shape[0]
+    params = np.column_stack([np.ones(n), np.full(n, b0), np.full(n, t00)])
+    g, _ = shape_function(batch.t, params)
+    g = np.where(batch.mask, g, 0.0)
+    params[:, 0] = (g * batch.y).sum(axis=1) / (g**2).sum(axis=1)
+
+    r, jac, ssr = calc_residual(batch, params)
+    lam = np.full(n, 1e-3)
+    done = np.zeros(n, dtype=np.bool_)
+    for _ in range(max_iter):
+        jtj = np.einsum("nmi,nmj->nij", jac, jac)
+        jtr = np.einsum("nmi,nm->ni", jac, r)
+        diag = np.einsum("nii->ni", jtj)
+        a = jtj + (lam[:, None] * (diag + 1e-12))[..., None] * np.eye(3)
+        delta = np.linalg.solve(a, jtr[..., None])[..., 0]
+
+        params_new = params + delta
+        params_new[:, 1] = np.abs(params_new[:, 1])
+        r_new, jac_new, ssr_new = calc_residual(batch, params_new)
+
+        # 残差平方和が減った周期のみ更新し、減衰係数を調整する
+        improved = ssr_new < ssr
+        done |= (lam > LAM_MAX) | (
+            improved & (ssr - ssr_new <= TOLERANCE * ssr)
+        )
+        params = np.where(improved[:, None], params_new, params)
+        r = np.where(improved[:, None], r_new, r)
+        jac = np.where(improved[:, None, None], jac_new, jac)
+        ssr = np.where(improved, ssr_new, ssr)
+        lam = np.where(improved, lam / 10, lam * 10)
+        if done.all():
+            break
+    return params, ssr
+
+
+def calc_stderr(
+    batch: CycleBatch, params: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """ヤコビ行列からパラメータの標準誤差を算出する
+
+    Args:
+        batch (CycleBatch): 周期ごとの配列
+        params (npt.NDArray[np.float64]): 周期ごとのパラメータ
+
+    Returns:
+        npt.NDArray[np.float64]: 周期ごとのパラメータの標準誤差
+    """
+    _, jac, ssr = calc_residual(batch, params)
+    dof = batch.mask.sum(axis=1) - len(PARAMS)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s2 = np.where(dof > 0, ssr / dof, np.nan)
+    cov = np.linalg.pinv(np.einsum("nmi,nmj->nij", jac, jac))
+    return np.sqrt(s2[:, None] * np.einsum("nii->ni", cov))
+
+
+def fit_cycles(
+    batch: CycleBatch,
+    start_b: list[float] = START_B,
+    start_t0: list[float] = START_T0,
+    max_workers: int | None = None,
+) -> pl.DataFrame:
+    """初期値の候補ごとに並列で当てはめ、周期ごとに最良の結果を選ぶ
+
+    Args:
+        batch (CycleBatch): 周期ごとの配列
+        start_b (list[float], optional): bの初期値の候補. Defaults to START_B.
+        start_t0 (list[float], optional): t0の初期値の候補.
+            Defaults to START_T0.
+        max_workers (int | None, optional): プロセス数. Defaults to None.
+
+    Returns:
+        pl.DataFrame: 周期ごとのパラメータと標準誤差、残差平方和、月数
+    """
+    starts = list(product(start_b, start_t0))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                fit_batch,
+                [batch] * len(starts),
+                [b for b, _ in starts],
+                [t0 for _, t0 in starts],
+            )
+        )
+    params_all = np.stack([params for params, _ in results])
+    ssr_all = np.stack([ssr for _, ssr in results])
+    best = ssr_all.argmin(axis=0)
+    index = np.arange(batch.y.shape[0])
+    params = params_all[best, index]
+    stderr = calc_stderr(batch, params)
+
+    return batch.keys.with_columns(
+        *(
+            pl.Series(name, params[:, i]).fill_nan(None)
+            for i, name in enumerate(PARAMS)
+        ),
+        *(
+            pl.Series(f"{name}_err", stderr[:, i]).fill_nan(None)
+            for i, name in enumerate(PARAMS)
+        ),
+        pl.Series("ssr", ssr_all[best, index]),
+        pl.Series("n", batch.mask.sum(axis=1)),
+    )
+
+
+def main() -> None:
+    path_monthly = Path("out/sn/smoothed/monthly.parquet")
+    path_extrema = Path("out/sn/smoothed/extrema_tapered.parquet")
+    output_path = Path("out/sn/smoothed")
+
+    df_cycles = segment_cycles(
+        pl.read_parquet(path_monthly), pl.read_parquet(path_extrema)
+    )
+    batch = create_batch(df_cycles)
+
+    start = time.perf_counter()
+    df = fit_cycles(batch)
+    print(f"{df.height} cycles in {time.perf_counter() - start:.3f}s")
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print(df)
+    df.write_parquet(output_path / "cycle_fit.parquet")
+
+
+if __name__ == "__main__":
+    main()
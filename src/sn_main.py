@@ -3,12 +3,49 @@ from pprint import pprint
 
 import polars as pl
 
+import parquet_layout
 import sn_common
 import sn_jst
 import sn_type
 import sn_ut
 
 
+def load_file(path: Path) -> pl.LazyFrame | None:
+    """月ごとのファイルを読み込み、日付と時刻を計算する
+
+    Args:
+        path (Path): ファイルのパス
+
+    Returns:
+        pl.LazyFrame | None: 黒点数のデータ、対応していない年月の場合はNone
+    """
+    # ファイル名から対象の年と月を計算
+    year, month = map(int, path.stem.split("-"))
+    file_frame = pl.scan_csv(
+        path,
+        schema={
+            "date": pl.UInt8,
+            "time": pl.Utf8,
+            "ng": pl.UInt8,
+            "nf": pl.UInt16,
+            "sg": pl.UInt8,
+            "sf": pl.UInt16,
+            "remarks": pl.Utf8,
+        },
+    )
+    # jstとutで時刻の計算方法が別
+    match sn_type.detect_time_type(year, month):
+        case sn_type.TimeType.JST:
+            file_frame = sn_jst.calc_time(file_frame)
+        case sn_type.TimeType.UT:
+            file_frame = sn_ut.calc_time(file_frame)
+        case _:
+            print(f"Err: not supported date for {year}/{month}")
+            return None
+    # 日付の計算
+    return sn_common.calc_date(file_frame, year, month)
+
+
 def main() -> None:
     # 入出力先のフォルダのパス
     # 出力先のフォルダがない場合は作成
@@ -16,34 +53,11 @@ def main() -> None:
     output_path = Path("out/sn")
     output_path.mkdir(parents=True, exist_ok=True)
 
-    file_frames: list[pl.LazyFrame] = []
-    for path in data_path.glob("*-*.csv"):
-        # ファイル名から対象の年と月を計算
-        year, month = map(int, path.stem.split("-"))
-        file_frame = pl.scan_csv(
-            path,
-            schema={
-                "date": pl.UInt8,
-                "time": pl.Utf8,
-                "ng": pl.UInt8,
-                "nf": pl.UInt16,
-                "sg": pl.UInt8,
-                "sf": pl.UInt16,
-                "remarks": pl.Utf8,
-            },
-        )
-        # jstとutで時刻の計算方法が別
-        match sn_type.detect_time_type(year, month):
-            case sn_type.TimeType.JST:
-                file_frame = sn_jst.calc_time(file_frame)
-            case sn_type.TimeType.UT:
-                file_frame = sn_ut.calc_time(file_frame)
-            case _:
-                print(f"Err: not supported date for {year}/{month}")
-                continue
-        # 日付の計算
-        file_frame = sn_common.calc_date(file_frame, year, month)
-        file_frames.append(file_frame)
+    file_frames = [
+        file_frame
+        for path in data_path.glob("*-*.csv")
+        if (file_frame := load_file(path)) is not None
+    ]
     # 全てのファイルを一つへ結合
     all_files = pl.concat(file_frames)
 
@@ -54,7 +68,7 @@ def main() -> None:
     pprint(df.schema)
     print(df)
     print(profile)
-    df.write_parquet(output_path / "all.parquet")
+    parquet_layout.write_parquet(df, output_path / "all.parquet", ["date"])
     profile.write_csv(output_path / "profile.csv")
 
 
@@ -0,0 +1,272 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+import wolf_number
+
+# 周期の範囲の日数、約11年の周期が端とならないよう最大値は長くとる
+MIN_PERIOD = 5.0
+MAX_PERIOD = 6000.0
+
+# 観測期間で決まる周波数の分解能に対する細かさの倍率
+OVERSAMPLING = 5
+
+# 一度に計算する周波数の数、スペクトログラムでは累積和のため少なくする
+CHUNK_SIZE = 256
+SPECTROGRAM_CHUNK_SIZE = 32
+
+# スペクトログラムの窓の幅と移動量の日数
+WINDOW_DAYS = 3 * 365
+STEP_DAYS = 91
+
+
+def create_frequency_grid(
+    baseline: float,
+    min_period: float = MIN_PERIOD,
+    max_period: float = MAX_PERIOD,
+    oversampling: int = OVERSAMPLING,
+) -> npt.NDArray[np.float64]:
+    """周期の範囲から等間隔の周波数を作成する
+
+    間隔は観測期間から決まる分解能1/Tをoversampling等分した値以下とする
+
+    Args:
+        baseline (float): 観測期間の日数
+        min_period (float, optional): 周期の最小値の日数.
+            Defaults to MIN_PERIOD.
+        max_period (float, optional): 周期の最大値の日数.
+            Defaults to MAX_PERIOD.
+        oversampling (int, optional): 分解能に対する細かさの倍率.
+            Defaults to OVERSAMPLING.
+
+    Returns:
+        npt.NDArray[np.float64]: 1日あたりの周波数
+    """
+    span = (max_period - min_period) / (min_period * max_period)
+    n = int(np.ceil(oversampling * baseline * span)) + 1
+    return np.linspace(1 / max_period, 1 / min_period, n)
+
+
+def window_sum(
+    x: npt.NDArray[np.float64],
+    f: npt.NDArray[np.float64],
+    bounds: npt.NDArray[np.int64],
+) -> npt.NDArray[np.float64]:
+    """系列と三角関数の積の総和を窓ごとに算出する
+
+    窓が一つの場合は行列積、複数の場合は時刻方向の累積和の差で求める
+
+    Args:
+        x (npt.NDArray[np.float64]): 系列を行とした値
+        f (npt.NDArray[np.float64]): 周波数を行とした三角関数の値
+        bounds (npt.NDArray[np.int64]): 窓ごとの開始と終了の位置
+
+    Returns:
+        npt.NDArray[np.float64]: 系列、周波数、窓の順の総和
+    """
+    if bounds.shape[0] == 1:
+        sl = slice(bounds[0, 0], bounds[0, 1])
+        return (x[:, sl] @ f[:, sl].T)[..., None]
+    cum = np.zeros((x.shape[0], f.shape[0], x.shape[1] + 1))
+    np.cumsum(x[:, None, :] * f[None, :, :], axis=2, out=cum[..., 1:])
+    return cum[..., bounds[:, 1]] - cum[..., bounds[:, 0]]
+
+
+def lomb_scargle(
+    t: npt.NDArray[np.float64],
+    y: npt.NDArray[np.float64],
+    frequency: npt.NDArray[np.float64],
+    bounds: npt.NDArray[np.int64] | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> npt.NDArray[np.float64]:
+    """全ての系列と窓のLomb-Scargleピリオドグラムをまとめて算出する
+
+    欠損を重み0とし、窓ごとの平均を除いた総和から強度を求める。
+    時刻と周波数の三角関数は周波数を分割して作成し、メモリを抑える
+
+    Args:
+        t (npt.NDArray[np.float64]): 昇順の共通の時刻の日数
+        y (npt.NDArray[np.float64]): 系列を行とし、欠損を非数とした値
+        frequency (npt.NDArray[np.float64]): 1日あたりの周波数
+        bounds (npt.NDArray[np.int64] | None, optional):
+            窓ごとの開始と終了の位置、Noneの場合は全体. Defaults to None.
+        chunk_size (int, optional): 一度に計算する周波数の数.
+            Defaults to CHUNK_SIZE.
+
+    Returns:
+        npt.NDArray[np.float64]: 系列、周波数、窓の順の0から1の強度
+    """
+    if bounds is None:
+        bounds = np.array([[0, t.size]])
+    weight = (~np.isnan(y)).astype(np.float64)
+    wy = np.where(weight > 0, y, 0.0)
+
+    # 窓ごとの観測数、平均、平均を除いた二乗和
+    ones = np.ones((1, t.size))
+    n = window_sum(weight, ones, bounds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = window_sum(wy, ones, bounds) / n
+    yy = window_sum(wy * wy, ones, bounds) - n * mean**2
+
+    power = np.empty((y.shape[0], frequency.size, bounds.shape[0]))
+    for start in range(0, frequency.size, chunk_size):
+        omega = 2 * np.pi * frequency[start : start + chunk_size]
+        phase = np.outer(omega, t)
+        c = np.cos(phase)
+        s = np.sin(phase)
+
+        # 平均を除いた値と三角関数の積の総和
+        yc = window_sum(wy, c, bounds) - mean * window_sum(weight, c, bounds)
+        ys = window_sum(wy, s, bounds) - mean * window_sum(weight, s, bounds)
+        cc = window_sum(weight, c * c, bounds)
+        cs = window_sum(weight, c * s, bounds)
+        ss = n - cc
+
+        # 正弦と余弦の項が直交するよう時刻をずらす
+        tau = 0.5 * np.arctan2(2 * cs, cc - ss)
+        cos_tau = np.cos(tau)
+        sin_tau = np.sin(tau)
+        yc_tau = yc * cos_tau + ys * sin_tau
+        ys_tau = ys * cos_tau - yc * sin_tau
+        cc_tau = cc * cos_tau**2 + 2 * cs * cos_tau * sin_tau + ss * sin_tau**2
+        ss_tau = n - cc_tau
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            power[:, start : start + chunk_size] = (
+                yc_tau**2 / cc_tau + ys_tau**2 / ss_tau
+            ) / yy
+    return power
+
+
+def to_arrays(
+    df: pl.DataFrame,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """日付と系列ごとの値から時刻と値の配列を作成する
+
+    Args:
+        df (pl.DataFrame): 日付順の日付と系列ごとの値
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+            最初の日付からの日数と、系列を行として欠損を非数とした値
+    """
+    cols = [col for col in df.columns if col != "date"]
+    t = (
+        df.select((pl.col("date") - pl.col("date").min()).dt.total_days())
+        .to_series()
+        .to_numpy()
+        .astype(np.float64)
+    )
+    y = df.select(pl.col(cols).cast(pl.Float64).fill_null(np.nan)).to_numpy().T
+    return t, y
+
+
+def calc_periodogram(
+    df: pl.DataFrame, frequency: npt.NDArray[np.float64]
+) -> pl.DataFrame:
+    """日付以外の全ての列のピリオドグラムを算出する
+
+    Args:
+        df (pl.DataFrame): 日付順の日付と系列ごとの値
+        frequency (npt.NDArray[np.float64]): 1日あたりの周波数
+
+    Returns:
+        pl.DataFrame: 周波数、周期、系列ごとの強度
+    """
+    cols = [col for col in df.columns if col != "date"]
+    t, y = to_arrays(df)
+    power = lomb_scargle(t, y, frequency)[..., 0]
+    return pl.DataFrame(
+        {
+            "frequency": frequency,
+            "period": 1 / frequency,
+            **dict(zip(cols, power, strict=True)),
+        }
+    )
+
+
+def calc_spectrogram(
+    df: pl.DataFrame,
+    frequency: npt.NDArray[np.float64],
+    window: int = WINDOW_DAYS,
+    step: int = STEP_DAYS,
+    chunk_size: int = SPECTROGRAM_CHUNK_SIZE,
+) -> tuple[npt.NDArray[np.datetime64], dict[str, npt.NDArray[np.float64]]]:
+    """移動する窓ごとのピリオドグラムを算出する
+
+    三角関数は全期間で一度だけ作成し、窓ごとの総和は累積和の差から求める
+
+    Args:
+        df (pl.DataFrame): 日付順の日付と系列ごとの値
+        frequency (npt.NDArray[np.float64]): 1日あたりの周波数
+        window (int, optional): 窓の幅の日数. Defaults to WINDOW_DAYS.
+        step (int, optional): 窓の移動量の日数. Defaults to STEP_DAYS.
+        chunk_size (int, optional): 一度に計算する周波数の数.
+            Defaults to SPECTROGRAM_CHUNK_SIZE.
+
+    Returns:
+        tuple[
+            npt.NDArray[np.datetime64],
+            dict[str, npt.NDArray[np.float64]],
+        ]: 窓の中央の日付と、系列ごとの窓を行、周波数を列とした強度
+    """
+    cols = [col for col in df.columns if col != "date"]
+    t, y = to_arrays(df)
+    starts = np.arange(0, max(t[-1] - window, 0) + 1, step)
+    bounds = np.column_stack(
+        [
+            np.searchsorted(t, starts, side="left"),
+            np.searchsorted(t, starts + window, side="left"),
+        ]
+    )
+    power = lomb_scargle(t, y, frequency, bounds, chunk_size)
+    centers = df["date"].to_numpy()[0] + (starts + window // 2).astype(
+        "timedelta64[D]"
+    )
+    return centers, {col: power[i].T for i, col in enumerate(cols)}
+
+
+def main() -> None:
+    path_fujimori = Path("out/sn/all.parquet")
+    path_seiryo = Path("out/seiryo/sunspot/daily.parquet")
+    output_path = Path("out/sn/periodogram")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # スペクトログラムの分解能は窓の幅で決まる
+    frequency_window = create_frequency_grid(WINDOW_DAYS)
+    for name, df in [
+        ("fujimori", wolf_number.load_fujimori_daily(path_fujimori)),
+        ("seiryo", pl.read_parquet(path_seiryo)),
+    ]:
+        frequency = create_frequency_grid(
+            df.select(
+                (pl.col("date").max() - pl.col("date").min()).dt.total_days()
+            ).item()
+        )
+        start = time.perf_counter()
+        df_power = calc_periodogram(df, frequency)
+        print(
+            f"{name}: {df.height} days x {frequency.size} frequencies "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        print(df_power.sort("total", descending=True).head(5))
+        df_power.write_parquet(output_path / f"{name}.parquet")
+
+        start = time.perf_counter()
+        centers, spectrogram = calc_spectrogram(df, frequency_window)
+        print(
+            f"{name}: {centers.size} windows x "
+            f"{frequency_window.size} frequencies "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        with (output_path / f"{name}_spectrogram.npz").open("wb") as f:
+            np.savez_compressed(
+                f, date=centers, frequency=frequency_window, **spectrogram
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+import sn_common
+import sn_hemispheric
+
+# 極大と極小の前後に取る月数
+EXTREMUM_WINDOW = 36
+
+# 欠損した月を除いた平滑化の重みの合計の下限
+MIN_WEIGHT = 0.8
+
+
+def create_tapered_kernel(months: int = 13) -> npt.NDArray[np.float64]:
+    """両端の重みを半分とした移動平均の重みを作成する
+
+    13か月の場合はSIDCの標準的な平滑化と一致する
+
+    Args:
+        months (int, optional): 窓の月数. Defaults to 13.
+
+    Returns:
+        npt.NDArray[np.float64]: 重み
+    """
+    kernel = np.ones(months)
+    kernel[[0, -1]] = 0.5
+    return kernel / kernel.sum()
+
+
+def create_boxcar_kernel(months: int = 13) -> npt.NDArray[np.float64]:
+    """均等な重みの移動平均の重みを作成する
+
+    Args:
+        months (int, optional): 窓の月数. Defaults to 13.
+
+    Returns:
+        npt.NDArray[np.float64]: 重み
+    """
+    return np.full(months, 1 / months)
+
+
+def create_gaussian_kernel(
+    sigma: float = 8.0, truncate: float = 3.0
+) -> npt.NDArray[np.float64]:
+    """ガウス関数の重みを作成する
+
+    Args:
+        sigma (float, optional): 標準偏差の月数. Defaults to 8.0.
+        truncate (float, optional): 打ち切る標準偏差の倍数. Defaults to 3.0.
+
+    Returns:
+        npt.NDArray[np.float64]: 重み
+    """
+    radius = int(truncate * sigma)
+    t = np.arange(-radius, radius + 1)
+    kernel = np.exp(-(t**2) / (2 * sigma**2))
+    return kernel / kernel.sum()
+
+
+# 平滑化の名前と重み
+KERNELS = {
+    "tapered": create_tapered_kernel(),
+    "boxcar": create_boxcar_kernel(),
+    "gaussian": create_gaussian_kernel(),
+}
+
+
+def mask_inner(
+    valid: npt.NDArray[np.bool_], radius: int
+) -> npt.NDArray[np.bool_]:
+    """系列ごとの最初と最後の観測から指定の月数以上内側の月を求める
+
+    Args:
+        valid (npt.NDArray[np.bool_]): 系列を行とした観測の有無
+        radius (int): 端から除く月数
+
+    Returns:
+        npt.NDArray[np.bool_]: 内側の月の場合は真
+    """
+    n_months = valid.shape[1]
+    index = np.arange(n_months)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), n_months)
+    last = n_months - 1 - valid[:, ::-1].argmax(axis=1)
+    return (index >= (first + radius)[:, None]) & (
+        index <= (last - radius)[:, None]
+    )
+
+
+def convolve(
+    arr: npt.NDArray[np.float64],
+    kernel: npt.NDArray[np.float64],
+    min_weight: float = MIN_WEIGHT,
+) -> npt.NDArray[np.float64]:
+    """全ての系列を重みでまとめて畳み込む
+
+    欠損した月は除き、残った月の重みの合計で割り直す。
+    残った重みが下限未満の場合と、窓が系列の最初や最後の観測を超える場合は
+    非数とする
+
+    Args:
+        arr (npt.NDArray[np.float64]): 系列を行とした配列
+        kernel (npt.NDArray[np.float64]): 長さが奇数で合計が1の重み
+        min_weight (float, optional): 残った重みの合計の下限.
+            Defaults to MIN_WEIGHT.
+
+    Raises:
+        ValueError: 重みの長さが偶数の場合に送出
+
+    Returns:
+        npt.NDArray[np.float64]: 平滑化した配列
+    """
+    if kernel.size % 2 == 0:
+        msg = "kernel length must be odd"
+        raise ValueError(msg)
+    radius = kernel.size // 2
+    valid = ~np.isnan(arr)
+
+    def window_sum(x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        padded = np.pad(x, ((0, 0), (radius, radius)))
+        windows = np.lib.stride_tricks.sliding_window_view(
+            padded, kernel.size, axis=1
+        )
+        return windows @ kernel[::-1]
+
+    total = window_sum(np.where(valid, arr, 0.0))
+    weight = window_sum(valid.astype(np.float64))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(
+            mask_inner(valid, radius) & (weight >= min_weight - 1e-9),
+            total / weight,
+            np.nan,
+        )
+
+
+def smooth(df: pl.DataFrame, kernel: npt.NDArray[np.float64]) -> pl.DataFrame:
+    """日付以外の全ての列を平滑化する
+
+    Args:
+        df (pl.DataFrame): 連続した月の日付と値を持つデータ
+        kernel (npt.NDArray[np.float64]): 長さが奇数の重み
+
+    Returns:
+        pl.DataFrame: 平滑化したデータ
+    """
+    cols = [col for col in df.columns if col != "date"]
+    arr = (
+        df.select(pl.col(cols).cast(pl.Float64).fill_null(np.nan)).to_numpy().T
+    )
+    smoothed = convolve(arr, kernel)
+    return df.with_columns(
+        pl.Series(col, values).fill_nan(None)
+        for col, values in zip(cols, smoothed, strict=True)
+    )
+
+
+def detect_extrema(
+    df: pl.DataFrame, window: int = EXTREMUM_WINDOW
+) -> pl.DataFrame:
+    """平滑化した系列から活動周期の極大と極小を検出する
+
+    前後の窓の月数の範囲で最大または最小となる月を極値とする。
+    窓の途中の欠損は除いて比較し、
+    窓が系列の最初や最後の観測を超える場合は確定できないため除く
+
+    Args:
+        df (pl.DataFrame): 連続した月の日付と平滑化した値を持つデータ
+        window (int, optional): 前後に取る月数. Defaults to EXTREMUM_WINDOW.
+
+    Returns:
+        pl.DataFrame: 系列名、極大か極小か、日付、値
+    """
+    cols = [col for col in df.columns if col != "date"]
+    arr = (
+        df.select(pl.col(cols).cast(pl.Float64).fill_null(np.nan)).to_numpy().T
+    )
+    padded = np.pad(arr, ((0, 0), (window, window)), constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(
+        padded, 2 * window + 1, axis=1
+    )
+    valid = ~np.isnan(arr)
+    inner = mask_inner(valid, window) & valid
+    dates = df["date"].to_numpy()
+
+    dfl = []
+    # 欠損を無視して比較する
+    extrema: list[tuple[str, np.ufunc]] = [("max", np.fmax), ("min", np.fmin)]
+    for kind, extremum in extrema:
+        # 平坦な区間で重複しないよう、窓の中で最初の極値のみを取る
+        is_extremum = (
+            inner
+            & (arr == extremum.reduce(windows, axis=2))
+            & (np.argmax(windows == arr[..., None], axis=2) == window)
+        )
+        series, index = np.nonzero(is_extremum)
+        dfl.append(
+            pl.DataFrame(
+                {
+                    "series": np.array(cols)[series],
+                    "kind": kind,
+                    "date": dates[index],
+                    "value": arr[series, index],
+                }
+            )
+        )
+    return pl.concat(dfl).cast({"date": pl.Date}).sort("series", "date")
+
+
+def load_monthly(path_seiryo: Path, path_fujimori: Path) -> pl.DataFrame:
+    """清陵と藤森の月ごとの半球別の黒点数を一つのデータへまとめる
+
+    Args:
+        path_seiryo (Path): 清陵の月ごとの黒点数のファイルのパス
+        path_fujimori (Path): 藤森の黒点数のファイルのパス
+
+    Returns:
+        pl.DataFrame: 連続した月の日付と系列ごとの黒点数
+    """
+    cols = ["north", "south", "total"]
+    df_seiryo = pl.read_parquet(path_seiryo).select(
+        "date", pl.col(cols).name.prefix("seiryo_")
+    )
+    df_fujimori = sn_hemispheric.calc_sunspot_number(
+        pl.scan_parquet(path_fujimori)
+    ).select("date", pl.col(cols).name.prefix("fujimori_"))
+    return sn_common.fill_dates(
+        df_fujimori.join(df_seiryo, on="date", how="full", coalesce=True),
+        "1mo",
+    )
+
+
+def main() -> None:
+    path_seiryo = Path("out/seiryo/sunspot/monthly.parquet")
+    path_fujimori = Path("out/sn/all.parquet")
+    output_path = Path("out/sn/smoothed")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    df = load_monthly(path_seiryo, path_fujimori)
+
+    for name, kernel in KERNELS.items():
+        start = time.perf_counter()
+        df_smoothed = smooth(df, kernel)
+        df_extrema = detect_extrema(df_smoothed)
+        print(f"{name}: {time.perf_counter() - start:.3f}s")
+        print(df_extrema.filter(pl.col("series").str.ends_with("total")))
+
+        df_smoothed.write_parquet(output_path / f"monthly_{name}.parquet")
+        df_extrema.write_parquet(output_path / f"extrema_{name}.parquet")
+
+    df.write_parquet(output_path / "monthly.parquet")
+
+
+if __name__ == "__main__":
+    main()
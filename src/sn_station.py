@@ -0,0 +1,504 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from zipfile import ZipFile
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+# ブートストラップで一つのプロセスが一度に計算する回数
+BOOTSTRAP_CHUNK_SIZE = 10
+
+# 観測所の行列を保存するファイル名
+MATRIX_VALUES = "ns.f32"
+MATRIX_DATES = "date.npy"
+MATRIX_NAMES = "station_names.txt"
+
+# 観測所の組の統計量を一度に集計する日数
+PAIR_BLOCK_SIZE = 4096
+
+# 組の統計量を算出する重複日数の下限
+MIN_OVERLAP = 10
+
+# ブートストラップのプロセスごとに初期化時に受け取る行列
+_bootstrap_data: dict[str, npt.NDArray[np.float64]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class StationMatrix:
+    """観測所ごとの黒点数を日付で揃えた行列
+
+    黒点数は観測所ごとに連続したfloat32のメモリマップとする
+    """
+
+    names: list[str]
+    date_index: npt.NDArray[np.int64]
+    values: npt.NDArray[np.float32]
+
+
+@dataclass(frozen=True, slots=True)
+class PairwiseStats:
+    """全ての観測所の組の比較結果
+
+    行列の[i, j]は観測所jを基準とした観測所iの値とする
+    """
+
+    names: list[str]
+    overlap: npt.NDArray[np.int64]
+    k_factor: npt.NDArray[np.float64]
+    corr: npt.NDArray[np.float64]
+
+
+def to_date_index(fr_year: npt.NDArray[np.float64]) -> npt.NDArray[np.int64]:
+    """小数の年を1970年1月1日からの日数へ変換する
+
+    Args:
+        fr_year (npt.NDArray[np.float64]): 小数の年
+
+    Returns:
+        npt.NDArray[np.int64]: 1970年1月1日からの日数
+    """
+    year = np.floor(fr_year).astype(np.int64)
+    start = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+    end = (year - 1969).astype("datetime64[Y]").astype("datetime64[D]")
+    # 年の経過日数を年の長さから算出し、最も近い日へ丸める
+    elapsed = np.floor(
+        (fr_year - year) * (end - start).astype(np.float64) + 0.5
+    )
+    return start.astype(np.int64) + elapsed.astype(np.int64)
+
+
+def load_station_zip(
+    path: Path,
+) -> tuple[list[str], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """他の観測所のデータをzipファイルから読み込む
+
+    Args:
+        path (Path): zipファイルのパス
+
+    Returns:
+        tuple[list[str], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+            観測所名、日付のインデックス、黒点数の行列
+    """
+    with ZipFile(path) as zf:
+        with zf.open("station_names.txt") as f:
+            names = [line.decode().strip() for line in f if line.strip()]
+        with zf.open("fr_year.txt") as f:
+            fr_year = np.loadtxt(f, dtype=np.float64)
+        with zf.open("Ns.txt") as f:
+            ns = np.loadtxt(f, delimiter=",", dtype=np.float64)
+    return names, to_date_index(fr_year), ns
+
+
+def save_station_cache(
+    path: Path,
+    names: list[str],
+    date_index: npt.NDArray[np.int64],
+    ns: npt.NDArray[np.float64],
+) -> None:
+    """観測所のデータをキャッシュとして保存する
+
+    Args:
+        path (Path): キャッシュのパス
+        names (list[str]): 観測所名
+        date_index (npt.NDArray[np.int64]): 日付のインデックス
+        ns (npt.NDArray[np.float64]): 黒点数の行列
+    """
+    with path.open("wb") as f:
+        np.savez(f, names=np.array(names), date=date_index, ns=ns)
+
+
+def load_station_cache(
+    path: Path,
+) -> tuple[list[str], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """キャッシュから観測所のデータを読み込む
+
+    Args:
+        path (Path): キャッシュのパス
+
+    Returns:
+        tuple[list[str], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+            観測所名、日付のインデックス、黒点数の行列
+    """
+    with np.load(path) as f:
+        return f["names"].tolist(), f["date"], f["ns"]
+
+
+def load_station_data(
+    path_zip: Path, path_cache: Path
+) -> tuple[list[str], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """観測所のデータを読み込む
+
+    キャッシュがzipファイルより新しければキャッシュを用い、
+    そうでなければzipファイルから読み込みキャッシュを作成する
+
+    Args:
+        path_zip (Path): zipファイルのパス
+        path_cache (Path): キャッシュのパス
+
+    Returns:
+        tuple[list[str], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+            観測所名、日付のインデックス、黒点数の行列
+    """
+    if (
+        path_cache.exists()
+        and path_cache.stat().st_mtime >= path_zip.stat().st_mtime
+    ):
+        return load_station_cache(path_cache)
+    names, date_index, ns = load_station_zip(path_zip)
+    save_station_cache(path_cache, names, date_index, ns)
+    return names, date_index, ns
+
+
+def merge_station(
+    ns: npt.NDArray[np.float64],
+    date_index: npt.NDArray[np.int64],
+    dates: npt.NDArray[np.int64],
+    values: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+    """観測所の行列へ新たな観測者の列を日付で揃えて追加する
+
+    行列の行も日付を行番号として配置し直すため、
+    日付のインデックスに抜けがあっても揃えられる。
+    新たな観測者のデータが行列の期間より長い場合は欠損値で延長する
+
+    Args:
+        ns (npt.NDArray[np.float64]): 黒点数の行列
+        date_index (npt.NDArray[np.int64]): 行列の行ごとの日付
+        dates (npt.NDArray[np.int64]): 追加する観測者の日付
+        values (npt.NDArray[np.float64]): 追加する観測者の黒点数
+
+    Raises:
+        ValueError: 行数と日付の数が異なるか、日付が重複する場合
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+            追加後の黒点数の行列と日ごとに連続した日付のインデックス
+    """
+    if ns.shape[0] != date_index.size or dates.size != values.size:
+        msg = "number of rows and dates must match"
+        raise ValueError(msg)
+    if (
+        np.unique(date_index).size != date_index.size
+        or np.unique(dates).size != dates.size
+    ):
+        msg = "dates must be unique"
+        raise ValueError(msg)
+
+    start = int(date_index.min())
+    end = max(int(date_index.max()), int(dates.max()))
+    merged_index = np.arange(start, end + 1, dtype=np.int64)
+
+    merged = np.full((merged_index.size, ns.shape[1] + 1), np.nan)
+    merged[date_index - start, :-1] = ns
+
+    # 行列の期間内にあるデータのみ、日付を行番号として代入
+    in_range = dates >= start
+    merged[dates[in_range] - start, -1] = values[in_range]
+    return merged, merged_index
+
+
+def calc_iqr(x: npt.NDArray[np.float64], axis: int = 0) -> npt.NDArray:
+    """欠損値を除いた四分位範囲を算出する
+
+    Args:
+        x (npt.NDArray[np.float64]): データ
+        axis (int, optional): 算出する軸. Defaults to 0.
+
+    Returns:
+        npt.NDArray: 四分位範囲
+    """
+    q75, q25 = np.nanpercentile(x, [75, 25], axis=axis)
+    return q75 - q25
+
+
+def bootstrap_iqr_chunk(
+    x: npt.NDArray[np.float64], n_resamples: int, seed: np.random.SeedSequence
+) -> npt.NDArray[np.float64]:
+    """行を復元抽出し、観測所ごとの四分位範囲をまとめて算出する
+
+    Args:
+        x (npt.NDArray[np.float64]): 行が時刻、列が観測所の行列
+        n_resamples (int): リサンプリングの回数
+        seed (np.random.SeedSequence): 乱数のシード
+
+    Returns:
+        npt.NDArray[np.float64]: 行がリサンプリング、列が観測所の四分位範囲
+    """
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, x.shape[0], size=(n_resamples, x.shape[0]))
+    return calc_iqr(x[index], axis=1)
+
+
+def init_bootstrap_worker(x: npt.NDArray[np.float64]) -> None:
+    """プロセスの初期化時に行列を一度だけ受け取る
+
+    Args:
+        x (npt.NDArray[np.float64]): 行が時刻、列が観測所の行列
+    """
+    _bootstrap_data["x"] = x
+
+
+def bootstrap_iqr_worker(
+    n_resamples: int, seed: np.random.SeedSequence
+) -> npt.NDArray[np.float64]:
+    """初期化時に受け取った行列でブートストラップを計算する
+
+    Args:
+        n_resamples (int): リサンプリングの回数
+        seed (np.random.SeedSequence): 乱数のシード
+
+    Returns:
+        npt.NDArray[np.float64]: 行がリサンプリング、列が観測所の四分位範囲
+    """
+    return bootstrap_iqr_chunk(_bootstrap_data["x"], n_resamples, seed)
+
+
+def bootstrap_iqr(
+    x: npt.NDArray[np.float64],
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+    max_workers: int | None = None,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """観測所ごとの四分位範囲のブートストラップ信頼区間を算出する
+
+    リサンプリングを分割し、プロセスプールで並列に計算する。
+    行列はプロセスの初期化時に一度だけ渡し、
+    分割ごとには回数とシードのみを渡す
+
+    Args:
+        x (npt.NDArray[np.float64]): 行が時刻、列が観測所の行列
+        n_resamples (int, optional): リサンプリングの回数. Defaults to 1000.
+        confidence (float, optional): 信頼水準. Defaults to 0.95.
+        seed (int, optional): 乱数のシード. Defaults to 0.
+        max_workers (int | None, optional): プロセス数. Defaults to None.
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+            信頼区間の下限と上限
+    """
+    sizes = [
+        min(BOOTSTRAP_CHUNK_SIZE, n_resamples - i)
+        for i in range(0, n_resamples, BOOTSTRAP_CHUNK_SIZE)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_bootstrap_worker,
+        initargs=(x,),
+    ) as executor:
+        iqr = np.vstack(list(executor.map(bootstrap_iqr_worker, sizes, seeds)))
+    alpha = (1 - confidence) / 2
+    lower, upper = np.nanquantile(iqr, [alpha, 1 - alpha], axis=0)
+    return lower, upper
+
+
+def open_matrix(path: Path, *, writable: bool = False) -> StationMatrix:
+    """保存した観測所の行列をメモリマップとして開く
+
+    フォルダが無ければ観測所も日付も無い行列とする
+
+    Args:
+        path (Path): 行列を保存したフォルダのパス
+        writable (bool, optional): 書き込み可能とするかどうか.
+            Defaults to False.
+
+    Returns:
+        StationMatrix: 観測所の行列
+    """
+    if not (path / MATRIX_DATES).exists():
+        return StationMatrix(
+            [], np.empty(0, np.int64), np.empty((0, 0), np.float32)
+        )
+    date_index = np.load(path / MATRIX_DATES)
+    names = (path / MATRIX_NAMES).read_text().splitlines()
+    shape = (len(names), date_index.size)
+    if not names or date_index.size == 0:
+        return StationMatrix(names, date_index, np.empty(shape, np.float32))
+    values = np.memmap(
+        path / MATRIX_VALUES,
+        dtype=np.float32,
+        mode="r+" if writable else "r",
+        shape=shape,
+    )
+    return StationMatrix(names, date_index, values)
+
+
+def extend_dates(
+    path: Path, matrix: StationMatrix, dates: npt.NDArray[np.int64]
+) -> StationMatrix:
+    """行列の日付へ新たな日付を加え、既存の観測所の行を並べ直す
+
+    Args:
+        path (Path): 行列を保存したフォルダのパス
+        matrix (StationMatrix): 観測所の行列
+        dates (npt.NDArray[np.int64]): 加える日付
+
+    Returns:
+        StationMatrix: 日付を加えた観測所の行列
+    """
+    date_index = np.union1d(matrix.date_index, dates)
+    if date_index.size == matrix.date_index.size:
+        return matrix
+
+    path.mkdir(parents=True, exist_ok=True)
+    if matrix.names:
+        positions = np.searchsorted(date_index, matrix.date_index)
+        path_tmp = path / f"{MATRIX_VALUES}.tmp"
+        with path_tmp.open("wb") as f:
+            # 観測所ごとに新しい日付の位置へ並べ直して書き出す
+            for row in matrix.values:
+                extended = np.full(date_index.size, np.nan, np.float32)
+                extended[positions] = row
+                f.write(extended.tobytes())
+        path_tmp.replace(path / MATRIX_VALUES)
+    np.save(path / MATRIX_DATES, date_index)
+    (path / MATRIX_NAMES).write_text("".join(f"{n}\n" for n in matrix.names))
+    return open_matrix(path)
+
+
+def register_stations(
+    path: Path,
+    names: list[str],
+    dates: npt.NDArray[np.int64],
+    values: npt.NDArray[np.float64],
+) -> StationMatrix:
+    """観測所の行列へ観測所を登録する
+
+    登録済みの観測所は値を置き換え、新たな観測所は行列の末尾へ追加する。
+    行列に無い日付があれば、全ての観測所の日付を揃えて延長する
+
+    Args:
+        path (Path): 行列を保存したフォルダのパス
+        names (list[str]): 登録する観測所名
+        dates (npt.NDArray[np.int64]): 重複の無い日付のインデックス
+        values (npt.NDArray[np.float64]): 行が日付、列が観測所の黒点数
+
+    Returns:
+        StationMatrix: 登録後の観測所の行列
+    """
+    matrix = extend_dates(path, open_matrix(path), dates)
+    positions = np.searchsorted(matrix.date_index, dates)
+    rows = np.full((len(names), matrix.date_index.size), np.nan, np.float32)
+    rows[:, positions] = values.T
+
+    # 登録済みの観測所はメモリマップへ直接書き込む
+    exists = [name in matrix.names for name in names]
+    if any(exists):
+        matrix = open_matrix(path, writable=True)
+        index = [
+            matrix.names.index(n)
+            for n, e in zip(names, exists, strict=True)
+            if e
+        ]
+        matrix.values[index] = rows[np.array(exists)]
+        matrix.values.flush()  # type: ignore[attr-defined]
+
+    # 新たな観測所はファイルの末尾へ追加する
+    new_names = [n for n, e in zip(names, exists, strict=True) if not e]
+    if new_names:
+        with (path / MATRIX_VALUES).open("ab") as f:
+            f.write(rows[~np.array(exists)].tobytes())
+        (path / MATRIX_NAMES).write_text(
+            "".join(f"{n}\n" for n in [*matrix.names, *new_names])
+        )
+    return open_matrix(path)
+
+
+def accumulate_pair_sums(
+    values: npt.NDArray[np.float32], block_size: int = PAIR_BLOCK_SIZE
+) -> tuple[
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+]:
+    """全ての観測所の組について、共に観測した日の和をまとめて集計する
+
+    日付を区切って読み込み、欠損値を0とした行列と観測の有無の行列の積から
+    全ての組の和を求める
+
+    Args:
+        values (npt.NDArray[np.float32]): 行が観測所、列が日付の黒点数
+        block_size (int, optional): 一度に集計する日数.
+            Defaults to PAIR_BLOCK_SIZE.
+
+    Returns:
+        tuple[npt.NDArray[np.float64], ...]: 重複日数、積の和、
+            観測所iの値の和、観測所iの値の二乗の和。
+            行列の[i, j]は観測所iと観測所jが共に観測した日の和とする
+    """
+    n_stations = values.shape[0]
+    n = np.zeros((n_stations, n_stations))
+    sxy = np.zeros((n_stations, n_stations))
+    sx = np.zeros((n_stations, n_stations))
+    sxx = np.zeros((n_stations, n_stations))
+    for start in range(0, values.shape[1], block_size):
+        block = np.asarray(values[:, start : start + block_size], np.float64)
+        mask = ~np.isnan(block)
+        x = np.where(mask, block, 0.0)
+        m = mask.astype(np.float64)
+        n += m @ m.T
+        sxy += x @ x.T
+        sx += x @ m.T
+        sxx += (x * x) @ m.T
+    return n, sxy, sx, sxx
+
+
+def calc_pairwise(
+    matrix: StationMatrix,
+    block_size: int = PAIR_BLOCK_SIZE,
+    min_overlap: int = MIN_OVERLAP,
+) -> PairwiseStats:
+    """全ての観測所の組のk係数、相関係数、重複日数を算出する
+
+    k係数は原点を通る直線の最小二乗法による傾きとし、
+    観測所jの値にk係数を掛けると観測所iの値となる
+
+    Args:
+        matrix (StationMatrix): 観測所の行列
+        block_size (int, optional): 一度に集計する日数.
+            Defaults to PAIR_BLOCK_SIZE.
+        min_overlap (int, optional): 算出する重複日数の下限.
+            Defaults to MIN_OVERLAP.
+
+    Returns:
+        PairwiseStats: 全ての観測所の組の比較結果
+    """
+    n, sxy, sx, sxx = accumulate_pair_sums(matrix.values, block_size)
+    sy, syy = sx.T, sxx.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k_factor = sxy / syy
+        corr = (n * sxy - sx * sy) / np.sqrt(
+            (n * sxx - sx**2) * (n * syy - sy**2)
+        )
+    invalid = n < min_overlap
+    k_factor[invalid | ~np.isfinite(k_factor)] = np.nan
+    corr[invalid | ~np.isfinite(corr)] = np.nan
+    return PairwiseStats(
+        matrix.names, n.astype(np.int64), k_factor, np.clip(corr, -1, 1)
+    )
+
+
+def pairwise_to_frame(stats: PairwiseStats) -> pl.DataFrame:
+    """観測所の組の比較結果を異なる観測所の組ごとの行へ変換する
+
+    Args:
+        stats (PairwiseStats): 全ての観測所の組の比較結果
+
+    Returns:
+        pl.DataFrame: 観測所、基準の観測所、重複日数、k係数、相関係数
+    """
+    i, j = np.nonzero(~np.eye(len(stats.names), dtype=np.bool_))
+    names = pl.Series(stats.names, dtype=pl.String)
+    return pl.DataFrame(
+        {
+            "station": names.gather(i),
+            "reference": names.gather(j),
+            "n": pl.Series(stats.overlap[i, j], dtype=pl.UInt32),
+            "k": pl.Series(stats.k_factor[i, j]).fill_nan(None),
+            "r": pl.Series(stats.corr[i, j]).fill_nan(None),
+        }
+    )
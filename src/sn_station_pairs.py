@@ -0,0 +1,124 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+import silso
+import sn_station
+import sn_sunspot_number
+import wolf_number
+
+
+def register_frame(
+    path: Path, df: pl.DataFrame, names: dict[str, str]
+) -> sn_station.StationMatrix:
+    """日付ごとの黒点数の列を観測所として行列へ登録する
+
+    同じ日付の観測が複数あれば平均値とする
+
+    Args:
+        path (Path): 行列を保存したフォルダのパス
+        df (pl.DataFrame): 日付と黒点数
+        names (dict[str, str]): 列名と登録する観測所名
+
+    Returns:
+        sn_station.StationMatrix: 登録後の観測所の行列
+    """
+    df_mean = (
+        df.select("date", *names)
+        .group_by("date")
+        .agg(pl.col(names).cast(pl.Float64).mean())
+        .sort("date")
+    )
+    return sn_station.register_stations(
+        path,
+        list(names.values()),
+        df_mean["date"].to_numpy().astype("datetime64[D]").astype(np.int64),
+        df_mean.select(names).to_numpy(),
+    )
+
+
+def load_fujimori_spots(path: Path) -> pl.DataFrame:
+    """藤森の観測ごとの黒点の個数を読み込む
+
+    Args:
+        path (Path): 藤森の黒点数のファイルのパス
+
+    Returns:
+        pl.DataFrame: 日付と黒点の個数
+    """
+    return (
+        pl.scan_parquet(path)
+        .drop_nulls(["nf", "sf"])
+        .select("date", (pl.col("nf") + pl.col("sf")).alias("spots"))
+        .collect()
+    )
+
+
+def main() -> None:
+    path_uncertainty = Path("data/uncertainty/data_21_1947.zip")
+    path_fujimori = Path("out/sn/all.parquet")
+    path_seiryo = Path("out/seiryo/sunspot")
+    path_silso = Path("data/SN_m_tot_V2.0.txt")
+    path_cache = Path("out/silso")
+    output_path = Path("out/sn/station")
+
+    # 他の観測所と同じ黒点の個数の行列
+    path_spots = output_path / "spots"
+    if path_uncertainty.exists():
+        names, date_index, ns = sn_station.load_station_data(
+            path_uncertainty, Path("out/sn/uncertainty.npz")
+        )
+        sn_station.register_stations(path_spots, names, date_index, ns)
+    register_frame(
+        path_spots, load_fujimori_spots(path_fujimori), {"spots": "Fujimori"}
+    )
+
+    # 日ごとの黒点数の行列
+    path_daily = output_path / "daily"
+    register_frame(
+        path_daily,
+        wolf_number.load_fujimori(path_fujimori),
+        {"total": "Fujimori"},
+    )
+    register_frame(
+        path_daily,
+        pl.read_parquet(path_seiryo / "daily.parquet"),
+        {"total": "Seiryo"},
+    )
+
+    # 月ごとの黒点数の行列
+    path_monthly = output_path / "monthly"
+    register_frame(
+        path_monthly,
+        sn_sunspot_number.calc_sunspot_number(pl.scan_parquet(path_fujimori)),
+        {"total": "Fujimori"},
+    )
+    register_frame(
+        path_monthly,
+        pl.read_parquet(path_seiryo / "monthly.parquet"),
+        {"total": "Seiryo"},
+    )
+    register_frame(
+        path_monthly,
+        silso.load_silso_data_cached(path_silso, path_cache),
+        {"total": "SILSO"},
+    )
+
+    for path in path_spots, path_daily, path_monthly:
+        matrix = sn_station.open_matrix(path)
+        start = time.perf_counter()
+        stats = sn_station.calc_pairwise(matrix)
+        print(
+            f"{path.name}: {len(matrix.names)} stations x "
+            f"{matrix.date_index.size} dates "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        df_pairs = sn_station.pairwise_to_frame(stats)
+        print(df_pairs)
+        df_pairs.write_parquet(output_path / f"{path.name}_pairs.parquet")
+
+
+if __name__ == "__main__":
+    main()
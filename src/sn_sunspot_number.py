@@ -8,24 +8,10 @@ from matplotlib.figure import Figure
 from scipy import optimize
 from sklearn import metrics
 
-
-def load_silso_data(path: Path) -> pl.DataFrame:
-    with path.open() as f:
-        data = [i.split() for i in f.read().split("\n") if i]
-    return (
-        pl.LazyFrame(
-            {
-                "year": [int(i[0]) for i in data],
-                "month": [int(i[1]) for i in data],
-                "total": [float(i[3]) for i in data],
-            }
-        )
-        .with_columns(
-            pl.date(pl.col("year"), pl.col("month"), 1).alias("date")
-        )
-        .drop("year", "month")
-        .collect()
-    )
+import parquet_layout
+import silso
+import sn_bootstrap
+import wolf_number
 
 
 def calc_sunspot_number(df: pl.LazyFrame) -> pl.DataFrame:
@@ -102,6 +88,17 @@ def draw_sunspot_number_whole_disk(df: pl.DataFrame) -> Figure:
 
     ax.plot(df["date"], df["fujimori"], lw=1, label="fujimori")
     ax.plot(df["date"], df["silso"], lw=1, label="SILSO")
+    if "fujimori_se" in df.columns:
+        # 月平均値の標準誤差を誤差棒として描画
+        ax.errorbar(
+            df["date"],
+            df["fujimori"],
+            yerr=df["fujimori_se"].fill_null(0),
+            fmt="none",
+            ecolor="C0",
+            elinewidth=0.5,
+            capsize=0,
+        )
 
     ax.set_title("fujimori's sunspot number", y=1.1)
     ax.set_xlabel("year")
@@ -316,18 +313,35 @@ def draw_ratio_and_diff_plotly(df: pl.DataFrame) -> go.Figure:
 def main_matplotlib() -> None:
     path_fujimori = Path("out/sn/all.parquet")
     path_silso = Path("data/SN_m_tot_V2.0.txt")
+    path_cache = Path("out/silso")
     output_path = Path("out/sn")
 
     df_fujimori = calc_sunspot_number(pl.scan_parquet(path_fujimori))
     print(df_fujimori)
 
-    df_silso = load_silso_data(path_silso)
+    df_errors = sn_bootstrap.calc_monthly_errors(
+        wolf_number.load_fujimori(path_fujimori)
+    )
+    parquet_layout.write_parquet(
+        df_fujimori.join(df_errors, on="date", how="left", coalesce=True),
+        output_path / "monthly.parquet",
+        ["date"],
+    )
+
+    df_silso = silso.load_silso_data_cached(path_silso, path_cache)
     print(df_silso)
 
     df_joined = join_data(df_fujimori, df_silso)
     print(df_joined)
 
-    fig1 = draw_sunspot_number_whole_disk(df_joined)
+    fig1 = draw_sunspot_number_whole_disk(
+        df_joined.join(
+            df_errors.select("date", pl.col("total_se").alias("fujimori_se")),
+            on="date",
+            how="left",
+            coalesce=True,
+        )
+    )
 
     for ext in "pdf", "png":
         fig1.savefig(
@@ -372,12 +386,13 @@ def main_matplotlib() -> None:
 def main_plotly() -> None:
     path_fujimori = Path("out/sn/all.parquet")
     path_silso = Path("data/SN_m_tot_V2.0.txt")
+    path_cache = Path("out/silso")
     output_path = Path("out/sn")
 
     df_fujimori = calc_sunspot_number(pl.scan_parquet(path_fujimori))
     print(df_fujimori)
 
-    df_silso = load_silso_data(path_silso)
+    df_silso = silso.load_silso_data_cached(path_silso, path_cache)
     print(df_silso)
 
     df_joined = join_data(df_fujimori, df_silso)
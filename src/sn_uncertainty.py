@@ -1,24 +1,13 @@
-from datetime import date
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from zipfile import ZipFile
 
 import matplotlib.pyplot as plt
 import numpy as np
+import numpy.typing as npt
 import polars as pl
-from dateutil.relativedelta import relativedelta
 from uncertainty import errors as err
 
-
-def to_year_fraction(dt: date) -> float:
-    start_of_this_year = date(year=dt.year, month=1, day=1)
-    start_of_next_year = start_of_this_year + relativedelta(years=1)
-
-    year_elapsed = (dt - start_of_this_year).days
-    year_duration = (start_of_next_year - start_of_this_year).days
-
-    fraction = year_elapsed / year_duration
-
-    return dt.year + fraction
+import sn_station
 
 
 def calc_sunspot_number(df: pl.LazyFrame) -> pl.DataFrame:
@@ -39,59 +28,57 @@ def calc_sunspot_number(df: pl.LazyFrame) -> pl.DataFrame:
     )
 
 
+def calc_errors(
+    ns: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    # short-term error and long-term error are computed in parallel
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        future_e1 = executor.submit(
+            err.short_term_error, ns, period_rescaling=8
+        )
+        future_mu2 = executor.submit(
+            err.long_term_error, ns, period_rescaling=8
+        )
+        return future_e1.result(), future_mu2.result()
+
+
 def main() -> None:
     path_uncertainty = Path("data/uncertainty/data_21_1947.zip")
     path_fujimori = Path("out/sn/all.parquet")
+    path_cache = Path("out/sn/uncertainty.npz")
     output_path = Path("out/sn")
 
     # open other observer's data
-    with ZipFile(path_uncertainty) as zf:
-        with zf.open("station_names.txt") as f:
-            station_names = [
-                line.decode().removesuffix("\r\n") for line in f.readlines()
-            ]
-            station_names.append("Fujimori")
-        with zf.open("fr_year.txt") as f:
-            time = np.loadtxt(f.readlines())
-        with zf.open("Ns.txt") as f:
-            ns = np.loadtxt(f.readlines(), delimiter=",")
+    # the matrix is cached as binary on the first run
+    station_names, date_index, ns = sn_station.load_station_data(
+        path_uncertainty, path_cache
+    )
+    station_names.append("Fujimori")
 
     # open fujimori's data
     df = calc_sunspot_number(pl.scan_parquet(path_fujimori))
     print(df)
 
-    # calc the starting year of fujimori's data in fr_year
-    start_fy = to_year_fraction(df.item(0, "date"))
-    start = np.where(time == start_fy)[0][0]
-
+    # merge fujimori data with other observatories' data by date
     # if fujimori's data is longer than other observers
-    # extend other observer's data with null
-    if start + df.height - ns.shape[0] > 0:
-        ns = np.vstack(
-            [
-                ns,
-                np.full(
-                    (start + df.height - ns.shape[0], ns.shape[1]), np.nan
-                ),
-            ]
-        )
-
-    # merge fujimori data with other observatories' data
-    ns_repl = np.full(ns.shape[0], np.nan)
-    ns_repl[start : start + len(df["date"])] = np.array(df["ns"])
-    ns = np.append(ns, ns_repl.reshape(-1, 1), axis=1)
+    # other observer's data is extended with null
+    ns, date_index = sn_station.merge_station(
+        ns,
+        date_index,
+        df["date"].to_numpy().astype("datetime64[D]").astype(np.int64),
+        df["ns"].cast(pl.Float64).to_numpy(),
+    )
     print(ns)
 
-    # short-term error (epsilon tilde)
-    e1 = err.short_term_error(ns, period_rescaling=8)
-    q75, q25 = np.nanpercentile(e1, [75, 25], axis=0)
-    iqr_eps = q75 - q25
+    # short-term error (epsilon tilde) and long-term error (mu2)
+    e1, mu2 = calc_errors(ns)
+
+    iqr_eps = sn_station.calc_iqr(e1)
+    iqr_eps_lower, iqr_eps_upper = sn_station.bootstrap_iqr(e1)
     print(iqr_eps)
 
-    # long-term error (mu2)
-    mu2 = err.long_term_error(ns, period_rescaling=8)
-    q75, q25 = np.nanpercentile(mu2, [75, 25], axis=0)
-    iqr_mu2 = q75 - q25
+    iqr_mu2 = sn_station.calc_iqr(mu2)
+    iqr_mu2_lower, iqr_mu2_upper = sn_station.bootstrap_iqr(mu2)
     print(iqr_mu2)
 
     colors = ["black"] * 21 + ["red"]
@@ -99,7 +86,17 @@ def main() -> None:
     fig = plt.figure(figsize=(8, 5))
     ax = fig.add_subplot(111)
 
-    ax.scatter(iqr_eps, iqr_mu2, c=colors)
+    ax.errorbar(
+        iqr_eps,
+        iqr_mu2,
+        xerr=[iqr_eps - iqr_eps_lower, iqr_eps_upper - iqr_eps],
+        yerr=[iqr_mu2 - iqr_mu2_lower, iqr_mu2_upper - iqr_mu2],
+        fmt="none",
+        ecolor="gray",
+        elinewidth=0.5,
+        zorder=1,
+    )
+    ax.scatter(iqr_eps, iqr_mu2, c=colors, zorder=2)
 
     ax.set_title("short-term and long-term error")
     ax.set_xlabel(r"IQR($\hat \widetilde{\epsilon}$)")
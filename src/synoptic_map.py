@@ -0,0 +1,245 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+import ephemeris
+import seiryo_crossmatch
+
+# 緯度の範囲
+LAT_MIN = -50
+LAT_MAX = 50
+
+# カリントン経度の区切りの数
+LON_BINS = 360
+
+
+def prepare_seiryo(df: pl.LazyFrame) -> pl.LazyFrame:
+    """黒点群データを観測日ごとの緯度とカリントン経度の範囲へ変換する
+
+    Args:
+        df (pl.LazyFrame): 黒点群データ
+
+    Returns:
+        pl.LazyFrame: 日付、緯度の範囲、カリントン経度の始点と幅
+    """
+    return seiryo_crossmatch.prepare_seiryo(df).select(
+        "date", "lat_min", "lat_max", "lon_start", "lon_width"
+    )
+
+
+def prepare_ar(df: pl.LazyFrame) -> pl.LazyFrame:
+    """活動領域のデータを観測期間の中央の日付の緯度と経度の範囲へ変換する
+
+    Args:
+        df (pl.LazyFrame): 活動領域のデータ
+
+    Returns:
+        pl.LazyFrame: 日付、緯度の範囲、カリントン経度の始点と幅
+    """
+    return seiryo_crossmatch.convert_ar_coords(df).select(
+        (pl.col("first") + (pl.col("last") - pl.col("first")) / 2)
+        .cast(pl.Date)
+        .alias("date"),
+        pl.col("ar_lat_min").alias("lat_min"),
+        pl.col("ar_lat_max").alias("lat_max"),
+        pl.col("ar_lon_start").alias("lon_start"),
+        pl.col("ar_lon_width").alias("lon_width"),
+    )
+
+
+def with_rotation(df: pl.LazyFrame) -> pl.LazyFrame:
+    """中央子午線を通過するカリントン自転番号を付与する
+
+    自転番号の小数部は中央子午線の経度が360度から減少した割合であるため、
+    範囲の中央の経度が中央子午線に最も近くなる自転を選ぶ
+
+    Args:
+        df (pl.LazyFrame): 日付とカリントン経度の範囲を持つデータ
+
+    Returns:
+        pl.LazyFrame: カリントン自転番号を付与したデータ
+    """
+    cr = pl.col("date").map_batches(
+        lambda s: pl.Series(
+            ephemeris.calc_carrington_rotation(s.to_numpy())
+        ).fill_nan(None),
+        return_dtype=pl.Float64,
+    )
+    center = (pl.col("lon_start") + pl.col("lon_width") / 2) % 360
+    return df.with_columns(
+        (cr - 1 + center / 360).round().cast(pl.Int32).alias("rotation")
+    ).drop_nulls("rotation")
+
+
+def rasterize(
+    df: pl.LazyFrame, lat_min: int = LAT_MIN, lat_max: int = LAT_MAX
+) -> pl.LazyFrame:
+    """緯度と経度の範囲を1度ごとのセルへ展開する
+
+    Args:
+        df (pl.LazyFrame): 自転番号と緯度と経度の範囲を持つデータ
+        lat_min (int, optional): 緯度の最小値. Defaults to LAT_MIN.
+        lat_max (int, optional): 緯度の最大値. Defaults to LAT_MAX.
+
+    Returns:
+        pl.LazyFrame: 自転番号、緯度と経度のインデックス
+    """
+    lat_start = pl.col("lat_min").floor().clip(lat_min, lat_max)
+    lat_end = pl.col("lat_max").ceil().clip(lat_min, lat_max)
+    lon_end = pl.col("lon_start") + pl.col("lon_width")
+    return (
+        df.filter(
+            (pl.col("lat_max") >= lat_min) & (pl.col("lat_min") <= lat_max)
+        )
+        .select(
+            "rotation",
+            # 北を上とするため、緯度の大きい方から行を並べる
+            pl.int_ranges(
+                (lat_max - lat_end).cast(pl.Int64),
+                (lat_max - lat_start).cast(pl.Int64) + 1,
+            ).alias("lat_index"),
+            pl.int_ranges(
+                pl.col("lon_start").floor().cast(pl.Int64),
+                lon_end.floor().cast(pl.Int64) + 1,
+            ).alias("lon_index"),
+        )
+        .explode("lat_index")
+        .explode("lon_index")
+        # 0度を跨ぐ範囲を一周に収める
+        .with_columns(pl.col("lon_index") % LON_BINS)
+    )
+
+
+def calc_rotation_index(df: pl.DataFrame) -> npt.NDArray[np.int32]:
+    """データに含まれる最初から最後までの自転番号を作成する
+
+    Args:
+        df (pl.DataFrame): 自転番号を持つデータ
+
+    Returns:
+        npt.NDArray[np.int32]: 連続した自転番号
+    """
+    if df.height == 0:
+        return np.array([], dtype=np.int32)
+    rotation = df["rotation"].to_numpy()
+    return np.arange(rotation.min(), rotation.max() + 1, dtype=np.int32)
+
+
+def accumulate(
+    df: pl.DataFrame,
+    rotation_index: npt.NDArray[np.int32],
+    out: npt.NDArray[np.float32],
+) -> None:
+    """セルごとの出現回数を自転、緯度、経度の立方体へ書き込む
+
+    全てのセルを一次元のインデックスへ変換し、まとめて数え上げる
+
+    Args:
+        df (pl.DataFrame): 自転番号、緯度と経度のインデックス
+        rotation_index (npt.NDArray[np.int32]): 立方体の自転番号
+        out (npt.NDArray[np.float32]): 書き込み先の立方体
+    """
+    _, n_lat, n_lon = out.shape
+    flat = (
+        (df["rotation"].to_numpy().astype(np.int64) - rotation_index[0])
+        * n_lat
+        + df["lat_index"].to_numpy()
+    ) * n_lon + df["lon_index"].to_numpy()
+    # 立方体全体の大きさの配列を確保しないよう、出現したセルのみを数える
+    cells, inverse = np.unique(flat, return_inverse=True)
+    out.reshape(-1)[cells] = np.bincount(inverse, minlength=cells.size)
+
+
+def build_synoptic(
+    df: pl.LazyFrame,
+    output_file: Path,
+    lat_min: int = LAT_MIN,
+    lat_max: int = LAT_MAX,
+) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.int32]]:
+    """自転ごとのシノプティックマップを作成し、メモリマップの立方体へ保存する
+
+    自転番号と緯度と経度のインデックスはnpzファイルとして併せて保存する
+
+    Args:
+        df (pl.LazyFrame): 日付、緯度の範囲、カリントン経度の始点と幅
+        output_file (Path): 立方体の保存先のnpyファイルのパス
+        lat_min (int, optional): 緯度の最小値. Defaults to LAT_MIN.
+        lat_max (int, optional): 緯度の最大値. Defaults to LAT_MAX.
+
+    Returns:
+        tuple[npt.NDArray[np.float32], npt.NDArray[np.int32]]:
+            自転、緯度、経度の立方体と自転番号
+    """
+    df_cells = (
+        df.pipe(with_rotation).pipe(rasterize, lat_min, lat_max).collect()
+    )
+    rotation_index = calc_rotation_index(df_cells)
+    lat_index = np.arange(lat_max, lat_min - 1, -1, dtype=np.int32)
+    lon_index = np.arange(LON_BINS, dtype=np.int32)
+
+    cube = np.lib.format.open_memmap(
+        output_file,
+        mode="w+",
+        dtype=np.float32,
+        shape=(rotation_index.size, lat_index.size, lon_index.size),
+    )
+    if cube.size != 0:
+        accumulate(df_cells, rotation_index, cube)
+    cube.flush()
+
+    with output_file.with_suffix(".npz").open("wb") as f:
+        np.savez(f, rotation=rotation_index, lat=lat_index, lon=lon_index)
+    return cube, rotation_index
+
+
+def load_synoptic(
+    output_file: Path,
+) -> tuple[
+    npt.NDArray[np.float32],
+    npt.NDArray[np.int32],
+    npt.NDArray[np.int32],
+    npt.NDArray[np.int32],
+]:
+    """保存したシノプティックマップを読み込む
+
+    立方体はメモリマップとして開くため、必要な自転のみが読み込まれる
+
+    Args:
+        output_file (Path): 立方体のnpyファイルのパス
+
+    Returns:
+        tuple[
+            npt.NDArray[np.float32],
+            npt.NDArray[np.int32],
+            npt.NDArray[np.int32],
+            npt.NDArray[np.int32],
+        ]: 立方体、自転番号、緯度、経度
+    """
+    cube = np.load(output_file, mmap_mode="r")
+    with np.load(output_file.with_suffix(".npz")) as f:
+        return cube, f["rotation"], f["lat"], f["lon"]
+
+
+def main() -> None:
+    path_seiryo = Path("out/seiryo/all.parquet")
+    path_ar = Path("out/ar/all.parquet")
+    output_path = Path("out/synoptic")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    for name, df in [
+        ("seiryo", pl.scan_parquet(path_seiryo).pipe(prepare_seiryo)),
+        ("fujimori", pl.scan_parquet(path_ar).pipe(prepare_ar)),
+    ]:
+        start = time.perf_counter()
+        cube, rotation_index = build_synoptic(df, output_path / f"{name}.npy")
+        print(
+            f"{name}: {rotation_index.size} rotations {cube.shape} "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
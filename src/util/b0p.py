@@ -1,23 +1,27 @@
 import sys
-from csv import DictReader
 from pathlib import Path
 
+import polars as pl
+
 
 def main(argv: list[str]) -> None:
     if len(argv) != 3:  # noqa: PLR2004
         print("Error: Invalid arguments.")
         return
 
-    month, day = argv[1], argv[2]
-    with Path("data/b0p.csv").open("r") as f:
-        reader = DictReader(f)
-        for row in reader:
-            if row["month"] == month and row["day"] == day:
-                print(f"B0 : {row['b0']}")
-                print(f"P  : {row['p']}")
-                return
+    month, day = int(argv[1]), int(argv[2])
+    df = (
+        pl.scan_csv(Path("data/b0p.csv"))
+        .filter(pl.col("month").eq(month) & pl.col("day").eq(day))
+        .collect()
+    )
+
+    if df.height == 0:
+        print(f"Error: No data for {month}/{day}.")
+        return
 
-    print(f"Error: No data for {month}/{day}.")
+    print(f"B0 : {df.item(0, 'b0')}")
+    print(f"P  : {df.item(0, 'p')}")
 
 
 if __name__ == "__main__":
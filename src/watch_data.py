@@ -0,0 +1,357 @@
+import calendar
+import contextlib
+import time
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+
+import ar_type
+import check_ar_raw
+import check_sn_raw
+import parquet_layout
+import seiryo_agg
+import seiryo_check_file
+import seiryo_sunspot_number
+import sn_common
+import sn_main
+import sn_type
+
+# ファイルの更新を確認する秒単位の間隔
+POLL_INTERVAL = 0.5
+
+
+def scan_mtimes(path: Path, pattern: str) -> dict[Path, float]:
+    """フォルダ内のファイルの更新時刻を取得する
+
+    検索してから更新時刻を取得するまでに削除されたファイルは除く
+
+    Args:
+        path (Path): フォルダのパス
+        pattern (str): ファイル名のパターン
+
+    Returns:
+        dict[Path, float]: ファイルごとの更新時刻
+    """
+    mtimes = {}
+    for file in path.glob(pattern):
+        with contextlib.suppress(FileNotFoundError):
+            mtimes[file] = file.stat().st_mtime
+    return mtimes
+
+
+def find_changed(
+    before: dict[Path, float], after: dict[Path, float]
+) -> list[Path]:
+    """追加、更新もしくは削除されたファイルを検出する
+
+    名前を変更したファイルは、元の名前の削除と新たな名前の追加として検出する
+
+    Args:
+        before (dict[Path, float]): 以前のファイルごとの更新時刻
+        after (dict[Path, float]): 現在のファイルごとの更新時刻
+
+    Returns:
+        list[Path]: 追加、更新もしくは削除されたファイル
+    """
+    return sorted(
+        file
+        for file in before.keys() | after.keys()
+        if before.get(file) != after.get(file)
+    )
+
+
+def calc_months(*dfs: pl.DataFrame) -> list[date]:
+    """データに含まれる月を算出する
+
+    Args:
+        *dfs (pl.DataFrame): 日付の列を持つデータ
+
+    Returns:
+        list[date]: 月初めの日付
+    """
+    return (
+        pl.concat([df.select("date") for df in dfs])
+        .select(pl.col("date").dt.truncate("1mo").unique().sort())
+        .drop_nulls()
+        .to_series()
+        .to_list()
+    )
+
+
+def replace_months(
+    df: pl.DataFrame, df_new: pl.DataFrame, months: list[date]
+) -> pl.DataFrame:
+    """指定した月の行のみを新たなデータで置き換える
+
+    Args:
+        df (pl.DataFrame): 元のデータ
+        df_new (pl.DataFrame): 置き換える新たなデータ
+        months (list[date]): 置き換える月
+
+    Returns:
+        pl.DataFrame: 置き換えたデータ
+    """
+    in_months = pl.col("date").dt.truncate("1mo").is_in(months)
+    return pl.concat(
+        [df.filter(~in_months), df_new.filter(in_months).select(df.columns)]
+    ).sort("date", maintain_order=True)
+
+
+def load_seiryo_files(path: Path) -> dict[Path, pl.DataFrame]:
+    """全ての黒点群のファイルをファイルごとに並列に変換する
+
+    Args:
+        path (Path): フォルダのパス
+
+    Returns:
+        dict[Path, pl.DataFrame]: ファイルごとの黒点群データ
+    """
+    files = sorted(path.glob("*.csv"))
+    dfl = pl.collect_all(
+        [seiryo_agg.load_file(file).pipe(seiryo_agg.convert) for file in files]
+    )
+    return dict(zip(files, dfl, strict=True))
+
+
+def rebuild_seiryo(
+    frames: dict[Path, pl.DataFrame], months: list[date], output_path: Path
+) -> None:
+    """ファイルごとの黒点群データを結合し、影響する月の黒点数を再計算する
+
+    Args:
+        frames (dict[Path, pl.DataFrame]): ファイルごとの黒点群データ
+        months (list[date]): 影響する月
+        output_path (Path): 出力先のフォルダのパス
+    """
+    # 黒点群データはファイルごとの変換結果を結合する
+    df_all = pl.concat(frames.values()).sort("date", "no")
+    parquet_layout.write_parquet(
+        df_all, output_path / "all.parquet", ["date", "no"]
+    )
+
+    # 黒点数は影響する月のみを再計算する
+    sunspot_path = output_path / "sunspot"
+    sunspot_path.mkdir(exist_ok=True)
+    df_raw_new = (
+        df_all.lazy()
+        .filter(pl.col("date").dt.truncate("1mo").is_in(months))
+        .pipe(seiryo_sunspot_number.calc_raw)
+        .collect()
+    )
+    df_raw = (
+        replace_months(
+            pl.read_parquet(sunspot_path / "raw.parquet"), df_raw_new, months
+        )
+        if (sunspot_path / "raw.parquet").exists()
+        else seiryo_sunspot_number.calc_raw(df_all.lazy()).collect()
+    )
+    parquet_layout.write_parquet(
+        df_raw, sunspot_path / "raw.parquet", ["date"]
+    )
+    parquet_layout.write_parquet(
+        seiryo_sunspot_number.agg_daily(df_raw),
+        sunspot_path / "daily.parquet",
+        ["date"],
+    )
+    parquet_layout.write_parquet(
+        seiryo_sunspot_number.agg_monthly_with_errors(df_raw),
+        sunspot_path / "monthly.parquet",
+        ["date"],
+    )
+
+
+def update_seiryo(
+    frames: dict[Path, pl.DataFrame], path: Path, output_path: Path
+) -> None:
+    """変更された黒点群のファイルを検査し、影響する月の出力を更新する
+
+    Args:
+        frames (dict[Path, pl.DataFrame]): ファイルごとの黒点群データ
+        path (Path): 変更されたファイルのパス
+        output_path (Path): 出力先のフォルダのパス
+    """
+    with path.open("r") as f:
+        if len(errors := seiryo_check_file.validate_file(f)) != 0:
+            seiryo_check_file.print_errors(path, errors)
+            return
+
+    df_old = frames.get(path, pl.DataFrame(schema={"date": pl.Date}))
+    df_new = seiryo_agg.load_file(path).pipe(seiryo_agg.convert).collect()
+    frames[path] = df_new
+    months = calc_months(df_old, df_new)
+    rebuild_seiryo(frames, months, output_path)
+    print(f"{path}: updated {', '.join(f'{m:%Y/%m}' for m in months)}")
+
+
+def remove_seiryo(
+    frames: dict[Path, pl.DataFrame], path: Path, output_path: Path
+) -> None:
+    """削除された黒点群のファイルの行を除き、影響する月の出力を更新する
+
+    Args:
+        frames (dict[Path, pl.DataFrame]): ファイルごとの黒点群データ
+        path (Path): 削除されたファイルのパス
+        output_path (Path): 出力先のフォルダのパス
+    """
+    if (df_old := frames.pop(path, None)) is None:
+        return
+    if len(frames) == 0:
+        print(f"{path}: removed, no files left to aggregate")
+        return
+    months = calc_months(df_old)
+    rebuild_seiryo(frames, months, output_path)
+    print(f"{path}: removed {', '.join(f'{m:%Y/%m}' for m in months)}")
+
+
+def update_sn(path: Path, output_path: Path) -> None:
+    """変更された黒点数のファイルを検査し、その月の出力を更新する
+
+    Args:
+        path (Path): 変更されたファイルのパス
+        output_path (Path): 出力先のフォルダのパス
+    """
+    year, month = map(int, path.stem.split("-"))
+    if (time_type := sn_type.detect_time_type(year, month)) is None:
+        print(f"Err: not supported date for {year}/{month}")
+        return
+    try:
+        days = calendar.monthrange(year, month)[1]
+        check_sn_raw.check_file(path, days, check_sn_raw.patterns[time_type])
+    except (pl.ComputeError, ValueError) as e:
+        print(path)
+        print(e)
+        return
+
+    if (df := sn_main.load_file(path)) is None:
+        return
+    file = output_path / "all.parquet"
+    if not file.exists():
+        print(f"{file} not found, run sn_main first")
+        return
+    df_all = replace_months(
+        pl.read_parquet(file), df.collect(), [date(year, month, 1)]
+    )
+    parquet_layout.write_parquet(
+        sn_common.sort(df_all.lazy()).collect(), file, ["date"]
+    )
+    print(f"{path}: updated {year}/{month:02}")
+
+
+def check_ar(path: Path) -> None:
+    """変更された活動領域のファイルを検査する
+
+    活動領域は複数のファイルをまたいで結合されるため、出力は更新しない
+
+    Args:
+        path (Path): 変更されたファイルのパス
+    """
+    year, month = map(int, path.stem.split("-"))
+    if (schema_type := ar_type.detect_schema_type(year, month)) is None:
+        print(f"Err: not supported date for {year}/{month}")
+        return
+    try:
+        check_ar_raw.check_file(
+            path,
+            check_ar_raw.columns[schema_type],
+            check_ar_raw.patterns[schema_type],
+        )
+    except (pl.ComputeError, ValueError) as e:
+        print(path)
+        print(e)
+        return
+    print(f"{path}: checked, run ar_main to rebuild")
+
+
+def remove_sn(path: Path, output_path: Path) -> None:
+    """削除された黒点数のファイルの月を出力から除く
+
+    Args:
+        path (Path): 削除されたファイルのパス
+        output_path (Path): 出力先のフォルダのパス
+    """
+    year, month = map(int, path.stem.split("-"))
+    file = output_path / "all.parquet"
+    if not file.exists():
+        return
+    df_all = pl.read_parquet(file)
+    parquet_layout.write_parquet(
+        replace_months(df_all, df_all.clear(), [date(year, month, 1)]),
+        file,
+        ["date"],
+    )
+    print(f"{path}: removed {year}/{month:02}")
+
+
+def process_file(
+    frames: dict[Path, pl.DataFrame], kind: str, file: Path, output_path: Path
+) -> None:
+    """追加、更新もしくは削除されたファイルを種類に応じて処理する
+
+    Args:
+        frames (dict[Path, pl.DataFrame]): ファイルごとの黒点群データ
+        kind (str): ファイルの種類
+        file (Path): 処理するファイルのパス
+        output_path (Path): 出力先のフォルダのパス
+    """
+    removed = not file.exists()
+    match kind, removed:
+        case "seiryo", False:
+            update_seiryo(frames, file, output_path)
+        case "seiryo", True:
+            remove_seiryo(frames, file, output_path)
+        case "sn", False:
+            update_sn(file, output_path)
+        case "sn", True:
+            remove_sn(file, output_path)
+        case _, False:
+            check_ar(file)
+        case _, True:
+            print(f"{file}: removed, run ar_main to rebuild")
+
+
+def main() -> None:
+    seiryo_path = Path("data/seiryo")
+    sn_path = Path("data/fujimori_sn")
+    ar_path = Path("data/fujimori_ar")
+    seiryo_output_path = Path("out/seiryo")
+    sn_output_path = Path("out/sn")
+    ar_output_path = Path("out/ar")
+    seiryo_output_path.mkdir(parents=True, exist_ok=True)
+
+    frames = load_seiryo_files(seiryo_path)
+    watched = [
+        ("seiryo", seiryo_path, "*.csv", seiryo_output_path),
+        ("sn", sn_path, "*-*.csv", sn_output_path),
+        ("ar", ar_path, "*-*.csv", ar_output_path),
+    ]
+    mtimes = {
+        path: scan_mtimes(path, pattern) for _, path, pattern, _ in watched
+    }
+    print("watching for changes, press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(POLL_INTERVAL)
+            for kind, path, pattern, output_path in watched:
+                current = scan_mtimes(path, pattern)
+                for file in find_changed(mtimes[path], current):
+                    start = time.perf_counter()
+                    # 不正なファイル名や読み込みの失敗で監視を止めない
+                    try:
+                        process_file(frames, kind, file, output_path)
+                    except (
+                        pl.exceptions.PolarsError,
+                        OSError,
+                        ValueError,
+                    ) as e:
+                        print(file)
+                        print(e)
+                    print(f"    {time.perf_counter() - start:.3f}s")
+                mtimes[path] = current
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
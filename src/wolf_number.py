@@ -3,6 +3,8 @@ from pprint import pprint
 
 import polars as pl
 
+import parquet_layout
+
 
 def calc_wolf_number(df: pl.LazyFrame) -> pl.LazyFrame:
     return df.with_columns(
@@ -16,6 +18,49 @@ def calc_wolf_number(df: pl.LazyFrame) -> pl.LazyFrame:
     )
 
 
+def load_fujimori(path: Path) -> pl.DataFrame:
+    """藤森の観測ごとの半球別の黒点数を読み込む
+
+    Args:
+        path (Path): 藤森の黒点数のファイルのパス
+
+    Returns:
+        pl.DataFrame: 日付と観測ごとの半球別の黒点数
+    """
+    return (
+        pl.scan_parquet(path)
+        .drop("time", "remarks")
+        .drop_nulls()
+        .pipe(calc_wolf_number)
+        .select(
+            "date",
+            pl.col("nr").alias("north"),
+            pl.col("sr").alias("south"),
+            pl.col("tr").alias("total"),
+        )
+        .collect()
+    )
+
+
+def load_fujimori_daily(path: Path) -> pl.DataFrame:
+    """藤森の観測から日ごとの半球別の黒点数を算出する
+
+    同じ日の観測が複数あれば平均値とする
+
+    Args:
+        path (Path): 藤森の黒点数のファイルのパス
+
+    Returns:
+        pl.DataFrame: 日付と日ごとの半球別の黒点数
+    """
+    return (
+        load_fujimori(path)
+        .group_by("date")
+        .agg(pl.col("north", "south", "total").mean())
+        .sort("date")
+    )
+
+
 def agg_monthly(df: pl.LazyFrame) -> pl.LazyFrame:
     return (
         df.with_columns(pl.col("date").dt.truncate("1mo"))
@@ -40,14 +85,18 @@ def main() -> None:
     print("=== daily ===")
     pprint(df.schema)
     print(df)
-    df.write_parquet(output_path / "fujimori.parquet")
+    parquet_layout.write_parquet(
+        df, output_path / "fujimori.parquet", ["date"]
+    )
 
     df = df.lazy().drop("time").pipe(agg_monthly).sort("date").collect()
 
     print("=== monthly ===")
     pprint(df.schema)
     print(df)
-    df.write_parquet(output_path / "fujimori_monthly.parquet")
+    parquet_layout.write_parquet(
+        df, output_path / "fujimori_monthly.parquet", ["date"]
+    )
 
 
 if __name__ == "__main__":
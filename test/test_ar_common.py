@@ -5,6 +5,7 @@ import pytest
 from polars.testing import assert_frame_equal
 
 import ar_common
+import ar_type
 
 
 @pytest.mark.parametrize(
@@ -23,12 +24,23 @@ def test_extract_no(in_no: str, out_ns: str, out_no: str) -> None:
     df_in = pl.LazyFrame({"no": [in_no]}, schema={"no": pl.Utf8})
     df_expected = pl.LazyFrame(
         {"ns": [out_ns], "no": [out_no]},
-        schema={"ns": pl.Categorical, "no": pl.Utf8},
+        schema={"ns": ar_type.NS, "no": pl.Utf8},
     )
     df_out = ar_common.extract_ns(df_in)
-    assert_frame_equal(
-        df_out, df_expected, check_column_order=False, categorical_as_str=True
-    )
+    assert_frame_equal(df_out, df_expected, check_column_order=False)
+
+
+def test_cast_ns() -> None:
+    df_in = pl.LazyFrame({"ns": ["N", "S"]}, schema={"ns": pl.Utf8})
+    df_expected = pl.LazyFrame({"ns": ["N", "S"]}, schema={"ns": ar_type.NS})
+    df_out = ar_common.cast_ns(df_in)
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_cast_ns_with_error() -> None:
+    df_in = pl.LazyFrame({"ns": ["N", "E"]}, schema={"ns": pl.Utf8})
+    with pytest.raises(pl.exceptions.InvalidOperationError):
+        ar_common.cast_ns(df_in).collect()
 
 
 @pytest.mark.parametrize(
@@ -121,14 +133,12 @@ def test_extract_coords_qm(
         schema={
             "lat": pl.Utf8,
             "lon": pl.Utf8,
-            "lat_question": pl.Categorical,
-            "lon_question": pl.Categorical,
+            "lat_question": ar_type.QUESTION,
+            "lon_question": ar_type.QUESTION,
         },
     )
     df_out = ar_common.extract_coords_qm(df_in)
-    assert_frame_equal(
-        df_out, df_expected, check_column_order=False, categorical_as_str=True
-    )
+    assert_frame_equal(df_out, df_expected, check_column_order=False)
 
 
 @pytest.mark.parametrize(
@@ -148,12 +158,10 @@ def test_extract_coords_qm_lat_only(
     df_in = pl.LazyFrame({"lat": [in_lat]}, schema={"lat": pl.Utf8})
     df_expected = pl.LazyFrame(
         {"lat": [out_lat], "lat_question": [out_lat_question]},
-        schema={"lat": pl.Utf8, "lat_question": pl.Categorical},
+        schema={"lat": pl.Utf8, "lat_question": ar_type.QUESTION},
     )
     df_out = ar_common.extract_coords_qm(df_in, ["lat"])
-    assert_frame_equal(
-        df_out, df_expected, check_column_order=False, categorical_as_str=True
-    )
+    assert_frame_equal(df_out, df_expected, check_column_order=False)
 
 
 @pytest.mark.parametrize(
@@ -318,16 +326,14 @@ def test_extract_coords_sign(
             "lat_right": pl.Utf8,
             "lon_left": pl.Utf8,
             "lon_right": pl.Utf8,
-            "lat_left_sign": pl.Categorical,
-            "lat_right_sign": pl.Categorical,
-            "lon_left_sign": pl.Categorical,
-            "lon_right_sign": pl.Categorical,
+            "lat_left_sign": ar_type.SIGN,
+            "lat_right_sign": ar_type.SIGN,
+            "lon_left_sign": ar_type.SIGN,
+            "lon_right_sign": ar_type.SIGN,
         },
     )
     df_out = ar_common.extract_coords_sign(df_in)
-    assert_frame_equal(
-        df_out, df_expected, check_column_order=False, categorical_as_str=True
-    )
+    assert_frame_equal(df_out, df_expected, check_column_order=False)
 
 
 @pytest.mark.parametrize(
@@ -368,14 +374,12 @@ def test_extract_coords_sign_lat_only(
         schema={
             "lat_left": pl.Utf8,
             "lat_right": pl.Utf8,
-            "lat_left_sign": pl.Categorical,
-            "lat_right_sign": pl.Categorical,
+            "lat_left_sign": ar_type.SIGN,
+            "lat_right_sign": ar_type.SIGN,
         },
     )
     df_out = ar_common.extract_coords_sign(df_in, ["lat"])
-    assert_frame_equal(
-        df_out, df_expected, check_column_order=False, categorical_as_str=True
-    )
+    assert_frame_equal(df_out, df_expected, check_column_order=False)
 
 
 @pytest.mark.parametrize(
@@ -478,18 +482,13 @@ def test_sort_by_no(
         "over",
     ]
     df_in = pl.LazyFrame(
-        {"no": in_no, "ns": in_ns},
-        schema={"no": pl.UInt32, "ns": pl.Categorical},
+        {"no": in_no, "ns": in_ns}, schema={"no": pl.UInt32, "ns": ar_type.NS}
     ).with_columns([pl.lit(None).alias(col) for col in cols])
     df_expected = pl.LazyFrame(
         {"no": out_no, "ns": out_ns},
-        schema={"no": pl.UInt32, "ns": pl.Categorical},
+        schema={"no": pl.UInt32, "ns": ar_type.NS},
     ).with_columns([pl.lit(None).alias(col) for col in cols])
     df_out = ar_common.sort(df_in)
     assert_frame_equal(
-        df_out,
-        df_expected,
-        check_column_order=False,
-        check_row_order=True,
-        categorical_as_str=True,
+        df_out, df_expected, check_column_order=False, check_row_order=True
     )
@@ -2,31 +2,64 @@ from datetime import date
 
 import polars as pl
 import pytest
-from polars.testing import assert_frame_equal, assert_series_equal
+from polars.testing import assert_frame_equal
 
 import ar_merge
 
 
 @pytest.mark.parametrize(
-    ("in_no", "in_over", "out_no"),
+    ("in_ns", "in_no", "in_over", "out_over"),
     [
-        ([1, 2, 3, 4], [False, False, False, False], []),
-        ([1, 2, 3, 3], [False, False, True, False], [3]),
-        ([1, 2, 3, 3], [False, False, False, False], []),
-        ([1, 2, 2, 2], [False, True, False, False], []),
-        ([1, 2, 3, 4], [True, True, False, False], []),
+        (
+            ["N", "N", "N", "N"],
+            [1, 2, 3, 4],
+            [False, False, False, False],
+            [False, False, False, False],
+        ),
+        (
+            ["N", "N", "N", "N"],
+            [1, 2, 3, 3],
+            [False, False, True, False],
+            [False, False, True, True],
+        ),
+        (
+            ["N", "N", "N", "N"],
+            [1, 2, 3, 3],
+            [False, False, False, False],
+            [False, False, False, False],
+        ),
+        (
+            ["N", "N", "N", "N"],
+            [1, 2, 2, 2],
+            [False, True, True, False],
+            [False, True, True, True],
+        ),
+        (
+            ["N", "N", "N", "N"],
+            [1, 2, 3, 4],
+            [True, True, False, False],
+            [False, False, False, False],
+        ),
+        (
+            ["N", "S", "N", "S"],
+            [1, 1, 2, 2],
+            [True, False, False, True],
+            [False, False, False, False],
+        ),
     ],
 )
-def test_extract_over_no(
-    in_no: list[int], in_over: list[int], out_no: list[int]
+def test_is_over(
+    in_ns: list[str],
+    in_no: list[int],
+    in_over: list[bool],
+    out_over: list[bool],
 ) -> None:
-    df_in = pl.LazyFrame(
-        {"no": in_no, "over": in_over},
-        schema={"no": pl.UInt32, "over": pl.Boolean},
+    df_in = pl.DataFrame(
+        {"ns": in_ns, "no": in_no, "over": in_over},
+        schema={"ns": pl.Utf8, "no": pl.UInt32, "over": pl.Boolean},
     )
-    s_expected = pl.Series("no", out_no, dtype=pl.UInt32)
-    s_out = ar_merge.extract_over_no(df_in)
-    assert_series_equal(s_out, s_expected)
+    s_out = df_in.select(ar_merge.is_over()).to_series()
+    assert s_out.to_list() == out_over
 
 
 @pytest.mark.parametrize(
@@ -48,90 +81,116 @@ def test_extract_over_no(
             [date(1980, 12, 25)],
             [date(1981, 1, 3)],
         ),
+        (
+            [1, 1, 1, 2],
+            [
+                date(1980, 11, 25),
+                date(1980, 12, 1),
+                date(1981, 1, 1),
+                date(1981, 1, 2),
+            ],
+            [
+                date(1980, 11, 30),
+                date(1980, 12, 31),
+                date(1981, 1, 3),
+                date(1981, 1, 5),
+            ],
+            [1, 2],
+            [date(1980, 11, 25), date(1981, 1, 2)],
+            [date(1981, 1, 3), date(1981, 1, 5)],
+        ),
     ],
 )
-def test_get_obs_date(
+def test_merge_rows_obs_date(
     in_no: list[int],
     in_first: list[date],
     in_last: list[date],
-    out_no: list[list[int]],
-    out_first: list[int],
-    out_last: list[int],
+    out_no: list[int],
+    out_first: list[date],
+    out_last: list[date],
 ) -> None:
     df_in = pl.LazyFrame(
-        {"no": in_no, "first": in_first, "last": in_last},
-        schema={"no": pl.UInt32, "first": pl.Date, "last": pl.Date},
+        {
+            "ns": ["N"] * len(in_no),
+            "no": in_no,
+            "first": in_first,
+            "last": in_last,
+            "over": [True] * len(in_no),
+        },
+        schema={
+            "ns": pl.Utf8,
+            "no": pl.UInt32,
+            "first": pl.Date,
+            "last": pl.Date,
+            "over": pl.Boolean,
+        },
     )
     df_expected = pl.LazyFrame(
-        {"no": out_no, "first": out_first, "last": out_last},
-        schema={"no": pl.UInt32, "first": pl.Date, "last": pl.Date},
+        {
+            "ns": ["N"] * len(out_no),
+            "no": out_no,
+            "first": out_first,
+            "last": out_last,
+            "over": [False] * len(out_no),
+        },
+        schema={
+            "ns": pl.Utf8,
+            "no": pl.UInt32,
+            "first": pl.Date,
+            "last": pl.Date,
+            "over": pl.Boolean,
+        },
     )
-    df_out = ar_merge.get_obs_date(df_in)
+    df_out = ar_merge.merge_rows(df_in)
     assert_frame_equal(df_out, df_expected, check_column_order=False)
 
 
-def test_get_not_null() -> None:
+def test_merge_rows_not_null() -> None:
     df_in = pl.LazyFrame(
         {
-            "no": [1],
-            "ns": [["N", "N"]],
-            "lat_left": [[None, 12]],
-            "lat_right": [[None, 12]],
-            "lat_question": [[None, None]],
-            "lat_left_sign": [["+", None]],
-            "lat_right_sign": [["-", None]],
-            "lon_left": [[123, None]],
-            "lon_right": [[132, None]],
-            "lon_question": [[None, "?"]],
-            "lon_left_sign": [[None, "-"]],
-            "lon_right_sign": [[None, None]],
+            "ns": ["N", "N", "N"],
+            "no": [1, 1, 1],
+            "lat_left": [None, 12, 10],
+            "lat_question": [None, None, "?"],
+            "lon_left": [None, None, 123],
+            "first": [date(2000, 5, 30), date(2000, 6, 1), date(2000, 7, 1)],
+            "last": [date(2000, 5, 31), date(2000, 6, 30), date(2000, 7, 2)],
+            "over": [True, True, False],
         },
         schema={
+            "ns": pl.Utf8,
             "no": pl.UInt32,
-            "ns": pl.List(pl.Utf8),
-            "lat_left": pl.List(pl.UInt8),
-            "lat_right": pl.List(pl.UInt8),
-            "lat_question": pl.List(pl.Utf8),
-            "lat_left_sign": pl.List(pl.Utf8),
-            "lat_right_sign": pl.List(pl.Utf8),
-            "lon_left": pl.List(pl.UInt16),
-            "lon_right": pl.List(pl.UInt16),
-            "lon_question": pl.List(pl.Utf8),
-            "lon_left_sign": pl.List(pl.Utf8),
-            "lon_right_sign": pl.List(pl.Utf8),
+            "lat_left": pl.UInt8,
+            "lat_question": pl.Utf8,
+            "lon_left": pl.UInt16,
+            "first": pl.Date,
+            "last": pl.Date,
+            "over": pl.Boolean,
         },
     )
     df_expected = pl.LazyFrame(
         {
-            "no": [1],
             "ns": ["N"],
+            "no": [1],
             "lat_left": [12],
-            "lat_right": [12],
-            "lat_question": [None],
-            "lat_left_sign": ["+"],
-            "lat_right_sign": ["-"],
+            "lat_question": ["?"],
             "lon_left": [123],
-            "lon_right": [132],
-            "lon_question": ["?"],
-            "lon_left_sign": ["-"],
-            "lon_right_sign": [None],
+            "first": [date(2000, 5, 30)],
+            "last": [date(2000, 7, 2)],
+            "over": [False],
         },
         schema={
-            "no": pl.UInt32,
             "ns": pl.Utf8,
+            "no": pl.UInt32,
             "lat_left": pl.UInt8,
-            "lat_right": pl.UInt8,
             "lat_question": pl.Utf8,
-            "lat_left_sign": pl.Utf8,
-            "lat_right_sign": pl.Utf8,
             "lon_left": pl.UInt16,
-            "lon_right": pl.UInt16,
-            "lon_question": pl.Utf8,
-            "lon_left_sign": pl.Utf8,
-            "lon_right_sign": pl.Utf8,
+            "first": pl.Date,
+            "last": pl.Date,
+            "over": pl.Boolean,
         },
     )
-    df_out = ar_merge.get_not_null(df_in)
+    df_out = ar_merge.merge_rows(df_in)
     assert_frame_equal(df_out, df_expected, check_column_order=False)
 
 
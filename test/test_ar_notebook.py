@@ -4,6 +4,7 @@ import polars as pl
 import pytest
 
 import ar_notebook
+import ar_type
 
 
 @pytest.mark.parametrize(
@@ -28,15 +29,17 @@ def test_calc_obs_date(in_year: int, in_month: int, out_first: date) -> None:
         ("over", pl.Boolean),
         ("lon_left", pl.UInt16),
         ("lon_right", pl.UInt16),
-        ("lat_left_sign", pl.Categorical),
-        ("lat_right_sign", pl.Categorical),
-        ("lon_left_sign", pl.Categorical),
-        ("lon_right_sign", pl.Categorical),
-        ("lat_question", pl.Categorical),
-        ("lon_question", pl.Categorical),
+        ("lat_left_sign", ar_type.SIGN),
+        ("lat_right_sign", ar_type.SIGN),
+        ("lon_left_sign", ar_type.SIGN),
+        ("lon_right_sign", ar_type.SIGN),
+        ("lat_question", ar_type.QUESTION),
+        ("lon_question", ar_type.QUESTION),
     ],
 )
-def test_fill_blanks(in_name: str, in_type: type[pl.DataType]) -> None:
+def test_fill_blanks(
+    in_name: str, in_type: pl.DataType | type[pl.DataType]
+) -> None:
     df_in = pl.LazyFrame()
     df_out = ar_notebook.fill_blanks(df_in, [(in_name, in_type)]).collect()
     assert df_out.item(0, in_name) is None
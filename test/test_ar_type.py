@@ -31,15 +31,15 @@ def test_detect_schema_type(
     [
         (
             ar_type.SchemaType.NOTEBOOK_1,
-            {"no": pl.UInt32, "ns": pl.Categorical, "lat": pl.Utf8},
+            {"no": pl.UInt32, "ns": pl.Utf8, "lat": pl.Utf8},
         ),
         (
             ar_type.SchemaType.NOTEBOOK_2,
-            {"no": pl.Utf8, "ns": pl.Categorical, "lat": pl.Utf8},
+            {"no": pl.Utf8, "ns": pl.Utf8, "lat": pl.Utf8},
         ),
         (
             ar_type.SchemaType.NOTEBOOK_3,
-            {"no": pl.Utf8, "ns": pl.Categorical, "lat": pl.Utf8},
+            {"no": pl.Utf8, "ns": pl.Utf8, "lat": pl.Utf8},
         ),
         (
             ar_type.SchemaType.OLD,
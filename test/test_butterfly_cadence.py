@@ -0,0 +1,142 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+from polars.testing import assert_frame_equal
+
+import butterfly_cadence
+from seiryo_butterfly import ButterflyInfo, DateDelta
+
+
+def test_prepare_seiryo() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 1, 2)],
+            "no": [1, 0],
+            "lat_min": [5, None],
+            "lat_max": [8, None],
+        }
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "first": [date(2020, 1, 1)],
+            "last": [date(2020, 1, 1)],
+            "lat_min": [5],
+            "lat_max": [8],
+        }
+    )
+    df_out = butterfly_cadence.prepare_seiryo(df_in)
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_create_info() -> None:
+    df_in = pl.DataFrame(
+        {
+            "first": [date(2020, 1, 15), date(2020, 2, 3)],
+            "last": [date(2020, 1, 20), date(2020, 3, 10)],
+        }
+    )
+    info = butterfly_cadence.create_info(
+        df_in, DateDelta(months=1), lat_min=-10, lat_max=10
+    )
+    assert info == ButterflyInfo(
+        -10, 10, date(2020, 1, 1), date(2020, 3, 1), DateDelta(months=1)
+    )
+
+
+def test_calc_bins() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "first": [
+                date(2019, 12, 20),
+                date(2020, 1, 20),
+                date(2020, 3, 20),
+                date(2020, 4, 10),
+            ],
+            "last": [
+                date(2020, 1, 5),
+                date(2020, 2, 5),
+                date(2020, 4, 5),
+                date(2020, 4, 20),
+            ],
+            "lat_min": [1, 2, 3, 4],
+            "lat_max": [5, 6, 7, 8],
+        }
+    )
+    info = ButterflyInfo(
+        -10, 10, date(2020, 1, 1), date(2020, 3, 1), DateDelta(months=1)
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "index": [0, 0, 1, 2],
+            "min": [1, 2, 2, 3],
+            "max": [5, 6, 6, 7],
+            "weight": [1.0, 1.0, 1.0, 1.0],
+        }
+    )
+    df_out = butterfly_cadence.calc_bins(df_in, info)
+    assert_frame_equal(df_out, df_expected, check_dtypes=False)
+
+
+def test_build_images() -> None:
+    df_in = pl.DataFrame(
+        {
+            "first": [date(2003, 1, 24), date(2003, 2, 25)],
+            "last": [date(2003, 1, 30), date(2003, 2, 25)],
+            "lat_min": [0, -1],
+            "lat_max": [1, -1],
+        }
+    )
+    images = butterfly_cadence.build_images(
+        df_in,
+        {
+            "daily": DateDelta(days=1),
+            "carrington": DateDelta(rotations=1),
+            "monthly": DateDelta(months=1),
+        },
+        lat_min=-1,
+        lat_max=1,
+    )
+    img_daily, info_daily = images["daily"]
+    assert img_daily.shape == (5, 33)
+    assert img_daily.dtype == np.uint8
+    assert info_daily.date_start == date(2003, 1, 24)
+    assert img_daily[:3, :7].all()
+    assert img_daily[4, 32] == 1
+    assert img_daily.sum() == 3 * 7 + 1
+
+    img_rotation, info_rotation = images["carrington"]
+    assert info_rotation.date_start == date(2003, 1, 24)
+    np.testing.assert_array_equal(
+        img_rotation, [[1, 0], [1, 0], [1, 0], [0, 0], [0, 1]]
+    )
+
+    img_monthly, _ = images["monthly"]
+    np.testing.assert_array_equal(
+        img_monthly, [[1, 0], [1, 0], [1, 0], [0, 0], [0, 1]]
+    )
+
+
+def test_calc_bins_weight() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "first": [date(2020, 1, 20), date(2020, 3, 1)],
+            "last": [date(2020, 2, 5), date(2020, 3, 1)],
+            "lat_min": [2, 3],
+            "lat_max": [6, 7],
+            "num": [4, 1],
+        }
+    )
+    info = ButterflyInfo(
+        -10, 10, date(2020, 1, 1), date(2020, 3, 1), DateDelta(months=1)
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "index": [0, 1, 2],
+            "min": [2, 2, 3],
+            "max": [6, 6, 7],
+            "weight": [4.0, 4.0, 1.0],
+        }
+    )
+    df_out = butterfly_cadence.calc_bins(df_in, info, weight="num")
+    assert_frame_equal(df_out, df_expected, check_dtypes=False)
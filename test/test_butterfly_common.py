@@ -4,6 +4,7 @@ import polars as pl
 import pytest
 from polars.testing import assert_frame_equal
 
+import ar_type
 import butterfly_common
 
 
@@ -55,11 +56,7 @@ def test_reverse_south(
             "lat_left": [in_lat_left],
             "lat_right": [in_lat_right],
         },
-        schema={
-            "ns": pl.Categorical,
-            "lat_left": pl.Int8,
-            "lat_right": pl.Int8,
-        },
+        schema={"ns": ar_type.NS, "lat_left": pl.Int8, "lat_right": pl.Int8},
     )
     df_expected = pl.LazyFrame(
         {
@@ -67,16 +64,10 @@ def test_reverse_south(
             "lat_left": [out_lat_left],
             "lat_right": [out_lat_right],
         },
-        schema={
-            "ns": pl.Categorical,
-            "lat_left": pl.Int8,
-            "lat_right": pl.Int8,
-        },
+        schema={"ns": ar_type.NS, "lat_left": pl.Int8, "lat_right": pl.Int8},
     )
     df_out = butterfly_common.reverse_south(df_in)
-    assert_frame_equal(
-        df_out, df_expected, check_column_order=False, categorical_as_str=True
-    )
+    assert_frame_equal(df_out, df_expected, check_column_order=False)
 
 
 @pytest.mark.parametrize(
@@ -112,8 +103,8 @@ def test_reverse_minus(
         schema={
             "lat_left": pl.Int8,
             "lat_right": pl.Int8,
-            "lat_left_sign": pl.Categorical,
-            "lat_right_sign": pl.Categorical,
+            "lat_left_sign": ar_type.SIGN,
+            "lat_right_sign": ar_type.SIGN,
         },
     )
     df_expected = pl.LazyFrame(
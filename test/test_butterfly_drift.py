@@ -0,0 +1,253 @@
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import butterfly_drift
+from seiryo_butterfly import ButterflyInfo, DateDelta
+
+
+def test_prepare_seiryo() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 1, 2)],
+            "no": [1, 0],
+            "lat_min": [5, None],
+            "lat_max": [8, None],
+            "num": [3, 0],
+        }
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "first": [date(2020, 1, 1)],
+            "last": [date(2020, 1, 1)],
+            "lat_min": [5],
+            "lat_max": [8],
+            "weight": [3],
+        }
+    )
+    df_out = butterfly_drift.prepare_seiryo(df_in)
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_calc_drift() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "first": [
+                date(2020, 1, 1),
+                date(2020, 1, 1),
+                date(2020, 1, 1),
+                date(2020, 1, 1),
+                date(2020, 1, 2),
+            ],
+            "last": [
+                date(2020, 1, 1),
+                date(2020, 1, 1),
+                date(2020, 1, 1),
+                date(2020, 1, 2),
+                date(2020, 1, 2),
+            ],
+            "lat_min": [10, 20, -16, -1, 28],
+            "lat_max": [12, 24, -14, 1, 32],
+            "weight": [1, 3, 2, 5, 1],
+        }
+    )
+    info = ButterflyInfo(
+        -50, 50, date(2020, 1, 1), date(2020, 1, 3), DateDelta(days=1)
+    )
+    t = [3652 / 365.25, 3652 / 365.25, 3653 / 365.25]
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 1, 1), date(2020, 1, 2)],
+            "start": [date(2010, 1, 1)] * 3,
+            "t": t,
+            "hemisphere": ["north", "south", "north"],
+            "lat_mean": [(11 + 22 * 3) / 4, 15.0, 30.0],
+            "lat_q10": [11.0, 15.0, 30.0],
+            "lat_q50": [22.0, 15.0, 30.0],
+            "lat_q90": [22.0, 15.0, 30.0],
+            "count": pl.Series([2, 1, 1], dtype=pl.UInt32),
+            "weight": [4.0, 2.0, 1.0],
+        }
+    )
+    minima = pl.Series([date(2010, 1, 1)])
+    df_out = butterfly_drift.calc_drift(df_in, info, minima).collect()
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_assign_cycles() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [
+                date(1999, 6, 1),
+                date(2000, 6, 1),
+                date(2000, 6, 1),
+                date(2005, 1, 1),
+                date(2010, 1, 1),
+                date(2010, 1, 1),
+                date(2012, 1, 1),
+                date(2012, 1, 1),
+                date(2014, 1, 1),
+            ],
+            "lat": [30.0, 5.0, 25.0, 10.0, 25.0, 8.0, 6.0, 20.0, 6.0],
+        }
+    )
+    minima = pl.Series([date(2011, 1, 1), date(2000, 1, 1)])
+    df_expected = pl.DataFrame(
+        {
+            "date": [
+                date(2000, 6, 1),
+                date(2005, 1, 1),
+                date(2010, 1, 1),
+                date(2010, 1, 1),
+                date(2012, 1, 1),
+                date(2012, 1, 1),
+                date(2014, 1, 1),
+            ],
+            "lat": [25.0, 10.0, 25.0, 8.0, 6.0, 20.0, 6.0],
+            "start": [
+                date(2000, 1, 1),
+                date(2000, 1, 1),
+                date(2011, 1, 1),
+                date(2000, 1, 1),
+                date(2000, 1, 1),
+                date(2011, 1, 1),
+                date(2011, 1, 1),
+            ],
+        }
+    )
+    df_out = butterfly_drift.assign_cycles(df_in, minima).collect()
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_calc_drift_weighted_quantile() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "first": [date(2020, 1, 1)] * 3,
+            "last": [date(2020, 1, 1)] * 3,
+            "lat_min": [10, 20, 30],
+            "lat_max": [10, 20, 30],
+            "weight": [8, 1, 1],
+        }
+    )
+    info = ButterflyInfo(
+        -50, 50, date(2020, 1, 1), date(2020, 1, 1), DateDelta(days=1)
+    )
+    minima = pl.Series([date(2010, 1, 1)])
+    df_out = butterfly_drift.calc_drift(df_in, info, minima).collect()
+    assert df_out.select("lat_q10", "lat_q50", "lat_q90").row(0) == (
+        10.0,
+        10.0,
+        20.0,
+    )
+
+
+@pytest.mark.parametrize("degree", [1, 2, 3])
+def test_fit_drift(degree: int) -> None:
+    rng = np.random.default_rng(0)
+    dfl = []
+    for start, hemisphere, coef in [
+        (date(2000, 1, 1), "north", [30.0, -2.0, 0.05, 0.001]),
+        (date(2000, 1, 1), "south", [25.0, -1.5, 0.0, 0.0]),
+        (date(2011, 1, 1), "north", [28.0, -2.5, 0.1, -0.002]),
+    ]:
+        t = np.sort(rng.uniform(0, 11, 50))
+        lat = np.polyval(coef[::-1], t) + rng.normal(0, 1, t.size)
+        dfl.append(
+            pl.DataFrame(
+                {
+                    "start": start,
+                    "hemisphere": hemisphere,
+                    "t": t,
+                    "lat_mean": lat,
+                    "weight": rng.integers(1, 5, t.size).astype(float),
+                }
+            )
+        )
+    df_in = pl.concat(dfl)
+    df_out = butterfly_drift.fit_drift(df_in, degree)
+    assert df_out.height == 3
+    assert df_out["degree"].to_list() == [degree] * 3
+
+    for df_group, row in zip(dfl, df_out.iter_rows(named=True), strict=True):
+        expected = np.polyfit(
+            df_group["t"],
+            df_group["lat_mean"],
+            degree,
+            w=np.sqrt(df_group["weight"]),
+        )[::-1]
+        np.testing.assert_allclose(
+            [row[f"c{k}"] for k in range(degree + 1)], expected, rtol=1e-6
+        )
+        assert row["n"] == 50
+
+
+def test_fit_drift_few() -> None:
+    df_in = pl.DataFrame(
+        {
+            "start": [date(2000, 1, 1)] * 2,
+            "hemisphere": ["north"] * 2,
+            "t": [1.0, 2.0],
+            "lat_mean": [20.0, 18.0],
+            "weight": [1.0, 1.0],
+        }
+    )
+    df_out = butterfly_drift.fit_drift(df_in, 2)
+    assert df_out.select("c0", "c1", "c2").row(0) == (None, None, None)
+
+    df_out = butterfly_drift.fit_drift(df_in, 1)
+    np.testing.assert_allclose(df_out.select("c0", "c1").row(0), [22.0, -2.0])
+
+
+def test_fit_all() -> None:
+    df_in = pl.DataFrame(
+        {
+            "start": [date(2000, 1, 1)] * 4,
+            "hemisphere": ["north"] * 4,
+            "t": [0.0, 1.0, 2.0, 3.0],
+            "lat_mean": [30.0, 28.0, 26.0, 24.0],
+            "weight": [1.0, 1.0, 1.0, 1.0],
+        }
+    )
+    df_out = butterfly_drift.fit_all(df_in)
+    assert df_out.columns == [
+        "start",
+        "hemisphere",
+        "degree",
+        "c0",
+        "c1",
+        "c2",
+        "n",
+    ]
+    assert df_out["degree"].to_list() == [1, 2]
+    np.testing.assert_allclose(df_out["c0"], 30.0)
+    np.testing.assert_allclose(df_out["c1"], -2.0)
+    assert df_out["c2"][0] is None
+    assert df_out["c2"][1] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_calc_drift_daily_span() -> None:
+    n = 30
+    df_in = pl.LazyFrame(
+        {
+            "first": [date(2020, 1, 1)],
+            "last": [date(2020, 1, 1) + timedelta(days=n - 1)],
+            "lat_min": [-20],
+            "lat_max": [-18],
+            "weight": [1],
+        }
+    )
+    info = ButterflyInfo(
+        -50,
+        50,
+        date(2020, 1, 1),
+        date(2020, 1, 1) + timedelta(days=n - 1),
+        DateDelta(days=1),
+    )
+    minima = pl.Series([date(2010, 1, 1)])
+    df_out = butterfly_drift.calc_drift(df_in, info, minima).collect()
+    assert df_out.height == n
+    assert (df_out["hemisphere"] == "south").all()
+    np.testing.assert_allclose(df_out["lat_mean"], 19.0)
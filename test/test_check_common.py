@@ -0,0 +1,75 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import check_common
+from check_common import Rule
+
+RULES = [
+    Rule(
+        name="negative",
+        message="negative",
+        expr=pl.col("x") < 0,
+        columns=("id", "x"),
+    ),
+    Rule(
+        name="too_large",
+        message="too large",
+        expr=pl.col("x").abs() > 10,
+        columns=("id", "x"),
+    ),
+]
+
+
+def test_enabled_rules() -> None:
+    rules = check_common.enabled_rules(RULES, ["negative"])
+    assert [rule.name for rule in rules] == ["too_large"]
+
+
+@pytest.mark.parametrize(
+    ("in_x", "in_rules", "out_id", "out_rule"),
+    [
+        pytest.param(
+            [1, -2, 20, -30, None],
+            RULES,
+            [2, 3, 4, 4],
+            ["negative", "too_large", "negative", "too_large"],
+            id="all",
+        ),
+        pytest.param(
+            [1, -2, 20, -30, None],
+            RULES[1:],
+            [3, 4],
+            ["too_large", "too_large"],
+            id="partial",
+        ),
+        pytest.param([1, 2, 3, 4, 5], RULES, [], [], id="valid"),
+        pytest.param([1, -2, 20, -30, None], [], [], [], id="empty"),
+    ],
+)
+def test_find_violations(
+    in_x: list[int | None],
+    in_rules: list[Rule],
+    out_id: list[int],
+    out_rule: list[str],
+) -> None:
+    df_in = pl.LazyFrame(
+        {"id": [1, 2, 3, 4, 5], "x": in_x},
+        schema={"id": pl.UInt8, "x": pl.Int8},
+    )
+    rule_type = pl.Enum([rule.name for rule in in_rules])
+    df_expected = pl.DataFrame(
+        {"id": out_id, "rule": out_rule},
+        schema={"id": pl.UInt8, "rule": rule_type},
+    )
+    df_out = check_common.find_violations(df_in, in_rules).collect()
+    assert_frame_equal(df_out.select("id", "rule"), df_expected)
+
+
+def test_print_violations(capsys: pytest.CaptureFixture[str]) -> None:
+    df_in = pl.LazyFrame({"id": [1, 2], "x": [-1, 2]})
+    df = check_common.find_violations(df_in, RULES).collect()
+    check_common.print_violations(df, RULES)
+    captured = capsys.readouterr().out
+    assert captured.startswith("negative\n")
+    assert "too large" not in captured
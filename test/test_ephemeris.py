@@ -0,0 +1,138 @@
+from datetime import date
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import ephemeris
+
+
+@pytest.mark.parametrize(
+    ("in_dates", "out_jd"),
+    [
+        pytest.param(
+            np.array(["1970-01-01", "2000-01-01"], dtype="datetime64[D]"),
+            np.array([2440587.5, 2451544.5]),
+        ),
+        pytest.param(
+            np.array(["1957-10-04", "NaT"], dtype="datetime64[D]"),
+            np.array([2436115.5, np.nan]),
+        ),
+    ],
+)
+def test_calc_julian_day(
+    in_dates: npt.NDArray[np.datetime64], out_jd: npt.NDArray[np.float64]
+) -> None:
+    np.testing.assert_array_equal(ephemeris.calc_julian_day(in_dates), out_jd)
+
+
+def test_calc_b0p() -> None:
+    # Astronomical Algorithms 例29.a
+    b0, p = ephemeris.calc_b0p(np.array(["1992-10-13"], dtype="datetime64[D]"))
+    np.testing.assert_allclose(b0, [5.99], atol=0.01)
+    np.testing.assert_allclose(p, [26.27], atol=0.01)
+
+
+def test_calc_l0() -> None:
+    # Astronomical Algorithms 例29.a
+    l0 = ephemeris.calc_l0(np.array(["1992-10-13"], dtype="datetime64[D]"))
+    np.testing.assert_allclose(l0, [238.63], atol=0.05)
+
+
+def test_calc_l0_rotation() -> None:
+    # 一日で約13度ずつ減少する
+    dates = np.arange(np.datetime64("2000-01-01"), np.datetime64("2000-01-03"))
+    l0 = ephemeris.calc_l0(dates)
+    assert np.all((l0 >= 0) & (l0 < 360))
+    np.testing.assert_allclose(np.diff(l0) % 360, 360 - 13.2, atol=0.3)
+
+
+def test_calc_carrington_rotation() -> None:
+    # カリントン自転2000は2003年2月20日頃、2100は2010年8月10日頃に始まる
+    dates = np.array(
+        ["2003-02-19", "2003-02-22", "2010-08-09", "2010-08-11"],
+        dtype="datetime64[D]",
+    )
+    cr = ephemeris.calc_carrington_rotation(dates)
+    np.testing.assert_array_equal(np.floor(cr), [1999, 2000, 2099, 2100])
+    # 一日あたり約1/27自転が進む
+    cr_days = ephemeris.calc_carrington_rotation(
+        np.arange("1950-01-01", "1950-03-01", dtype="datetime64[D]")
+    )
+    np.testing.assert_allclose(np.diff(cr_days), 1 / 27.28, atol=0.002)
+
+
+def test_calc_b0p_table() -> None:
+    table = pl.read_csv("data/b0p.csv")
+    dates = np.array(
+        [
+            np.datetime64(f"2000-{month:02}-{day:02}")
+            for month, day in table.select("month", "day").iter_rows()
+        ]
+    )
+    b0, p = ephemeris.calc_b0p(dates)
+    np.testing.assert_allclose(b0, table["b0"], atol=1.0)
+    np.testing.assert_allclose(p, table["p"], atol=2.0)
+
+
+def test_join_b0p_table() -> None:
+    df_in = pl.LazyFrame(
+        {"date": [date(2020, 2, 29), None, date(1970, 1, 1)], "no": [1, 2, 3]},
+        schema={"date": pl.Date, "no": pl.UInt8},
+    )
+    table = pl.LazyFrame(
+        {
+            "month": [1, 2],
+            "day": [1, 29],
+            "b0": [-3.0, -7.0],
+            "p": [2.0, -21.0],
+        },
+        schema={
+            "month": pl.Int8,
+            "day": pl.Int8,
+            "b0": pl.Float64,
+            "p": pl.Float64,
+        },
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "date": [date(2020, 2, 29), None, date(1970, 1, 1)],
+            "no": [1, 2, 3],
+            "b0": [-7.0, None, -3.0],
+            "p": [-21.0, None, 2.0],
+        },
+        schema={
+            "date": pl.Date,
+            "no": pl.UInt8,
+            "b0": pl.Float64,
+            "p": pl.Float64,
+        },
+    )
+    df_out = ephemeris.join_b0p_table(df_in, table)
+    assert_frame_equal(
+        df_out, df_expected, check_column_order=False, check_row_order=False
+    )
+
+
+def test_with_b0p() -> None:
+    df_in = pl.LazyFrame(
+        {"first": [date(1992, 10, 13), None]}, schema={"first": pl.Date}
+    )
+    df_out = ephemeris.with_b0p(df_in, col="first").collect()
+    assert df_out.columns == ["first", "b0", "p"]
+    assert df_out.item(0, "b0") == pytest.approx(5.99, abs=0.01)
+    assert df_out.item(0, "p") == pytest.approx(26.27, abs=0.01)
+    assert df_out.item(1, "b0") is None
+    assert df_out.item(1, "p") is None
+
+
+def test_with_l0() -> None:
+    df_in = pl.LazyFrame(
+        {"date": [date(1992, 10, 13), None]}, schema={"date": pl.Date}
+    )
+    df_out = ephemeris.with_l0(df_in).collect()
+    assert df_out.columns == ["date", "l0"]
+    assert df_out.item(0, "l0") == pytest.approx(238.63, abs=0.05)
+    assert df_out.item(1, "l0") is None
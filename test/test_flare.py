@@ -0,0 +1,317 @@
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+from pytest_mock import MockerFixture
+
+import flare
+
+FILE_2011 = (
+    "Kandilli Observatory\r\n"
+    "                 FLARE INDEX OF SOLAR ACTIVITY\r\n"
+    "\r\n"
+    "2011\r\n"
+    "------------------------------------------------\r\n"
+    "Day   Jan   Feb   Mar   Apr   May   Jun   Jul   Aug\r\n"
+    "================================================\r\n"
+    "1\t0.10\t0.00\t0.46\r\n"
+    "2\t0.00\t0.20\t0.13\r\n"
+    "\r\n"
+    "29\t0.00\t\t0.00\r\n"
+    "------------------------------------------------\r\n"
+    "Mean\t0.02\t0.19\t1.32\t\r\n"
+    "------------------------------------------------\r\n"
+    "Yearly Mean =\t1.67\r\n"
+)
+
+
+def write_file(path: Path, text: str) -> Path:
+    with path.open("w", newline="") as f:
+        f.write(text)
+    return path
+
+
+@pytest.mark.parametrize(
+    ("in_name", "out_hemisphere"),
+    [
+        pytest.param("flare-index-north_2011", "north"),
+        pytest.param("flare-index-south_2022", "south"),
+        pytest.param("flare-index-total_2003", "total"),
+    ],
+)
+def test_detect_hemisphere(in_name: str, out_hemisphere: str) -> None:
+    assert flare.detect_hemisphere(Path(f"{in_name}.txt")) == out_hemisphere
+
+
+def test_detect_hemisphere_with_error() -> None:
+    with pytest.raises(ValueError, match="cannot detect hemisphere"):
+        _ = flare.detect_hemisphere(Path("flare-index_2011.txt"))
+
+
+def test_parse_flare_file(tmp_path: Path) -> None:
+    path = write_file(tmp_path / "flare-index-north_2011.txt", FILE_2011)
+    df_expected = pl.DataFrame(
+        {
+            "date": [
+                date(2011, 1, 1),
+                date(2011, 1, 2),
+                date(2011, 1, 29),
+                date(2011, 2, 1),
+                date(2011, 2, 2),
+                date(2011, 3, 1),
+                date(2011, 3, 2),
+                date(2011, 3, 29),
+            ],
+            "hemisphere": ["north"] * 8,
+            "daily": [0.10, 0.00, 0.00, 0.00, 0.20, 0.46, 0.13, 0.00],
+            "monthly": [0.02, 0.02, 0.02, 0.19, 0.19, 1.32, 1.32, 1.32],
+        },
+        schema={
+            "date": pl.Date,
+            "hemisphere": flare.HEMISPHERE,
+            "daily": pl.Float64,
+            "monthly": pl.Float64,
+        },
+    )
+    df_out = flare.parse_flare_file(path)
+    assert_frame_equal(df_out.collect(), df_expected)
+
+
+@pytest.mark.parametrize(
+    ("in_text", "out_date", "out_index"),
+    [
+        pytest.param(
+            "Kandilli Observatory\n"
+            "                              FLARE INDEX OF SOLAR ACTIVITY\n"
+            "                                        FULL DISK\n"
+            "      2003\n"
+            "--------------------------------------------------------------------------------\n"
+            "Day    Jan  Feb   Mar     Apr  May   Jun     Jul  Aug   Sep     Oct  Nov   Dec  \n"  # noqa: E501
+            "================================================================================\n"
+            "  1   1.11  1.48  0.55   2.31  8.81  0.74   0.68  0.00  0.00   3.33  7.21  0.00 \n"  # noqa: E501
+            "  2   0.13  1.16  1.44   2.34  2.49  6.27   6.60  9.95  0.00   4.88 30.47  0.21 \n"  # noqa: E501
+            "  3   5.17  0.00  0.00   3.52  0.46  0.58   3.70  3.28  0.17   1.12 15.79  0.00 \n"  # noqa: E501
+            "  4   4.42  0.56  0.00  10.54  1.68  0.11   8.70  0.19  0.07   0.24 12.09  0.26 \n"  # noqa: E501
+            "  5   2.44  0.57  0.73   3.03  0.92  0.74   1.81  0.80  0.00   0.90  0.41  0.11 \n"  # noqa: E501
+            "================================================================================\n"
+            "Mean  2.69  1.55  3.33   2.62  4.35  4.54   2.55  1.59  0.77  12.11  4.53  0.68 \n"  # noqa: E501
+            "--------------------------------------------------------------------------------\n"
+            "Yearly Mean = 3.46\n",
+            [
+                date(2003, 1, 1),
+                date(2003, 2, 1),
+                date(2003, 3, 1),
+                date(2003, 4, 1),
+                date(2003, 5, 1),
+                date(2003, 6, 1),
+                date(2003, 7, 1),
+                date(2003, 8, 1),
+                date(2003, 9, 1),
+                date(2003, 10, 1),
+                date(2003, 11, 1),
+                date(2003, 12, 1),
+            ],
+            [
+                2.69,
+                1.55,
+                3.33,
+                2.62,
+                4.35,
+                4.54,
+                2.55,
+                1.59,
+                0.77,
+                12.11,
+                4.53,
+                0.68,
+            ],
+        ),
+        pytest.param(
+            "            Kandilli Observatory\n"
+            "\n"
+            "                            FLARE INDEX OF SOLAR ACTIVITY\n"
+            "\n"
+            "                                      FULL DISK\n"
+            "\n"
+            "2020\n"
+            "\n"
+            "-----------------------------------------------------------------------------------------------------\n"
+            "Day\tJan\tFeb\tMar\tApr\tMay\tJun\tJul\tAug\tSep\tOct\tNov\tDec\n"
+            "=====================================================================================================\n"
+            ".....\n"
+            "-----------------------------------------------------------------------------------------------------\n"
+            "Mean\t0.01\t0.00\t0.00\t1.28\t0.00\t0.02\t0.00\t0.06\t0.00\t0.46\t1.08\t0.46\n"
+            "-----------------------------------------------------------------------------------------------------\n"
+            "Yearly Mean =\t0.28\n",
+            [
+                date(2020, 1, 1),
+                date(2020, 2, 1),
+                date(2020, 3, 1),
+                date(2020, 4, 1),
+                date(2020, 5, 1),
+                date(2020, 6, 1),
+                date(2020, 7, 1),
+                date(2020, 8, 1),
+                date(2020, 9, 1),
+                date(2020, 10, 1),
+                date(2020, 11, 1),
+                date(2020, 12, 1),
+            ],
+            [
+                0.01,
+                0.00,
+                0.00,
+                1.28,
+                0.00,
+                0.02,
+                0.00,
+                0.06,
+                0.00,
+                0.46,
+                1.08,
+                0.46,
+            ],
+        ),
+        pytest.param(
+            "Bogazici University\n"
+            "Kandilli Observatory\t\n"
+            "Istanbul\n"
+            "Turkey\n"
+            "                            FLARE INDEX OF SOLAR ACTIVITY\t\n"
+            "\n"
+            "                                 TOTAL HEMISPHERE\t\n"
+            "\n"
+            "2022\t\n"
+            "\n"
+            "-----------------------------------------------------------------------------------------------------\n"
+            "Day\tJan\tFeb\tMar\tApr\tMay\tJun\tJul\tAug\tSep\tOct\tNov\tDec\n"
+            "=====================================================================================================\n"
+            ".....\n"
+            "-----------------------------------------------------------------------------------------------------\n"
+            "Mean\t0.63\t0.36\t2.00\t1.41\t3.62\t2.69\t3.08\t8.35\t15.74\t3.82\t2.85\t8.49\t\n"
+            "-----------------------------------------------------------------------------------------------------\n"
+            "Yearly Mean =\t0.28\n",
+            [
+                date(2022, 1, 1),
+                date(2022, 2, 1),
+                date(2022, 3, 1),
+                date(2022, 4, 1),
+                date(2022, 5, 1),
+                date(2022, 6, 1),
+                date(2022, 7, 1),
+                date(2022, 8, 1),
+                date(2022, 9, 1),
+                date(2022, 10, 1),
+                date(2022, 11, 1),
+                date(2022, 12, 1),
+            ],
+            [
+                0.63,
+                0.36,
+                2.00,
+                1.41,
+                3.62,
+                2.69,
+                3.08,
+                8.35,
+                15.74,
+                3.82,
+                2.85,
+                8.49,
+            ],
+        ),
+    ],
+)
+def test_parse_flare_file_monthly(
+    tmp_path: Path, in_text: str, out_date: list[date], out_index: list[float]
+) -> None:
+    path = write_file(tmp_path / "flare-index-total.txt", in_text)
+    df_expected = pl.DataFrame(
+        {"date": out_date, "total": out_index},
+        schema={"date": pl.Date, "total": pl.Float64},
+    )
+    df_out = flare.pivot_monthly(flare.parse_flare_file(path).collect())
+    assert_frame_equal(df_out.select("date", "total"), df_expected)
+
+
+def test_load_flare_files_with_error(tmp_path: Path) -> None:
+    path = write_file(tmp_path / "flare-index-total.txt", "Mean\t0.02\t0.19\n")
+    with pytest.raises(ValueError, match="cannot find year"):
+        _ = flare.load_flare_files([path])
+
+
+def test_load_flare_data_cached(tmp_path: Path, mocker: MockerFixture) -> None:
+    data_path = tmp_path / "flare"
+    data_path.mkdir()
+    cache_file = tmp_path / "cache" / "flare.parquet"
+    for hemisphere in ["north", "south", "total"]:
+        write_file(data_path / f"flare-index-{hemisphere}_2011.txt", FILE_2011)
+    spy = mocker.spy(flare, "parse_flare_file")
+
+    df_first = flare.load_flare_data_cached(data_path, cache_file)
+    assert spy.call_count == 3
+    assert df_first.columns == ["date", "hemisphere", "daily", "monthly"]
+    assert df_first.height == 24
+
+    # 新しい年のファイルのみを読み込む
+    write_file(
+        data_path / "flare-index-north_2013.txt",
+        FILE_2011.replace("2011", "2013"),
+    )
+    df_second = flare.load_flare_data_cached(data_path, cache_file)
+    assert spy.call_count == 4
+    assert df_second.height == 32
+
+    # 変更のない場合は読み込まない
+    df_third = flare.load_flare_data_cached(data_path, cache_file)
+    assert spy.call_count == 4
+    assert_frame_equal(df_third, df_second)
+
+
+def test_pivot_daily() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [date(2011, 1, 1), date(2011, 1, 2), date(2011, 1, 1)],
+            "hemisphere": ["north", "north", "south"],
+            "daily": [0.1, 0.2, 0.3],
+            "monthly": [0.15, 0.15, 0.3],
+        },
+        schema={
+            "date": pl.Date,
+            "hemisphere": flare.HEMISPHERE,
+            "daily": pl.Float64,
+            "monthly": pl.Float64,
+        },
+    )
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(2011, 1, 1), date(2011, 1, 2)],
+            "north": [0.1, 0.2],
+            "south": [0.3, None],
+            "total": [None, None],
+        },
+        schema={
+            "date": pl.Date,
+            "north": pl.Float64,
+            "south": pl.Float64,
+            "total": pl.Float64,
+        },
+    )
+    assert_frame_equal(flare.pivot_daily(df_in), df_expected)
+    df_expected_monthly = pl.DataFrame(
+        {
+            "date": [date(2011, 1, 1)],
+            "north": [0.15],
+            "south": [0.3],
+            "total": [None],
+        },
+        schema={
+            "date": pl.Date,
+            "north": pl.Float64,
+            "south": pl.Float64,
+            "total": pl.Float64,
+        },
+    )
+    assert_frame_equal(flare.pivot_monthly(df_in), df_expected_monthly)
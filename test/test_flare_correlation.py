@@ -0,0 +1,160 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import flare_correlation
+
+
+def calc_xcorr_naive(
+    x: np.ndarray, y: np.ndarray, lag: int
+) -> tuple[float, int]:
+    n = x.size
+    a = x[max(0, -lag) : n - max(0, lag)]
+    b = y[max(0, lag) : n + min(0, lag)]
+    mask = ~np.isnan(a) & ~np.isnan(b)
+    return np.corrcoef(a[mask], b[mask])[0, 1], int(mask.sum())
+
+
+def create_monthly(n: int, shift: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pl.date_range(
+        date(2000, 1, 1), date(2000 + (n - 1) // 12, 12, 1), "1mo", eager=True
+    )[:n]
+    sunspot = rng.normal(size=n)
+    return pl.DataFrame(
+        {
+            "date": dates,
+            "flare_north": np.roll(sunspot, shift) * 2 + 10,
+            "flare_south": rng.normal(size=n),
+            "flare_total": rng.normal(size=n),
+            "seiryo_north": sunspot,
+            "seiryo_south": rng.normal(size=n),
+            "seiryo_total": rng.normal(size=n),
+        }
+    )
+
+
+def test_join_series() -> None:
+    df_flare = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 3, 1)],
+            "north": [1.0, 2.0],
+            "south": [3.0, None],
+            "total": [4.0, 2.0],
+        }
+    )
+    df_seiryo = pl.DataFrame(
+        {
+            "date": [date(2019, 12, 1), date(2020, 1, 1)],
+            "north": [5, 6],
+            "south": [7, 8],
+            "total": [12, 14],
+        },
+        schema_overrides={"north": pl.Int16, "south": pl.Int16},
+    )
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 2, 1), date(2020, 3, 1)],
+            "flare_north": [1.0, None, 2.0],
+            "flare_south": [3.0, None, None],
+            "flare_total": [4.0, None, 2.0],
+            "seiryo_north": [6.0, None, None],
+            "seiryo_south": [8.0, None, None],
+            "seiryo_total": [14.0, None, None],
+        }
+    )
+    df_out = flare_correlation.join_series(
+        df_flare, {"seiryo": df_seiryo}, "1mo"
+    )
+    assert_frame_equal(df_out, df_expected)
+
+
+@pytest.mark.parametrize("max_lag", [0, 3, 20])
+def test_masked_xcorr(max_lag: int) -> None:
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(3, 100))
+    y = np.roll(x, 5, axis=1) + rng.normal(0, 0.5, (3, 100)) + 100
+    x[0, ::4] = np.nan
+    y[1, 10:40] = np.nan
+
+    r, n = flare_correlation.masked_xcorr(x, y, max_lag)
+    assert r.shape == n.shape == (3, 2 * max_lag + 1)
+    for i in range(3):
+        for j, lag in enumerate(range(-max_lag, max_lag + 1)):
+            r_expected, n_expected = calc_xcorr_naive(x[i], y[i], lag)
+            assert r[i, j] == pytest.approx(r_expected)
+            assert n[i, j] == n_expected
+
+
+def test_masked_xcorr_min_pairs() -> None:
+    x = np.array([[1.0, 2.0, np.nan, 4.0, 3.0]])
+    y = np.array([[2.0, 4.0, 5.0, np.nan, 6.0]])
+    r, n = flare_correlation.masked_xcorr(x, y, 1, min_pairs=3)
+    np.testing.assert_array_equal(n, [[2, 3, 3]])
+    assert np.isnan(r[0, 0])
+    for j, lag in [(1, 0), (2, 1)]:
+        assert r[0, j] == pytest.approx(calc_xcorr_naive(x[0], y[0], lag)[0])
+
+
+def test_calc_cross_correlation() -> None:
+    df_in = create_monthly(60, shift=3)
+    df_out = flare_correlation.calc_cross_correlation(df_in, 6)
+    assert df_out.columns == ["sunspot", "hemisphere", "lag", "r", "n"]
+    assert df_out.height == 3 * 13
+    df_best = df_out.filter(
+        pl.col("hemisphere") == "north", pl.col("r") == pl.col("r").max()
+    )
+    assert df_best["lag"].item() == 3
+    assert df_best["r"].item() == pytest.approx(1.0)
+    assert df_best["n"].item() == 57
+
+
+def test_track_rolling_lag() -> None:
+    df_in = create_monthly(60, shift=2)
+    df_out = flare_correlation.track_rolling_lag(
+        df_in, window=24, step=12, max_lag=4
+    )
+    df_north = df_out.filter(pl.col("hemisphere") == "north")
+    assert df_north["date"].to_list() == [
+        date(2001, 1, 1),
+        date(2002, 1, 1),
+        date(2003, 1, 1),
+        date(2004, 1, 1),
+    ]
+    assert df_north["lag"].to_list() == [2, 2, 2, 2]
+    np.testing.assert_allclose(df_north["r"], 1.0)
+    assert df_out.height == 3 * 4
+
+
+def test_track_rolling_lag_short() -> None:
+    df_in = create_monthly(10, shift=0)
+    df_out = flare_correlation.track_rolling_lag(df_in, window=24)
+    assert df_out.height == 0
+    assert df_out.columns == ["date", "sunspot", "hemisphere", "lag", "r", "n"]
+
+
+def test_pivot_rolling() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1)] * 3,
+            "sunspot": ["seiryo", "seiryo", "fujimori"],
+            "hemisphere": ["north", "south", "north"],
+            "lag": [1, None, 3],
+            "r": [0.5, None, 0.7],
+            "n": [10, None, 12],
+        }
+    )
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1)],
+            "lag_north": [1],
+            "lag_south": pl.Series([None], dtype=pl.Int64),
+            "r_north": [0.5],
+            "r_south": pl.Series([None], dtype=pl.Float64),
+        }
+    )
+    df_out = flare_correlation.pivot_rolling(df_in, "seiryo")
+    assert_frame_equal(df_out, df_expected)
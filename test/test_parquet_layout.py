@@ -0,0 +1,139 @@
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import parquet_layout
+
+
+def create_frame() -> pl.DataFrame:
+    df = pl.DataFrame(
+        {
+            "date": pl.date_range(
+                date(2000, 1, 1), date(2003, 12, 31), eager=True
+            ).reverse()
+        }
+    )
+    return df.with_columns(
+        pl.int_range(pl.len()).alias("no").cast(pl.UInt16),
+        pl.Series(
+            ["N", "S"] * (df.height // 2) + ["N"], dtype=pl.Enum(["N", "S"])
+        ).alias("ns"),
+    )
+
+
+def test_write_parquet(tmp_path: Path) -> None:
+    df_in = create_frame()
+    path = tmp_path / "out.parquet"
+    parquet_layout.write_parquet(df_in, path, ["date"])
+    assert_frame_equal(pl.read_parquet(path), df_in.sort("date"))
+
+    df_out = (
+        pl.scan_parquet(path)
+        .filter(pl.col("date").is_between(date(2000, 1, 5), date(2000, 1, 7)))
+        .collect()
+    )
+    assert df_out["date"].to_list() == [
+        date(2000, 1, 5),
+        date(2000, 1, 6),
+        date(2000, 1, 7),
+    ]
+
+
+def test_write_parquet_stable(tmp_path: Path) -> None:
+    df_in = pl.DataFrame({"ns": ["S", "N", "S", "N"], "no": [1, 2, 3, 4]})
+    path = tmp_path / "out.parquet"
+    parquet_layout.write_parquet(df_in, path, ["ns"])
+    assert pl.read_parquet(path)["no"].to_list() == [2, 4, 1, 3]
+
+
+def test_write_parquet_time(tmp_path: Path) -> None:
+    df_in = create_frame().with_columns(
+        pl.time(pl.col("no") % 24, pl.col("no") % 60).alias("time")
+    )
+    for span in [None, "1y"]:
+        path = tmp_path / "out.parquet"
+        parquet_layout.write_parquet(df_in, path, ["date"], span)
+        assert_frame_equal(pl.read_parquet(path), df_in.sort("date"))
+
+
+@pytest.mark.parametrize(
+    ("sort_by", "span", "expected"),
+    [
+        (["date"], None, [1461]),
+        (["date"], "1y", [366, 365, 365, 365]),
+        (["date"], "6mo", [182, 184, 181, 184, 181, 184, 181, 184]),
+        (["ns", "no"], "1y", [1461]),
+    ],
+)
+def test_calc_row_group_sizes(
+    sort_by: list[str], span: str | None, expected: list[int]
+) -> None:
+    df_in = create_frame().sort(sort_by)
+    sizes = parquet_layout.calc_row_group_sizes(df_in, sort_by, span)
+    assert sizes.to_list() == expected
+
+
+def test_calc_row_group_sizes_fixed() -> None:
+    df_in = pl.DataFrame({"no": range(parquet_layout.ROW_GROUP_SIZE * 2 + 5)})
+    sizes = parquet_layout.calc_row_group_sizes(df_in, ["no"])
+    assert sizes.to_list() == [
+        parquet_layout.ROW_GROUP_SIZE,
+        parquet_layout.ROW_GROUP_SIZE,
+        5,
+    ]
+
+
+def test_split_row_groups() -> None:
+    df_in = create_frame()
+    df_out = parquet_layout.split_row_groups(df_in, pl.Series([1000, 400, 61]))
+    assert df_out.n_chunks() == 3
+    assert_frame_equal(df_out, df_in)
+
+
+def test_calc_row_group_bounds() -> None:
+    df_in = create_frame().filter(
+        pl.col("date").is_between(date(2000, 10, 1), date(2003, 3, 31))
+    )
+    df_in = df_in.sort("date")
+    sizes = parquet_layout.calc_row_group_sizes(df_in, ["date"], "1y")
+    df_expected = pl.DataFrame(
+        {
+            "row_group": pl.Series([0, 1, 2, 3], dtype=pl.UInt32),
+            "rows": pl.Series([92, 365, 365, 90], dtype=pl.UInt32),
+            "min": [
+                date(2000, 10, 1),
+                date(2001, 1, 1),
+                date(2002, 1, 1),
+                date(2003, 1, 1),
+            ],
+            "max": [
+                date(2000, 12, 31),
+                date(2001, 12, 31),
+                date(2002, 12, 31),
+                date(2003, 3, 31),
+            ],
+        }
+    )
+    assert_frame_equal(
+        parquet_layout.calc_row_group_bounds(df_in, sizes), df_expected
+    )
+
+
+@pytest.mark.parametrize(
+    ("start", "end", "expected"),
+    [
+        (date(2000, 12, 1), date(2000, 12, 31), 1),
+        (date(2001, 12, 1), date(2002, 1, 31), 2),
+        (date(1999, 1, 1), date(2004, 1, 1), 4),
+        (date(2004, 1, 1), date(2004, 2, 1), 0),
+    ],
+)
+def test_filter_row_groups(start: date, end: date, expected: int) -> None:
+    df_in = create_frame().sort("date")
+    sizes = parquet_layout.calc_row_group_sizes(df_in, ["date"], "1y")
+    df_bounds = parquet_layout.calc_row_group_bounds(df_in, sizes)
+    df_out = parquet_layout.filter_row_groups(df_bounds, start, end)
+    assert df_out.height == expected
@@ -204,14 +204,18 @@ def test_convert_date(in_date: str, out_date: date) -> None:
         ("-0.3~-0.2", "lon", pl.Int16, 0, 0),
         ("12.5~13.5", "lon", pl.Int16, 13, 14),
         ("W4.1~6.5", "lon", pl.Int16, -7, -4),
+        ("N12.5~13.5", "lat", pl.Float64, 12.5, 13.5),
+        ("S4.25~6", "lat", pl.Float64, -6.0, -4.25),
+        ("W4.1~6.5", "lon", pl.Float64, -6.5, -4.1),
+        ("m0.3", "lon", pl.Float64, -0.3, -0.3),
     ],
 )
 def test_convert_coord(
     in_data: str,
     in_col: str,
     in_dtype: type[pl.DataType],
-    out_min: int,
-    out_max: int,
+    out_min: float,
+    out_max: float,
 ) -> None:
     df_in = pl.LazyFrame({in_col: [in_data]}, schema={in_col: pl.Utf8})
     df_expected = pl.LazyFrame(
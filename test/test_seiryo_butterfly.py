@@ -1,5 +1,6 @@
-from datetime import date
+from datetime import date, timedelta
 
+import numpy as np
 import polars as pl
 import pytest
 from polars.testing import assert_frame_equal
@@ -17,8 +18,22 @@ import seiryo_butterfly
         "out_isoformat",
     ),
     [
-        (0, 1, 0, {"years": 0, "months": 1, "days": 0}, "1mo", "P1M"),
-        (1, 2, 3, {"years": 1, "months": 2, "days": 3}, "1y2mo3d", "P1Y2M3D"),
+        (
+            0,
+            1,
+            0,
+            {"years": 0, "months": 1, "days": 0, "rotations": 0},
+            "1mo",
+            "P1M",
+        ),
+        (
+            1,
+            2,
+            3,
+            {"years": 1, "months": 2, "days": 3, "rotations": 0},
+            "1y2mo3d",
+            "P1Y2M3D",
+        ),
     ],
 )
 def test_date_delta(
@@ -37,6 +52,29 @@ def test_date_delta(
     assert date_delta.isoformat() == out_isoformat
 
 
+@pytest.mark.parametrize(
+    ("in_delta", "in_factor", "out_delta"),
+    [
+        pytest.param(
+            seiryo_butterfly.DateDelta(days=1),
+            4,
+            seiryo_butterfly.DateDelta(days=4),
+        ),
+        pytest.param(
+            seiryo_butterfly.DateDelta(years=1, months=2, days=3),
+            2,
+            seiryo_butterfly.DateDelta(years=2, months=4, days=6),
+        ),
+    ],
+)
+def test_date_delta_scale(
+    in_delta: seiryo_butterfly.DateDelta,
+    in_factor: int,
+    out_delta: seiryo_butterfly.DateDelta,
+) -> None:
+    assert in_delta.scale(in_factor) == out_delta
+
+
 @pytest.mark.parametrize(
     ("in_str", "out_years", "out_months", "out_days"),
     [
@@ -73,6 +111,20 @@ def test_date_delta_whith_error(
         )
 
 
+def test_date_delta_rotations() -> None:
+    date_delta = seiryo_butterfly.DateDelta(rotations=2)
+    assert date_delta.isoformat() == "P2R"
+    assert seiryo_butterfly.DateDelta.fromisoformat("P2R") == date_delta
+    assert date_delta.scale(3) == seiryo_butterfly.DateDelta(rotations=6)
+    with pytest.raises(ValueError, match="cannot be converted to interval"):
+        _ = date_delta.to_interval()
+
+
+def test_date_delta_rotations_whith_error() -> None:
+    with pytest.raises(ValueError, match="cannot be combined"):
+        _ = seiryo_butterfly.DateDelta(days=1, rotations=1)
+
+
 def test_butterfly_info() -> None:
     info = seiryo_butterfly.ButterflyInfo(
         -50,
@@ -448,3 +500,402 @@ def test_calc_lat() -> None:
     )
     df_out = seiryo_butterfly.calc_lat(df_in, info)
     assert_frame_equal(df_out, df_expected)
+
+
+def test_create_date_bins() -> None:
+    info = seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2020, 1, 1),
+        date(2020, 3, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "index": [0, 1, 2],
+            "date": [date(2020, 1, 1), date(2020, 2, 1), date(2020, 3, 1)],
+        },
+        schema={"index": pl.UInt32, "date": pl.Date},
+    )
+    df_out = seiryo_butterfly.create_date_bins(info)
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_create_date_bins_rotations() -> None:
+    # 自転1999は2003年1月24日に始まる
+    info = seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2003, 1, 24),
+        date(2003, 3, 25),
+        seiryo_butterfly.DateDelta(rotations=1),
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "index": [0, 1, 2],
+            "date": [date(2003, 1, 24), date(2003, 2, 21), date(2003, 3, 20)],
+        },
+        schema={"index": pl.UInt32, "date": pl.Date},
+    )
+    df_out = seiryo_butterfly.create_date_bins(info)
+    assert_frame_equal(df_out, df_expected)
+
+
+@pytest.mark.parametrize(
+    ("in_date", "in_delta", "out_date"),
+    [
+        pytest.param(
+            date(2020, 2, 15),
+            seiryo_butterfly.DateDelta(months=1),
+            date(2020, 2, 1),
+            id="monthly",
+        ),
+        pytest.param(
+            date(2003, 2, 1),
+            seiryo_butterfly.DateDelta(rotations=1),
+            date(2003, 1, 24),
+            id="rotation",
+        ),
+        pytest.param(
+            date(2003, 1, 20),
+            seiryo_butterfly.DateDelta(rotations=1),
+            date(2002, 12, 28),
+            id="previous_rotation",
+        ),
+        pytest.param(
+            date(2003, 3, 25),
+            seiryo_butterfly.DateDelta(rotations=2),
+            date(2003, 2, 21),
+            id="two_rotations",
+        ),
+    ],
+)
+def test_align_date(
+    in_date: date, in_delta: seiryo_butterfly.DateDelta, out_date: date
+) -> None:
+    assert seiryo_butterfly.align_date(in_date, in_delta) == out_date
+
+
+@pytest.mark.parametrize(
+    ("in_info", "in_dates", "out_index"),
+    [
+        pytest.param(
+            seiryo_butterfly.ButterflyInfo(
+                0,
+                0,
+                date(2020, 1, 1),
+                date(2020, 3, 1),
+                seiryo_butterfly.DateDelta(months=1),
+            ),
+            [
+                date(2019, 12, 31),
+                date(2020, 2, 15),
+                date(2020, 3, 31),
+                date(2020, 4, 1),
+            ],
+            [None, 1, 2, None],
+            id="monthly",
+        ),
+        pytest.param(
+            seiryo_butterfly.ButterflyInfo(
+                0,
+                0,
+                date(2003, 1, 24),
+                date(2003, 3, 25),
+                seiryo_butterfly.DateDelta(rotations=1),
+            ),
+            [
+                date(2003, 1, 23),
+                date(2003, 1, 24),
+                date(2003, 2, 21),
+                date(2003, 3, 30),
+            ],
+            [None, 0, 1, 2],
+            id="rotation",
+        ),
+    ],
+)
+def test_with_bin_index(
+    in_info: seiryo_butterfly.ButterflyInfo,
+    in_dates: list[date],
+    out_index: list[int | None],
+) -> None:
+    df_in = pl.LazyFrame({"first": in_dates})
+    df_expected = pl.LazyFrame(
+        {"first": in_dates, "first_index": out_index},
+        schema={"first": pl.Date, "first_index": pl.UInt32},
+    )
+    df_out = seiryo_butterfly.with_bin_index(df_in, in_info, col="first")
+    assert_frame_equal(df_out, df_expected)
+
+
+@pytest.mark.parametrize(
+    ("in_weight", "out_weight"),
+    [
+        pytest.param("num", [3.0, 1.0, 10.0], id="num"),
+        pytest.param(None, [1.0, 1.0, 1.0], id="group"),
+    ],
+)
+def test_calc_density(in_weight: str | None, out_weight: list[float]) -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [
+                date(2020, 2, 2),
+                date(2020, 2, 20),
+                date(2020, 2, 21),
+                date(2020, 3, 3),
+                date(2020, 5, 5),
+            ],
+            "lat_min": [1, 2, None, 3, 4],
+            "lat_max": [4, 5, None, 6, 7],
+            "num": [3, 1, 0, 10, 2],
+        },
+        schema={
+            "date": pl.Date,
+            "lat_min": pl.Int8,
+            "lat_max": pl.Int8,
+            "num": pl.UInt16,
+        },
+    )
+    info = seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2020, 1, 1),
+        date(2020, 3, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    df_expected = pl.DataFrame(
+        {
+            "index": [1, 1, 2],
+            "min": [1, 2, 3],
+            "max": [4, 5, 6],
+            "weight": out_weight,
+        },
+        schema={
+            "index": pl.UInt32,
+            "min": pl.Int8,
+            "max": pl.Int8,
+            "weight": pl.Float64,
+        },
+    )
+    df_out = seiryo_butterfly.calc_density(df_in, info, in_weight)
+    assert_frame_equal(df_out, df_expected, check_row_order=False)
+
+
+def test_agg_intervals() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [
+                date(2020, 4, 6),
+                date(2020, 2, 5),
+                date(2020, 2, 2),
+                date(2020, 3, 3),
+            ],
+            "lat_min": [3, 2, 1, None],
+            "lat_max": [8, 7, 6, None],
+        },
+        schema={"date": pl.Date, "lat_min": pl.Int8, "lat_max": pl.Int8},
+    )
+    df_expected = pl.LazyFrame(
+        {
+            "date": [date(2020, 2, 1), date(2020, 2, 1), date(2020, 4, 1)],
+            "min": [1, 2, 3],
+            "max": [6, 7, 8],
+        },
+        schema={"date": pl.Date, "min": pl.Int8, "max": pl.Int8},
+    )
+    df_out = seiryo_butterfly.agg_intervals(df_in, "1mo")
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_calc_intervals() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [date(2020, 2, 2), date(2020, 3, 3), date(2020, 5, 5)],
+            "lat_min": [1, 2, 3],
+            "lat_max": [4, 5, 6],
+        },
+        schema={"date": pl.Date, "lat_min": pl.Int8, "lat_max": pl.Int8},
+    )
+    info = seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2020, 1, 1),
+        date(2020, 3, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(2020, 2, 1), date(2020, 3, 1)],
+            "min": [1, 2],
+            "max": [4, 5],
+        },
+        schema={"date": pl.Date, "min": pl.Int8, "max": pl.Int8},
+    )
+    df_out = seiryo_butterfly.calc_intervals(df_in, info)
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_calc_offsets() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [
+                date(2020, 2, 1),
+                date(2020, 2, 1),
+                date(2020, 4, 1),
+                date(2020, 5, 1),
+            ],
+            "min": [1, 2, 3, 4],
+            "max": [1, 2, 3, 4],
+        },
+        schema={"date": pl.Date, "min": pl.Int8, "max": pl.Int8},
+    )
+    info = seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2020, 1, 1),
+        date(2020, 5, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    offsets = seiryo_butterfly.calc_offsets(df_in, info)
+    np.testing.assert_equal(offsets, [0, 0, 2, 2, 3, 4])
+
+    df_out = seiryo_butterfly.slice_intervals(df_in, offsets, 1, 4)
+    assert_frame_equal(df_out, df_in.head(3))
+    df_blank = seiryo_butterfly.slice_intervals(df_in, offsets, 2, 3)
+    assert df_blank.height == 0
+
+
+@pytest.mark.parametrize(
+    ("in_lat_min", "in_lat_max", "out_slice"),
+    [
+        pytest.param(-2, 2, slice(0, 9), id="all"),
+        pytest.param(0, 1, slice(2, 5), id="north"),
+        pytest.param(-5, -1, slice(6, 9), id="outside"),
+    ],
+)
+def test_calc_row_slice(
+    in_lat_min: int, in_lat_max: int, out_slice: slice
+) -> None:
+    info = seiryo_butterfly.ButterflyInfo(
+        -2,
+        2,
+        date(2020, 1, 1),
+        date(2020, 5, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    out = seiryo_butterfly.calc_row_slice(info, in_lat_min, in_lat_max)
+    assert out == out_slice
+
+
+@pytest.mark.parametrize(
+    ("in_start", "in_interval", "in_day", "out_index"),
+    [
+        pytest.param(
+            date(2020, 1, 1),
+            seiryo_butterfly.DateDelta(days=7),
+            date(2020, 1, 15),
+            2,
+        ),
+        pytest.param(
+            date(2020, 1, 1),
+            seiryo_butterfly.DateDelta(days=7),
+            date(2019, 12, 31),
+            -1,
+        ),
+        pytest.param(
+            date(2020, 1, 31),
+            seiryo_butterfly.DateDelta(months=1),
+            date(2020, 2, 29),
+            1,
+        ),
+        pytest.param(
+            date(2020, 1, 31),
+            seiryo_butterfly.DateDelta(months=1),
+            date(2020, 3, 30),
+            1,
+        ),
+        pytest.param(
+            date(2020, 1, 31),
+            seiryo_butterfly.DateDelta(months=1),
+            date(2020, 3, 31),
+            2,
+        ),
+        pytest.param(
+            date(2020, 1, 1),
+            seiryo_butterfly.DateDelta(years=1),
+            date(2023, 12, 31),
+            3,
+        ),
+        pytest.param(
+            date(2020, 1, 1),
+            seiryo_butterfly.DateDelta(months=1, days=5),
+            date(2020, 3, 9),
+            1,
+        ),
+        pytest.param(
+            date(2020, 1, 1),
+            seiryo_butterfly.DateDelta(months=1, days=5),
+            date(2020, 3, 11),
+            2,
+        ),
+    ],
+)
+def test_calc_column_index(
+    in_start: date,
+    in_interval: seiryo_butterfly.DateDelta,
+    in_day: date,
+    out_index: int,
+) -> None:
+    info = seiryo_butterfly.ButterflyInfo(
+        -2, 2, in_start, date(2024, 1, 1), in_interval
+    )
+    date_bins = (
+        seiryo_butterfly.create_date_bins(info).collect()["date"].to_list()
+    )
+    out = seiryo_butterfly.calc_column_index(info, in_day)
+    assert out == out_index
+    if out >= 0:
+        assert date_bins[out] <= in_day < date_bins[out + 1]
+
+
+def test_calc_column_index_rotations() -> None:
+    info = seiryo_butterfly.ButterflyInfo(
+        -2,
+        2,
+        date(2020, 1, 1),
+        date(2021, 1, 1),
+        seiryo_butterfly.DateDelta(rotations=2),
+    )
+    df_bins = seiryo_butterfly.create_date_bins(info).collect()
+    for index, day in df_bins.iter_rows():
+        assert seiryo_butterfly.calc_column_index(info, day) == index
+        # 開始日より前でも同じ自転の日付は最初の列となる
+        assert seiryo_butterfly.calc_column_index(
+            info, day - timedelta(days=1)
+        ) == max(index - 1, 0)
+
+
+@pytest.mark.parametrize(
+    ("in_start", "in_end", "out_slice"),
+    [
+        pytest.param(date(2020, 1, 1), date(2020, 5, 1), slice(0, 5)),
+        pytest.param(date(2020, 2, 1), date(2020, 3, 1), slice(1, 3)),
+        pytest.param(date(2020, 2, 15), date(2020, 3, 15), slice(1, 3)),
+        pytest.param(date(2019, 1, 1), date(2021, 1, 1), slice(0, 5)),
+        pytest.param(date(2021, 1, 1), date(2021, 2, 1), slice(5, 5)),
+        pytest.param(date(2019, 1, 1), date(2019, 2, 1), slice(0, 0)),
+    ],
+)
+def test_calc_column_slice(
+    in_start: date, in_end: date, out_slice: slice
+) -> None:
+    info = seiryo_butterfly.ButterflyInfo(
+        -2,
+        2,
+        date(2020, 1, 1),
+        date(2020, 5, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    out = seiryo_butterfly.calc_column_slice(info, in_start, in_end)
+    assert out == out_slice
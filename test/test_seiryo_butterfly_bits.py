@@ -0,0 +1,148 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import seiryo_butterfly_bits
+from seiryo_butterfly import ButterflyInfo, DateDelta
+
+INFO = ButterflyInfo(
+    -2, 2, date(2020, 1, 1), date(2020, 3, 1), DateDelta(months=1)
+)
+
+IMG_A = np.array(
+    [
+        [1, 0, 0],  # +2
+        [1, 0, 0],
+        [0, 0, 0],  # +1
+        [0, 0, 0],
+        [0, 0, 0],  # 0
+        [0, 1, 0],
+        [0, 1, 0],  # -1
+        [0, 0, 0],
+        [1, 0, 0],  # -2
+    ],
+    dtype=np.uint8,
+)
+
+IMG_B = np.array(
+    [
+        [1, 0, 0],  # +2
+        [0, 0, 0],
+        [0, 0, 0],  # +1
+        [0, 0, 0],
+        [0, 0, 0],  # 0
+        [0, 0, 0],
+        [0, 1, 0],  # -1
+        [0, 1, 0],
+        [1, 0, 0],  # -2
+    ],
+    dtype=np.uint8,
+)
+
+
+def test_packed_image() -> None:
+    packed = seiryo_butterfly_bits.PackedImage.from_image(IMG_A, INFO)
+    assert packed.bits.shape == (2, 3)
+    assert packed.n_rows == 9
+    np.testing.assert_equal(packed.to_image(), IMG_A)
+    np.testing.assert_equal(packed.count(), [3, 2, 0])
+
+
+def test_packed_image_operators() -> None:
+    a = seiryo_butterfly_bits.PackedImage.from_image(IMG_A, INFO)
+    b = seiryo_butterfly_bits.PackedImage.from_image(IMG_B, INFO)
+    np.testing.assert_equal((a | b).to_image(), IMG_A | IMG_B)
+    np.testing.assert_equal((a & b).to_image(), IMG_A & IMG_B)
+    np.testing.assert_equal((a ^ b).to_image(), IMG_A ^ IMG_B)
+
+
+def test_packed_image_with_error() -> None:
+    a = seiryo_butterfly_bits.PackedImage.from_image(IMG_A, INFO)
+    b = seiryo_butterfly_bits.PackedImage.from_image(
+        IMG_B,
+        ButterflyInfo(
+            -2, 2, date(2020, 2, 1), date(2020, 4, 1), DateDelta(months=1)
+        ),
+    )
+    with pytest.raises(ValueError, match="Butterfly info must be equal"):
+        _ = a | b
+
+
+def test_intersect_info() -> None:
+    info = seiryo_butterfly_bits.intersect_info(
+        [
+            INFO,
+            ButterflyInfo(
+                -1, 5, date(2020, 2, 1), date(2020, 6, 1), DateDelta(months=1)
+            ),
+        ]
+    )
+    assert info == ButterflyInfo(
+        -1, 2, date(2020, 2, 1), date(2020, 3, 1), DateDelta(months=1)
+    )
+
+
+@pytest.mark.parametrize(
+    ("in_info", "out_error_msg"),
+    [
+        pytest.param(
+            ButterflyInfo(
+                -2, 2, date(2020, 1, 1), date(2020, 3, 1), DateDelta(days=1)
+            ),
+            "Date interval must be equal",
+            id="interval",
+        ),
+        pytest.param(
+            ButterflyInfo(
+                -2, 2, date(2020, 4, 1), date(2020, 6, 1), DateDelta(months=1)
+            ),
+            "ranges do not overlap",
+            id="date",
+        ),
+        pytest.param(
+            ButterflyInfo(
+                3, 5, date(2020, 1, 1), date(2020, 3, 1), DateDelta(months=1)
+            ),
+            "ranges do not overlap",
+            id="lat",
+        ),
+    ],
+)
+def test_intersect_info_with_error(
+    in_info: ButterflyInfo, out_error_msg: str
+) -> None:
+    with pytest.raises(ValueError, match=out_error_msg):
+        _ = seiryo_butterfly_bits.intersect_info([INFO, in_info])
+
+
+def test_calc_column_metrics() -> None:
+    a = seiryo_butterfly_bits.PackedImage.from_image(IMG_A, INFO)
+    b = seiryo_butterfly_bits.PackedImage.from_image(IMG_B, INFO)
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 2, 1), date(2020, 3, 1)],
+            "count_a": [3, 2, 0],
+            "count_b": [2, 2, 0],
+            "intersection": [2, 1, 0],
+            "union": [3, 3, 0],
+            "xor": [1, 2, 0],
+            "jaccard": [2 / 3, 1 / 3, None],
+            "overlap": [1.0, 0.5, None],
+        },
+        schema={
+            "date": pl.Date,
+            "count_a": pl.Int64,
+            "count_b": pl.Int64,
+            "intersection": pl.Int64,
+            "union": pl.Int64,
+            "xor": pl.Int64,
+            "jaccard": pl.Float64,
+            "overlap": pl.Float64,
+        },
+    )
+    assert_frame_equal(
+        seiryo_butterfly_bits.calc_column_metrics(a, b), df_expected
+    )
@@ -145,3 +145,173 @@ def test_create_image(
     )
     out = seiryo_butterfly_image.create_image(df_in, info)
     np.testing.assert_equal(out, out_img)
+
+
+@pytest.mark.parametrize(
+    ("in_log", "out_img"),
+    [
+        pytest.param(
+            False,
+            [
+                [2, 0, 1],  # +1
+                [0, 0, 1],
+                [0, 0, 6],  # 0
+                [0, 0, 1],
+                [5, 0, 1],  # -1
+            ],
+            id="linear",
+        ),
+        pytest.param(
+            True,
+            np.log1p(
+                [
+                    [2, 0, 1],  # +1
+                    [0, 0, 1],
+                    [0, 0, 6],  # 0
+                    [0, 0, 1],
+                    [5, 0, 1],  # -1
+                ]
+            ),
+            id="log",
+        ),
+    ],
+)
+def test_create_density_image(
+    in_log: bool, out_img: list[list[float]]
+) -> None:
+    df_in = pl.DataFrame(
+        {
+            "index": [0, 0, 2, 2, 2],
+            "min": [1, -2, -1, 0, 5],
+            "max": [1, -1, 2, 0, 6],
+            "weight": [2.0, 5.0, 1.0, 5.0, 7.0],
+        },
+        schema={
+            "index": pl.UInt32,
+            "min": pl.Int8,
+            "max": pl.Int8,
+            "weight": pl.Float64,
+        },
+    )
+    info = seiryo_butterfly.ButterflyInfo(
+        -1,
+        1,
+        date(2020, 1, 1),
+        date(2020, 3, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    out = seiryo_butterfly_image.create_density_image(df_in, info, log=in_log)
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out, out_img, rtol=1e-6)
+
+
+@pytest.mark.parametrize(
+    ("in_lat_step", "out_lat"),
+    [
+        pytest.param(1.0, [1.0, 0.0, -1.0], id="1"),
+        pytest.param(0.5, [1.0, 0.5, 0.0, -0.5, -1.0], id="0.5"),
+        pytest.param(
+            0.25,
+            [1.0, 0.75, 0.5, 0.25, 0.0, -0.25, -0.5, -0.75, -1.0],
+            id="0.25",
+        ),
+    ],
+)
+def test_create_lat_bins(in_lat_step: float, out_lat: list[float]) -> None:
+    info = seiryo_butterfly.ButterflyInfo(
+        -1,
+        1,
+        date(2020, 1, 1),
+        date(2020, 1, 1),
+        seiryo_butterfly.DateDelta(days=1),
+    )
+    out = seiryo_butterfly_image.create_lat_bins(info, in_lat_step)
+    np.testing.assert_allclose(out, out_lat)
+
+
+@pytest.mark.parametrize(
+    ("in_lat_step", "out_img"),
+    [
+        pytest.param(
+            1.0,
+            [
+                [0, 2],  # +1
+                [0, 1],  # 0
+                [5, 0],  # -1
+            ],
+            id="1",
+        ),
+        pytest.param(
+            0.25,
+            [
+                [0, 2],  # +1
+                [0, 2],
+                [0, 0],  # +0.5
+                [0, 0],
+                [0, 1],  # 0
+                [0, 0],
+                [5, 0],  # -0.5
+                [5, 0],
+                [5, 0],  # -1
+            ],
+            id="0.25",
+        ),
+    ],
+)
+def test_create_binned_image(
+    in_lat_step: float, out_img: list[list[float]]
+) -> None:
+    df_in = pl.DataFrame(
+        {
+            "index": [0, 1, 1, 1],
+            "min": [-1.2, 0.75, -0.1, 3.0],
+            "max": [-0.5, 1.0, 0.2, 4.0],
+            "weight": [5.0, 2.0, 1.0, 7.0],
+        },
+        schema={
+            "index": pl.UInt32,
+            "min": pl.Float64,
+            "max": pl.Float64,
+            "weight": pl.Float64,
+        },
+    )
+    info = seiryo_butterfly.ButterflyInfo(
+        -1,
+        1,
+        date(2020, 1, 1),
+        date(2020, 1, 2),
+        seiryo_butterfly.DateDelta(days=1),
+    )
+    out = seiryo_butterfly_image.create_binned_image(df_in, info, in_lat_step)
+    assert out.dtype == np.float32
+    np.testing.assert_equal(out, out_img)
+
+
+def test_create_image_from_intervals() -> None:
+    df_list = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 2, 1), date(2020, 3, 1)],
+            "min": [[1, -2], [], [-1, 1]],
+            "max": [[1, -1], [], [2, 4]],
+        },
+        schema={
+            "date": pl.Date,
+            "min": pl.List(pl.Int8),
+            "max": pl.List(pl.Int8),
+        },
+    )
+    info = seiryo_butterfly.ButterflyInfo(
+        -2,
+        2,
+        date(2020, 1, 1),
+        date(2020, 3, 1),
+        seiryo_butterfly.DateDelta(months=1),
+    )
+    df_intervals = df_list.explode("min", "max").drop_nulls()
+    out = seiryo_butterfly_image.create_image_from_intervals(
+        df_intervals, info
+    )
+    assert out.dtype == np.uint8
+    np.testing.assert_equal(
+        out, seiryo_butterfly_image.create_image(df_list, info)
+    )
@@ -163,6 +163,115 @@ def test_create_merged_image(
     np.testing.assert_equal(out, out_img)
 
 
+def test_create_merged_image_from_images() -> None:
+    info_1 = seiryo_butterfly.ButterflyInfo(
+        0,
+        2,
+        date(2020, 2, 1),
+        date(2020, 2, 2),
+        seiryo_butterfly.DateDelta(days=1),
+    )
+    img_1 = np.ones((5, 2), dtype=np.uint8)
+    info_2 = seiryo_butterfly.ButterflyInfo(
+        -2,
+        0,
+        date(2020, 2, 2),
+        date(2020, 2, 4),
+        seiryo_butterfly.DateDelta(days=1),
+    )
+    img_2 = np.array(
+        [[1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 1, 0], [1, 0, 0]], dtype=np.uint8
+    )
+    info = seiryo_butterfly_merge.merge_info([info_1, info_2])
+    out = seiryo_butterfly_merge.create_merged_image_from_images(
+        [(img_1, info_1), (img_2, info_2)], info
+    )
+    np.testing.assert_equal(
+        out,
+        [
+            [1, 1, 0, 0],  # +2
+            [1, 1, 0, 0],
+            [1, 1, 0, 0],  # +1
+            [1, 1, 0, 0],
+            [1, 3, 0, 0],  # 0
+            [0, 0, 2, 0],
+            [0, 0, 0, 2],  # -1
+            [0, 0, 2, 0],
+            [0, 2, 0, 0],  # -2
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    ("in_img_info", "out_img"),
+    [
+        pytest.param(
+            seiryo_butterfly.ButterflyInfo(
+                -3,
+                3,
+                date(2020, 1, 30),
+                date(2020, 2, 3),
+                seiryo_butterfly.DateDelta(days=1),
+            ),
+            [
+                [23, 24, 25, 0],  # +1
+                [28, 29, 30, 0],
+                [33, 34, 35, 0],  # 0
+                [38, 39, 40, 0],
+                [43, 44, 45, 0],  # -1
+            ],
+            id="overhang",
+        ),
+        pytest.param(
+            seiryo_butterfly.ButterflyInfo(
+                -1,
+                0,
+                date(2020, 2, 3),
+                date(2020, 2, 4),
+                seiryo_butterfly.DateDelta(days=1),
+            ),
+            [
+                [0, 0, 0, 0],  # +1
+                [0, 0, 0, 0],
+                [0, 0, 1, 2],  # 0
+                [0, 0, 3, 4],
+                [0, 0, 5, 6],  # -1
+            ],
+            id="inside",
+        ),
+        pytest.param(
+            seiryo_butterfly.ButterflyInfo(
+                -3,
+                3,
+                date(2020, 3, 1),
+                date(2020, 3, 5),
+                seiryo_butterfly.DateDelta(days=1),
+            ),
+            np.zeros((5, 4)),
+            id="outside",
+        ),
+    ],
+)
+def test_paste_image(
+    in_img_info: seiryo_butterfly.ButterflyInfo, out_img: list[list[int]]
+) -> None:
+    info = seiryo_butterfly.ButterflyInfo(
+        -1,
+        1,
+        date(2020, 2, 1),
+        date(2020, 2, 4),
+        seiryo_butterfly.DateDelta(days=1),
+    )
+    canvas = np.zeros((5, 4), dtype=np.uint16)
+    n_columns = (in_img_info.date_end - in_img_info.date_start).days + 1
+    n_rows = 2 * (in_img_info.lat_max - in_img_info.lat_min) + 1
+    img = np.arange(1, n_rows * n_columns + 1, dtype=np.uint16).reshape(
+        n_rows, n_columns
+    )
+    seiryo_butterfly_merge.paste_image(canvas, info, img, in_img_info)
+    np.testing.assert_equal(canvas, out_img)
+
+
 @pytest.mark.parametrize(
     ("in_img", "in_cmap", "out_img"),
     [
@@ -1,9 +1,12 @@
 from datetime import date
+from pathlib import Path
 
 import numpy as np
+import pytest
 
 import seiryo_butterfly
 import seiryo_butterfly_plotly
+import seiryo_butterfly_pyramid
 
 
 def test_draw_butterfly_diagram() -> None:
@@ -16,3 +19,75 @@ def test_draw_butterfly_diagram() -> None:
         seiryo_butterfly.DateDelta(months=1),
     )
     _ = seiryo_butterfly_plotly.draw_butterfly_diagram_plotly(img, info)
+
+
+def test_draw_butterfly_pyramid_plotly() -> None:
+    img = np.arange(10, dtype=np.float32).reshape(2, 5)
+    info = seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2020, 1, 1),
+        date(2020, 1, 5),
+        seiryo_butterfly.DateDelta(days=1),
+    )
+    levels = seiryo_butterfly_pyramid.create_pyramid(
+        img, info, density=True, max_columns=2
+    )
+    fig = seiryo_butterfly_plotly.draw_butterfly_pyramid_plotly(
+        levels, max_columns=2
+    )
+    assert len(fig.data[0].x) == 2
+
+    # 範囲を狭めると細かい段へ差し替える
+    fig = seiryo_butterfly_plotly.update_butterfly_pyramid_plotly(
+        fig, levels, date(2020, 1, 3), date(2020, 1, 4), max_columns=2
+    )
+    np.testing.assert_equal(fig.data[0].z, [[2, 3], [7, 8]])
+
+
+def create_levels() -> list[seiryo_butterfly_pyramid.ButterflyLevel]:
+    img = np.arange(10, dtype=np.float32).reshape(2, 5)
+    info = seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2020, 1, 1),
+        date(2020, 1, 5),
+        seiryo_butterfly.DateDelta(days=1),
+    )
+    return seiryo_butterfly_pyramid.create_pyramid(
+        img, info, density=True, max_columns=2
+    )
+
+
+def test_connect_butterfly_pyramid_plotly() -> None:
+    levels = create_levels()
+    fig = seiryo_butterfly_plotly.draw_butterfly_pyramid_plotly(
+        levels, max_columns=2
+    )
+    seiryo_butterfly_plotly.connect_butterfly_pyramid_plotly(
+        fig, levels, max_columns=2
+    )
+    assert len(fig.data[0].x) == 2
+
+    # ズームで範囲を狭めると細かい段へ差し替える
+    fig.plotly_relayout(
+        {"xaxis.range": ["2020-01-03 00:00:00", "2020-01-04 12:00:00"]}
+    )
+    np.testing.assert_equal(fig.data[0].z, [[2, 3], [7, 8]])
+
+    # 範囲を解除すると全体の粗い段へ戻す
+    fig.plotly_relayout({"xaxis.range": None})
+    np.testing.assert_equal(fig.data[0].z, levels[-1].img)
+
+
+def test_create_butterfly_pyramid_widget(tmp_path: Path) -> None:
+    pytest.importorskip("ipywidgets")
+    levels = create_levels()
+    seiryo_butterfly_pyramid.save_pyramid(
+        levels, tmp_path / "pyramid.npz", tmp_path / "pyramid.json"
+    )
+    fig = seiryo_butterfly_plotly.create_butterfly_pyramid_widget(
+        tmp_path / "pyramid.npz", tmp_path / "pyramid.json", max_columns=2
+    )
+    fig.layout.xaxis.range = ["2020-01-03", "2020-01-04"]
+    np.testing.assert_equal(fig.data[0].z, [[2, 3], [7, 8]])
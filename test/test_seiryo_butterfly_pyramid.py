@@ -0,0 +1,132 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import seiryo_butterfly
+import seiryo_butterfly_pyramid
+
+
+def create_info(days: int = 1) -> seiryo_butterfly.ButterflyInfo:
+    return seiryo_butterfly.ButterflyInfo(
+        0,
+        0,
+        date(2020, 1, 1),
+        date(2020, 1, 5),
+        seiryo_butterfly.DateDelta(days=days),
+    )
+
+
+@pytest.mark.parametrize(
+    ("in_img", "in_density", "out_img"),
+    [
+        pytest.param(
+            np.array([[1, 0, 0, 0, 1]], dtype=np.uint8),
+            False,
+            [[1, 0, 1]],
+            id="binary",
+        ),
+        pytest.param(
+            np.array([[1, 2, 3, 4, 5]], dtype=np.float32),
+            True,
+            [[3, 7, 5]],
+            id="density",
+        ),
+    ],
+)
+def test_pool_image(
+    in_img: np.ndarray, in_density: bool, out_img: list[list[float]]
+) -> None:
+    out = seiryo_butterfly_pyramid.pool_image(in_img, 2, density=in_density)
+    assert out.dtype == in_img.dtype
+    np.testing.assert_equal(out, out_img)
+
+
+def test_create_pyramid() -> None:
+    img = np.arange(5, dtype=np.float32).reshape(1, -1)
+    levels = seiryo_butterfly_pyramid.create_pyramid(
+        img, create_info(), density=True, max_columns=2
+    )
+    assert [level.img.shape[1] for level in levels] == [5, 3, 2]
+    assert [level.info.date_interval.days for level in levels] == [1, 2, 4]
+    # 各段の列数は段の日付のインデックスと一致する
+    for level in levels:
+        date_index = seiryo_butterfly_pyramid.create_level_date_index(level)
+        assert date_index.size == level.img.shape[1]
+        assert level.img.sum() == img.sum()
+
+
+def test_save_pyramid(tmp_path: Path) -> None:
+    img = np.array([[1, 0, 0, 0, 1]], dtype=np.uint8)
+    levels = seiryo_butterfly_pyramid.create_pyramid(
+        img, create_info(), max_columns=2
+    )
+    img_path = tmp_path / "pyramid.npz"
+    info_path = tmp_path / "pyramid.json"
+    seiryo_butterfly_pyramid.save_pyramid(levels, img_path, info_path)
+    levels_load = seiryo_butterfly_pyramid.load_pyramid(img_path, info_path)
+    assert len(levels_load) == len(levels)
+    for level_load, level in zip(levels_load, levels, strict=True):
+        np.testing.assert_equal(level_load.img, level.img)
+        assert level_load.info == level.info
+
+
+@pytest.mark.parametrize(
+    ("in_start", "in_end", "out_days"),
+    [
+        pytest.param(date(2020, 1, 1), date(2020, 1, 5), 4, id="all"),
+        pytest.param(date(2020, 1, 2), date(2020, 1, 4), 2, id="middle"),
+        pytest.param(date(2020, 1, 3), date(2020, 1, 4), 1, id="zoom"),
+    ],
+)
+def test_select_level(in_start: date, in_end: date, out_days: int) -> None:
+    img = np.zeros((1, 5), dtype=np.uint8)
+    levels = seiryo_butterfly_pyramid.create_pyramid(
+        img, create_info(), max_columns=2
+    )
+    level = seiryo_butterfly_pyramid.select_level(
+        levels, in_start, in_end, max_columns=2
+    )
+    assert level.info.date_interval.days == out_days
+
+
+@pytest.mark.parametrize(
+    ("in_days", "in_start", "in_end", "out_img", "out_dates"),
+    [
+        pytest.param(
+            1,
+            date(2020, 1, 2),
+            date(2020, 1, 3),
+            [[1, 2]],
+            ["2020-01-02", "2020-01-03"],
+            id="daily",
+        ),
+        pytest.param(
+            2,
+            date(2020, 1, 2),
+            date(2020, 1, 3),
+            [[1, 5]],
+            ["2020-01-01", "2020-01-03"],
+            id="pooled",
+        ),
+    ],
+)
+def test_crop_level(
+    in_days: int,
+    in_start: date,
+    in_end: date,
+    out_img: list[list[int]],
+    out_dates: list[str],
+) -> None:
+    img = (
+        np.array([[0, 1, 2, 3, 4]], dtype=np.float32)
+        if in_days == 1
+        else np.array([[1, 5, 4]], dtype=np.float32)
+    )
+    level = seiryo_butterfly_pyramid.ButterflyLevel(img, create_info(in_days))
+    img_out, dates_out = seiryo_butterfly_pyramid.crop_level(
+        level, in_start, in_end
+    )
+    np.testing.assert_equal(img_out, out_img)
+    np.testing.assert_equal(dates_out, np.array(out_dates, "datetime64[D]"))
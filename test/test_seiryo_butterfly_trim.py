@@ -1,6 +1,8 @@
 from datetime import date
 
+import numpy as np
 import polars as pl
+import pytest
 from polars.testing import assert_frame_equal
 
 import seiryo_butterfly_trim
@@ -63,3 +65,101 @@ def test_trim_data() -> None:
     )
     df_out = seiryo_butterfly_trim.trim_data(df_in, info)
     assert_frame_equal(df_out, df_expected)
+
+
+@pytest.mark.parametrize(
+    ("in_start", "in_end", "out_date"),
+    [
+        pytest.param(
+            date(2020, 2, 1),
+            date(2020, 7, 1),
+            [
+                date(2020, 2, 1),
+                date(2020, 2, 1),
+                date(2020, 4, 1),
+                date(2020, 5, 1),
+            ],
+            id="after",
+        ),
+        pytest.param(
+            date(2019, 11, 1),
+            date(2020, 2, 1),
+            [date(2020, 1, 1), date(2020, 2, 1), date(2020, 2, 1)],
+            id="before",
+        ),
+        pytest.param(date(2020, 3, 1), date(2020, 3, 1), [], id="blank"),
+    ],
+)
+def test_trim_intervals(
+    in_start: date, in_end: date, out_date: list[date]
+) -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [
+                date(2020, 1, 1),
+                date(2020, 2, 1),
+                date(2020, 2, 1),
+                date(2020, 4, 1),
+                date(2020, 5, 1),
+            ],
+            "min": [1, 2, 3, 4, 5],
+            "max": [11, 22, 33, 44, 55],
+        },
+        schema={"date": pl.Date, "min": pl.Int8, "max": pl.Int8},
+    )
+    info = ButterflyInfo(
+        10, 50, date(2020, 1, 1), date(2020, 5, 1), DateDelta(months=1)
+    )
+    trimmed_info = seiryo_butterfly_trim.trim_info(
+        info, date_start=in_start, date_end=in_end
+    )
+    df_out = seiryo_butterfly_trim.trim_intervals(df_in, info, trimmed_info)
+    assert df_out["date"].to_list() == out_date
+
+
+def test_trim_image() -> None:
+    img = np.arange(5 * 4, dtype=np.uint8).reshape(5, 4)
+    info = ButterflyInfo(
+        -1, 1, date(2020, 1, 1), date(2020, 4, 1), DateDelta(months=1)
+    )
+    trimmed_info = seiryo_butterfly_trim.trim_info(
+        info, lat_min=0, date_start=date(2020, 2, 1), date_end=date(2020, 3, 1)
+    )
+    out = seiryo_butterfly_trim.trim_image(img, info, trimmed_info)
+    np.testing.assert_equal(out, [[1, 2], [5, 6], [9, 10]])
+    # 元の画像を参照するビューとなる
+    assert np.shares_memory(out, img)
+
+
+@pytest.mark.parametrize(
+    ("in_trimmed_info", "out_error_msg"),
+    [
+        pytest.param(
+            ButterflyInfo(
+                -1, 1, date(2020, 1, 1), date(2020, 4, 1), DateDelta(days=1)
+            ),
+            "Date interval must be equal",
+        ),
+        pytest.param(
+            ButterflyInfo(
+                -2, 1, date(2020, 1, 1), date(2020, 4, 1), DateDelta(months=1)
+            ),
+            "trimmed range must be inside the original range",
+        ),
+        pytest.param(
+            ButterflyInfo(
+                -1, 1, date(2020, 1, 1), date(2020, 5, 1), DateDelta(months=1)
+            ),
+            "trimmed range must be inside the original range",
+        ),
+    ],
+)
+def test_trim_image_with_error(
+    in_trimmed_info: ButterflyInfo, out_error_msg: str
+) -> None:
+    img = np.zeros((5, 4), dtype=np.uint8)
+    info = ButterflyInfo(
+        -1, 1, date(2020, 1, 1), date(2020, 4, 1), DateDelta(months=1)
+    )
+    with pytest.raises(ValueError, match=out_error_msg):
+        _ = seiryo_butterfly_trim.trim_image(img, info, in_trimmed_info)
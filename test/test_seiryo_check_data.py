@@ -2,79 +2,11 @@ from datetime import date
 
 import polars as pl
 import pytest
-from polars.testing import assert_frame_equal, assert_series_equal
+from polars.testing import assert_frame_equal
 
+import check_common
 import seiryo_check_data
-
-
-@pytest.mark.parametrize(
-    ("in_no", "out_no"),
-    [
-        pytest.param(1, [1]),
-        pytest.param(3, [1, 2, 3]),
-        pytest.param(5, [1, 2, 3, 4, 5]),
-    ],
-)
-def test_create_expected_group_numbers(in_no: int, out_no: list[int]) -> None:
-    s_out = seiryo_check_data.create_expected_group_numbers(in_no)
-    s_expected = pl.Series(out_no, dtype=pl.UInt8)
-    assert_series_equal(s_out, s_expected)
-
-
-@pytest.mark.parametrize(
-    ("in_date", "in_no", "out_date", "out_original", "out_expected"),
-    [
-        (
-            [date(2020, 8, 20), date(2020, 8, 20), date(2020, 8, 20)],
-            [1, 2, 1],
-            [date(2020, 8, 20)],
-            [[1, 1, 2]],
-            [[1, 2, 3]],
-        ),
-        (
-            [date(2020, 2, 2), date(2020, 2, 2), date(2020, 3, 3)],
-            [1, 1, 2],
-            [date(2020, 2, 2), date(2020, 3, 3)],
-            [[1, 1], [2]],
-            [[1, 2], [1]],
-        ),
-        (
-            [date(2020, 12, 24), date(2020, 12, 24), date(2020, 12, 25)],
-            [1, 2, 1],
-            [],
-            [],
-            [],
-        ),
-        (
-            [date(2020, 8, 20), date(2020, 8, 21), date(2020, 8, 22)],
-            [0, 0, 1],
-            [],
-            [],
-            [],
-        ),
-    ],
-)
-def test_find_invalid_group_number(
-    in_date: list[date],
-    in_no: list[int],
-    out_date: list[date],
-    out_original: list[int],
-    out_expected: list[int],
-) -> None:
-    df_in = pl.DataFrame(
-        {"date": in_date, "no": in_no},
-        schema={"date": pl.Date, "no": pl.UInt8},
-    )
-    df_expected = pl.DataFrame(
-        {"date": out_date, "original": out_original, "expected": out_expected},
-        schema={
-            "date": pl.Date,
-            "original": pl.List(pl.UInt8),
-            "expected": pl.List(pl.UInt8),
-        },
-    )
-    df_out = seiryo_check_data.find_invalid_group_number(df_in).sort("date")
-    assert_frame_equal(df_out, df_expected, check_column_order=False)
+from check_config import CheckSeiryo
 
 
 @pytest.mark.parametrize(
@@ -90,7 +22,7 @@ def test_find_invalid_group_number(
         ([1, 2, 3, 4, 5], [-5, -4, -3, -2, -1], 10, [], []),
     ],
 )
-def test_find_invalid_lat_range(
+def test_invalid_lat_range(
     in_lat_min: list[int],
     in_lat_max: list[int],
     in_threshold: int,
@@ -105,7 +37,7 @@ def test_find_invalid_lat_range(
         {"lat_min": out_lat_min, "lat_max": out_lat_max},
         schema={"lat_min": pl.Int8, "lat_max": pl.Int8},
     )
-    df_out = seiryo_check_data.find_invalid_lat_range(df_in, in_threshold)
+    df_out = df_in.filter(seiryo_check_data.invalid_lat_range(in_threshold))
     assert_frame_equal(
         df_out, df_expected, check_column_order=False, check_row_order=False
     )
@@ -132,7 +64,7 @@ def test_find_invalid_lat_range(
         ([1, 2, 3, 4, 5], [-5, -4, -3, -2, -1], -10, 10, [], []),
     ],
 )
-def test_find_invalid_lon_range(
+def test_invalid_lon_range(
     in_lon_min: list[int],
     in_lon_max: list[int],
     in_min_threshold: int,
@@ -148,8 +80,8 @@ def test_find_invalid_lon_range(
         {"lon_min": out_lon_min, "lon_max": out_lon_max},
         schema={"lon_min": pl.Int8, "lon_max": pl.Int8},
     )
-    df_out = seiryo_check_data.find_invalid_lon_range(
-        df_in, in_min_threshold, in_max_threshold
+    df_out = df_in.filter(
+        seiryo_check_data.invalid_lon_range(in_min_threshold, in_max_threshold)
     )
     assert_frame_equal(
         df_out, df_expected, check_column_order=False, check_row_order=False
@@ -157,94 +89,134 @@ def test_find_invalid_lon_range(
 
 
 @pytest.mark.parametrize(
-    (
-        "in_lat_min",
-        "in_lat_max",
-        "in_interval",
-        "out_lat_min",
-        "out_lat_max",
-        "out_interval",
-    ),
+    ("in_lat_min", "in_lat_max", "in_interval", "out_lat_min", "out_lat_max"),
     [
-        (
-            [10, 10, 10, 10, 10],
-            [10, 20, 30, 40, 50],
-            20,
-            [10, 10],
-            [40, 50],
-            [30, 40],
-        ),
-        ([1, 1, 1, 1, 1], [1, 2, 3, 4, 5], 10, [], [], []),
+        ([10, 10, 10, 10, 10], [10, 20, 30, 40, 50], 20, [10, 10], [40, 50]),
+        ([1, 1, 1, 1, 1], [1, 2, 3, 4, 5], 10, [], []),
     ],
 )
-def test_find_invalid_lat_interval(
+def test_invalid_lat_interval(
     in_lat_min: list[int],
     in_lat_max: list[int],
     in_interval: int,
     out_lat_min: list[int],
     out_lat_max: list[int],
-    out_interval: list[int],
 ) -> None:
     df_in = pl.DataFrame(
         {"lat_min": in_lat_min, "lat_max": in_lat_max},
         schema={"lat_min": pl.Int8, "lat_max": pl.Int8},
     )
     df_expected = pl.DataFrame(
-        {
-            "lat_min": out_lat_min,
-            "lat_max": out_lat_max,
-            "interval": out_interval,
-        },
-        schema={"lat_min": pl.Int8, "lat_max": pl.Int8, "interval": pl.Int8},
+        {"lat_min": out_lat_min, "lat_max": out_lat_max},
+        schema={"lat_min": pl.Int8, "lat_max": pl.Int8},
+    )
+    df_out = df_in.filter(
+        seiryo_check_data.invalid_interval("lat", in_interval)
     )
-    df_out = seiryo_check_data.find_invalid_lat_interval(df_in, in_interval)
     assert_frame_equal(
         df_out, df_expected, check_column_order=False, check_row_order=False
     )
 
 
 @pytest.mark.parametrize(
-    (
-        "in_lon_min",
-        "in_lon_max",
-        "in_interval",
-        "out_lon_min",
-        "out_lon_max",
-        "out_interval",
-    ),
+    ("in_lon_min", "in_lon_max", "in_interval", "out_lon_min", "out_lon_max"),
     [
-        (
-            [10, 10, 10, 10, 10],
-            [10, 20, 30, 40, 50],
-            20,
-            [10, 10],
-            [40, 50],
-            [30, 40],
-        ),
-        ([1, 1, 1, 1, 1], [1, 2, 3, 4, 5], 10, [], [], []),
+        ([10, 10, 10, 10, 10], [10, 20, 30, 40, 50], 20, [10, 10], [40, 50]),
+        ([1, 1, 1, 1, 1], [1, 2, 3, 4, 5], 10, [], []),
     ],
 )
-def test_find_invalid_lon_interval(
+def test_invalid_lon_interval(
     in_lon_min: list[int],
     in_lon_max: list[int],
     in_interval: int,
     out_lon_min: list[int],
     out_lon_max: list[int],
-    out_interval: list[int],
 ) -> None:
     df_in = pl.DataFrame(
         {"lon_min": in_lon_min, "lon_max": in_lon_max},
         schema={"lon_min": pl.Int8, "lon_max": pl.Int8},
     )
     df_expected = pl.DataFrame(
-        {
-            "lon_min": out_lon_min,
-            "lon_max": out_lon_max,
-            "interval": out_interval,
-        },
-        schema={"lon_min": pl.Int8, "lon_max": pl.Int8, "interval": pl.Int8},
+        {"lon_min": out_lon_min, "lon_max": out_lon_max},
+        schema={"lon_min": pl.Int8, "lon_max": pl.Int8},
+    )
+    df_out = df_in.filter(
+        seiryo_check_data.invalid_interval("lon", in_interval)
     )
-    df_out = seiryo_check_data.find_invalid_lon_interval(df_in, in_interval)
     assert_frame_equal(
         df_out, df_expected, check_column_order=False, check_row_order=False
     )
+
+
+@pytest.mark.parametrize(
+    ("in_date", "in_no", "out_invalid"),
+    [
+        pytest.param(
+            [date(2020, 8, 20), date(2020, 8, 20), date(2020, 8, 20)],
+            [1, 2, 1],
+            [True, True, True],
+        ),
+        pytest.param(
+            [date(2020, 2, 2), date(2020, 2, 2), date(2020, 3, 3)],
+            [2, 1, 1],
+            [False, False, False],
+        ),
+        pytest.param(
+            [date(2020, 8, 20), date(2020, 8, 21), date(2020, 8, 21)],
+            [0, 0, 0],
+            [False, True, True],
+        ),
+    ],
+)
+def test_invalid_group_number(
+    in_date: list[date], in_no: list[int], out_invalid: list[bool]
+) -> None:
+    df_in = pl.DataFrame(
+        {"date": in_date, "no": in_no},
+        schema={"date": pl.Date, "no": pl.UInt8},
+    )
+    s_out = df_in.select(seiryo_check_data.invalid_group_number()).to_series()
+    assert s_out.to_list() == out_invalid
+
+
+def test_create_rules() -> None:
+    config = CheckSeiryo(
+        disabled=[],
+        lat_threshold=50,
+        lon_min_threshold=-180,
+        lon_max_threshold=180,
+        lat_interval=15,
+        lon_interval=30,
+    )
+    df_in = pl.LazyFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 1, 1), date(2020, 1, 2)],
+            "no": [1, 2, 2],
+            "lat_min": [10, -60, 10],
+            "lat_max": [20, -50, 30],
+            "lon_min": [0, 10, -10],
+            "lon_max": [10, 50, 10],
+        },
+        schema={
+            "date": pl.Date,
+            "no": pl.UInt8,
+            "lat_min": pl.Int8,
+            "lat_max": pl.Int8,
+            "lon_min": pl.Int16,
+            "lon_max": pl.Int16,
+        },
+    )
+    rules = seiryo_check_data.create_rules(config)
+    df_out = check_common.find_violations(df_in, rules).collect()
+    assert sorted(
+        zip(
+            df_out["no"].to_list(),
+            df_out["rule"].cast(pl.Utf8).to_list(),
+            strict=True,
+        )
+    ) == [
+        (2, "group_number"),
+        (2, "lat_interval"),
+        (2, "lat_range"),
+        (2, "lon_interval"),
+    ]
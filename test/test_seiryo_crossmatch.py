@@ -0,0 +1,193 @@
+from datetime import date
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import ar_type
+import ephemeris
+import seiryo_crossmatch
+
+
+@pytest.mark.parametrize(
+    ("in_lat", "in_ar_lat", "out_score"),
+    [
+        pytest.param((10, 14), (10, 14), 1.0, id="same"),
+        pytest.param((10, 10), (12, 12), 2 / 6, id="tolerance"),
+        pytest.param((10, 14), (12, 16), 6 / 10, id="partial"),
+        pytest.param((10, 12), (20, 22), 0.0, id="apart"),
+    ],
+)
+def test_calc_lat_score(
+    in_lat: tuple[int, int], in_ar_lat: tuple[int, int], out_score: float
+) -> None:
+    df_in = pl.DataFrame(
+        {
+            "lat_min": [in_lat[0]],
+            "lat_max": [in_lat[1]],
+            "ar_lat_min": [in_ar_lat[0]],
+            "ar_lat_max": [in_ar_lat[1]],
+        },
+        schema={
+            "lat_min": pl.Float64,
+            "lat_max": pl.Float64,
+            "ar_lat_min": pl.Float64,
+            "ar_lat_max": pl.Float64,
+        },
+    )
+    score = df_in.select(seiryo_crossmatch.calc_lat_score(2)).item()
+    assert score == pytest.approx(out_score)
+
+
+@pytest.mark.parametrize(
+    ("in_lon", "in_ar_lon", "out_score"),
+    [
+        pytest.param((100, 10), (100, 10), 1.0, id="same"),
+        pytest.param((100, 10), (105, 10), 5 / 15, id="partial"),
+        pytest.param((355, 10), (0, 10), 5 / 15, id="wrap"),
+        pytest.param((0, 10), (355, 10), 5 / 15, id="wrap_reverse"),
+        pytest.param((100, 10), (200, 10), 0.0, id="apart"),
+    ],
+)
+def test_calc_lon_score(
+    in_lon: tuple[int, int], in_ar_lon: tuple[int, int], out_score: float
+) -> None:
+    df_in = pl.DataFrame(
+        {
+            "lon_start": [in_lon[0]],
+            "lon_width": [in_lon[1]],
+            "ar_lon_start": [in_ar_lon[0]],
+            "ar_lon_width": [in_ar_lon[1]],
+        },
+        schema={
+            "lon_start": pl.Float64,
+            "lon_width": pl.Float64,
+            "ar_lon_start": pl.Float64,
+            "ar_lon_width": pl.Float64,
+        },
+    )
+    score = df_in.select(seiryo_crossmatch.calc_lon_score(0)).item()
+    assert score == pytest.approx(out_score)
+
+
+def test_prepare_ar() -> None:
+    df_in = pl.LazyFrame(
+        {
+            "ns": ["S", "N"],
+            "no": [1, 2],
+            "lat_left": [10, 5],
+            "lat_right": [15, 5],
+            "lat_left_sign": [None, "-"],
+            "lat_right_sign": [None, None],
+            "lon_left": [354, 20],
+            "lon_right": [5, 10],
+            "lon_left_sign": [None, None],
+            "lon_right_sign": [None, None],
+            "first": [date(2000, 1, 30), date(2000, 2, 1)],
+            "last": [date(2000, 2, 1), date(2000, 2, 1)],
+        },
+        schema={
+            "ns": ar_type.NS,
+            "no": pl.UInt32,
+            "lat_left": pl.UInt8,
+            "lat_right": pl.UInt8,
+            "lat_left_sign": ar_type.SIGN,
+            "lat_right_sign": ar_type.SIGN,
+            "lon_left": pl.UInt16,
+            "lon_right": pl.UInt16,
+            "lon_left_sign": ar_type.SIGN,
+            "lon_right_sign": ar_type.SIGN,
+            "first": pl.Date,
+            "last": pl.Date,
+        },
+    )
+    df_expected = pl.DataFrame(
+        {
+            "date": [
+                date(2000, 1, 30),
+                date(2000, 1, 31),
+                date(2000, 2, 1),
+                date(2000, 2, 1),
+            ],
+            "ns": ["S", "S", "S", "N"],
+            "ar_no": [1, 1, 1, 2],
+            "ar_lat_min": [-15.0, -15.0, -15.0, -5.0],
+            "ar_lat_max": [-10.0, -10.0, -10.0, 5.0],
+            "ar_lon_start": [354.0, 354.0, 354.0, 10.0],
+            "ar_lon_width": [11.0, 11.0, 11.0, 10.0],
+        },
+        schema={
+            "date": pl.Date,
+            "ns": ar_type.NS,
+            "ar_no": pl.UInt32,
+            "ar_lat_min": pl.Float64,
+            "ar_lat_max": pl.Float64,
+            "ar_lon_start": pl.Float64,
+            "ar_lon_width": pl.Float64,
+        },
+    )
+    df_out = seiryo_crossmatch.prepare_ar(df_in).collect()
+    assert_frame_equal(df_out, df_expected, check_column_order=False)
+
+
+def test_crossmatch() -> None:
+    day = date(2015, 6, 6)
+    l0 = float(
+        ephemeris.with_l0(pl.LazyFrame({"date": [day]})).collect()["l0"][0]
+    )
+    # 中央子午線付近の黒点群と、それに対応する活動領域と対応しない活動領域
+    df_seiryo = pl.LazyFrame(
+        {
+            "date": [day, day, date(2015, 6, 7)],
+            "no": [1, 2, 0],
+            "lat_min": [10, -20, None],
+            "lat_max": [14, -18, None],
+            "lon_min": [-2, 40, None],
+            "lon_max": [2, 45, None],
+            "num": [3, 1, None],
+        },
+        schema={
+            "date": pl.Date,
+            "no": pl.UInt8,
+            "lat_min": pl.Int8,
+            "lat_max": pl.Int8,
+            "lon_min": pl.Int16,
+            "lon_max": pl.Int16,
+            "num": pl.UInt16,
+        },
+    )
+    lon = [round(l0 - 3) % 360, round(l0 + 3) % 360]
+    df_ar = pl.LazyFrame(
+        {
+            "ns": ["N", "N", "S"],
+            "no": [100, 101, 102],
+            "lat_left": [11, 30, 19],
+            "lat_right": [13, 35, 19],
+            "lat_left_sign": [None, None, None],
+            "lat_right_sign": [None, None, None],
+            "lon_left": [lon[0], lon[0], lon[0]],
+            "lon_right": [lon[1], lon[1], lon[1]],
+            "lon_left_sign": [None, None, None],
+            "lon_right_sign": [None, None, None],
+            "first": [date(2015, 6, 1), day, day],
+            "last": [date(2015, 6, 10), day, day],
+        },
+        schema={
+            "ns": ar_type.NS,
+            "no": pl.UInt32,
+            "lat_left": pl.UInt8,
+            "lat_right": pl.UInt8,
+            "lat_left_sign": ar_type.SIGN,
+            "lat_right_sign": ar_type.SIGN,
+            "lon_left": pl.UInt16,
+            "lon_right": pl.UInt16,
+            "lon_left_sign": ar_type.SIGN,
+            "lon_right_sign": ar_type.SIGN,
+            "first": pl.Date,
+            "last": pl.Date,
+        },
+    )
+    df_out = seiryo_crossmatch.crossmatch(df_seiryo, df_ar).collect()
+    assert df_out.select("date", "no", "ar_no").rows() == [(day, 1, 100)]
+    assert df_out.item(0, "best")
+    assert 0 < df_out.item(0, "score") <= 1
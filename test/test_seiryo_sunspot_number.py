@@ -461,6 +461,38 @@ def test_agg_monthly(
     assert_frame_equal(df_out, df_expected)
 
 
+def test_agg_monthly_with_errors() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 1, 2), date(2020, 2, 1)],
+            "ng": [1, 0, 2],
+            "nf": [2, 0, 5],
+            "sg": [0, 1, 0],
+            "sf": [0, 3, 0],
+            "tg": [1, 1, 2],
+            "tf": [2, 3, 5],
+        },
+        schema={
+            "date": pl.Date,
+            "ng": pl.UInt8,
+            "nf": pl.UInt16,
+            "sg": pl.UInt8,
+            "sf": pl.UInt16,
+            "tg": pl.UInt8,
+            "tf": pl.UInt16,
+        },
+    )
+    df_out = seiryo_sunspot_number.agg_monthly_with_errors(df_in)
+    assert_frame_equal(
+        df_out.select("date", "north", "south", "total"),
+        seiryo_sunspot_number.agg_monthly(df_in),
+    )
+    assert df_out["n"].to_list() == [2, 1]
+    assert df_out["north_se_jack"][0] == pytest.approx(6.0)
+    assert df_out["total_se_jack"][0] == pytest.approx(0.5)
+    assert df_out["north_se"][1] is None
+
+
 def test_draw_sunspot_number_whole_disk() -> None:
     df = pl.DataFrame(
         {
@@ -504,6 +536,9 @@ def test_draw_sunspot_number_whole_disk() -> None:
         ),
     )
     _ = seiryo_sunspot_number.draw_sunspot_number_whole_disk(df, config)
+    _ = seiryo_sunspot_number.draw_sunspot_number_whole_disk(
+        df.with_columns(pl.Series("total_se", [0.5, None, 1.0])), config
+    )
 
 
 def test_draw_sunspot_number_hemispheric() -> None:
@@ -558,3 +593,10 @@ def test_draw_sunspot_number_hemispheric() -> None:
         legend=Legend(font_family="Times New Roman", font_size=12),
     )
     _ = seiryo_sunspot_number.draw_sunspot_number_hemispheric(df, config)
+    _ = seiryo_sunspot_number.draw_sunspot_number_hemispheric(
+        df.with_columns(
+            pl.Series("north_se", [0.5, None, 1.0]),
+            pl.Series("south_se", [0.2, 0.1, None]),
+        ),
+        config,
+    )
@@ -1,10 +1,8 @@
 from datetime import date
-from pathlib import Path
 
 import polars as pl
 import pytest
 from polars.testing import assert_frame_equal
-from pytest_mock import MockerFixture
 
 import seiryo_sunspot_number_with_silso
 from seiryo_config_common import (
@@ -28,103 +26,6 @@ from seiryo_sunspot_number_with_silso_config import (
 )
 
 
-@pytest.mark.parametrize(
-    ("in_text", "out_date", "out_total"),
-    [
-        pytest.param(
-            "2020 01 2020.042    6.2   0.7   795\n"
-            "2020 02 2020.124    0.2   0.1   967\n"
-            "2020 03 2020.206    1.5   0.1  1055\n"
-            "2020 04 2020.288    5.2   0.6  1234\n"
-            "2020 05 2020.373    0.2   0.1  1363\n"
-            "2020 06 2020.455    5.8   0.6  1196\n"
-            "2020 07 2020.540    6.1   3.7  1548\n"
-            "2020 08 2020.624    7.5   4.1  1587\n"
-            "2020 09 2020.706    0.6   2.2  1244\n"
-            "2020 10 2020.791   14.6   7.4  1215\n"
-            "2020 11 2020.873   34.5   8.1  1238\n"
-            "2020 12 2020.958   23.1   6.0   998\n",
-            [
-                date(2020, 1, 1),
-                date(2020, 2, 1),
-                date(2020, 3, 1),
-                date(2020, 4, 1),
-                date(2020, 5, 1),
-                date(2020, 6, 1),
-                date(2020, 7, 1),
-                date(2020, 8, 1),
-                date(2020, 9, 1),
-                date(2020, 10, 1),
-                date(2020, 11, 1),
-                date(2020, 12, 1),
-            ],
-            [6.2, 0.2, 1.5, 5.2, 0.2, 5.8, 6.1, 7.5, 0.6, 14.6, 34.5, 23.1],
-        ),
-        pytest.param(
-            "2023 01 2023.042  144.4  29.4   968  \n"
-            "2023 02 2023.122  111.3  20.7  1014  \n"
-            "2023 03 2023.204  123.3  17.9  1081  \n"
-            "2023 04 2023.286   97.6  18.0  1132  \n"
-            "2023 05 2023.371  137.4  19.6  1240  \n"
-            "2023 06 2023.453  160.5  20.0  1248  \n"
-            "2023 07 2023.538  159.1  17.3  1039 *\n"
-            "2023 08 2023.623  114.8  15.4  1095 *\n"
-            "2023 09 2023.705  133.6  17.6  1140 *\n"
-            "2023 10 2023.790   99.4  16.0   958 *\n"
-            "2023 11 2023.873  105.4  16.7   809 *\n"
-            "2023 12 2023.958  114.2  17.9   619 *\n",
-            [
-                date(2023, 1, 1),
-                date(2023, 2, 1),
-                date(2023, 3, 1),
-                date(2023, 4, 1),
-                date(2023, 5, 1),
-                date(2023, 6, 1),
-                date(2023, 7, 1),
-                date(2023, 8, 1),
-                date(2023, 9, 1),
-                date(2023, 10, 1),
-                date(2023, 11, 1),
-                date(2023, 12, 1),
-            ],
-            [
-                144.4,
-                111.3,
-                123.3,
-                97.6,
-                137.4,
-                160.5,
-                159.1,
-                114.8,
-                133.6,
-                99.4,
-                105.4,
-                114.2,
-            ],
-        ),
-    ],
-)
-def test_load_silso_data(
-    mocker: MockerFixture,
-    in_text: str,
-    out_date: list[date],
-    out_total: list[float],
-) -> None:
-    m = mocker.mock_open(read_data=in_text)
-    mocker.patch("pathlib.Path.open", m)
-
-    df_expected = pl.DataFrame(
-        {"date": out_date, "total": out_total},
-        schema={"date": pl.Date, "total": pl.Float64},
-    )
-
-    df_out = seiryo_sunspot_number_with_silso.load_silso_data(
-        Path("dummy/path")
-    )
-
-    assert_frame_equal(df_out, df_expected, check_column_order=False)
-
-
 @pytest.mark.parametrize(
     (
         "in_seiryo_date",
@@ -0,0 +1,167 @@
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import silso
+
+
+@pytest.mark.parametrize(
+    ("in_text", "out_df"),
+    [
+        pytest.param(
+            "2020 01 2020.042    6.2   0.7   795\n"
+            "2020 02 2020.124    0.2   0.1   967\n"
+            "2020 03 2020.206    1.5   0.1  1055\n",
+            pl.DataFrame(
+                {
+                    "date": [
+                        date(2020, 1, 1),
+                        date(2020, 2, 1),
+                        date(2020, 3, 1),
+                    ],
+                    "fr_year": [2020.042, 2020.124, 2020.206],
+                    "total": [6.2, 0.2, 1.5],
+                    "std": [0.7, 0.1, 0.1],
+                    "obs": [795, 967, 1055],
+                    "provisional": [False, False, False],
+                },
+                schema={
+                    "date": pl.Date,
+                    "fr_year": pl.Float64,
+                    "total": pl.Float64,
+                    "std": pl.Float64,
+                    "obs": pl.Int32,
+                    "provisional": pl.Boolean,
+                },
+            ),
+            id="definitive",
+        ),
+        pytest.param(
+            "2023 06 2023.453  160.5  20.0  1248  \n"
+            "2023 07 2023.538  159.1  17.3  1039 *\n"
+            "\n",
+            pl.DataFrame(
+                {
+                    "date": [date(2023, 6, 1), date(2023, 7, 1)],
+                    "fr_year": [2023.453, 2023.538],
+                    "total": [160.5, 159.1],
+                    "std": [20.0, 17.3],
+                    "obs": [1248, 1039],
+                    "provisional": [False, True],
+                },
+                schema={
+                    "date": pl.Date,
+                    "fr_year": pl.Float64,
+                    "total": pl.Float64,
+                    "std": pl.Float64,
+                    "obs": pl.Int32,
+                    "provisional": pl.Boolean,
+                },
+            ),
+            id="provisional",
+        ),
+        pytest.param(
+            "2024 05 2024.371  215.5  24.2  1198 1\n"
+            "2024 06 2024.453  162.8  16.8  1104 0\n",
+            pl.DataFrame(
+                {
+                    "date": [date(2024, 5, 1), date(2024, 6, 1)],
+                    "fr_year": [2024.371, 2024.453],
+                    "total": [215.5, 162.8],
+                    "std": [24.2, 16.8],
+                    "obs": [1198, 1104],
+                    "provisional": [False, True],
+                },
+                schema={
+                    "date": pl.Date,
+                    "fr_year": pl.Float64,
+                    "total": pl.Float64,
+                    "std": pl.Float64,
+                    "obs": pl.Int32,
+                    "provisional": pl.Boolean,
+                },
+            ),
+            id="provisional_flag",
+        ),
+        pytest.param(
+            "1749 01 1749.042   96.7  -1.0    -1\n",
+            pl.DataFrame(
+                {
+                    "date": [date(1749, 1, 1)],
+                    "fr_year": [1749.042],
+                    "total": [96.7],
+                    "std": [None],
+                    "obs": [None],
+                    "provisional": [False],
+                },
+                schema={
+                    "date": pl.Date,
+                    "fr_year": pl.Float64,
+                    "total": pl.Float64,
+                    "std": pl.Float64,
+                    "obs": pl.Int32,
+                    "provisional": pl.Boolean,
+                },
+            ),
+            id="missing",
+        ),
+    ],
+)
+def test_load_silso_data(
+    tmp_path: Path, in_text: str, out_df: pl.DataFrame
+) -> None:
+    path = tmp_path / "SN_m_tot_V2.0.txt"
+    path.write_text(in_text)
+    df_out = silso.load_silso_data(path)
+    assert_frame_equal(df_out, out_df)
+
+
+def test_load_silso_data_daily(tmp_path: Path) -> None:
+    path = tmp_path / "SN_d_tot_V2.0.txt"
+    path.write_text(
+        "1818 01 01 1818.001   -1  -1.0    0 1\n"
+        "2024 02 29 2024.163  105   9.2   27 0\n"
+        "2024 03 01 2024.166  110   8.1   30\n"
+    )
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(1818, 1, 1), date(2024, 2, 29), date(2024, 3, 1)],
+            "fr_year": [1818.001, 2024.163, 2024.166],
+            "total": [None, 105.0, 110.0],
+            "std": [None, 9.2, 8.1],
+            "obs": [0, 27, 30],
+            # 印が無い行は確定値とする
+            "provisional": [False, True, False],
+        },
+        schema={
+            "date": pl.Date,
+            "fr_year": pl.Float64,
+            "total": pl.Float64,
+            "std": pl.Float64,
+            "obs": pl.Int32,
+            "provisional": pl.Boolean,
+        },
+    )
+    df_out = silso.load_silso_data(path, daily=True)
+    assert_frame_equal(df_out, df_expected)
+
+
+def test_load_silso_data_cached(tmp_path: Path) -> None:
+    path = tmp_path / "SN_m_tot_V2.0.txt"
+    cache_path = tmp_path / "cache"
+
+    path.write_text("2020 01 2020.042    6.2   0.7   795\n")
+    df_first = silso.load_silso_data_cached(path, cache_path)
+    assert len(list(cache_path.glob("*.parquet"))) == 1
+    assert_frame_equal(
+        silso.load_silso_data_cached(path, cache_path), df_first
+    )
+
+    # 内容が変わった場合は別のキャッシュを作成する
+    path.write_text("2020 01 2020.042    7.2   0.7   795\n")
+    df_second = silso.load_silso_data_cached(path, cache_path)
+    assert len(list(cache_path.glob("*.parquet"))) == 2
+    assert df_second.item(0, "total") == 7.2
@@ -0,0 +1,140 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_series_equal
+
+import sn_bootstrap
+
+
+def create_daily(seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = [date(2020, 1, d) for d in range(1, 21)] + [
+        date(2020, 2, d) for d in range(1, 6)
+    ]
+    n = len(dates)
+    return pl.DataFrame(
+        {
+            "date": [*dates, date(2020, 4, 3)],
+            "north": [*rng.integers(0, 50, n), 7],
+            "south": [*rng.integers(0, 50, n), 3],
+            "total": [*rng.integers(0, 100, n), 10],
+        }
+    )
+
+
+def test_create_batch() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [
+                date(2020, 2, 3),
+                date(2020, 1, 5),
+                date(2020, 1, 9),
+                date(2020, 2, 1),
+                date(2020, 1, 2),
+            ],
+            "total": [4.0, 1.0, None, 3.0, 2.0],
+        }
+    )
+    batch = sn_bootstrap.create_batch(df_in, ["total"])
+    assert_series_equal(
+        batch.dates, pl.Series("date", [date(2020, 1, 1), date(2020, 2, 1)])
+    )
+    np.testing.assert_array_equal(batch.counts, [2, 2])
+    np.testing.assert_array_equal(batch.mask, [[True, True], [True, True]])
+    np.testing.assert_array_equal(
+        np.sort(batch.values[0], axis=1), [[1.0, 2.0], [3.0, 4.0]]
+    )
+
+
+def test_bootstrap_means() -> None:
+    batch = sn_bootstrap.create_batch(create_daily(), ["north", "total"])
+    means = sn_bootstrap.bootstrap_means(batch, 500, chunk_size=37)
+    assert means.shape == (2, 3, 500)
+
+    # 観測が一つの月は常に同じ値となる
+    np.testing.assert_allclose(means[:, 2], [[7.0] * 500, [10.0] * 500])
+
+    # 再標本化した平均値は月の観測値の範囲に収まる
+    for i in range(2):
+        for j in range(3):
+            observed = batch.values[i, j, : batch.counts[j]]
+            assert means[i, j].min() >= observed.min()
+            assert means[i, j].max() <= observed.max()
+            assert means[i, j].mean() == pytest.approx(
+                observed.mean(), rel=0.05
+            )
+
+
+def test_bootstrap_means_naive() -> None:
+    batch = sn_bootstrap.create_batch(create_daily(), ["north", "south"])
+    means = sn_bootstrap.bootstrap_means(batch, 10, seed=1, chunk_size=4)
+
+    rng = np.random.default_rng(1)
+    n_months, n_max = batch.values.shape[1:]
+    for start in range(0, 10, 4):
+        size = min(4, 10 - start)
+        u = rng.random((size, n_months, n_max))
+        for b in range(size):
+            for j, n in enumerate(batch.counts):
+                index = (u[b, j, :n] * n).astype(np.int64)
+                np.testing.assert_allclose(
+                    means[:, j, start + b],
+                    batch.values[:, j, index].mean(axis=1),
+                )
+
+
+def test_bootstrap_means_seed() -> None:
+    batch = sn_bootstrap.create_batch(create_daily(), ["total"])
+    np.testing.assert_array_equal(
+        sn_bootstrap.bootstrap_means(batch, 100, seed=3),
+        sn_bootstrap.bootstrap_means(batch, 100, seed=3, chunk_size=7),
+    )
+
+
+def test_jackknife_se() -> None:
+    batch = sn_bootstrap.create_batch(create_daily(), ["north", "total"])
+    se = sn_bootstrap.jackknife_se(batch)
+    assert se.shape == (2, 3)
+    # 平均値のジャックナイフ標準誤差は標本標準偏差 / sqrt(n) と一致する
+    for i in range(2):
+        for j in range(2):
+            observed = batch.values[i, j, : batch.counts[j]]
+            np.testing.assert_allclose(
+                se[i, j], observed.std(ddof=1) / np.sqrt(observed.size)
+            )
+    assert np.isnan(se[:, 2]).all()
+
+
+def test_calc_monthly_errors() -> None:
+    df_in = create_daily()
+    df_out = sn_bootstrap.calc_monthly_errors(df_in, n_resamples=4000)
+    assert df_out.columns == [
+        "date",
+        "n",
+        *(
+            f"{col}_{name}"
+            for col in ["north", "south", "total"]
+            for name in ["se", "se_jack", "ci_lower", "ci_upper"]
+        ),
+    ]
+    assert df_out["date"].to_list() == [
+        date(2020, 1, 1),
+        date(2020, 2, 1),
+        date(2020, 4, 1),
+    ]
+    assert df_out["n"].to_list() == [20, 5, 1]
+
+    # 観測が一つの月は誤差を算出しない
+    assert df_out.row(2)[2:] == (None,) * 12
+
+    df_jan = df_in.filter(pl.col("date").dt.month() == 1)
+    for col in ["north", "south", "total"]:
+        row = df_out.row(0, named=True)
+        mean = df_jan[col].mean()
+        # ブートストラップ標準誤差は標本標準偏差 / sqrt(n) に近い
+        assert row[f"{col}_se"] == pytest.approx(
+            df_jan[col].std(ddof=0) / np.sqrt(20), rel=0.1
+        )
+        assert row[f"{col}_ci_lower"] < mean < row[f"{col}_ci_upper"]
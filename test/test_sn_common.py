@@ -38,3 +38,29 @@ def test_sort_by_date(in_date: list[date], out_date: list[date]) -> None:
     df_expected = pl.LazyFrame({"date": out_date}, schema={"date": pl.Date})
     df_out = sn_common.sort(df_in)
     assert_frame_equal(df_out, df_expected, check_column_order=False)
+
+
+@pytest.mark.parametrize(
+    ("in_date", "in_interval", "out_date"),
+    [
+        pytest.param(
+            [date(2020, 1, 1), date(2020, 1, 3)],
+            "1d",
+            [date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 3)],
+            id="daily",
+        ),
+        pytest.param(
+            [date(2020, 3, 1), date(2020, 1, 1)],
+            "1mo",
+            [date(2020, 1, 1), date(2020, 2, 1), date(2020, 3, 1)],
+            id="monthly",
+        ),
+    ],
+)
+def test_fill_dates(
+    in_date: list[date], in_interval: str, out_date: list[date]
+) -> None:
+    df_in = pl.DataFrame({"date": in_date, "total": [1.0, 3.0]})
+    df_out = sn_common.fill_dates(df_in, in_interval)
+    assert_frame_equal(df_out.drop_nulls(), df_in.sort("date"))
+    assert df_out["date"].to_list() == out_date
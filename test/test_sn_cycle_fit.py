@@ -0,0 +1,130 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+from polars.testing import assert_frame_equal
+
+import sn_cycle_fit
+
+
+def test_segment_cycles() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": pl.date_range(
+                date(2020, 11, 1), date(2021, 3, 1), "1mo", eager=True
+            ),
+            "total": [1.0, 2.0, None, 4.0, 5.0],
+            "north": [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+    df_extrema = pl.DataFrame(
+        {
+            "series": ["total", "total", "north"],
+            "kind": ["min", "min", "max"],
+            "date": [date(2020, 12, 1), date(2021, 2, 1), date(2021, 1, 1)],
+            "value": [2.0, 4.0, 3.0],
+        }
+    )
+    # 最初の極小より前の月と欠損した月は除き、最後の周期は未完結とする
+    df_expected = pl.DataFrame(
+        {
+            "series": ["total", "total", "total"],
+            "start": [date(2020, 12, 1), date(2021, 2, 1), date(2021, 2, 1)],
+            "complete": [True, False, False],
+            "t": [0, 0, 1],
+            "value": [2.0, 4.0, 5.0],
+        }
+    )
+    df_out = sn_cycle_fit.segment_cycles(df_in, df_extrema, min_months=1)
+    assert_frame_equal(df_out, df_expected, check_dtypes=False)
+
+    # 観測のある月が少ない周期は除く
+    df_out = sn_cycle_fit.segment_cycles(df_in, df_extrema, min_months=2)
+    assert_frame_equal(df_out, df_expected.slice(1), check_dtypes=False)
+
+
+def test_create_batch() -> None:
+    df_in = pl.DataFrame(
+        {
+            "series": ["a", "a", "b"],
+            "start": [date(2020, 1, 1), date(2020, 1, 1), date(2020, 1, 1)],
+            "t": [0, 2, 1],
+            "value": [1.0, 3.0, 5.0],
+        }
+    )
+    batch = sn_cycle_fit.create_batch(df_in)
+    assert batch.keys.columns == ["series", "start"]
+    assert batch.keys["series"].to_list() == ["a", "b"]
+    np.testing.assert_equal(batch.y, [[1.0, 0.0, 3.0], [0.0, 5.0, 0.0]])
+    np.testing.assert_equal(
+        batch.mask, [[True, False, True], [False, True, False]]
+    )
+    np.testing.assert_equal(batch.t, [[0.0, 1.0, 2.0], [0.0, 1.0, 2.0]])
+
+
+def test_shape_function_jacobian() -> None:
+    t = np.broadcast_to(np.arange(1.0, 150.0), (2, 149))
+    params = np.array([[0.002, 45.0, -3.0], [0.001, 60.0, 2.0]])
+    _, jac = sn_cycle_fit.shape_function(t, params)
+    for i in range(3):
+        step = np.zeros(3)
+        step[i] = 1e-6 * np.abs(params[:, i]).max()
+        f_plus, _ = sn_cycle_fit.shape_function(t, params + step)
+        f_minus, _ = sn_cycle_fit.shape_function(t, params - step)
+        np.testing.assert_allclose(
+            jac[..., i],
+            (f_plus - f_minus) / (2 * step[i]),
+            rtol=1e-5,
+            atol=1e-8,
+        )
+
+
+def create_synthetic_batch() -> tuple[sn_cycle_fit.CycleBatch, np.ndarray]:
+    params = np.array([[0.003, 50.0, -2.0], [0.001, 40.0, 3.0]])
+    t = np.broadcast_to(np.arange(130.0), (2, 130))
+    y, _ = sn_cycle_fit.shape_function(t, params)
+    y = y + np.random.default_rng(0).normal(0, 1.0, y.shape)
+    mask = np.ones(y.shape, dtype=np.bool_)
+    # 2つ目の周期は短く、欠損を含む
+    mask[1, 100:] = False
+    mask[1, 30] = False
+    keys = pl.DataFrame(
+        {"series": ["a", "b"], "start": [date(2000, 1, 1), date(2000, 1, 1)]}
+    )
+    return sn_cycle_fit.CycleBatch(keys, t, y, mask), params
+
+
+def test_fit_batch() -> None:
+    batch, params = create_synthetic_batch()
+    params_out, ssr = sn_cycle_fit.fit_batch(batch, 36.0, 0.0)
+    np.testing.assert_allclose(params_out, params, rtol=0.05, atol=0.5)
+    assert (ssr < batch.mask.sum(axis=1) * 1.5).all()
+
+
+def test_fit_cycles() -> None:
+    batch, params = create_synthetic_batch()
+    df_out = sn_cycle_fit.fit_cycles(
+        batch, start_b=[24.0, 60.0], start_t0=[0.0], max_workers=2
+    )
+    assert df_out.columns == [
+        "series",
+        "start",
+        "a",
+        "b",
+        "t0",
+        "a_err",
+        "b_err",
+        "t0_err",
+        "ssr",
+        "n",
+    ]
+    assert df_out["n"].to_list() == [130, 99]
+    np.testing.assert_allclose(
+        df_out.select("a", "b", "t0").to_numpy(), params, rtol=0.05, atol=0.5
+    )
+    # 真の値は標準誤差の数倍以内に収まる
+    err = df_out.select("a_err", "b_err", "t0_err").to_numpy()
+    assert (err > 0).all()
+    assert (
+        np.abs(df_out.select("a", "b", "t0").to_numpy() - params) < 5 * err
+    ).all()
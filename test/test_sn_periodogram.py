@@ -0,0 +1,139 @@
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+from scipy import signal
+
+import sn_periodogram
+
+
+def create_series(
+    n_days: int = 600, period: float = 27.0, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    t = np.sort(rng.choice(n_days * 3, n_days, replace=False)).astype(float)
+    y = np.vstack(
+        [
+            np.sin(2 * np.pi * t / period) + rng.normal(0, 0.3, t.size),
+            rng.normal(size=t.size),
+        ]
+    )
+    return t, y
+
+
+@pytest.mark.parametrize(
+    ("baseline", "oversampling", "out_n"),
+    [(100, 1, 10), (100, 5, 46), (150, 5, 69)],
+)
+def test_create_frequency_grid(
+    baseline: float, oversampling: int, out_n: int
+) -> None:
+    frequency = sn_periodogram.create_frequency_grid(
+        baseline, 10, 100, oversampling
+    )
+    assert frequency.size == out_n
+    np.testing.assert_allclose(frequency[[0, -1]], [0.01, 0.1])
+    np.testing.assert_array_less(
+        np.diff(frequency), 1 / (oversampling * baseline) + 1e-12
+    )
+
+
+def test_create_frequency_grid_long_period() -> None:
+    # 約11年の周期の強度の極大が格子の端ではなく内側に現れる
+    t = np.arange(0.0, 60 * 365, 10)
+    y = np.sin(2 * np.pi * t / 4000)[None, :]
+    frequency = sn_periodogram.create_frequency_grid(t[-1] - t[0], 30)
+    assert 1 / frequency[0] > 4400
+    power = sn_periodogram.lomb_scargle(t, y, frequency)[0, :, 0]
+    assert 0 < power.argmax() < frequency.size - 1
+    assert 1 / frequency[power.argmax()] == pytest.approx(4000, rel=0.01)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 256])
+def test_lomb_scargle_scipy(chunk_size: int) -> None:
+    t, y = create_series()
+    y[1, ::3] = np.nan
+    frequency = sn_periodogram.create_frequency_grid(t[-1] - t[0], 10, 500, 1)
+    power = sn_periodogram.lomb_scargle(t, y, frequency, chunk_size=chunk_size)
+    assert power.shape == (2, frequency.size, 1)
+
+    for row, p in zip(y, power[..., 0], strict=True):
+        mask = ~np.isnan(row)
+        expected = signal.lombscargle(
+            t[mask],
+            row[mask] - row[mask].mean(),
+            2 * np.pi * frequency,
+            normalize=True,
+        )
+        np.testing.assert_allclose(p, expected)
+
+
+def test_lomb_scargle_peak() -> None:
+    t, y = create_series(period=27.0)
+    frequency = sn_periodogram.create_frequency_grid(t[-1] - t[0], 10, 500)
+    power = sn_periodogram.lomb_scargle(t, y, frequency)[0, :, 0]
+    assert 1 / frequency[power.argmax()] == pytest.approx(27.0, rel=0.01)
+    assert np.all((power >= 0) & (power <= 1))
+
+
+def test_lomb_scargle_bounds() -> None:
+    t, y = create_series()
+    y[0, 50:80] = np.nan
+    frequency = sn_periodogram.create_frequency_grid(500, 10, 500, 1)
+    bounds = np.array([[0, 200], [100, 450], [300, 600]])
+    power = sn_periodogram.lomb_scargle(t, y, frequency, bounds, chunk_size=7)
+    assert power.shape == (2, frequency.size, 3)
+    for i, (start, end) in enumerate(bounds):
+        np.testing.assert_allclose(
+            power[..., i],
+            sn_periodogram.lomb_scargle(
+                t[start:end], y[:, start:end], frequency
+            )[..., 0],
+        )
+
+
+def test_calc_periodogram() -> None:
+    n = 400
+    dates = [date(2020, 1, 1) + timedelta(days=i) for i in range(n)]
+    t = np.arange(n)
+    df_in = pl.DataFrame(
+        {
+            "date": dates,
+            "north": np.sin(2 * np.pi * t / 27),
+            "south": [None if i % 5 == 0 else float(i % 10) for i in t],
+        }
+    )
+    frequency = sn_periodogram.create_frequency_grid(n, 5, 100)
+    df_out = sn_periodogram.calc_periodogram(df_in, frequency)
+    assert df_out.columns == ["frequency", "period", "north", "south"]
+    assert df_out.height == frequency.size
+    peak = df_out.sort("north", descending=True)["period"][0]
+    assert peak == pytest.approx(27.0, rel=0.01)
+    assert df_out["south"].is_not_nan().all()
+
+
+def test_calc_spectrogram() -> None:
+    n = 100
+    df_in = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1) + timedelta(days=i) for i in range(n)],
+            "total": np.sin(np.arange(n) / 3),
+        }
+    )
+    frequency = sn_periodogram.create_frequency_grid(40, 5, 50, 1)
+    centers, spectrogram = sn_periodogram.calc_spectrogram(
+        df_in, frequency, window=40, step=20
+    )
+    np.testing.assert_array_equal(
+        centers,
+        np.array(
+            ["2020-01-21", "2020-02-10", "2020-03-01"], dtype="datetime64[D]"
+        ),
+    )
+    assert list(spectrogram) == ["total"]
+    assert spectrogram["total"].shape == (3, frequency.size)
+    np.testing.assert_allclose(
+        spectrogram["total"][1],
+        sn_periodogram.calc_periodogram(df_in[20:60], frequency)["total"],
+    )
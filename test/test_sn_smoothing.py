@@ -0,0 +1,124 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import sn_smoothing
+
+
+@pytest.mark.parametrize(
+    ("in_kernel", "out_size"),
+    [
+        pytest.param(sn_smoothing.create_tapered_kernel(), 13, id="tapered"),
+        pytest.param(sn_smoothing.create_boxcar_kernel(), 13, id="boxcar"),
+        pytest.param(
+            sn_smoothing.create_gaussian_kernel(2.0, 3.0), 13, id="gaussian"
+        ),
+    ],
+)
+def test_create_kernel(in_kernel: np.ndarray, out_size: int) -> None:
+    assert in_kernel.size == out_size
+    np.testing.assert_allclose(in_kernel.sum(), 1.0)
+    np.testing.assert_allclose(in_kernel, in_kernel[::-1])
+
+
+def test_create_tapered_kernel() -> None:
+    kernel = sn_smoothing.create_tapered_kernel()
+    np.testing.assert_allclose(kernel[[0, -1]], 1 / 24)
+    np.testing.assert_allclose(kernel[1:-1], 1 / 12)
+
+
+@pytest.mark.parametrize(
+    ("in_arr", "in_min_weight", "out_arr"),
+    [
+        pytest.param(
+            [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            1.0,
+            [np.nan, 2.0, 3.0, 4.0, 5.0, np.nan],
+            id="edge",
+        ),
+        pytest.param(
+            [np.nan, 1.0, 2.0, 3.0, 4.0, np.nan],
+            1.0,
+            [np.nan, np.nan, 2.0, 3.0, np.nan, np.nan],
+            id="edge_with_null",
+        ),
+        pytest.param(
+            [2.0, 2.0, np.nan, 4.0, 4.0, 4.0],
+            1.0,
+            [np.nan, np.nan, np.nan, np.nan, 4.0, np.nan],
+            id="strict",
+        ),
+        pytest.param(
+            [2.0, 2.0, np.nan, 4.0, 4.0, 4.0],
+            0.75,
+            [np.nan, 2.0, np.nan, 4.0, 4.0, np.nan],
+            id="renormalize",
+        ),
+        pytest.param([np.nan] * 6, 0.5, [np.nan] * 6, id="empty"),
+    ],
+)
+def test_convolve(
+    in_arr: list[float], in_min_weight: float, out_arr: list[float]
+) -> None:
+    kernel = np.array([0.25, 0.5, 0.25])
+    out = sn_smoothing.convolve(
+        np.array([in_arr]), kernel, min_weight=in_min_weight
+    )
+    np.testing.assert_allclose(out, [out_arr])
+
+
+def test_convolve_with_error() -> None:
+    with pytest.raises(ValueError, match="kernel length must be odd"):
+        _ = sn_smoothing.convolve(np.zeros((1, 5)), np.ones(4) / 4)
+
+
+def test_smooth() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": pl.date_range(
+                date(2020, 1, 1), date(2021, 2, 1), "1mo", eager=True
+            ),
+            "total": [0.0] * 6 + [12.0] + [0.0] * 7,
+        }
+    )
+    df_out = sn_smoothing.smooth(df_in, sn_smoothing.create_tapered_kernel())
+    # 窓全体が揃うのは7か月目と8か月目のみ
+    assert (
+        df_out["total"].is_null().to_list()
+        == [True] * 6 + [False, False] + [True] * 6
+    )
+    np.testing.assert_allclose(df_out["total"].drop_nulls(), [1.0, 1.0])
+
+
+def test_detect_extrema() -> None:
+    months = np.arange(240)
+    df_in = pl.DataFrame(
+        {
+            "date": pl.date_range(
+                date(2000, 1, 1), date(2019, 12, 1), "1mo", eager=True
+            ),
+            # 極小の前後の欠損は比較から除く
+            "total": [
+                None if i in {113, 125} else v
+                for i, v in enumerate(
+                    100 - 100 * np.cos(2 * np.pi * months / 120)
+                )
+            ],
+            "north": [None] * 240,
+        },
+        schema={"date": pl.Date, "total": pl.Float64, "north": pl.Float64},
+    )
+    df_expected = pl.DataFrame(
+        {
+            "series": ["total", "total", "total"],
+            "kind": ["max", "min", "max"],
+            "date": [date(2005, 1, 1), date(2010, 1, 1), date(2015, 1, 1)],
+            "value": [200.0, 0.0, 200.0],
+        }
+    )
+    # 端から窓の月数以内にある2000年1月の極小は確定できない
+    df_out = sn_smoothing.detect_extrema(df_in, window=36)
+    assert_frame_equal(df_out, df_expected)
@@ -0,0 +1,307 @@
+from datetime import date
+from pathlib import Path
+from zipfile import ZipFile
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import sn_station
+
+
+def to_days(dates: list[date]) -> npt.NDArray[np.int64]:
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+@pytest.mark.parametrize(
+    ("in_fr_year", "out_dates"),
+    [
+        pytest.param(
+            [1947.0, 1947 + 1 / 365, 1948 + 59 / 366, 2000 + 365 / 366],
+            [
+                date(1947, 1, 1),
+                date(1947, 1, 2),
+                date(1948, 2, 29),
+                date(2000, 12, 31),
+            ],
+        ),
+        pytest.param(
+            [1969 + 364 / 365, 1970.0, 1970 + 31 / 365],
+            [date(1969, 12, 31), date(1970, 1, 1), date(1970, 2, 1)],
+        ),
+    ],
+)
+def test_to_date_index(in_fr_year: list[float], out_dates: list[date]) -> None:
+    date_index = sn_station.to_date_index(np.array(in_fr_year))
+    np.testing.assert_array_equal(date_index, to_days(out_dates))
+
+
+def test_load_station_data(tmp_path: Path) -> None:
+    path_zip = tmp_path / "data.zip"
+    path_cache = tmp_path / "cache.npz"
+    with ZipFile(path_zip, "w") as zf:
+        zf.writestr("station_names.txt", "A\r\nB\r\n")
+        zf.writestr("fr_year.txt", f"1947.0\n{1947 + 1 / 365}\n")
+        zf.writestr("Ns.txt", "1.0,2.0\nnan,4.0\n")
+
+    names_expected = ["A", "B"]
+    date_expected = to_days([date(1947, 1, 1), date(1947, 1, 2)])
+    ns_expected = np.array([[1.0, 2.0], [np.nan, 4.0]])
+
+    for _ in range(2):
+        names, date_index, ns = sn_station.load_station_data(
+            path_zip, path_cache
+        )
+        assert path_cache.exists()
+        assert names == names_expected
+        np.testing.assert_array_equal(date_index, date_expected)
+        np.testing.assert_array_equal(ns, ns_expected)
+
+
+@pytest.mark.parametrize(
+    ("in_dates", "in_values", "out_dates", "out_ns"),
+    [
+        pytest.param(
+            [date(2000, 1, 2)],
+            [5.0],
+            [date(2000, 1, 1), date(2000, 1, 2), date(2000, 1, 3)],
+            [[1.0, np.nan], [2.0, 5.0], [3.0, np.nan]],
+            id="inner",
+        ),
+        pytest.param(
+            [date(1999, 12, 31), date(2000, 1, 3), date(2000, 1, 5)],
+            [4.0, 5.0, 6.0],
+            [
+                date(2000, 1, 1),
+                date(2000, 1, 2),
+                date(2000, 1, 3),
+                date(2000, 1, 4),
+                date(2000, 1, 5),
+            ],
+            [
+                [1.0, np.nan],
+                [2.0, np.nan],
+                [3.0, 5.0],
+                [np.nan, np.nan],
+                [np.nan, 6.0],
+            ],
+            id="extend",
+        ),
+    ],
+)
+def test_merge_station(
+    in_dates: list[date],
+    in_values: list[float],
+    out_dates: list[date],
+    out_ns: list[list[float]],
+) -> None:
+    ns, date_index = sn_station.merge_station(
+        np.array([[1.0], [2.0], [3.0]]),
+        to_days([date(2000, 1, 1), date(2000, 1, 2), date(2000, 1, 3)]),
+        to_days(in_dates),
+        np.array(in_values),
+    )
+    np.testing.assert_array_equal(ns, np.array(out_ns))
+    np.testing.assert_array_equal(date_index, to_days(out_dates))
+
+
+def test_merge_station_gap() -> None:
+    ns, date_index = sn_station.merge_station(
+        np.array([[3.0], [1.0]]),
+        to_days([date(2000, 1, 3), date(2000, 1, 1)]),
+        to_days([date(2000, 1, 2)]),
+        np.array([5.0]),
+    )
+    np.testing.assert_array_equal(
+        ns, np.array([[1.0, np.nan], [np.nan, 5.0], [3.0, np.nan]])
+    )
+    np.testing.assert_array_equal(
+        date_index,
+        to_days([date(2000, 1, 1), date(2000, 1, 2), date(2000, 1, 3)]),
+    )
+
+
+@pytest.mark.parametrize(
+    ("in_ns", "in_date_index", "match"),
+    [
+        pytest.param(
+            [[1.0], [2.0]], [date(2000, 1, 1)], "number of rows", id="rows"
+        ),
+        pytest.param(
+            [[1.0], [2.0]],
+            [date(2000, 1, 1), date(2000, 1, 1)],
+            "unique",
+            id="duplicate",
+        ),
+    ],
+)
+def test_merge_station_invalid(
+    in_ns: list[list[float]], in_date_index: list[date], match: str
+) -> None:
+    with pytest.raises(ValueError, match=match):
+        sn_station.merge_station(
+            np.array(in_ns),
+            to_days(in_date_index),
+            to_days([date(2000, 1, 2)]),
+            np.array([5.0]),
+        )
+
+
+def test_calc_iqr() -> None:
+    x = np.array([[1.0, 10.0], [2.0, np.nan], [3.0, 30.0], [4.0, 40.0]])
+    np.testing.assert_allclose(sn_station.calc_iqr(x), [1.5, 15.0])
+
+
+def test_bootstrap_iqr_chunk() -> None:
+    x = np.column_stack([np.arange(100.0), np.full(100, 3.0)])
+    seed = np.random.SeedSequence(0)
+    iqr = sn_station.bootstrap_iqr_chunk(x, 5, seed)
+    assert iqr.shape == (5, 2)
+    np.testing.assert_array_equal(iqr[:, 1], 0.0)
+    np.testing.assert_array_equal(
+        iqr, sn_station.bootstrap_iqr_chunk(x, 5, seed)
+    )
+
+
+def test_bootstrap_iqr_worker() -> None:
+    x = np.column_stack([np.arange(100.0), np.full(100, 3.0)])
+    seed = np.random.SeedSequence(0)
+    sn_station.init_bootstrap_worker(x)
+    np.testing.assert_array_equal(
+        sn_station.bootstrap_iqr_worker(5, seed),
+        sn_station.bootstrap_iqr_chunk(x, 5, seed),
+    )
+
+
+def test_bootstrap_iqr() -> None:
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(500, 3)) * [1.0, 2.0, 4.0]
+    iqr = sn_station.calc_iqr(x)
+    lower, upper = sn_station.bootstrap_iqr(x, n_resamples=40, max_workers=2)
+    assert lower.shape == upper.shape == (3,)
+    assert np.all(lower <= iqr)
+    assert np.all(iqr <= upper)
+    assert np.all(np.diff(upper - lower) > 0)
+
+
+def test_open_matrix_empty(tmp_path: Path) -> None:
+    matrix = sn_station.open_matrix(tmp_path / "store")
+    assert matrix.names == []
+    assert matrix.date_index.size == 0
+    assert matrix.values.shape == (0, 0)
+
+
+def test_register_stations(tmp_path: Path) -> None:
+    path = tmp_path / "store"
+    sn_station.register_stations(
+        path,
+        ["A", "B"],
+        to_days([date(2000, 1, 1), date(2000, 1, 3)]),
+        np.array([[1.0, 2.0], [3.0, np.nan]]),
+    )
+    # 期間外の日付を持つ観測所の追加
+    sn_station.register_stations(
+        path,
+        ["C"],
+        to_days([date(1999, 12, 31), date(2000, 1, 3)]),
+        np.array([[5.0], [6.0]]),
+    )
+    # 登録済みの観測所の置き換えと新たな観測所の追加
+    matrix = sn_station.register_stations(
+        path, ["A", "D"], to_days([date(2000, 1, 1)]), np.array([[7.0, 8.0]])
+    )
+
+    assert matrix.names == ["A", "B", "C", "D"]
+    assert matrix.values.dtype == np.float32
+    np.testing.assert_array_equal(
+        matrix.date_index,
+        to_days([date(1999, 12, 31), date(2000, 1, 1), date(2000, 1, 3)]),
+    )
+    np.testing.assert_array_equal(
+        matrix.values,
+        [
+            [np.nan, 7.0, np.nan],
+            [np.nan, 2.0, np.nan],
+            [5.0, np.nan, 6.0],
+            [np.nan, 8.0, np.nan],
+        ],
+    )
+
+    matrix_reopened = sn_station.open_matrix(path)
+    assert matrix_reopened.names == matrix.names
+    np.testing.assert_array_equal(matrix_reopened.values, matrix.values)
+
+
+def create_stations(
+    n_dates: int, n_stations: int, seed: int = 0
+) -> npt.NDArray[np.float32]:
+    rng = np.random.default_rng(seed)
+    base = rng.gamma(2.0, 30.0, n_dates)
+    scale = rng.uniform(0.5, 1.5, n_stations)
+    values = base[None] * scale[:, None] + rng.normal(
+        0, 5, (n_stations, n_dates)
+    )
+    values[rng.random((n_stations, n_dates)) < 0.4] = np.nan
+    return values.astype(np.float32)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 4096])
+def test_calc_pairwise(block_size: int) -> None:
+    values = create_stations(200, 5)
+    matrix = sn_station.StationMatrix(
+        list("ABCDE"), np.arange(200, dtype=np.int64), values
+    )
+    stats = sn_station.calc_pairwise(matrix, block_size=block_size)
+    x = values.astype(np.float64)
+    for i in range(5):
+        for j in range(5):
+            mask = ~np.isnan(x[i]) & ~np.isnan(x[j])
+            a, b = x[i, mask], x[j, mask]
+            assert stats.overlap[i, j] == mask.sum()
+            assert stats.k_factor[i, j] == pytest.approx(
+                np.linalg.lstsq(b[:, None], a, rcond=None)[0][0]
+            )
+            assert stats.corr[i, j] == pytest.approx(np.corrcoef(a, b)[0, 1])
+
+
+def test_calc_pairwise_min_overlap() -> None:
+    values = np.array(
+        [
+            [1.0, 2.0, 3.0, np.nan, np.nan],
+            [2.0, 4.0, 7.0, np.nan, 1.0],
+            [np.nan, np.nan, 1.0, 2.0, 3.0],
+        ],
+        dtype=np.float32,
+    )
+    matrix = sn_station.StationMatrix(
+        ["A", "B", "C"], np.arange(5, dtype=np.int64), values
+    )
+    stats = sn_station.calc_pairwise(matrix, min_overlap=2)
+    np.testing.assert_array_equal(
+        stats.overlap, [[3, 3, 1], [3, 4, 2], [1, 2, 3]]
+    )
+    assert stats.k_factor[1, 0] == pytest.approx(31 / 14)
+    assert np.isnan(stats.k_factor[0, 2])
+    assert np.isnan(stats.corr[2, 0])
+    assert stats.corr[1, 2] == pytest.approx(-1.0)
+
+
+def test_pairwise_to_frame() -> None:
+    stats = sn_station.PairwiseStats(
+        ["A", "B"],
+        np.array([[3, 2], [2, 4]]),
+        np.array([[1.0, 0.5], [2.0, 1.0]]),
+        np.array([[1.0, np.nan], [np.nan, 1.0]]),
+    )
+    df_expected = pl.DataFrame(
+        {
+            "station": ["A", "B"],
+            "reference": ["B", "A"],
+            "n": pl.Series([2, 2], dtype=pl.UInt32),
+            "k": [0.5, 2.0],
+            "r": pl.Series([None, None], dtype=pl.Float64),
+        }
+    )
+    assert_frame_equal(sn_station.pairwise_to_frame(stats), df_expected)
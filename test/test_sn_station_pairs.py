@@ -0,0 +1,47 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+from polars.testing import assert_frame_equal
+
+import sn_station_pairs
+
+
+def test_register_frame(tmp_path: Path) -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [date(2000, 1, 2), date(2000, 1, 1), date(2000, 1, 2)],
+            "north": [1, 2, 3],
+            "total": [4, None, 6],
+        }
+    )
+    matrix = sn_station_pairs.register_frame(
+        tmp_path, df_in, {"total": "X", "north": "Y"}
+    )
+    assert matrix.names == ["X", "Y"]
+    np.testing.assert_array_equal(
+        matrix.date_index,
+        np.array(["2000-01-01", "2000-01-02"], dtype="datetime64[D]").astype(
+            np.int64
+        ),
+    )
+    np.testing.assert_array_equal(matrix.values, [[np.nan, 5.0], [2.0, 2.0]])
+
+
+def test_load_fujimori_spots(tmp_path: Path) -> None:
+    path = tmp_path / "all.parquet"
+    pl.DataFrame(
+        {
+            "date": [date(2000, 1, 1), date(2000, 1, 2)],
+            "ng": [1, None],
+            "nf": [3, None],
+            "sg": [2, None],
+            "sf": [4, None],
+        },
+        schema_overrides={"nf": pl.UInt16, "sf": pl.UInt16},
+    ).write_parquet(path)
+    df_expected = pl.DataFrame(
+        {"date": [date(2000, 1, 1)], "spots": pl.Series([7], dtype=pl.UInt16)}
+    )
+    assert_frame_equal(sn_station_pairs.load_fujimori_spots(path), df_expected)
@@ -0,0 +1,145 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import synoptic_map
+
+
+@pytest.mark.parametrize(
+    ("in_lon_start", "out_rotation"),
+    [
+        # 2003年1月24日頃はL0がほぼ360度であり、自転1999の始まりにあたる
+        pytest.param(345.0, 1999, id="center"),
+        # 東側の経度の小さい範囲はその自転の終わりに中央子午線を通過する
+        pytest.param(60.0, 1998, id="previous"),
+        pytest.param(250.0, 1999, id="same"),
+    ],
+)
+def test_with_rotation(in_lon_start: float, out_rotation: int) -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [date(2003, 1, 24)],
+            "lon_start": [in_lon_start],
+            "lon_width": [10.0],
+        }
+    )
+    df_out = synoptic_map.with_rotation(df_in).collect()
+    assert df_out.item(0, "rotation") == out_rotation
+
+
+@pytest.mark.parametrize(
+    ("in_df", "out_df"),
+    [
+        pytest.param(
+            pl.LazyFrame(
+                {
+                    "rotation": [1],
+                    "lat_min": [9.0],
+                    "lat_max": [10.0],
+                    "lon_start": [20.5],
+                    "lon_width": [1.0],
+                }
+            ),
+            pl.LazyFrame(
+                {
+                    "rotation": [1, 1, 1, 1],
+                    "lat_index": [0, 0, 1, 1],
+                    "lon_index": [20, 21, 20, 21],
+                }
+            ),
+            id="simple",
+        ),
+        pytest.param(
+            pl.LazyFrame(
+                {
+                    "rotation": [1],
+                    "lat_min": [-10.0],
+                    "lat_max": [-10.0],
+                    "lon_start": [358.0],
+                    "lon_width": [3.0],
+                }
+            ),
+            pl.LazyFrame(
+                {
+                    "rotation": [1, 1, 1, 1],
+                    "lat_index": [20, 20, 20, 20],
+                    "lon_index": [358, 359, 0, 1],
+                }
+            ),
+            id="wrap",
+        ),
+        pytest.param(
+            pl.LazyFrame(
+                {
+                    "rotation": [1, 2],
+                    "lat_min": [8.0, 20.0],
+                    "lat_max": [12.0, 30.0],
+                    "lon_start": [0.0, 0.0],
+                    "lon_width": [0.0, 0.0],
+                }
+            ),
+            pl.LazyFrame(
+                {
+                    "rotation": [1, 1, 1],
+                    "lat_index": [0, 1, 2],
+                    "lon_index": [0, 0, 0],
+                }
+            ),
+            id="clip",
+        ),
+    ],
+)
+def test_rasterize(in_df: pl.LazyFrame, out_df: pl.LazyFrame) -> None:
+    df_out = synoptic_map.rasterize(in_df, lat_min=-10, lat_max=10)
+    assert_frame_equal(df_out, out_df, check_dtypes=False)
+
+
+def test_accumulate() -> None:
+    df_in = pl.DataFrame(
+        {
+            "rotation": [5, 5, 7, 5],
+            "lat_index": [0, 1, 2, 0],
+            "lon_index": [3, 3, 359, 3],
+        }
+    )
+    out = np.zeros((3, 3, 360), dtype=np.float32)
+    synoptic_map.accumulate(df_in, np.array([5, 6, 7], dtype=np.int32), out)
+    assert out[0, 0, 3] == 2
+    assert out[0, 1, 3] == 1
+    assert out[2, 2, 359] == 1
+    assert out.sum() == 4
+
+
+def test_build_synoptic(tmp_path: Path) -> None:
+    df_in = pl.LazyFrame(
+        {
+            "date": [date(2003, 1, 24), date(2003, 2, 20)],
+            "lat_min": [10.0, -5.0],
+            "lat_max": [10.0, -5.0],
+            "lon_start": [355.0, 355.0],
+            "lon_width": [0.0, 0.0],
+        }
+    )
+    file = tmp_path / "synoptic.npy"
+    cube, rotation_index = synoptic_map.build_synoptic(
+        df_in, file, lat_min=-10, lat_max=10
+    )
+    np.testing.assert_array_equal(rotation_index, [1999, 2000])
+    assert cube.shape == (2, 21, 360)
+
+    cube_load, rotation_load, lat_load, lon_load = synoptic_map.load_synoptic(
+        file
+    )
+    assert isinstance(cube_load, np.memmap)
+    np.testing.assert_array_equal(cube_load, cube)
+    np.testing.assert_array_equal(rotation_load, [1999, 2000])
+    assert lat_load[0] == 10
+    assert lat_load[-1] == -10
+    assert lon_load.size == 360
+    assert cube_load[0, 0, 355] == 1
+    assert cube_load[1, 15, 355] == 1
+    assert cube_load.sum() == 2
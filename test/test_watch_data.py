@@ -0,0 +1,146 @@
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import watch_data
+
+
+def test_scan_mtimes(tmp_path: Path) -> None:
+    (tmp_path / "2020-1.csv").write_text("")
+    (tmp_path / "memo.txt").write_text("")
+    mtimes = watch_data.scan_mtimes(tmp_path, "*.csv")
+    assert list(mtimes) == [tmp_path / "2020-1.csv"]
+
+
+def test_scan_mtimes_vanished(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "2020-1.csv").write_text("")
+    # 検索の後に削除されたファイルは除く
+    monkeypatch.setattr(
+        type(tmp_path),
+        "glob",
+        lambda self, _pattern: iter(
+            [self / "2020-2.csv", self / "2020-1.csv"]
+        ),
+    )
+    mtimes = watch_data.scan_mtimes(tmp_path, "*.csv")
+    assert list(mtimes) == [tmp_path / "2020-1.csv"]
+
+
+@pytest.mark.parametrize(
+    ("in_before", "in_after", "out_changed"),
+    [
+        pytest.param(
+            {"a": 1.0, "b": 1.0}, {"a": 1.0, "b": 1.0}, [], id="same"
+        ),
+        pytest.param(
+            {"a": 1.0, "b": 1.0}, {"a": 1.0, "b": 2.0}, ["b"], id="modified"
+        ),
+        pytest.param({"a": 1.0}, {"a": 1.0, "c": 1.0}, ["c"], id="added"),
+        pytest.param({"a": 1.0, "b": 1.0}, {"b": 1.0}, ["a"], id="removed"),
+        pytest.param({"a": 1.0}, {"b": 1.0}, ["a", "b"], id="renamed"),
+    ],
+)
+def test_find_changed(
+    in_before: dict[str, float],
+    in_after: dict[str, float],
+    out_changed: list[str],
+) -> None:
+    changed = watch_data.find_changed(
+        {Path(k): v for k, v in in_before.items()},
+        {Path(k): v for k, v in in_after.items()},
+    )
+    assert changed == [Path(p) for p in out_changed]
+
+
+def test_calc_months() -> None:
+    df_old = pl.DataFrame({"date": [date(2020, 1, 3), date(2020, 2, 1)]})
+    df_new = pl.DataFrame({"date": [date(2020, 2, 20), date(2020, 4, 1)]})
+    assert watch_data.calc_months(df_old, df_new) == [
+        date(2020, 1, 1),
+        date(2020, 2, 1),
+        date(2020, 4, 1),
+    ]
+
+
+def test_replace_months() -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 2, 1), date(2020, 2, 2)],
+            "value": [1, 2, 3],
+        }
+    )
+    df_new = pl.DataFrame(
+        {
+            "value": [10, 20, 30],
+            "date": [date(2020, 1, 1), date(2020, 2, 3), date(2020, 3, 1)],
+        }
+    )
+    df_expected = pl.DataFrame(
+        {"date": [date(2020, 1, 1), date(2020, 2, 3)], "value": [1, 20]}
+    )
+    df_out = watch_data.replace_months(df_in, df_new, [date(2020, 2, 1)])
+    assert_frame_equal(df_out, df_expected)
+
+
+def create_seiryo_frame(day: date) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "date": [day, day],
+            "no": [1, 2],
+            "lat_min": [-14, 14],
+            "lat_max": [-14, 16],
+            "lon_min": [63, 42],
+            "lon_max": [63, 53],
+            "num": [1, 2],
+        },
+        schema={
+            "date": pl.Date,
+            "no": pl.UInt8,
+            "lat_min": pl.Int8,
+            "lat_max": pl.Int8,
+            "lon_min": pl.Int16,
+            "lon_max": pl.Int16,
+            "num": pl.UInt16,
+        },
+    )
+
+
+def test_remove_seiryo(tmp_path: Path) -> None:
+    frames = {
+        Path("2020-1.csv"): create_seiryo_frame(date(2020, 1, 10)),
+        Path("2020-2.csv"): create_seiryo_frame(date(2020, 2, 10)),
+    }
+    watch_data.rebuild_seiryo(
+        frames, watch_data.calc_months(*frames.values()), tmp_path
+    )
+    watch_data.remove_seiryo(frames, Path("2020-2.csv"), tmp_path)
+    assert list(frames) == [Path("2020-1.csv")]
+    for file in [
+        "all.parquet",
+        "sunspot/raw.parquet",
+        "sunspot/daily.parquet",
+    ]:
+        df_out = pl.read_parquet(tmp_path / file)
+        assert df_out["date"].unique().to_list() == [date(2020, 1, 10)]
+
+
+def test_remove_sn(tmp_path: Path) -> None:
+    df_in = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 2, 1), date(2020, 2, 2)],
+            "ng": [1, 2, 3],
+        }
+    )
+    df_in.write_parquet(tmp_path / "all.parquet")
+    watch_data.remove_sn(tmp_path / "2020-2.csv", tmp_path)
+    assert_frame_equal(pl.read_parquet(tmp_path / "all.parquet"), df_in[:1])
+
+
+def test_process_file_malformed_name(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="invalid literal"):
+        watch_data.process_file({}, "sn", tmp_path / "memo-1.csv", tmp_path)
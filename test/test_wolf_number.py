@@ -1,4 +1,5 @@
-from datetime import date
+from datetime import date, time
+from pathlib import Path
 
 import polars as pl
 import pytest
@@ -108,3 +109,42 @@ def test_agg_monthly(
     assert_frame_equal(
         df_out, df_expected, check_column_order=False, check_row_order=False
     )
+
+
+def test_load_fujimori(tmp_path: Path) -> None:
+    path = tmp_path / "all.parquet"
+    pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 1, 1), date(2020, 1, 2)],
+            "time": [time(9), time(15), None],
+            "ng": [1, 2, 0],
+            "nf": [3, 4, 0],
+            "sg": [0, 1, 1],
+            "sf": [0, 1, 2],
+            "remarks": [None, "cloudy", None],
+        },
+        schema={
+            "date": pl.Date,
+            "time": pl.Time,
+            "ng": pl.UInt8,
+            "nf": pl.UInt16,
+            "sg": pl.UInt8,
+            "sf": pl.UInt16,
+            "remarks": pl.String,
+        },
+    ).write_parquet(path)
+
+    df_out = wolf_number.load_fujimori(path)
+    assert df_out.columns == ["date", "north", "south", "total"]
+    assert df_out["total"].to_list() == [13, 35, 12]
+
+    # 同じ日の観測は平均値とする
+    df_expected = pl.DataFrame(
+        {
+            "date": [date(2020, 1, 1), date(2020, 1, 2)],
+            "north": [18.5, 0.0],
+            "south": [5.5, 12.0],
+            "total": [24.0, 12.0],
+        }
+    )
+    assert_frame_equal(wolf_number.load_fujimori_daily(path), df_expected)